@@ -9,6 +9,29 @@ It includes:
 
 Azure ML requires this exact structure for online endpoints and batch inference.
 
+Model updates do not need a restart: init() hands the model to a ModelManager
+(src/ml/model_manager.py) that watches AZUREML_MODEL_DIR, or the local model
+registry alias in MODEL_REF ('name@alias'), every MODEL_WATCH_INTERVAL
+seconds (0 = never). A new version is loaded and warmed up in the background
+and swapped in atomically; each request scores on the version it started with.
+
+Shadow scoring (src/ml/shadow_scoring.py): with SHADOW_MODEL_REF (or
+SHADOW_MODEL_DIR) set, a SHADOW_SAMPLE_RATE fraction of requests is also
+scored by that candidate in a background pool; paired predictions go to the
+shadow_predictions table of SHADOW_DB_PATH. The primary response never waits.
+
+Prediction intervals (src/ml/prediction_intervals.py): forest models return
+archived_gb/savings_gb _lower and _upper band edges covering
+PREDICTION_INTERVAL_COVERAGE (default 0.9) of the per-tree predictions,
+computed in the same pass as the point prediction.
+
+Per-tenant models (src/ml/tenant_router.py): with TENANT_MODEL_PREFIX set,
+rows of a request that carry a tenant_id are scored by the registry model
+'<TENANT_MODEL_PREFIX>-<tenant_id>' (alias TENANT_MODEL_ALIAS, default
+production) from a pool of TENANT_MODEL_POOL_SIZE loaded models; tenants
+without a model of their own use the global model. Tenant-routed requests
+return point predictions only.
+
 Usage:
     - Deploy to Azure ML online endpoint
     - Deploy to Azure ML batch inference job
@@ -16,6 +39,8 @@ Usage:
 """
 
 import json
+import os
+import time
 import joblib
 import pandas as pd
 import numpy as np
@@ -28,10 +53,81 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global model variable
+# Memory-mapped artifact loader (src/ml/model_artifacts.py) when available
+sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    from model_artifacts import load_model_artifact
+    ARTIFACTS_AVAILABLE = True
+except ImportError:
+    ARTIFACTS_AVAILABLE = False
+
+try:
+    from model_manager import ModelManager
+    MODEL_MANAGER_AVAILABLE = True
+except ImportError:
+    MODEL_MANAGER_AVAILABLE = False
+
+try:
+    from shadow_scoring import ShadowScorer
+    SHADOW_SCORING_AVAILABLE = True
+except ImportError:
+    SHADOW_SCORING_AVAILABLE = False
+
+try:
+    from tenant_router import TenantModelRouter
+    TENANT_ROUTING_AVAILABLE = True
+except ImportError:
+    TENANT_ROUTING_AVAILABLE = False
+
+try:
+    from prediction_intervals import predict_with_intervals, supports_intervals
+    INTERVALS_AVAILABLE = True
+except ImportError:
+    INTERVALS_AVAILABLE = False
+
+# Band coverage for forest models (0 disables intervals)
+INTERVAL_COVERAGE = float(os.getenv("PREDICTION_INTERVAL_COVERAGE", "0.9"))
+
+# Global model variable (kept in sync with model_manager after each swap)
 model = None
 feature_quantiles = None
 model_metadata = None
+load_stats = None
+model_manager = None
+shadow_scorer = None
+tenant_router = None
+
+
+def _read_json(path: Path):
+    """Read an optional JSON side file (None if missing)"""
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _prepare_version(version):
+    """
+    Warm-up hook of the model manager: load side files and score a dummy batch
+    before the version is published (raising rejects the version)
+    """
+    version.extras['feature_quantiles'] = _read_json(Path(version.path) / "feature_quantiles.json")
+    version.extras['model_metadata'] = _read_json(Path(version.path) / "model_card.json")
+    build_and_predict_dummy_batch(scoring_model=version.model)
+
+
+def _publish_version(version):
+    """Swap hook of the model manager: update the module globals"""
+    global model, feature_quantiles, model_metadata, load_stats
+    model = version.model
+    feature_quantiles = version.extras.get('feature_quantiles')
+    model_metadata = version.extras.get('model_metadata')
+    load_stats = {
+        'load_seconds': version.load_seconds,
+        'warm_up_seconds': version.warm_up_seconds,
+        'rss_delta_mb': version.rss_delta_mb,
+        'version': version.version
+    }
 
 
 def init():
@@ -40,16 +136,39 @@ def init():
     This is called once when the endpoint is deployed or when the container starts.
     Load the model from disk and any required artifacts.
     """
-    global model, feature_quantiles, model_metadata
+    global model, feature_quantiles, model_metadata, load_stats, model_manager, shadow_scorer, tenant_router
     
     try:
         # Get model directory (set by Azure ML)
         model_dir = os.getenv("AZUREML_MODEL_DIR", "./")
+        model_ref = os.getenv("MODEL_REF")
         
         # Alternative: Look for model in current directory (for local testing)
-        if not os.path.exists(os.path.join(model_dir, "model.joblib")):
+        if not model_ref and not os.path.exists(os.path.join(model_dir, "model.joblib")):
             model_dir = Path(__file__).parent.parent.parent / "models"
         
+        if MODEL_MANAGER_AVAILABLE:
+            # Loads, warms up and publishes the first version; watches for new ones
+            model_manager = ModelManager(
+                model_dir=None if model_ref else model_dir,
+                model_ref=model_ref,
+                poll_interval=float(os.getenv("MODEL_WATCH_INTERVAL", "30")),
+                warm_up=_prepare_version,
+                on_swap=_publish_version
+            )
+            model_manager.load_initial()
+            if model_manager.poll_interval > 0:
+                model_manager.start()
+            rss_delta = model_manager.current.rss_delta_mb
+            logger.info(
+                f"✅ Model version {model_manager.current.version} loaded from: {model_manager.current.path}"
+                + (f", RSS +{rss_delta:.1f} MB" if rss_delta is not None else "")
+            )
+            shadow_scorer = init_shadow_scoring()
+            tenant_router = init_tenant_routing()
+            logger.info("✅ Model initialization complete")
+            return
+        
         model_path = Path(model_dir) / "model.joblib"
         quantiles_path = Path(model_dir) / "feature_quantiles.json"
         metadata_path = Path(model_dir) / "model_card.json"
@@ -59,8 +178,20 @@ def init():
             logger.error(f"❌ Model not found at {model_path}")
             raise FileNotFoundError(f"Model file not found: {model_path}")
         
-        model = joblib.load(model_path)
-        logger.info(f"✅ Model loaded from: {model_path}")
+        # mmap_mode='r' shares the model's arrays between worker processes
+        # (only effective for models saved uncompressed, see save_model_artifact)
+        if ARTIFACTS_AVAILABLE:
+            model, load_stats = load_model_artifact(model_path, mmap_mode='r', run_warm_up=False)
+        else:
+            start = time.perf_counter()
+            model = joblib.load(model_path, mmap_mode='r')
+            load_stats = {'load_seconds': time.perf_counter() - start, 'rss_delta_mb': None}
+        
+        rss_delta = load_stats.get('rss_delta_mb')
+        logger.info(
+            f"✅ Model loaded from: {model_path} in {load_stats['load_seconds'] * 1000:.0f} ms"
+            + (f", RSS +{rss_delta:.1f} MB" if rss_delta is not None else "")
+        )
         
         # Load feature quantiles (for drift detection)
         if quantiles_path.exists():
@@ -74,6 +205,13 @@ def init():
                 model_metadata = json.load(f)
             logger.info(f"✅ Model metadata loaded: {model_metadata.get('model', 'N/A')}")
         
+        # Warm up with a dummy batch so the endpoint only reports ready once
+        # the first real request will not pay for page faults / lazy setup
+        warm_up_start = time.perf_counter()
+        build_and_predict_dummy_batch()
+        load_stats['warm_up_seconds'] = time.perf_counter() - warm_up_start
+        logger.info(f"✅ Warm-up batch scored in {load_stats['warm_up_seconds'] * 1000:.0f} ms")
+        
         logger.info("✅ Model initialization complete")
         
     except Exception as e:
@@ -81,6 +219,68 @@ def init():
         raise RuntimeError(f"Model initialization failed: {e}")
 
 
+def init_shadow_scoring():
+    """
+    Start shadow scoring of a candidate model if SHADOW_MODEL_REF / SHADOW_MODEL_DIR is set
+    
+    A candidate that cannot be loaded only disables shadow scoring.
+    
+    Returns:
+        ShadowScorer or None
+    """
+    shadow_ref = os.getenv("SHADOW_MODEL_REF")
+    shadow_dir = os.getenv("SHADOW_MODEL_DIR")
+    if not SHADOW_SCORING_AVAILABLE or not (shadow_ref or shadow_dir):
+        return None
+    
+    try:
+        candidate = ModelManager(
+            model_dir=None if shadow_ref else shadow_dir,
+            model_ref=shadow_ref,
+            poll_interval=float(os.getenv("MODEL_WATCH_INTERVAL", "30")),
+            warm_up=_prepare_version
+        )
+        candidate.load_initial()
+        if candidate.poll_interval > 0:
+            candidate.start()
+        scorer = ShadowScorer(
+            candidate,
+            sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+            db_path=os.getenv("SHADOW_DB_PATH", "monitoring.db")
+        )
+        logger.info(f"✅ Shadow scoring candidate version {candidate.current.version} "
+                    f"on {scorer.sample_rate:.0%} of requests")
+        return scorer
+    except Exception as e:
+        logger.warning(f"⚠️  Shadow scoring disabled: {e}")
+        return None
+
+
+def init_tenant_routing():
+    """
+    Route tenants to their own models if TENANT_MODEL_PREFIX is set
+    
+    Returns:
+        TenantModelRouter or None
+    """
+    prefix = os.getenv("TENANT_MODEL_PREFIX")
+    if not TENANT_ROUTING_AVAILABLE or not prefix:
+        return None
+    
+    try:
+        router = TenantModelRouter(
+            base_name=prefix,
+            alias=os.getenv("TENANT_MODEL_ALIAS", "production"),
+            pool_size=int(os.getenv("TENANT_MODEL_POOL_SIZE", "256"))
+        )
+        logger.info(f"✅ Tenant model routing: {prefix}-<tenant_id>@{router.alias}, "
+                    f"pool of {router.pool.max_loaded} models")
+        return router
+    except Exception as e:
+        logger.warning(f"⚠️  Tenant model routing disabled: {e}")
+        return None
+
+
 def build_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Build features from raw input data.
@@ -169,14 +369,36 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
         raise ValueError(f"Feature engineering error: {e}")
 
 
-def detect_data_drift(df: pd.DataFrame) -> dict:
+def build_and_predict_dummy_batch(batch_size: int = 8, scoring_model=None):
+    """
+    Score a dummy batch through the full feature pipeline.
+    Used by init() as a warm-up before the endpoint reports ready, and before
+    a new model version is swapped in.
+    """
+    dummy = pd.DataFrame({
+        'total_files': [100000] * batch_size,
+        'avg_file_size_mb': [1.2] * batch_size,
+        'pct_pdf': [0.45] * batch_size,
+        'pct_docx': [0.30] * batch_size,
+        'pct_xlsx': [0.15] * batch_size,
+        'archive_frequency_per_day': [300.0] * batch_size
+    })
+    return (scoring_model or model).predict(build_features(dummy))
+
+
+def detect_data_drift(df: pd.DataFrame, quantiles: dict = None) -> dict:
     """
     Detect potential data drift by comparing with training quantiles.
     
+    Args:
+        df: DataFrame with raw input features
+        quantiles: Training quantiles (default: those of the current model)
+    
     Returns:
         dict with drift warnings and statistics
     """
-    if feature_quantiles is None:
+    training_quantiles = quantiles if quantiles is not None else feature_quantiles
+    if training_quantiles is None:
         return {"drift_detected": False, "reason": "No training quantiles available"}
     
     drift_report = {
@@ -189,9 +411,9 @@ def detect_data_drift(df: pd.DataFrame) -> dict:
         X = build_features(df)
         
         for col in X.columns:
-            if col in feature_quantiles:
-                p10 = feature_quantiles[col]['p10']
-                p90 = feature_quantiles[col]['p90']
+            if col in training_quantiles:
+                p10 = training_quantiles[col]['p10']
+                p90 = training_quantiles[col]['p90']
                 
                 # Check for values outside expected range
                 out_of_range = (X[col] < p10) | (X[col] > p90)
@@ -231,13 +453,27 @@ def run(raw_data):
     Returns:
         JSON string with predictions and metadata
     """
-    global model
+    if model_manager is not None:
+        # Pin one version for the whole request; a concurrent swap does not affect it
+        with model_manager.acquire() as active:
+            return _score(
+                raw_data,
+                active.model,
+                active.extras.get('feature_quantiles'),
+                active.extras.get('model_metadata'),
+                active.version
+            )
     
     if model is None:
         error_msg = "Model not initialized. Call init() first."
         logger.error(f"❌ {error_msg}")
         return json.dumps({"error": error_msg, "status": "error"})
     
+    return _score(raw_data, model, feature_quantiles, model_metadata)
+
+
+def _score(raw_data, scoring_model, quantiles, metadata, version=None):
+    """Score one request with the given model version (see run())"""
     try:
         # Parse input
         logger.info(f"Processing prediction request...")
@@ -255,15 +491,33 @@ def run(raw_data):
         df = pd.DataFrame(instances)
         
         # Check for data drift
-        drift_report = detect_data_drift(df)
+        drift_report = detect_data_drift(df, quantiles)
         if drift_report["drift_detected"]:
             logger.warning(f"⚠️  Data drift detected: {drift_report['warnings']}")
         
         # Feature engineering
         X = build_features(df)
         
-        # Make predictions
-        predictions = model.predict(X)
+        # Make predictions (forests: point prediction and bands from one pass over the trees)
+        bands = None
+        routed = tenant_router is not None and 'tenant_id' in df.columns
+        predict_start = time.perf_counter()
+        if routed:
+            # Rows with a tenant model go to it; the rest to this request's global version
+            predictions = tenant_router.predict(X, df['tenant_id'], fallback=scoring_model)
+        elif INTERVALS_AVAILABLE and INTERVAL_COVERAGE and supports_intervals(scoring_model):
+            bands = predict_with_intervals(scoring_model, X, INTERVAL_COVERAGE)
+            predictions = bands['prediction']
+        else:
+            predictions = scoring_model.predict(X)
+        predict_seconds = time.perf_counter() - predict_start
+        
+        # Candidate comparison off the request path (sampled, never blocks)
+        # (tenant-routed predictions are not one version's, so they are not compared)
+        if shadow_scorer is not None and version is not None and not routed:
+            dates = (pd.to_datetime(df['month']).dt.strftime('%Y-%m-%d').tolist()
+                     if 'month' in df.columns else None)
+            shadow_scorer.submit(X, predictions, predict_seconds, version, prediction_dates=dates)
         
         # Format predictions
         results = []
@@ -286,13 +540,24 @@ def run(raw_data):
                     "savings_gb_next_period": float(pred * 0.7)
                 })
         
+        if bands is not None and bands['lower'].ndim == 2 and bands['lower'].shape[1] >= 2:
+            for result, lower, upper in zip(results, bands['lower'], bands['upper']):
+                result.update({
+                    "archived_gb_lower": float(lower[0]),
+                    "archived_gb_upper": float(upper[0]),
+                    "savings_gb_lower": float(lower[1]),
+                    "savings_gb_upper": float(upper[1])
+                })
+        
         # Build response
         response = {
             "status": "success",
             "predictions": results,
             "instance_count": len(instances),
             "timestamp": datetime.utcnow().isoformat(),
-            "model": model_metadata.get("model", "RandomForest") if model_metadata else "Unknown",
+            "model": metadata.get("model", "RandomForest") if metadata else "Unknown",
+            "model_version": version,
+            "interval_coverage": bands['coverage'] if bands is not None else None,
             "drift_detected": drift_report["drift_detected"],
             "drift_warnings": drift_report.get("warnings", [])
         }
@@ -337,8 +602,6 @@ if __name__ == "__main__":
         export AZUREML_MODEL_DIR=./models
         python src/ml/score.py
     """
-    import os
-    
     print("🚀 Testing score.py locally...\n")
     
     # Initialize model
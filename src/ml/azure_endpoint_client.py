@@ -18,27 +18,161 @@ Model expects 9 features (from training):
 Returns 2 outputs:
   1. archived_gb_next_period - Forecasted archived GB
   2. savings_gb_next_period - Forecasted savings in GB
+
+Large inputs are split into chunks of MLFLOW_CHUNK_SIZE rows and sent
+concurrently (at most MLFLOW_MAX_CONCURRENCY requests in flight, matching the
+deployment's max_concurrent_requests_per_instance). Results are reassembled in
+input order; rows from chunks that fail after retry come back as NaN.
+
+Inside a request_context() block, endpoint responses are memoized by a content
+hash of the input frame, so forecasts and metrics for the same data cost one
+inference per request (see get_forecast_and_metrics).
+
+A circuit breaker shared per endpoint URL (circuit_breaker.py) trips after
+consecutive timeouts, connection errors or 5xx responses. While it is open,
+requests are scored by the local fallback model (local_model.py) or fail
+immediately, instead of each waiting out the full timeout.
+
+Responses whose predictions carry interval bands (archived_gb_lower/_upper,
+savings_gb_lower/_upper, from score.py or the local fallback forest) get
+matching band columns in the forecast frame, including the confidence_upper/
+confidence_lower offsets the dashboard band charts draw.
+
+get_predictions() returns one prediction per input row, dated on consecutive
+days. For a real horizon, get_recursive_forecast() rolls the endpoint forward
+step by step (recursive_forecast.py), one batched call per step for all
+tenants.
 """
 
+import hashlib
 import json
 import os
 import requests
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    from .circuit_breaker import CircuitOpenError, get_breaker
+    from .local_model import get_local_model
+    from .recursive_forecast import RecursiveForecaster
+except ImportError:
+    from circuit_breaker import CircuitOpenError, get_breaker
+    from local_model import get_local_model
+    from recursive_forecast import RecursiveForecaster
 
 
 # Load environment variables
 load_dotenv()
 
+# Defaults for chunked requests (see deployment_config.yaml request_settings)
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_INTERVAL_COVERAGE = 0.9
 
-class AzureMLEndpointClient:
-    """Client for calling Azure ML endpoint"""
+# Band edges per prediction row, in this order
+INTERVAL_KEYS = ('archived_gb_lower', 'archived_gb_upper', 'savings_gb_lower', 'savings_gb_upper')
+
+
+class EndpointServerError(RuntimeError):
+    """HTTP 5xx from the endpoint (counts as a failure for the circuit breaker)"""
+    pass
+
+
+# Errors that mean the endpoint itself is unhealthy (trip the circuit breaker)
+BREAKER_FAILURES = (TimeoutError, ConnectionError, EndpointServerError)
+
+# Per-request response memo: {(endpoint_url, frame_hash): response}.
+# None outside request_context(), which disables memoization.
+_response_memo: ContextVar[Optional[Dict]] = ContextVar('endpoint_response_memo', default=None)
+
+
+@contextmanager
+def request_context():
+    """
+    Memoize endpoint responses for the duration of one request
+    
+    Every call_endpoint_cached() made inside the block with the same input
+    frame (by content) reuses the first response. The memo is dropped on
+    exit, so the next request (e.g. the next Streamlit rerun) sees fresh
+    predictions. Nested blocks share the outer memo.
+    
+    Usage:
+        with request_context():
+            forecast_df, metrics = client.get_predictions(df)
+            model_metrics = client.get_model_metrics(df)   # no second call
+    """
+    if _response_memo.get() is not None:
+        yield
+        return
+    
+    token = _response_memo.set({})
+    try:
+        yield
+    finally:
+        _response_memo.reset(token)
+
+
+def add_confidence_offsets(forecast_df: pd.DataFrame) -> pd.DataFrame:
+    """Add the confidence_upper/confidence_lower offsets (from archived_gb) the band charts draw"""
+    forecast_df['confidence_upper'] = forecast_df['archived_gb_upper'] - forecast_df['archived_gb']
+    forecast_df['confidence_lower'] = forecast_df['archived_gb'] - forecast_df['archived_gb_lower']
+    return forecast_df
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index and column names)
+    
+    Args:
+        df: Frame to hash
+    
+    Returns:
+        Hex digest that changes whenever any cell, row or column changes
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+class EndpointClientBase:
+    """
+    Transport-independent part of the endpoint clients
+    
+    Configuration, circuit breaker and local fallback, request payloads,
+    chunk splitting/merging and response parsing. AzureMLEndpointClient
+    (requests, thread pool) and AsyncAzureMLEndpointClient (aiohttp) add the
+    I/O on top.
+    """
     
-    def __init__(self):
-        """Initialize endpoint configuration from environment variables"""
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        max_concurrent_requests: Optional[int] = None,
+        timeout: Optional[float] = None,
+        chunk_retries: int = 1,
+        interval_coverage: Optional[float] = None
+    ):
+        """
+        Initialize endpoint configuration from environment variables
+        
+        Args:
+            chunk_size: Max rows per request (default: MLFLOW_CHUNK_SIZE or 500)
+            max_concurrent_requests: Max requests in flight for chunked calls
+                (default: MLFLOW_MAX_CONCURRENCY or 10)
+            timeout: Per-request timeout in seconds (default: MLFLOW_TIMEOUT or 30)
+            chunk_retries: Retries per chunk on timeout/connection errors (default: 1)
+            interval_coverage: Band coverage for local fallback predictions, 0 for none
+                (default: PREDICTION_INTERVAL_COVERAGE or 0.9)
+        """
         self.endpoint_url = os.getenv('MLFLOW_ENDPOINT')
         self.api_key = os.getenv('MLFLOW_API_KEY')
         self.deployment_name = os.getenv('MLFLOW_DEPLOYMENT')
@@ -48,6 +182,30 @@ class AzureMLEndpointClient:
                 "Azure ML endpoint configuration missing. "
                 "Set MLFLOW_ENDPOINT and MLFLOW_API_KEY in .env file"
             )
+        
+        # Explicit arguments win, also falsy ones (interval_coverage=0 disables bands)
+        self.chunk_size = int(
+            chunk_size if chunk_size is not None else os.getenv('MLFLOW_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+        )
+        self.max_concurrent_requests = int(
+            max_concurrent_requests if max_concurrent_requests is not None
+            else os.getenv('MLFLOW_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)
+        )
+        self.timeout = float(
+            timeout if timeout is not None else os.getenv('MLFLOW_TIMEOUT', DEFAULT_TIMEOUT_SECONDS)
+        )
+        self.chunk_retries = chunk_retries
+        self.interval_coverage = float(
+            interval_coverage if interval_coverage is not None
+            else os.getenv('PREDICTION_INTERVAL_COVERAGE', DEFAULT_INTERVAL_COVERAGE)
+        )
+        
+        if self.chunk_size < 1 or self.max_concurrent_requests < 1:
+            raise ValueError("chunk_size and max_concurrent_requests must be >= 1")
+        
+        # Shared per-endpoint breaker and local model used while it is open
+        self.breaker = get_breaker(self.endpoint_url)
+        self.fallback_model = get_local_model()
     
     def prepare_request_payload(self, historical_df: pd.DataFrame) -> Dict:
         """
@@ -109,22 +267,528 @@ class AzureMLEndpointClient:
         
         return payload
     
+    def split_into_chunks(self, historical_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """Split historical_df into consecutive frames of at most chunk_size rows"""
+        return [
+            historical_df.iloc[start:start + self.chunk_size]
+            for start in range(0, len(historical_df), self.chunk_size)
+        ]
+    
+    def merge_chunk_outcomes(
+        self,
+        chunks: List[pd.DataFrame],
+        outcomes: List[Tuple[Optional[Dict], Optional[Exception]]]
+    ) -> Dict:
+        """
+        Reassemble per-chunk (result, error) outcomes in input order
+        
+        Args:
+            chunks: Chunk frames in input order
+            outcomes: (result, error) per chunk, same order as chunks
+        
+        Returns:
+            Merged response dict (see call_endpoint_chunked)
+        
+        Raises:
+            Exception: The first chunk error if every chunk failed
+        """
+        predictions = []
+        intervals = []
+        has_intervals = False
+        failed_chunks = []
+        metrics = {}
+        source = None
+        first_error = None
+        
+        for index, (chunk, (result, error)) in enumerate(zip(chunks, outcomes)):
+            if error is not None:
+                first_error = first_error or error
+                failed_chunks.append({'chunk': index, 'rows': len(chunk), 'error': str(error)})
+                predictions.extend([[np.nan, np.nan]] * len(chunk))
+                intervals.extend([[np.nan] * 4] * len(chunk))
+                continue
+            
+            rows = self.extract_prediction_rows(result)
+            bands = self.extract_interval_rows(result)
+            has_intervals = has_intervals or bands is not None
+            bands = bands or [[np.nan] * 4] * len(rows)
+            if len(rows) != len(chunk):
+                failed_chunks.append({
+                    'chunk': index,
+                    'rows': len(chunk),
+                    'error': f"Expected {len(chunk)} predictions, got {len(rows)}"
+                })
+                rows = (rows + [[np.nan, np.nan]] * len(chunk))[:len(chunk)]
+                bands = (bands + [[np.nan] * 4] * len(chunk))[:len(chunk)]
+            predictions.extend(rows)
+            intervals.extend(bands)
+            
+            if isinstance(result, dict):
+                metrics = metrics or result.get('metrics', {})
+                source = source or result.get('source')
+        
+        if len(failed_chunks) == len(chunks) and first_error is not None:
+            raise first_error
+        
+        if failed_chunks:
+            print(f"  ⚠️ {len(failed_chunks)}/{len(chunks)} chunk(s) failed; "
+                  f"returning NaN for {sum(c['rows'] for c in failed_chunks)} row(s)")
+        
+        merged = {
+            'predictions': predictions,
+            'metrics': metrics,
+            'chunk_count': len(chunks),
+            'failed_chunks': failed_chunks
+        }
+        if has_intervals:
+            merged['intervals'] = intervals
+        if source:
+            merged['source'] = source
+        return merged
+    
+    @staticmethod
+    def extract_prediction_rows(result) -> List[List[float]]:
+        """
+        Normalize an endpoint response into [archived_gb, savings_gb] rows
+        
+        Args:
+            result: Raw endpoint response (list of pairs, or dict with 'predictions')
+        
+        Returns:
+            List of [archived_gb, savings_gb] float pairs
+        """
+        predictions = result if isinstance(result, list) else result.get('predictions', [])
+        
+        rows = []
+        for pred in predictions:
+            if isinstance(pred, (list, tuple)) and len(pred) >= 2:
+                rows.append([float(pred[0]), float(pred[1])])
+            elif isinstance(pred, dict):
+                rows.append([
+                    float(pred.get('archived_gb', pred.get('archived_gb_next_period', 0))),
+                    float(pred.get('savings_gb', pred.get('savings_gb_next_period', 0)))
+                ])
+        return rows
+    
+    @staticmethod
+    def extract_interval_rows(result) -> Optional[List[List[float]]]:
+        """
+        Interval band edges per prediction row, if the response has them
+        
+        Args:
+            result: Raw endpoint response (as for extract_prediction_rows), or a
+                merged chunked response with 'intervals'
+        
+        Returns:
+            List of [archived_gb_lower, archived_gb_upper, savings_gb_lower,
+            savings_gb_upper] (NaN where a row has no band), aligned with
+            extract_prediction_rows(); None if no row has a band
+        """
+        if isinstance(result, dict) and 'intervals' in result:
+            return result['intervals']
+        
+        predictions = result if isinstance(result, list) else result.get('predictions', [])
+        
+        bands = []
+        for pred in predictions:
+            if isinstance(pred, dict):
+                bands.append([float(pred.get(key, np.nan)) for key in INTERVAL_KEYS])
+            elif isinstance(pred, (list, tuple)) and len(pred) >= 2:
+                bands.append([np.nan] * 4)
+        
+        if not any(key in pred for pred in predictions if isinstance(pred, dict) for key in INTERVAL_KEYS):
+            return None
+        return bands
+    
+    def _request_timeout(self) -> float:
+        """Request timeout, capped for half-open probes so recovery checks stay fast"""
+        if self.breaker.is_probing():
+            return min(self.timeout, self.breaker.probe_timeout)
+        return self.timeout
+    
+    def _short_circuit(self, payload: Dict) -> Dict:
+        """
+        Serve a request while the circuit is open
+        
+        Args:
+            payload: Request payload from prepare_request_payload()
+        
+        Returns:
+            {'predictions': [...], 'source': 'local_fallback'}
+        
+        Raises:
+            CircuitOpenError: If no local fallback model is available
+        """
+        if self.fallback_model.available:
+            return {
+                'predictions': self.fallback_model.predict_payload(payload, coverage=self.interval_coverage),
+                'source': 'local_fallback'
+            }
+        
+        status = self.breaker.get_status()
+        raise CircuitOpenError(
+            f"Azure ML endpoint circuit is {status['state']} after "
+            f"{status['consecutive_failures']} consecutive failures; next probe in "
+            f"{status['next_probe_in_seconds'] or 0:.0f}s. No local fallback model: "
+            f"{self.fallback_model.load_error}"
+        )
+    
+    def get_breaker_status(self) -> Dict:
+        """
+        Get circuit breaker and fallback model status for monitoring
+        
+        Returns:
+            Breaker status dict with a 'fallback_model' entry
+        """
+        status = self.breaker.get_status()
+        status['fallback_model'] = self.fallback_model.get_status()
+        return status
+    
+    def _http_error(self, status: int, detail) -> Exception:
+        """
+        Map an HTTP error status to the exception type callers handle
+        
+        Args:
+            status: HTTP status code (>= 400)
+            detail: Parsed error body, or the raw response text
+        
+        Returns:
+            PermissionError (401), ValueError (404), EndpointServerError (5xx)
+            or RuntimeError
+        """
+        error_msg = f"HTTP {status} Error: {detail}"
+            
+        if status == 401:
+            return PermissionError(
+                f"Authentication failed (401). Check MLFLOW_API_KEY in .env. {error_msg}"
+            )
+        elif status == 404:
+            return ValueError(
+                f"Endpoint not found (404): {self.endpoint_url}. {error_msg}"
+            )
+        elif status == 424:
+            return RuntimeError(
+                f"Failed Dependency (424). Endpoint received request but cannot process it. "
+                f"This usually means: payload format mismatch, missing input columns, or endpoint not fully deployed. "
+                f"Details: {error_msg}"
+            )
+        elif status >= 500:
+            return EndpointServerError(error_msg)
+        return RuntimeError(error_msg)
+    
+    def build_forecast(self, historical_df: pd.DataFrame, result) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Build the forecast DataFrame and summary metrics from an endpoint response
+        
+        Args:
+            historical_df: Historical data the endpoint was called with
+            result: Raw endpoint response from call_endpoint()
+        
+        Returns:
+            Tuple of (forecast_df, metrics) as described in get_predictions()
+        """
+        # Azure ML endpoint returns list of predictions
+        # Each prediction is [archived_gb, savings_gb]
+        predictions = result if isinstance(result, list) else result.get('predictions', [])
+        
+        if not predictions:
+            raise ValueError("No predictions returned from endpoint")
+        
+        # Extract archived_gb and savings_gb
+        rows = self.extract_prediction_rows(result)
+        archived_gb_values = [row[0] for row in rows]
+        savings_gb_values = [row[1] for row in rows]
+        
+        if not archived_gb_values or not savings_gb_values:
+            raise ValueError(
+                f"Failed to extract predictions. "
+                f"Got {len(archived_gb_values)} archived_gb values and "
+                f"{len(savings_gb_values)} savings_gb values from {len(predictions)} predictions"
+            )
+        
+        # Generate forecast dates starting from last historical date
+        last_historical_date = pd.to_datetime(historical_df['date'].max())
+        
+        # Use actual prediction count, not forecast_days parameter
+        actual_predictions = len(archived_gb_values)
+        forecast_dates = pd.date_range(
+            start=last_historical_date + timedelta(days=1),
+            periods=actual_predictions,
+            freq='D'
+        )
+        
+        # Ensure all arrays have the same length
+        min_length = min(len(forecast_dates), len(archived_gb_values), len(savings_gb_values))
+        
+        # Build forecast DataFrame with guaranteed equal-length arrays
+        forecast_df = pd.DataFrame({
+            'date': forecast_dates[:min_length],
+            'archived_gb': archived_gb_values[:min_length],
+            'savings_gb': savings_gb_values[:min_length],
+        })
+        
+        # Interval bands, plus the offsets the dashboard band charts expect
+        bands = self.extract_interval_rows(result)
+        if bands is not None:
+            bands = np.asarray(bands[:min_length], dtype=float).reshape(-1, 4)
+            for column, key in enumerate(INTERVAL_KEYS):
+                forecast_df[key] = bands[:, column]
+            add_confidence_offsets(forecast_df)
+        
+        # Simple metrics based on predictions
+        metrics = {
+            'model_name': 'smartarchive-archive-forecast',
+            'endpoint_url': self.endpoint_url,
+            'last_updated': datetime.now().isoformat(),
+            'historical_records': len(historical_df),
+            'forecast_records': len(forecast_df),
+            'avg_archived_gb': float(np.nanmean(archived_gb_values[:min_length])) if archived_gb_values else 0,
+            'avg_savings_gb': float(np.nanmean(savings_gb_values[:min_length])) if savings_gb_values else 0,
+        }
+        
+        if isinstance(result, dict) and 'chunk_count' in result:
+            metrics['chunk_count'] = result['chunk_count']
+            metrics['failed_chunks'] = len(result['failed_chunks'])
+            metrics['failed_rows'] = sum(c['rows'] for c in result['failed_chunks'])
+        
+        if isinstance(result, dict) and result.get('source'):
+            metrics['source'] = result['source']
+        
+        return forecast_df, metrics
+    
+    def _step_predictions(self, result):
+        """One recursive forecast step's endpoint response in RecursiveForecaster's predict_fn format"""
+        rows = np.asarray(self.extract_prediction_rows(result), dtype=float).reshape(-1, 2)
+        bands = self.extract_interval_rows(result)
+        if bands is None:
+            return rows
+        bands = np.asarray(bands, dtype=float).reshape(-1, 4)
+        return {'prediction': rows, 'lower': bands[:, [0, 2]], 'upper': bands[:, [1, 3]]}
+    
+    def build_recursive_forecast(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_df: pd.DataFrame,
+        run: Dict
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Finish a recursive forecast: band offsets and summary metrics
+        
+        Args:
+            historical_df: Historical data the forecast started from
+            forecast_df: RecursiveForecaster output
+            run: The forecaster's last_run statistics
+        
+        Returns:
+            Tuple of (forecast_df, metrics) as described in get_recursive_forecast()
+        """
+        if 'archived_gb_upper' in forecast_df.columns:
+            add_confidence_offsets(forecast_df)
+        
+        metrics = {
+            'model_name': 'smartarchive-archive-forecast',
+            'endpoint_url': self.endpoint_url,
+            'last_updated': datetime.now().isoformat(),
+            'historical_records': len(historical_df),
+            'forecast_records': len(forecast_df),
+            'tenants': run['tenants'],
+            'horizon': run['horizon'],
+            'endpoint_calls': run['predict_calls'],
+            'avg_archived_gb': float(np.nanmean(forecast_df['archived_gb'])),
+            'avg_savings_gb': float(np.nanmean(forecast_df['savings_gb']))
+        }
+        return forecast_df, metrics
+    
+    def build_model_metrics(self, result) -> Dict:
+        """
+        Build the model performance metrics dict from an endpoint response
+        
+        Args:
+            result: Raw endpoint response from call_endpoint()
+        
+        Returns:
+            Dictionary with model performance metrics
+        """
+        metrics = result.get('metrics', {})
+        
+        return {
+            'r2_score': metrics.get('r2', 0.0),
+            'rmse': metrics.get('rmse', 0.0),
+            'mae': metrics.get('mae', 0.0),
+            'mape': metrics.get('mape', 0.0),
+            'model_name': 'smartarchive-archive-forecast',
+            'endpoint_url': self.endpoint_url,
+            'last_updated': datetime.now().isoformat()
+        }
+
+
+class AzureMLEndpointClient(EndpointClientBase):
+    """Client for calling Azure ML endpoint"""
+    
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        max_concurrent_requests: Optional[int] = None,
+        timeout: Optional[float] = None,
+        chunk_retries: int = 1,
+        interval_coverage: Optional[float] = None
+    ):
+        """Endpoint configuration (see EndpointClientBase) plus a pooled requests session"""
+        super().__init__(
+            chunk_size=chunk_size,
+            max_concurrent_requests=max_concurrent_requests,
+            timeout=timeout,
+            chunk_retries=chunk_retries,
+            interval_coverage=interval_coverage
+        )
+        
+        # One pooled session so concurrent chunks reuse connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_concurrent_requests
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+    
     def call_endpoint(self, historical_df: pd.DataFrame) -> Dict:
         """
         Call Azure ML endpoint with historical data
         
+        Frames larger than chunk_size are sent as concurrent chunked requests
+        (see call_endpoint_chunked).
+        
         Args:
             historical_df: DataFrame with historical data
         
         Returns:
             Dictionary with predictions and metrics from endpoint
-            
+        
         Raises:
             requests.RequestException: If endpoint call fails
         """
+        if len(historical_df) > self.chunk_size:
+            return self.call_endpoint_chunked(historical_df)
+        
+        payload = self.prepare_request_payload(historical_df)
+        return self._post_payload(payload)
+    
+    def call_endpoint_cached(self, historical_df: pd.DataFrame):
+        """
+        call_endpoint() memoized for the current request_context()
+        
+        Outside a request_context() this is a plain call_endpoint().
+        
+        Args:
+            historical_df: DataFrame with historical data
+        
+        Returns:
+            Raw endpoint response (shared between callers, do not mutate)
+        """
+        memo = _response_memo.get()
+        if memo is None:
+            return self.call_endpoint(historical_df)
+        
+        key = (self.endpoint_url, frame_fingerprint(historical_df))
+        if key not in memo:
+            memo[key] = self.call_endpoint(historical_df)
+        return memo[key]
+    
+    def call_endpoint_chunked(self, historical_df: pd.DataFrame) -> Dict:
+        """
+        Call the endpoint with historical_df split into concurrent chunks
+        
+        At most max_concurrent_requests chunks are in flight at once. Each chunk
+        is retried chunk_retries times on timeout/connection errors. Rows from
+        chunks that still fail are returned as [nan, nan] so the output stays
+        aligned with the input rows.
+        
+        Args:
+            historical_df: DataFrame with historical data
+        
+        Returns:
+            Dictionary with keys:
+            - 'predictions': List of [archived_gb, savings_gb], one per input row
+            - 'intervals': Band edges per row (see extract_interval_rows), only
+              if any chunk returned bands
+            - 'metrics': Metrics from the first successful chunk (if any)
+            - 'chunk_count': Number of chunks sent
+            - 'failed_chunks': List of {'chunk': int, 'rows': int, 'error': str}
+        
+        Raises:
+            Exception: The first chunk error if every chunk failed
+        """
+        chunks = self.split_into_chunks(historical_df)
+        workers = min(self.max_concurrent_requests, len(chunks))
+        
+        print(f"  Sending {len(historical_df)} rows as {len(chunks)} chunk(s), "
+              f"{workers} concurrent")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(self._call_chunk, chunks))
+        
+        return self.merge_chunk_outcomes(chunks, outcomes)
+    
+    def _call_chunk(self, chunk_df: pd.DataFrame) -> Tuple[Optional[Dict], Optional[Exception]]:
+        """Call the endpoint for one chunk, returning (result, error) instead of raising"""
+        attempts = self.chunk_retries + 1
+        error = None
+        
+        for _ in range(attempts):
+            try:
+                payload = self.prepare_request_payload(chunk_df)
+                return self._post_payload(payload), None
+            except CircuitOpenError as e:
+                # Open circuit and no fallback model: retrying cannot help
+                return None, e
+            except (TimeoutError, ConnectionError) as e:
+                error = e
+            except Exception as e:
+                # Auth, 4xx and payload errors will not succeed on retry
+                return None, e
+        
+        return None, error
+    
+    def _post_payload(self, payload: Dict):
+        """
+        POST a prepared payload through the circuit breaker
+        
+        Args:
+            payload: Request payload from prepare_request_payload()
+        
+        Returns:
+            Parsed JSON response, or the local fallback response while the
+            circuit is open
+        """
+        if not self.breaker.allow_request():
+            return self._short_circuit(payload)
+        
+        timeout = self._request_timeout()
+        try:
+            result = self._send_payload(payload, timeout)
+        except BREAKER_FAILURES:
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            # Auth/payload errors: the endpoint answered, so it is healthy
+            self.breaker.record_success()
+            raise
+        
+        self.breaker.record_success()
+        return result
+    
+    def _send_payload(self, payload: Dict, timeout: float):
+        """
+        POST a prepared payload to the endpoint and map HTTP errors
+        
+        Args:
+            payload: Request payload from prepare_request_payload()
+            timeout: Request timeout in seconds
+        
+        Returns:
+            Parsed JSON response
+        """
         try:
-            payload = self.prepare_request_payload(historical_df)
-            
             headers = {
                 'Content-Type': 'application/json',
                 'Authorization': f'Bearer {self.api_key}'
@@ -133,11 +797,11 @@ class AzureMLEndpointClient:
             print(f"  Payload size: {len(json.dumps(payload))} bytes")
             print(f"  Headers: Content-Type={headers['Content-Type']}, API Key length={len(self.api_key)}")
             
-            response = requests.post(
+            response = self._session.post(
                 self.endpoint_url,
                 json=payload,
                 headers=headers,
-                timeout=30
+                timeout=timeout
             )
             
             print(f"  Status Code: {response.status_code}")
@@ -147,10 +811,10 @@ class AzureMLEndpointClient:
             
             result = response.json()
             return result
-            
+        
         except requests.exceptions.Timeout:
             raise TimeoutError(
-                f"Azure ML endpoint timeout (30s). "
+                f"Azure ML endpoint timeout ({timeout:g}s). "
                 f"Endpoint: {self.endpoint_url}"
             )
         except requests.exceptions.ConnectionError as e:
@@ -159,32 +823,15 @@ class AzureMLEndpointClient:
                 f"Check endpoint URL and network connection. "
                 f"Error: {str(e)}"
             )
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP {response.status_code} Error"
+        except requests.exceptions.HTTPError:
             try:
-                error_detail = response.json()
-                error_msg += f": {error_detail}"
-            except:
-                error_msg += f": {response.text}"
-            
-            if response.status_code == 401:
-                raise PermissionError(
-                    f"Authentication failed (401). Check MLFLOW_API_KEY in .env. {error_msg}"
-                )
-            elif response.status_code == 404:
-                raise ValueError(
-                    f"Endpoint not found (404): {self.endpoint_url}. {error_msg}"
-                )
-            elif response.status_code == 424:
-                raise RuntimeError(
-                    f"Failed Dependency (424). Endpoint received request but cannot process it. "
-                    f"This usually means: payload format mismatch, missing input columns, or endpoint not fully deployed. "
-                    f"Details: {error_msg}"
-                )
-            raise RuntimeError(f"{error_msg}")
+                detail = response.json()
+            except ValueError:
+                detail = response.text
+            raise self._http_error(response.status_code, detail)
     
     def get_predictions(
-        self, 
+        self,
         historical_df: pd.DataFrame,
         forecast_days: int = 90
     ) -> Tuple[pd.DataFrame, Dict]:
@@ -199,80 +846,59 @@ class AzureMLEndpointClient:
             Tuple of (forecast_df, metrics)
             - forecast_df: DataFrame with columns [date, archived_gb, savings_gb]
             - metrics: Dictionary with model performance metrics
-            
-        Note: 
+        
+        Note:
             Model returns 2 outputs per input row:
             - archived_gb_next_period: Forecasted archived GB
             - savings_gb_next_period: Forecasted savings in GB
+            forecast_days is not a horizon here (one prediction per input row);
+            use get_recursive_forecast() for one.
         """
         try:
             # Call endpoint
-            result = self.call_endpoint(historical_df)
-            
-            # Azure ML endpoint returns list of predictions
-            # Each prediction is [archived_gb, savings_gb]
-            predictions = result if isinstance(result, list) else result.get('predictions', [])
-            
-            if not predictions:
-                raise ValueError("No predictions returned from endpoint")
-            
-            # Extract archived_gb and savings_gb
-            archived_gb_values = []
-            savings_gb_values = []
-            
-            for pred in predictions:
-                if isinstance(pred, (list, tuple)) and len(pred) >= 2:
-                    archived_gb_values.append(float(pred[0]))
-                    savings_gb_values.append(float(pred[1]))
-                elif isinstance(pred, dict):
-                    archived_gb_values.append(float(pred.get('archived_gb', 0)))
-                    savings_gb_values.append(float(pred.get('savings_gb', 0)))
-            
-            if not archived_gb_values or not savings_gb_values:
-                raise ValueError(
-                    f"Failed to extract predictions. "
-                    f"Got {len(archived_gb_values)} archived_gb values and "
-                    f"{len(savings_gb_values)} savings_gb values from {len(predictions)} predictions"
-                )
-            
-            # Generate forecast dates starting from last historical date
-            last_historical_date = pd.to_datetime(historical_df['date'].max())
-            
-            # Use actual prediction count, not forecast_days parameter
-            actual_predictions = len(archived_gb_values)
-            forecast_dates = pd.date_range(
-                start=last_historical_date + timedelta(days=1),
-                periods=actual_predictions,
-                freq='D'
-            )
-            
-            # Ensure all arrays have the same length
-            min_length = min(len(forecast_dates), len(archived_gb_values), len(savings_gb_values))
-            
-            # Build forecast DataFrame with guaranteed equal-length arrays
-            forecast_df = pd.DataFrame({
-                'date': forecast_dates[:min_length],
-                'archived_gb': archived_gb_values[:min_length],
-                'savings_gb': savings_gb_values[:min_length],
-            })
-            
-            # Simple metrics based on predictions
-            metrics = {
-                'model_name': 'smartarchive-archive-forecast',
-                'endpoint_url': self.endpoint_url,
-                'last_updated': datetime.now().isoformat(),
-                'historical_records': len(historical_df),
-                'forecast_records': len(forecast_df),
-                'avg_archived_gb': float(np.mean(archived_gb_values[:min_length])) if archived_gb_values else 0,
-                'avg_savings_gb': float(np.mean(savings_gb_values[:min_length])) if savings_gb_values else 0,
-            }
-            
-            return forecast_df, metrics
-            
+            result = self.call_endpoint_cached(historical_df)
+            return self.build_forecast(historical_df, result)
+        
         except Exception as e:
             print(f"Error getting predictions: {str(e)}")
             raise
     
+    def _predict_step(self, frame: pd.DataFrame):
+        """Score one recursive forecast step for all tenants with one endpoint call"""
+        return self._step_predictions(self.call_endpoint(frame))
+    
+    def get_recursive_forecast(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_days: int = 90,
+        tenant_column: str = 'tenant_id',
+        freq: str = 'D'
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Forecast forecast_days periods ahead by rolling the endpoint forward
+        
+        Starts from the last row of every tenant in historical_df (or the last
+        row overall without tenant_column). Each step sends all tenants in one
+        request (chunked above chunk_size) and advances the date and seasonal
+        features for the next step.
+        
+        Args:
+            historical_df: Historical data for input features (must have date column)
+            forecast_days: Horizon in periods of freq
+            tenant_column: Tenant identifier column, if any
+            freq: Period between steps (pandas offset alias)
+        
+        Returns:
+            Tuple of (forecast_df, metrics)
+            - forecast_df: One row per tenant and step: [tenant_column,] step,
+              date, archived_gb, savings_gb (plus band columns when the
+              endpoint returns intervals)
+            - metrics: As get_predictions(), plus tenants, horizon and endpoint_calls
+        """
+        forecaster = RecursiveForecaster(predict_fn=self._predict_step, freq=freq)
+        forecast_df = forecaster.forecast(historical_df, forecast_days, tenant_column=tenant_column)
+        return self.build_recursive_forecast(historical_df, forecast_df, forecaster.last_run)
+    
     def get_model_metrics(self, historical_df: pd.DataFrame) -> Dict:
         """
         Extract model metrics from endpoint response
@@ -284,21 +910,39 @@ class AzureMLEndpointClient:
             Dictionary with model performance metrics
         """
         try:
-            result = self.call_endpoint(historical_df)
-            metrics = result.get('metrics', {})
-            
-            return {
-                'r2_score': metrics.get('r2', 0.0),
-                'rmse': metrics.get('rmse', 0.0),
-                'mae': metrics.get('mae', 0.0),
-                'mape': metrics.get('mape', 0.0),
-                'model_name': 'smartarchive-archive-forecast',
-                'endpoint_url': self.endpoint_url,
-                'last_updated': datetime.now().isoformat()
-            }
+            result = self.call_endpoint_cached(historical_df)
+            return self.build_model_metrics(result)
         except Exception as e:
             print(f"Error getting metrics: {str(e)}")
             return {}
+    
+    def get_forecast_and_metrics(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_days: int = 90
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Get forecast and model metrics from a single endpoint call
+        
+        Replaces calling get_predictions() and get_model_metrics() separately,
+        which costs two inferences on the same data.
+        
+        Args:
+            historical_df: Historical data for input features (must have date column)
+            forecast_days: Number of days to forecast ahead
+        
+        Returns:
+            Tuple of (forecast_df, metrics) as get_predictions(); metrics also
+            carries r2_score/rmse/mae/mape when the endpoint reports them
+        """
+        with request_context():
+            forecast_df, metrics = self.get_predictions(historical_df, forecast_days)
+            result = self.call_endpoint_cached(historical_df)
+        
+        if isinstance(result, dict) and result.get('metrics'):
+            metrics.update(self.build_model_metrics(result))
+        
+        return forecast_df, metrics
 
 
 def get_predictions_from_azure(
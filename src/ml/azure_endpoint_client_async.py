@@ -0,0 +1,469 @@
+"""
+Async Azure ML Endpoint Client
+
+Asyncio variant of AzureMLEndpointClient for the dashboard and batch jobs.
+Mirrors get_predictions() / get_model_metrics() but awaits network I/O instead
+of blocking, so many forecasts can be fetched concurrently from one thread.
+
+- Connection reuse: one aiohttp.ClientSession per client (keep-alive pool)
+- Bounded concurrency: an asyncio.Semaphore caps requests in flight across
+  every call made through the client (default: MLFLOW_MAX_CONCURRENCY)
+- Cancellation-aware timeouts: per-request aiohttp timeouts; cancelling the
+  awaiting task aborts the request and releases its connection
+- Request memo: inside request_context(), identical frames share one response
+- Recursive forecasts: get_recursive_forecast() awaits one (chunked) endpoint
+  call per step, like the sync client
+
+Usage:
+    from azure_endpoint_client_async import AsyncAzureMLEndpointClient, run_sync
+    
+    async def fetch_all(frames):
+        async with AsyncAzureMLEndpointClient() as client:
+            return await asyncio.gather(*(client.get_predictions(df) for df in frames))
+    
+    results = run_sync(fetch_all(frames))   # from synchronous code
+"""
+
+import asyncio
+import threading
+import pandas as pd
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+try:
+    from .azure_endpoint_client import (
+        BREAKER_FAILURES, CircuitOpenError, EndpointClientBase,
+        _response_memo, frame_fingerprint, request_context
+    )
+    from .recursive_forecast import RecursiveForecaster
+except ImportError:
+    from azure_endpoint_client import (
+        BREAKER_FAILURES, CircuitOpenError, EndpointClientBase,
+        _response_memo, frame_fingerprint, request_context
+    )
+    from recursive_forecast import RecursiveForecaster
+
+
+class AsyncAzureMLEndpointClient(EndpointClientBase):
+    """Asyncio client for calling the Azure ML endpoint
+    
+    Sibling of AzureMLEndpointClient: configuration, breaker, payloads and
+    response parsing come from EndpointClientBase, only the transport differs.
+    Use as an async context manager, or call close() when done, so the HTTP
+    session is released.
+    """
+    
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        max_concurrent_requests: Optional[int] = None,
+        timeout: Optional[float] = None,
+        chunk_retries: int = 1,
+        interval_coverage: Optional[float] = None
+    ):
+        """
+        Initialize endpoint configuration from environment variables
+        
+        Args:
+            chunk_size: Max rows per request (default: MLFLOW_CHUNK_SIZE or 500)
+            max_concurrent_requests: Max requests in flight across all calls
+                (default: MLFLOW_MAX_CONCURRENCY or 10)
+            timeout: Per-request timeout in seconds (default: MLFLOW_TIMEOUT or 30)
+            chunk_retries: Retries per chunk on timeout/connection errors (default: 1)
+            interval_coverage: Band coverage for local fallback predictions, 0 for none
+                (default: PREDICTION_INTERVAL_COVERAGE or 0.9)
+        """
+        super().__init__(
+            chunk_size=chunk_size,
+            max_concurrent_requests=max_concurrent_requests,
+            timeout=timeout,
+            chunk_retries=chunk_retries,
+            interval_coverage=interval_coverage
+        )
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit"""
+        await self.close()
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        self._semaphore = None
+    
+    def _get_http(self) -> aiohttp.ClientSession:
+        """Create the session and semaphore lazily inside the running loop"""
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Authorization': f'Bearer {self.api_key}'
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._http
+    
+    async def call_endpoint(self, historical_df: pd.DataFrame):
+        """
+        Call Azure ML endpoint with historical data
+        
+        Frames larger than chunk_size are sent as concurrent chunks
+        (see call_endpoint_chunked).
+        
+        Args:
+            historical_df: DataFrame with historical data
+        
+        Returns:
+            Raw endpoint response (list of pairs or dict with 'predictions')
+        """
+        if len(historical_df) > self.chunk_size:
+            return await self.call_endpoint_chunked(historical_df)
+        
+        payload = self.prepare_request_payload(historical_df)
+        return await self._post_payload_async(payload)
+    
+    async def call_endpoint_cached(self, historical_df: pd.DataFrame):
+        """
+        call_endpoint() memoized for the current request_context()
+        
+        Concurrent callers awaiting the same frame share one in-flight request.
+        
+        Args:
+            historical_df: DataFrame with historical data
+        
+        Returns:
+            Raw endpoint response (shared between callers, do not mutate)
+        """
+        memo = _response_memo.get()
+        if memo is None:
+            return await self.call_endpoint(historical_df)
+        
+        key = ('async', self.endpoint_url, frame_fingerprint(historical_df))
+        if key not in memo:
+            memo[key] = asyncio.ensure_future(self.call_endpoint(historical_df))
+        return await asyncio.shield(memo[key])
+    
+    async def call_endpoint_chunked(self, historical_df: pd.DataFrame) -> Dict:
+        """
+        Call the endpoint with historical_df split into concurrent chunks
+        
+        Same contract as AzureMLEndpointClient.call_endpoint_chunked(); the
+        client-wide semaphore bounds the requests in flight.
+        
+        Args:
+            historical_df: DataFrame with historical data
+        
+        Returns:
+            Merged response dict with 'predictions', 'metrics', 'chunk_count'
+            and 'failed_chunks'
+        """
+        chunks = self.split_into_chunks(historical_df)
+        outcomes = await asyncio.gather(*(self._call_chunk_async(chunk) for chunk in chunks))
+        return self.merge_chunk_outcomes(chunks, list(outcomes))
+    
+    async def _call_chunk_async(self, chunk_df: pd.DataFrame) -> Tuple[Optional[Any], Optional[Exception]]:
+        """Call the endpoint for one chunk, returning (result, error) instead of raising"""
+        error = None
+        
+        for _ in range(self.chunk_retries + 1):
+            try:
+                payload = self.prepare_request_payload(chunk_df)
+                return await self._post_payload_async(payload), None
+            except CircuitOpenError as e:
+                # Open circuit and no fallback model: retrying cannot help
+                return None, e
+            except (TimeoutError, ConnectionError) as e:
+                error = e
+            except Exception as e:
+                # Auth, 4xx and payload errors will not succeed on retry
+                return None, e
+        
+        return None, error
+    
+    async def _post_payload_async(self, payload: Dict):
+        """
+        POST a prepared payload through the shared circuit breaker
+        
+        Args:
+            payload: Request payload from prepare_request_payload()
+        
+        Returns:
+            Parsed JSON response, or the local fallback response while the
+            circuit is open
+        """
+        if not self.breaker.allow_request():
+            return self._short_circuit(payload)
+        
+        timeout = self._request_timeout()
+        try:
+            result = await self._send_payload_async(payload, timeout)
+        except asyncio.CancelledError:
+            # Cancelled by the caller, not an endpoint failure; just free a half-open probe
+            self.breaker.release_probe()
+            raise
+        except BREAKER_FAILURES:
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_success()
+            raise
+        
+        self.breaker.record_success()
+        return result
+    
+    async def _send_payload_async(self, payload: Dict, timeout: float):
+        """
+        POST a prepared payload and map errors like the sync client
+        
+        Args:
+            payload: Request payload from prepare_request_payload()
+            timeout: Request timeout in seconds
+        
+        Returns:
+            Parsed JSON response
+        """
+        http = self._get_http()
+        request_timeout = aiohttp.ClientTimeout(total=timeout)
+        
+        async with self._semaphore:
+            try:
+                async with http.post(self.endpoint_url, json=payload, timeout=request_timeout) as response:
+                    if response.status >= 400:
+                        text = await response.text()
+                        raise self._http_error(response.status, text)
+                    return await response.json(content_type=None)
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Azure ML endpoint timeout ({timeout:g}s). "
+                    f"Endpoint: {self.endpoint_url}"
+                )
+            except aiohttp.ClientConnectionError as e:
+                raise ConnectionError(
+                    f"Failed to connect to Azure ML endpoint. "
+                    f"Check endpoint URL and network connection. "
+                    f"Error: {str(e)}"
+                )
+    
+    async def get_predictions(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_days: int = 90
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Get predictions from Azure ML endpoint
+        
+        Args:
+            historical_df: Historical data for input features (must have date column)
+            forecast_days: Number of days to forecast ahead
+        
+        Returns:
+            Tuple of (forecast_df, metrics), as AzureMLEndpointClient.get_predictions()
+        """
+        try:
+            result = await self.call_endpoint_cached(historical_df)
+            return self.build_forecast(historical_df, result)
+        except Exception as e:
+            print(f"Error getting predictions: {str(e)}")
+            raise
+    
+    async def _predict_step(self, frame: pd.DataFrame):
+        """Score one recursive forecast step for all tenants with one endpoint call"""
+        return self._step_predictions(await self.call_endpoint(frame))
+    
+    async def get_recursive_forecast(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_days: int = 90,
+        tenant_column: str = 'tenant_id',
+        freq: str = 'D'
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Forecast forecast_days periods ahead by rolling the endpoint forward
+        
+        Each step awaits one request for all tenants (chunked above
+        chunk_size) before the next step's features are built.
+        
+        Args:
+            historical_df: Historical data for input features (must have date column)
+            forecast_days: Horizon in periods of freq
+            tenant_column: Tenant identifier column, if any
+            freq: Period between steps (pandas offset alias)
+        
+        Returns:
+            Tuple of (forecast_df, metrics), as
+            AzureMLEndpointClient.get_recursive_forecast()
+        """
+        forecaster = RecursiveForecaster(predict_fn=self._predict_step, freq=freq)
+        forecast_df = await forecaster.forecast_async(historical_df, forecast_days, tenant_column=tenant_column)
+        return self.build_recursive_forecast(historical_df, forecast_df, forecaster.last_run)
+    
+    async def get_model_metrics(self, historical_df: pd.DataFrame) -> Dict:
+        """
+        Extract model metrics from endpoint response
+        
+        Args:
+            historical_df: Historical data
+        
+        Returns:
+            Dictionary with model performance metrics (empty on error)
+        """
+        try:
+            result = await self.call_endpoint_cached(historical_df)
+            return self.build_model_metrics(result)
+        except Exception as e:
+            print(f"Error getting metrics: {str(e)}")
+            return {}
+    
+    async def get_forecast_and_metrics(
+        self,
+        historical_df: pd.DataFrame,
+        forecast_days: int = 90
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Get forecast and model metrics from a single endpoint call
+        
+        Args:
+            historical_df: Historical data for input features (must have date column)
+            forecast_days: Number of days to forecast ahead
+        
+        Returns:
+            Tuple of (forecast_df, metrics), as
+            AzureMLEndpointClient.get_forecast_and_metrics()
+        """
+        with request_context():
+            forecast_df, metrics = await self.get_predictions(historical_df, forecast_days)
+            result = await self.call_endpoint_cached(historical_df)
+        
+        if isinstance(result, dict) and result.get('metrics'):
+            metrics.update(self.build_model_metrics(result))
+        
+        return forecast_df, metrics
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    Uses asyncio.run() when no loop is running in this thread. If one is
+    (e.g. inside Jupyter or another async framework), the coroutine runs on
+    a fresh loop in a helper thread instead of failing.
+    
+    Args:
+        coro: Coroutine to run
+        timeout: Optional overall timeout in seconds; the coroutine is
+                 cancelled when it expires
+    
+    Returns:
+        The coroutine's result (exceptions are re-raised)
+    """
+    if timeout is not None:
+        coro = asyncio.wait_for(coro, timeout)
+    
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    outcome: Dict[str, Any] = {}
+    
+    def _runner():
+        try:
+            outcome['result'] = asyncio.run(coro)
+        except BaseException as e:
+            outcome['error'] = e
+    
+    thread = threading.Thread(target=_runner, daemon=True)
+    thread.start()
+    thread.join()
+    
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def get_predictions_batch(
+    frames: List[pd.DataFrame],
+    forecast_days: int = 90,
+    max_concurrent_requests: Optional[int] = None
+) -> List[Tuple[pd.DataFrame, Dict]]:
+    """
+    Fetch forecasts for many historical frames concurrently (sync entry point)
+    
+    Args:
+        frames: Historical DataFrames, one forecast request each
+        forecast_days: Days to forecast
+        max_concurrent_requests: Cap on requests in flight (default: env/10)
+    
+    Returns:
+        List of (forecast_df, metrics) in the same order as frames
+    
+    Usage:
+        results = get_predictions_batch([df_site_a, df_site_b, df_site_c])
+    """
+    async def _fetch_all():
+        async with AsyncAzureMLEndpointClient(max_concurrent_requests=max_concurrent_requests) as client:
+            return await asyncio.gather(
+                *(client.get_predictions(df, forecast_days) for df in frames)
+            )
+    
+    return run_sync(_fetch_all())
+
+
+if __name__ == "__main__":
+    """
+    Test the async endpoint client against the local mock endpoint
+    
+    Run: python src/ml/azure_endpoint_client_async.py
+    """
+    import os
+    import sys
+    import time
+    import numpy as np
+    from pathlib import Path
+    
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from scripts.mock_endpoint_server import MockEndpointServer
+    
+    print("Testing AsyncAzureMLEndpointClient...")
+    print("=" * 60)
+    
+    with MockEndpointServer(latency_s=0.05, max_concurrency=10) as server:
+        os.environ['MLFLOW_ENDPOINT'] = server.url
+        os.environ.setdefault('MLFLOW_API_KEY', 'local-test-key')
+        
+        dates = pd.date_range(start='2025-08-14', periods=30, freq='D')
+        sample_df = pd.DataFrame({
+            'date': dates,
+            'total_files': np.random.uniform(100000, 150000, 30),
+            'avg_file_size_mb': np.random.uniform(1.0, 1.5, 30),
+            'pct_pdf': np.random.uniform(0.40, 0.50, 30),
+            'pct_docx': np.random.uniform(0.25, 0.35, 30),
+            'pct_xlsx': np.random.uniform(0.10, 0.20, 30),
+            'pct_other': np.random.uniform(0.05, 0.15, 30),
+            'archive_frequency_per_day': np.random.uniform(200, 400, 30),
+        })
+        
+        print("\n✓ Test 1: Single forecast via run_sync")
+        async def _single():
+            async with AsyncAzureMLEndpointClient() as client:
+                return await client.get_predictions(sample_df)
+        forecast_df, metrics = run_sync(_single())
+        print(f"  Rows: {len(forecast_df)}, avg archived_gb: {metrics['avg_archived_gb']:.2f}")
+        
+        print("\n✓ Test 2: 20 concurrent forecasts via get_predictions_batch")
+        start = time.perf_counter()
+        results = get_predictions_batch([sample_df] * 20)
+        print(f"  Got {len(results)} forecasts in {time.perf_counter() - start:.2f}s")
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -0,0 +1,287 @@
+"""
+Circuit Breaker for the Azure ML Endpoint
+
+Stops the dashboard from waiting out the full request timeout on every load
+while the endpoint is slow or down.
+
+States:
+- 'closed':    Requests go to the endpoint; consecutive failures are counted
+- 'open':      Requests are short-circuited (served by the local fallback
+               model, or rejected immediately) until reset_timeout elapses
+- 'half_open': One probe request is let through; success closes the circuit,
+               failure re-opens it for another reset_timeout
+
+Breakers are shared per endpoint URL, so every client instance (one per
+Streamlit rerun) sees the same state.
+
+Usage:
+    breaker = get_breaker(endpoint_url)
+    if breaker.allow_request():
+        try:
+            result = call()
+            breaker.record_success()
+        except TimeoutError:
+            breaker.record_failure()
+            raise
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Defaults (override with MLFLOW_BREAKER_* environment variables)
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT_SECONDS = 30
+DEFAULT_PROBE_TIMEOUT_SECONDS = 5
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when a request is short-circuited and no fallback is available"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker
+    
+    Responsibilities:
+    - Trip to 'open' after failure_threshold consecutive failures
+    - Move to 'half_open' once reset_timeout has elapsed and admit one probe
+    - Close on a successful probe, re-open on a failed one
+    - Keep counters for monitoring (get_status)
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT_SECONDS,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize breaker
+        
+        Args:
+            name: Identifier shown in status output (usually the endpoint URL)
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds to stay open before probing
+            probe_timeout: Request timeout callers should use for half-open probes
+            clock: Monotonic time source (injectable for tests)
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        
+        # Monitoring counters
+        self._total_failures = 0
+        self._total_successes = 0
+        self._short_circuited = 0
+        self._times_opened = 0
+        self._last_failure_at: Optional[str] = None
+        self._last_state_change: Optional[str] = None
+    
+    @property
+    def state(self) -> str:
+        """Current state, moving open -> half_open once reset_timeout has passed"""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+    
+    def _refresh_state(self):
+        """Promote an expired open circuit to half_open (caller holds the lock)"""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+            self._probe_in_flight = False
+    
+    def _set_state(self, state: str):
+        """Change state and record when (caller holds the lock)"""
+        if state != self._state:
+            self._state = state
+            self._last_state_change = datetime.now().isoformat()
+    
+    def allow_request(self) -> bool:
+        """
+        Decide whether the next request may go to the endpoint
+        
+        In half_open only one caller gets True (the probe) until it reports
+        back via record_success() / record_failure() / release_probe().
+        
+        Returns:
+            True to call the endpoint, False to short-circuit
+        """
+        with self._lock:
+            self._refresh_state()
+            
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            
+            self._short_circuited += 1
+            return False
+    
+    def is_probing(self) -> bool:
+        """True while a half-open probe is in flight"""
+        with self._lock:
+            return self._state == HALF_OPEN and self._probe_in_flight
+    
+    def record_success(self):
+        """Report a completed request; closes a half-open circuit"""
+        with self._lock:
+            self._total_successes += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._opened_at = None
+            self._set_state(CLOSED)
+    
+    def record_failure(self):
+        """Report a failed request; may open (or re-open) the circuit"""
+        with self._lock:
+            self._total_failures += 1
+            self._consecutive_failures += 1
+            self._last_failure_at = datetime.now().isoformat()
+            
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._times_opened += 1
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+                self._set_state(OPEN)
+    
+    def release_probe(self):
+        """Report a request abandoned by the caller (e.g. cancelled) without an outcome"""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def reset(self):
+        """Force the circuit closed and clear the failure count"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+    
+    def get_status(self) -> Dict:
+        """
+        Get breaker state and counters for monitoring
+        
+        Returns:
+            Dictionary with state, failure counts and seconds until the next probe
+        """
+        with self._lock:
+            self._refresh_state()
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout_seconds': self.reset_timeout,
+                'next_probe_in_seconds': retry_in,
+                'total_failures': self._total_failures,
+                'total_successes': self._total_successes,
+                'short_circuited_requests': self._short_circuited,
+                'times_opened': self._times_opened,
+                'last_failure_at': self._last_failure_at,
+                'last_state_change': self._last_state_change
+            }
+
+
+# Breaker registry, one per endpoint URL
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Get (or create) the shared breaker for an endpoint
+    
+    New breakers read MLFLOW_BREAKER_THRESHOLD, MLFLOW_BREAKER_RESET_SECONDS
+    and MLFLOW_BREAKER_PROBE_TIMEOUT from the environment.
+    
+    Args:
+        name: Endpoint URL (or any key identifying the dependency)
+    
+    Returns:
+        CircuitBreaker shared by all callers using the same name
+    """
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv('MLFLOW_BREAKER_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+                reset_timeout=float(os.getenv('MLFLOW_BREAKER_RESET_SECONDS', DEFAULT_RESET_TIMEOUT_SECONDS)),
+                probe_timeout=float(os.getenv('MLFLOW_BREAKER_PROBE_TIMEOUT', DEFAULT_PROBE_TIMEOUT_SECONDS))
+            )
+        return _breakers[name]
+
+
+def get_all_breaker_status() -> Dict[str, Dict]:
+    """
+    Get status of every registered breaker
+    
+    Returns:
+        Dictionary mapping breaker name to get_status() output
+    """
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_status() for breaker in breakers}
+
+
+if __name__ == "__main__":
+    """
+    Test the circuit breaker state machine
+    
+    Run: python src/ml/circuit_breaker.py
+    """
+    print("Testing CircuitBreaker...")
+    print("=" * 60)
+    
+    now = [0.0]
+    breaker = CircuitBreaker('demo', failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+    
+    print("\n✓ Test 1: Trips after 3 consecutive failures")
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    print(f"  State: {breaker.state}")
+    
+    print("\n✓ Test 2: Half-open after reset timeout admits one probe")
+    now[0] = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    print(f"  State: {breaker.state}")
+    
+    print("\n✓ Test 3: Successful probe closes the circuit")
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    print(f"  Status: {breaker.get_status()}")
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -0,0 +1,206 @@
+"""
+Local Fallback Model
+
+Loads a local copy of the registered forecasting model so the endpoint client
+can keep serving predictions while the Azure endpoint circuit is open.
+
+Model directory (LOCAL_MODEL_DIR, default: test_data/model) may contain:
+- An MLflow model (MLmodel + model.pkl), loaded with mlflow.sklearn
+- A plain joblib/pickle file (model.joblib or model.pkl), memory-mapped and
+  warmed up via model_artifacts.load_model_artifact
+
+With LOCAL_MODEL_REF ('name@alias', e.g. 'smart-archive-forecast@production')
+the model comes from the local model registry instead and shares its
+loaded-model cache.
+
+The model is loaded once per process and per directory. A missing or broken
+model is remembered too, so an unavailable fallback costs nothing per request.
+
+Usage:
+    model = get_local_model()
+    if model.available:
+        rows = model.predict_payload(payload)   # [[archived_gb, savings_gb], ...]
+        rows = model.predict_payload(payload, coverage=0.9)   # + forest interval bands
+"""
+
+import os
+import threading
+import time
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from .model_artifacts import load_model_artifact
+    from .model_registry import get_registry, parse_model_ref
+    from .prediction_intervals import predict_with_intervals, supports_intervals
+except ImportError:
+    from model_artifacts import load_model_artifact
+    from model_registry import get_registry, parse_model_ref
+    from prediction_intervals import predict_with_intervals, supports_intervals
+
+
+DEFAULT_MODEL_DIR = Path(__file__).parent.parent.parent / 'test_data' / 'model'
+
+
+class LocalFallbackModel:
+    """Lazily loaded local copy of the forecasting model"""
+    
+    def __init__(self, model_dir: Optional[str] = None, model_ref: Optional[str] = None):
+        """
+        Initialize (the model itself is loaded on first use)
+        
+        Args:
+            model_dir: Model directory (default: LOCAL_MODEL_DIR or test_data/model)
+            model_ref: Registry reference 'name@alias' (default: LOCAL_MODEL_REF
+                unless model_dir is given); takes precedence over model_dir
+        """
+        self.model_ref = model_ref or (None if model_dir else os.getenv('LOCAL_MODEL_REF'))
+        self.model_dir = Path(model_dir or os.getenv('LOCAL_MODEL_DIR', DEFAULT_MODEL_DIR))
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.load_stats: Optional[Dict] = None
+    
+    @property
+    def available(self) -> bool:
+        """True if the model loaded successfully"""
+        return self._load() is not None
+    
+    def _load(self):
+        """Load the model once; later calls return the cached model or None"""
+        if self._loaded:
+            return self._model
+        
+        with self._lock:
+            if self._loaded:
+                return self._model
+            
+            start = time.perf_counter()
+            try:
+                self._model = self._load_from_dir()
+                self.load_seconds = time.perf_counter() - start
+                print(f"✅ Local fallback model loaded from {self.model_dir} "
+                      f"({self.load_seconds:.2f}s)")
+            except Exception as e:
+                self._model = None
+                self.load_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Local fallback model unavailable: {self.load_error}")
+            finally:
+                self._loaded = True
+        
+        return self._model
+    
+    def _load_from_dir(self):
+        """Load an MLflow or joblib model from model_dir (or the registry)"""
+        if self.model_ref:
+            name, ref = parse_model_ref(self.model_ref)
+            registry = get_registry()
+            self.model_dir = registry.get_path(name, ref)
+            return registry.load(name, ref)
+        
+        if not self.model_dir.exists():
+            raise FileNotFoundError(f"Model directory not found: {self.model_dir}")
+        
+        if (self.model_dir / 'MLmodel').exists() and (self.model_dir / 'model.pkl').exists():
+            import mlflow.sklearn
+            return mlflow.sklearn.load_model(str(self.model_dir))
+        
+        for filename in ('model.joblib', 'model.pkl'):
+            path = self.model_dir / filename
+            if path.exists():
+                model, self.load_stats = load_model_artifact(path, mmap_mode='r')
+                return model
+        
+        raise FileNotFoundError(f"No model.pkl or model.joblib in {self.model_dir}")
+    
+    def predict_payload(self, payload: Dict, coverage: Optional[float] = None) -> List:
+        """
+        Score an endpoint request payload locally
+        
+        Args:
+            payload: Request payload from AzureMLEndpointClient.prepare_request_payload()
+            coverage: If set and the model is a forest, also return interval
+                bands covering this fraction of the tree predictions
+        
+        Returns:
+            List of [archived_gb, savings_gb] rows, like the endpoint response;
+            with coverage, dicts with archived_gb, savings_gb and their
+            _lower/_upper band edges instead
+        """
+        model = self._load()
+        if model is None:
+            raise RuntimeError(f"Local fallback model unavailable: {self.load_error}")
+        
+        input_data = payload['input_data']
+        features = pd.DataFrame(input_data['data'], columns=input_data['columns'])
+        
+        # Match the training column order when the model records it
+        if hasattr(model, 'feature_names_in_'):
+            features = features[list(model.feature_names_in_)]
+        else:
+            features = features.values
+        
+        if coverage and supports_intervals(model):
+            bands = predict_with_intervals(model, features, coverage)
+            return [
+                {
+                    'archived_gb': float(point[0]),
+                    'savings_gb': float(point[1]),
+                    'archived_gb_lower': float(lower[0]),
+                    'archived_gb_upper': float(upper[0]),
+                    'savings_gb_lower': float(lower[1]),
+                    'savings_gb_upper': float(upper[1])
+                }
+                for point, lower, upper in zip(bands['prediction'], bands['lower'], bands['upper'])
+            ]
+        
+        predictions = model.predict(features)
+        return [[float(row[0]), float(row[1])] for row in predictions]
+    
+    def get_status(self) -> Dict:
+        """
+        Get fallback model status for monitoring (does not trigger a load)
+        
+        Returns:
+            Dictionary with model_dir, loaded, available, load_seconds, load_error
+        """
+        return {
+            'model_ref': self.model_ref,
+            'model_dir': str(self.model_dir),
+            'loaded': self._loaded,
+            'available': self._loaded and self._model is not None,
+            'load_seconds': self.load_seconds,
+            'rss_delta_mb': (self.load_stats or {}).get('rss_delta_mb'),
+            'load_error': self.load_error
+        }
+
+
+# One loaded model per directory per process
+_models: Dict[str, LocalFallbackModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_local_model(model_dir: Optional[str] = None, model_ref: Optional[str] = None) -> LocalFallbackModel:
+    """
+    Get the shared fallback model for a directory or registry reference
+    
+    Args:
+        model_dir: Model directory (default: LOCAL_MODEL_DIR or test_data/model)
+        model_ref: Registry reference 'name@alias' (default: LOCAL_MODEL_REF
+            unless model_dir is given)
+    
+    Returns:
+        LocalFallbackModel (loaded lazily on first prediction)
+    """
+    model_ref = model_ref or (None if model_dir else os.getenv('LOCAL_MODEL_REF'))
+    if model_ref:
+        key = f"registry:{model_ref}"
+    else:
+        key = str(Path(model_dir or os.getenv('LOCAL_MODEL_DIR', DEFAULT_MODEL_DIR)).resolve())
+    with _models_lock:
+        if key not in _models:
+            _models[key] = LocalFallbackModel(model_ref=model_ref) if model_ref else LocalFallbackModel(key)
+        return _models[key]
@@ -0,0 +1,397 @@
+"""
+Hot-Swappable Model Manager
+
+Keeps the scoring model current without a container restart. A background
+thread watches the model source; when it changes, the new version is loaded
+and warmed up off the request path, then published with one reference
+assignment.
+
+Sources:
+- model_dir: an artifact directory (model.joblib); a change of the model
+  file (mtime, size, inode) is picked up once it has stopped changing for
+  one poll, so a half-written file is never loaded
+- model_ref: 'name@alias' in the local model registry; an alias pointing at
+  another version is picked up on the next poll
+
+Requests take the current version with acquire() and keep it until they
+finish, so in-flight requests complete on the old model while new ones
+already get the new one. A version that fails to load or warm up is never
+published; the old one keeps serving.
+
+Swap latency (change detected -> new version live, split into load and
+warm-up) and scoring latency percentiles, overall and for requests that
+overlapped a swap, are reported by get_stats().
+
+Usage:
+    manager = ModelManager(model_ref='smart-archive-forecast@production')
+    manager.start()
+    with manager.acquire() as active:
+        predictions = active.model.predict(X)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    from .model_artifacts import MODEL_FILENAME, get_rss_mb, load_model_artifact, warm_up as default_warm_up
+    from .model_registry import get_registry, parse_model_ref
+except ImportError:
+    from model_artifacts import MODEL_FILENAME, get_rss_mb, load_model_artifact, warm_up as default_warm_up
+    from model_registry import get_registry, parse_model_ref
+
+
+DEFAULT_POLL_INTERVAL = 30.0
+LATENCY_WINDOW = 10000
+
+
+@dataclass
+class ModelVersion:
+    """One loaded model version; never modified after it is published"""
+    model: Any
+    version: str
+    path: str
+    loaded_at: str
+    load_seconds: float
+    rss_delta_mb: Optional[float] = None
+    warm_up_seconds: Optional[float] = None
+    extras: Dict = field(default_factory=dict)
+
+
+class ModelManager:
+    """Watches a model source and atomically swaps in new versions"""
+    
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        model_ref: Optional[str] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        warm_up: Optional[Callable[[ModelVersion], None]] = None,
+        on_swap: Optional[Callable[[ModelVersion], None]] = None,
+        mmap_mode: Optional[str] = 'r'
+    ):
+        """
+        Args:
+            model_dir: Artifact directory to watch
+            model_ref: Registry reference 'name@alias' to watch (instead of model_dir)
+            poll_interval: Seconds between source checks
+            warm_up: Called with the loaded version before it is published
+                (default: model_artifacts.warm_up on a dummy batch); may fill
+                version.extras; raising rejects the version
+            on_swap: Called with the new version after it is published
+            mmap_mode: joblib mmap mode used to load directory sources
+        """
+        if not model_dir and not model_ref:
+            raise ValueError("model_dir or model_ref is required")
+        self.model_dir = Path(model_dir) if model_dir else None
+        self.model_ref = model_ref
+        self.poll_interval = poll_interval
+        self.warm_up = warm_up
+        self.on_swap = on_swap
+        self.mmap_mode = mmap_mode
+        
+        self._active: Optional[ModelVersion] = None
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = None
+        self._failed = None
+        self._swapping = 0
+        self._in_flight: Dict[str, int] = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.swaps: List[Dict] = []
+        self.last_error: Optional[str] = None
+    
+    # Source
+    
+    def _fingerprint(self) -> Optional[str]:
+        """Identifies the version the source currently points at (None if absent)"""
+        if self.model_ref:
+            name, ref = parse_model_ref(self.model_ref)
+            try:
+                return str(get_registry().resolve(name, ref))
+            except KeyError:
+                return None
+        
+        model_path = self.model_dir / MODEL_FILENAME
+        try:
+            st = model_path.stat()
+        except FileNotFoundError:
+            return None
+        return f"{st.st_mtime_ns}-{st.st_size}-{st.st_ino}"
+    
+    def _load(self, fingerprint: str) -> ModelVersion:
+        start = time.perf_counter()
+        if self.model_ref:
+            name, _ = parse_model_ref(self.model_ref)
+            registry = get_registry()
+            rss_before = get_rss_mb()
+            model = registry.load(name, int(fingerprint), mmap_mode=self.mmap_mode)
+            rss_after = get_rss_mb()
+            rss_delta = (rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+            path = str(registry.get_path(name, int(fingerprint)))
+        else:
+            model, stats = load_model_artifact(self.model_dir / MODEL_FILENAME, mmap_mode=self.mmap_mode,
+                                               run_warm_up=False)
+            rss_delta = stats['rss_delta_mb']
+            path = str(self.model_dir)
+        return ModelVersion(
+            model=model,
+            version=fingerprint,
+            path=path,
+            loaded_at=datetime.now().isoformat(),
+            load_seconds=time.perf_counter() - start,
+            rss_delta_mb=rss_delta
+        )
+    
+    def _warm_up(self, version: ModelVersion):
+        start = time.perf_counter()
+        if self.warm_up is not None:
+            self.warm_up(version)
+        elif hasattr(version.model, 'n_features_in_'):
+            default_warm_up(version.model)
+        version.warm_up_seconds = time.perf_counter() - start
+    
+    # Swapping
+    
+    def load_initial(self) -> ModelVersion:
+        """Load and publish the current version synchronously (raises on failure)"""
+        fingerprint = self._fingerprint()
+        if fingerprint is None:
+            raise FileNotFoundError(f"No model at {self.model_ref or self.model_dir}")
+        if not self.check_now(force=True):
+            raise RuntimeError(f"Model initialization failed: {self.last_error}")
+        return self._active
+    
+    def check_now(self, force: bool = False) -> bool:
+        """
+        Check the source once and swap if it changed
+        
+        Args:
+            force: Load even if the version is already active
+        
+        Returns:
+            True if a new version was published
+        """
+        with self._check_lock:
+            detected = time.perf_counter()
+            fingerprint = self._fingerprint()
+            active = self._active
+            if fingerprint is None or (not force and active is not None and fingerprint == active.version):
+                self._pending = None
+                return False
+            if fingerprint == self._failed and not force:
+                return False
+            
+            # Directory sources: wait until the file stopped changing for one poll
+            if self.model_dir is not None and not force and self._pending != fingerprint:
+                self._pending = fingerprint
+                return False
+            self._pending = None
+            
+            with self._lock:
+                self._swapping += 1
+            try:
+                try:
+                    version = self._load(fingerprint)
+                    self._warm_up(version)
+                except Exception as e:
+                    self._failed = fingerprint
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    print(f"⚠️ Model version {fingerprint} rejected, keeping "
+                          f"{active.version if active else 'none'}: {self.last_error}")
+                    return False
+                
+                # The swap itself: one reference assignment
+                with self._lock:
+                    previous, self._active = self._active, version
+                swap_seconds = time.perf_counter() - detected
+            finally:
+                with self._lock:
+                    self._swapping -= 1
+            
+            self._failed = None
+            self.last_error = None
+            self.swaps.append({
+                'from_version': previous.version if previous else None,
+                'to_version': version.version,
+                'swapped_at': datetime.now().isoformat(),
+                'load_seconds': version.load_seconds,
+                'rss_delta_mb': version.rss_delta_mb,
+                'warm_up_seconds': version.warm_up_seconds,
+                'swap_seconds': swap_seconds
+            })
+            print(f"✅ Model version {version.version} live ({swap_seconds * 1000:.0f} ms: "
+                  f"load {version.load_seconds * 1000:.0f} ms, warm-up {version.warm_up_seconds * 1000:.0f} ms)")
+        
+        if self.on_swap is not None:
+            try:
+                self.on_swap(version)
+            except Exception as e:
+                print(f"Error in model swap callback: {e}")
+        return True
+    
+    def start(self) -> 'ModelManager':
+        """Load the current version if none is active, then watch in the background"""
+        if self._active is None:
+            self.load_initial()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_now()
+            except Exception as e:
+                print(f"Error checking model source: {e}")
+    
+    # Request path
+    
+    @property
+    def current(self) -> Optional[ModelVersion]:
+        """Active version (a plain reference read)"""
+        return self._active
+    
+    @contextmanager
+    def acquire(self) -> Iterator[ModelVersion]:
+        """
+        Pin the active version for one request and record its latency
+        
+        Yields:
+            ModelVersion (stays valid for the whole request, even across a swap)
+        """
+        version = self._active
+        if version is None:
+            raise RuntimeError("No model loaded")
+        with self._lock:
+            self._in_flight[version.version] = self._in_flight.get(version.version, 0) + 1
+            swapping = self._swapping > 0
+        start = time.perf_counter()
+        try:
+            yield version
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._in_flight[version.version] -= 1
+                if not self._in_flight[version.version]:
+                    del self._in_flight[version.version]
+                self._latencies.append((elapsed, swapping or self._swapping > 0))
+    
+    def get_stats(self) -> Dict:
+        """
+        Active version, swaps and scoring latency
+        
+        Returns:
+            Dictionary with version, in_flight, swaps, last_swap, last_error,
+            requests, p50_ms, p99_ms, requests_during_swap, p99_during_swap_ms
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            in_flight = dict(self._in_flight)
+        all_ms = np.array([s for s, _ in latencies]) * 1000
+        swap_ms = np.array([s for s, during in latencies if during]) * 1000
+        
+        def pct(values, q):
+            return float(np.percentile(values, q)) if len(values) else None
+        
+        active = self._active
+        return {
+            'version': active.version if active else None,
+            'path': active.path if active else None,
+            'in_flight': in_flight,
+            'swaps': len(self.swaps),
+            'last_swap': self.swaps[-1] if self.swaps else None,
+            'last_error': self.last_error,
+            'requests': len(all_ms),
+            'p50_ms': pct(all_ms, 50),
+            'p99_ms': pct(all_ms, 99),
+            'requests_during_swap': len(swap_ms),
+            'p99_during_swap_ms': pct(swap_ms, 99)
+        }
+
+
+if __name__ == "__main__":
+    """
+    Swap models under scoring load and report swap and p99 latency
+    
+    Run: python src/ml/model_manager.py
+    """
+    import tempfile
+    from sklearn.ensemble import RandomForestRegressor
+    
+    try:
+        from .model_artifacts import save_model_artifact
+        from .model_registry import ModelRegistry
+    except ImportError:
+        from model_artifacts import save_model_artifact
+        from model_registry import ModelRegistry
+    
+    print("Testing model manager...")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 9))
+    y = X[:, :2] * [3.0, 1.0]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['MODEL_REGISTRY_DIR'] = str(Path(tmp) / 'registry')
+        registry = get_registry()
+        for seed in (1, 2):
+            model = RandomForestRegressor(n_estimators=100, random_state=seed, n_jobs=1).fit(X, y)
+            save_model_artifact(model, Path(tmp) / f'v{seed}')
+            registry.register('forecast', Path(tmp) / f'v{seed}', aliases=['staging'] if seed == 2 else ['production'])
+        
+        manager = ModelManager(model_ref='forecast@production', poll_interval=0.05).start()
+        print(f"\n✓ Test 1: Serving version {manager.current.version}")
+        
+        stop = threading.Event()
+        
+        def score():
+            while not stop.is_set():
+                with manager.acquire() as active:
+                    active.model.predict(X[:32])
+        
+        workers = [threading.Thread(target=score) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.5)
+        
+        print("\n✓ Test 2: Promote staging while scoring")
+        registry.set_alias('forecast', 'production', 'staging')
+        deadline = time.time() + 30
+        while manager.current.version != '2' and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        manager.stop()
+        
+        stats = manager.get_stats()
+        assert stats['version'] == '2' and stats['swaps'] == 2
+        print(f"  Swap: {stats['last_swap']['swap_seconds'] * 1000:.1f} ms "
+              f"(load {stats['last_swap']['load_seconds'] * 1000:.1f} ms, "
+              f"warm-up {stats['last_swap']['warm_up_seconds'] * 1000:.1f} ms)")
+        print(f"  Scoring p99: {stats['p99_ms']:.2f} ms overall, "
+              f"{stats['p99_during_swap_ms'] or 0:.2f} ms during swap "
+              f"({stats['requests']} requests, {stats['requests_during_swap']} during swap)")
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -0,0 +1,466 @@
+"""
+Local Model Registry
+
+One place for model versions, instead of every consumer keeping its own copy
+(models/anomaly_model_<timestamp>, mlruns/, test_data/model).
+
+Layout (root, default: MODEL_REGISTRY_DIR or model_registry/):
+    objects/<sha256[:2]>/<sha256>    - file contents, stored once (read-only)
+    models/<name>/<version>/         - artifact directory, hard links into objects/
+    models/<name>/<version>.json     - manifest: files -> sha256, digest, metadata
+    models/<name>/aliases.json       - {'production': 3, 'staging': 4}
+    promotions.json                  - {target: {digest: remote version}}
+
+- Files are addressed by SHA-256: a file shared by several versions is stored
+  once, and registering an artifact whose content is already registered
+  returns the existing version instead of adding a copy
+- A version's digest covers its file names and contents, so it identifies
+  the artifact independently of where it was saved. Save-time fields of
+  artifact.json (created_at) are left out, so saving the same model again
+  gives the same digest
+- Aliases are one small JSON file replaced atomically: promoting staging to
+  production is a pointer update, not a copy
+- load() keeps loaded models per (name, version) in an LRU cache, so
+  switching an alias back and forth does not reload from disk
+- Promotions to remote registries are recorded by digest, so an unchanged
+  artifact is not uploaded again
+
+Usage:
+    registry = get_registry()
+    version = registry.register('smart-archive-anomaly', 'models/anomaly_model_20250101_120000',
+                                aliases=['staging'])
+    registry.set_alias('smart-archive-anomaly', 'production', version['version'])
+    model = registry.load('smart-archive-anomaly', 'production')
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from .model_artifacts import METADATA_FILENAME, MODEL_FILENAME, load_model_artifact
+except ImportError:
+    from model_artifacts import METADATA_FILENAME, MODEL_FILENAME, load_model_artifact
+
+
+DEFAULT_REGISTRY_DIR = 'model_registry'
+DEFAULT_MAX_LOADED = 4
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# artifact.json fields that change on every save of the same model
+VOLATILE_METADATA_KEYS = ('created_at',)
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _metadata_sha256(path: Path) -> str:
+    """SHA-256 of artifact.json without its volatile fields (canonical JSON)"""
+    with open(path, 'r') as f:
+        metadata = json.load(f)
+    if not isinstance(metadata, dict):
+        return file_sha256(path)
+    stable = {key: value for key, value in metadata.items() if key not in VOLATILE_METADATA_KEYS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()
+
+
+def artifact_digest(path: Union[str, Path]) -> Tuple[str, Dict[str, str]]:
+    """
+    Content digest of an artifact directory or single model file
+    
+    The top-level artifact.json enters the digest without VOLATILE_METADATA_KEYS;
+    the returned per-file hashes are always of the exact file contents.
+    
+    Args:
+        path: Artifact directory (all files, recursively) or one file
+    
+    Returns:
+        Tuple of (digest, {relative path: sha256})
+    """
+    path = Path(path)
+    if path.is_dir():
+        files = {
+            file.relative_to(path).as_posix(): file_sha256(file)
+            for file in sorted(path.rglob('*')) if file.is_file()
+        }
+    elif path.is_file():
+        files = {path.name: file_sha256(path)}
+    else:
+        raise FileNotFoundError(f"Artifact not found: {path}")
+    
+    digest = hashlib.sha256()
+    for name, sha in sorted(files.items()):
+        if name == METADATA_FILENAME:
+            sha = _metadata_sha256(path / name if path.is_dir() else path)
+        digest.update(f"{name}\0{sha}\n".encode())
+    return digest.hexdigest(), files
+
+
+def _write_json(path: Path, data: Dict):
+    """Write JSON atomically (readers see the old or the new file, never half)"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class ModelRegistry:
+    """Content-addressed model versions with aliases and a loaded-model cache"""
+    
+    def __init__(self, root: Optional[str] = None, max_loaded: int = DEFAULT_MAX_LOADED):
+        """
+        Args:
+            root: Registry directory (default: MODEL_REGISTRY_DIR or model_registry/)
+            max_loaded: Loaded models kept in memory (least recently used evicted)
+        """
+        self.root = Path(root or os.getenv('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR))
+        self.max_loaded = max_loaded
+        self._lock = threading.RLock()
+        self._loaded: 'OrderedDict[Tuple[str, int], Any]' = OrderedDict()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    # Storage
+    
+    def _model_dir(self, name: str) -> Path:
+        return self.root / 'models' / name
+    
+    def _object_path(self, sha: str) -> Path:
+        return self.root / 'objects' / sha[:2] / sha
+    
+    def _store_object(self, source: Path, sha: str) -> Tuple[Path, bool]:
+        """Copy a file into objects/ unless its content is already there"""
+        target = self._object_path(sha)
+        if target.exists():
+            return target, False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp)
+        # Objects are shared by every version linking them; never modify in place
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, target)
+        return target, True
+    
+    @staticmethod
+    def _link(source: Path, target: Path):
+        """Hard link (no copy); falls back to copying across devices"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+    
+    def _claim_version(self, name: str) -> Tuple[int, Path]:
+        """Create the next version directory (mkdir is the cross-process claim)"""
+        model_dir = self._model_dir(name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        version = max((v['version'] for v in self.list_versions(name)), default=0) + 1
+        while True:
+            version_dir = model_dir / str(version)
+            try:
+                version_dir.mkdir()
+                return version, version_dir
+            except FileExistsError:
+                version += 1
+    
+    # Versions
+    
+    def register(
+        self,
+        name: str,
+        artifact_path: str,
+        metadata: Optional[Dict] = None,
+        aliases: Optional[Iterable[str]] = None
+    ) -> Dict:
+        """
+        Add an artifact as a new version (or return the version that has its content)
+        
+        Args:
+            name: Model name
+            artifact_path: Artifact directory or single model file
+            metadata: Extra fields stored with the version (e.g. metrics, run_id)
+            aliases: Aliases to point at the version
+        
+        Returns:
+            Version record (version, digest, files, path, metadata, created_at, new)
+        """
+        artifact_path = Path(artifact_path)
+        digest, files = artifact_digest(artifact_path)
+        
+        with self._lock:
+            existing = self.find_version(name, digest)
+            if existing is not None:
+                print(f"[REGISTRY] {name}: content unchanged, reusing version {existing['version']}")
+                record = dict(existing, new=False)
+            else:
+                version, version_dir = self._claim_version(name)
+                sources = ({rel: artifact_path / rel for rel in files} if artifact_path.is_dir()
+                           else {artifact_path.name: artifact_path})
+                stored_bytes = 0
+                for rel, sha in files.items():
+                    obj, created = self._store_object(sources[rel], sha)
+                    if created:
+                        stored_bytes += obj.stat().st_size
+                    self._link(obj, version_dir / rel)
+                
+                record = {
+                    'name': name,
+                    'version': version,
+                    'digest': digest,
+                    'files': files,
+                    'source': str(artifact_path),
+                    'metadata': metadata or {},
+                    'created_at': datetime.now().isoformat()
+                }
+                _write_json(self._model_dir(name) / f"{version}.json", record)
+                print(f"[REGISTRY] {name}: registered version {version} "
+                      f"({stored_bytes / (1024 * 1024):.2f} MB new content)")
+                record = dict(record, new=True)
+            
+            for alias in aliases or ():
+                self.set_alias(name, alias, record['version'])
+        
+        record['path'] = str(self._model_dir(name) / str(record['version']))
+        return record
+    
+    def list_versions(self, name: str) -> List[Dict]:
+        """All versions of a model, oldest first"""
+        model_dir = self._model_dir(name)
+        if not model_dir.exists():
+            return []
+        records = [_read_json(path) for path in model_dir.glob('*.json') if path.stem.isdigit()]
+        return sorted(records, key=lambda record: record['version'])
+    
+    def find_version(self, name: str, digest: str) -> Optional[Dict]:
+        """The version with this content digest, if registered"""
+        for record in self.list_versions(name):
+            if record['digest'] == digest:
+                return record
+        return None
+    
+    def resolve(self, name: str, ref: Union[int, str]) -> int:
+        """
+        Version number for a version or alias
+        
+        Args:
+            name: Model name
+            ref: Version number, 'latest' or alias (e.g. 'production')
+        
+        Returns:
+            Version number
+        """
+        if isinstance(ref, int) or str(ref).isdigit():
+            version = int(ref)
+            if not (self._model_dir(name) / f"{version}.json").exists():
+                raise KeyError(f"{name} has no version {version}")
+            return version
+        if ref == 'latest':
+            versions = self.list_versions(name)
+            if not versions:
+                raise KeyError(f"{name} has no versions")
+            return versions[-1]['version']
+        aliases = self.get_aliases(name)
+        if ref not in aliases:
+            raise KeyError(f"{name} has no alias '{ref}'")
+        return aliases[ref]
+    
+    def get_version(self, name: str, ref: Union[int, str] = 'production') -> Dict:
+        """Version record (with its artifact path) for a version or alias"""
+        version = self.resolve(name, ref)
+        record = _read_json(self._model_dir(name) / f"{version}.json")
+        record['path'] = str(self._model_dir(name) / str(version))
+        return record
+    
+    def get_path(self, name: str, ref: Union[int, str] = 'production') -> Path:
+        """Artifact directory of a version or alias"""
+        return self._model_dir(name) / str(self.resolve(name, ref))
+    
+    # Aliases
+    
+    def get_aliases(self, name: str) -> Dict[str, int]:
+        return _read_json(self._model_dir(name) / 'aliases.json')
+    
+    def set_alias(self, name: str, alias: str, ref: Union[int, str]) -> int:
+        """
+        Point an alias at a version (atomic; no files are copied)
+        
+        Args:
+            name: Model name
+            alias: Alias, e.g. 'production' or 'staging'
+            ref: Version number or another alias
+        
+        Returns:
+            Version the alias now points at
+        """
+        if str(alias).isdigit() or alias == 'latest':
+            raise ValueError(f"Invalid alias: {alias}")
+        with self._lock:
+            version = self.resolve(name, ref)
+            aliases = self.get_aliases(name)
+            previous = aliases.get(alias)
+            aliases[alias] = version
+            _write_json(self._model_dir(name) / 'aliases.json', aliases)
+        if previous != version:
+            print(f"[REGISTRY] {name}@{alias}: {previous} -> {version}")
+        return version
+    
+    def remove_alias(self, name: str, alias: str):
+        with self._lock:
+            aliases = self.get_aliases(name)
+            if aliases.pop(alias, None) is not None:
+                _write_json(self._model_dir(name) / 'aliases.json', aliases)
+    
+    # Loaded-model cache
+    
+    def load(self, name: str, ref: Union[int, str] = 'production', mmap_mode: Optional[str] = 'r') -> Any:
+        """
+        Loaded model for a version or alias, cached per (name, version)
+        
+        Args:
+            name: Model name
+            ref: Version number or alias
+            mmap_mode: joblib mmap mode for the first load
+        
+        Returns:
+            Model object (shared: do not modify it in place)
+        """
+        key = (name, self.resolve(name, ref))
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                self.cache_stats['hits'] += 1
+                return self._loaded[key]
+        
+        # Load outside the lock so other versions stay servable meanwhile
+        path = self._model_dir(name) / str(key[1])
+        if not (path / MODEL_FILENAME).exists():
+            # Legacy single-file model registered as is
+            legacy = sorted(p for p in path.iterdir() if p.suffix in ('.joblib', '.pkl'))
+            path = legacy[0] if legacy else path
+        model, _ = load_model_artifact(path, mmap_mode=mmap_mode)
+        
+        with self._lock:
+            self.cache_stats['misses'] += 1
+            self._loaded[key] = model
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+                self.cache_stats['evictions'] += 1
+            return self._loaded[key]
+    
+    def get_cache_stats(self) -> Dict:
+        """Cache hits, misses, evictions and the loaded (name, version) keys"""
+        with self._lock:
+            return dict(self.cache_stats, loaded=[f"{n}:{v}" for n, v in self._loaded])
+    
+    # Promotion bookkeeping
+    
+    def get_promotion(self, target: str, digest: str) -> Optional[str]:
+        """Remote version an artifact with this digest was promoted as (None if never)"""
+        return _read_json(self.root / 'promotions.json').get(target, {}).get(digest)
+    
+    def record_promotion(self, target: str, digest: str, remote_version: str):
+        """Remember that an artifact was uploaded to a remote registry"""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            promotions = _read_json(self.root / 'promotions.json')
+            promotions.setdefault(target, {})[digest] = str(remote_version)
+            _write_json(self.root / 'promotions.json', promotions)
+
+
+# One registry (and loaded-model cache) per root per process
+_registries: Dict[str, ModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(root: Optional[str] = None) -> ModelRegistry:
+    """
+    Get the shared registry for a directory
+    
+    Args:
+        root: Registry directory (default: MODEL_REGISTRY_DIR or model_registry/)
+    
+    Returns:
+        ModelRegistry
+    """
+    key = str(Path(root or os.getenv('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR)).resolve())
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(key)
+        return _registries[key]
+
+
+def parse_model_ref(value: str, default_ref: str = 'production') -> Tuple[str, str]:
+    """Split 'name@alias' / 'name@3' into (name, ref)"""
+    name, _, ref = value.partition('@')
+    return name, ref or default_ref
+
+
+if __name__ == "__main__":
+    """
+    Register, alias, dedupe and load model versions in a temporary registry
+    
+    Run: python src/ml/model_registry.py
+    """
+    import tempfile
+    import time
+    import numpy as np
+    from sklearn.ensemble import IsolationForest
+    
+    try:
+        from .model_artifacts import save_model_artifact
+    except ImportError:
+        from model_artifacts import save_model_artifact
+    
+    print("Testing model registry...")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 9))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(Path(tmp) / 'registry')
+        save_model_artifact(IsolationForest(random_state=0).fit(X), Path(tmp) / 'a')
+        save_model_artifact(IsolationForest(random_state=1).fit(X), Path(tmp) / 'b')
+        
+        print("\n✓ Test 1: Register two versions")
+        v1 = registry.register('anomaly', Path(tmp) / 'a', aliases=['production'])
+        v2 = registry.register('anomaly', Path(tmp) / 'b', aliases=['staging'])
+        assert (v1['version'], v2['version']) == (1, 2)
+        
+        print("\n✓ Test 2: Re-registering the same content is deduplicated")
+        again = registry.register('anomaly', Path(tmp) / 'a')
+        assert again['version'] == 1 and not again['new']
+        
+        print("\n✓ Test 3: Alias switch is served from the cache")
+        registry.load('anomaly', 'production')
+        registry.load('anomaly', 'staging')
+        start = time.perf_counter()
+        registry.set_alias('anomaly', 'production', 'staging')
+        model = registry.load('anomaly', 'production')
+        print(f"  Switch + load: {(time.perf_counter() - start) * 1000:.2f} ms")
+        assert model is registry.load('anomaly', 2)
+        print(f"  Cache: {registry.get_cache_stats()}")
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
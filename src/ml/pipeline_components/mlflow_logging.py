@@ -0,0 +1,342 @@
+"""
+Buffered, Asynchronous MLflow Logging
+
+Against a remote tracking server every mlflow.log_param / log_metric /
+set_tag is one HTTP round trip and log_model uploads the whole model before
+returning. MLflowRunLogger keeps training off that path:
+
+- Params, metrics and tags are buffered and sent as MlflowClient.log_batch
+  calls (chunked to the server's per-request limits) on flush()
+- flush(), artifact uploads and end_run() are queued to one background
+  thread, in order; each call is retried with exponential backoff and given
+  up on after max_retries
+- Only creating the run is synchronous (its id is needed up front)
+- Inside an existing run (an Azure ML job sets MLFLOW_RUN_ID, or an active
+  mlflow.start_run()) that run is logged into instead of creating one, as
+  mlflow.start_run() would; ending it is left to its owner
+- Pending work is drained at interpreter exit (bounded by drain_timeout),
+  so a script can return as soon as the model is persisted locally
+
+Usage:
+    run = MLflowRunLogger(experiment_name="smart-archive-retraining")
+    run_id = run.start()
+    run.log_params({'contamination': 0.1})
+    run.log_metrics({'anomaly_rate': 0.08, 'mean_anomaly_score': 0.47})
+    run.log_artifacts("models/anomaly_model_20250101_120000", "model")
+    run.end_run()          # returns immediately
+    run.wait(timeout=60)   # optional: block until uploaded
+"""
+
+import atexit
+import os
+import queue
+import random
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+
+# Per-request limits of the MLflow REST API (log_batch)
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_TAGS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+DEFAULT_DRAIN_TIMEOUT = 300.0
+
+_active_loggers = weakref.WeakSet()
+
+
+def chunk_batch(metrics: List, params: List, tags: List) -> List[Dict]:
+    """
+    Split entities into log_batch payloads within the per-request limits
+    
+    Args:
+        metrics: mlflow.entities.Metric list
+        params: mlflow.entities.Param list
+        tags: mlflow.entities.RunTag list
+    
+    Returns:
+        List of {'metrics', 'params', 'tags'} dicts
+    """
+    batches = []
+    metrics, params, tags = list(metrics), list(params), list(tags)
+    while metrics or params or tags:
+        batch_params = params[:MAX_PARAMS_TAGS_PER_BATCH]
+        batch_tags = tags[:MAX_PARAMS_TAGS_PER_BATCH]
+        room = min(MAX_METRICS_PER_BATCH, MAX_ENTITIES_PER_BATCH - len(batch_params) - len(batch_tags))
+        batch_metrics = metrics[:room]
+        batches.append({'metrics': batch_metrics, 'params': batch_params, 'tags': batch_tags})
+        metrics = metrics[len(batch_metrics):]
+        params = params[len(batch_params):]
+        tags = tags[len(batch_tags):]
+    return batches
+
+
+class MLflowRunLogger:
+    """Batched params/metrics/tags and background artifact uploads for one MLflow run"""
+    
+    def __init__(
+        self,
+        experiment_name: Optional[str] = None,
+        experiment_id: Optional[str] = None,
+        run_name: Optional[str] = None,
+        client: Optional[MlflowClient] = None,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        drain_timeout: float = DEFAULT_DRAIN_TIMEOUT
+    ):
+        """
+        Args:
+            experiment_name: Experiment to log into (created if missing)
+            experiment_id: Experiment id (takes precedence over the name)
+            run_name: Optional run name
+            client: MlflowClient (default: current tracking URI)
+            max_retries: Retries per request after the first attempt
+            backoff_base: First retry delay in seconds (doubles per retry)
+            backoff_max: Upper bound of the retry delay
+            drain_timeout: Seconds to wait for pending uploads at interpreter exit
+        """
+        self.experiment_name = experiment_name
+        self.experiment_id = experiment_id
+        self.run_name = run_name
+        self.client = client or MlflowClient()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.drain_timeout = drain_timeout
+        self.run_id = None
+        self.owns_run = False
+        
+        self._lock = threading.Lock()
+        self._params: Dict[str, str] = {}
+        self._metrics: List[Metric] = []
+        self._tags: Dict[str, str] = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._ended = False
+        self.stats = {'batches': 0, 'artifacts': 0, 'retries': 0, 'failed': 0}
+    
+    def start(self, tags: Optional[Dict[str, str]] = None) -> str:
+        """
+        Create the run (synchronous) and start the upload thread
+        
+        The active MLflow run or MLFLOW_RUN_ID (set inside Azure ML jobs) is
+        reused when present, so params and metrics land on the job's run.
+        
+        Args:
+            tags: Tags set at creation (logged with the first flush on a reused run)
+        
+        Returns:
+            Run id
+        """
+        if self.run_id is not None:
+            return self.run_id
+        
+        active_run = mlflow.active_run()
+        existing_run_id = active_run.info.run_id if active_run is not None else os.environ.get('MLFLOW_RUN_ID')
+        if existing_run_id:
+            self.run_id = existing_run_id
+            self.set_tags(tags or {})
+        else:
+            experiment_id = self.experiment_id
+            if experiment_id is None and self.experiment_name:
+                experiment = self.client.get_experiment_by_name(self.experiment_name)
+                experiment_id = (experiment.experiment_id if experiment is not None
+                                 else self.client.create_experiment(self.experiment_name))
+            self.experiment_id = experiment_id or '0'
+        
+            run = self.client.create_run(self.experiment_id, tags=tags or {}, run_name=self.run_name)
+            self.run_id = run.info.run_id
+            self.owns_run = True
+        
+        self._thread = threading.Thread(target=self._run, name='mlflow-logger', daemon=True)
+        self._thread.start()
+        _active_loggers.add(self)
+        return self.run_id
+    
+    # Buffering (no I/O)
+    
+    def log_param(self, key: str, value):
+        self.log_params({key: value})
+    
+    def log_params(self, params: Dict):
+        with self._lock:
+            self._params.update({key: str(value) for key, value in params.items()})
+    
+    def log_metric(self, key: str, value: float, step: int = 0):
+        self.log_metrics({key: value}, step=step)
+    
+    def log_metrics(self, metrics: Dict[str, float], step: int = 0):
+        timestamp = int(time.time() * 1000)
+        with self._lock:
+            self._metrics.extend(Metric(key, float(value), timestamp, step) for key, value in metrics.items())
+    
+    def set_tag(self, key: str, value):
+        self.set_tags({key: value})
+    
+    def set_tags(self, tags: Dict):
+        with self._lock:
+            self._tags.update({key: str(value) for key, value in tags.items()})
+    
+    # Queued (background thread)
+    
+    def flush(self):
+        """Queue the buffered params, metrics and tags as log_batch calls"""
+        self._require_run()
+        with self._lock:
+            params = [Param(key, value) for key, value in self._params.items()]
+            tags = [RunTag(key, value) for key, value in self._tags.items()]
+            metrics, self._metrics = self._metrics, []
+            self._params, self._tags = {}, {}
+        
+        for batch in chunk_batch(metrics, params, tags):
+            self._submit('batches', 'log_batch',
+                         lambda batch=batch: self.client.log_batch(self.run_id, **batch))
+    
+    def log_artifact(self, local_path: str, artifact_path: Optional[str] = None):
+        """Queue the upload of one file (buffered values are flushed first)"""
+        self.flush()
+        self._submit('artifacts', f'upload {local_path}',
+                     lambda: self.client.log_artifact(self.run_id, str(local_path), artifact_path))
+    
+    def log_artifacts(self, local_dir: str, artifact_path: Optional[str] = None):
+        """Queue the upload of a directory (buffered values are flushed first)"""
+        self.flush()
+        self._submit('artifacts', f'upload {local_dir}',
+                     lambda: self.client.log_artifacts(self.run_id, str(local_dir), artifact_path))
+    
+    def end_run(self, status: str = 'FINISHED'):
+        """Flush, then queue terminating the run (if created here); returns without waiting"""
+        if self.run_id is None or self._ended:
+            return
+        self.flush()
+        if self.owns_run:
+            self._submit(None, 'set_terminated', lambda: self.client.set_terminated(self.run_id, status))
+        self._ended = True
+        self._queue.put(None)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued call has completed or been given up on
+        
+        Args:
+            timeout: Seconds to wait (None = no limit)
+        
+        Returns:
+            True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Counters: batches, artifacts, retries, failed and pending calls"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['pending'] = self._queue.unfinished_tasks
+        return stats
+    
+    def _require_run(self):
+        if self.run_id is None:
+            raise RuntimeError("MLflowRunLogger.start() has not been called")
+        if self._ended:
+            raise RuntimeError(f"MLflow run {self.run_id} has already ended")
+    
+    def _submit(self, counter: Optional[str], description: str, call: Callable):
+        self._queue.put((counter, description, call))
+    
+    def _call_with_retry(self, description: str, call: Callable) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                call()
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"[WARN] MLflow {description} failed after {attempt + 1} attempts: {e}")
+                    return False
+                with self._lock:
+                    self.stats['retries'] += 1
+                delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        return False
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            counter, description, call = item
+            succeeded = self._call_with_retry(description, call)
+            with self._lock:
+                if not succeeded:
+                    self.stats['failed'] += 1
+                elif counter:
+                    self.stats[counter] += 1
+            self._queue.task_done()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end_run('FAILED' if exc_type else 'FINISHED')
+
+
+@atexit.register
+def _drain_active_loggers():
+    """Give queued uploads a chance to finish before the interpreter exits"""
+    for run_logger in list(_active_loggers):
+        if run_logger.get_stats()['pending']:
+            print(f"[MLFLOW] Waiting for pending uploads of run {run_logger.run_id}...")
+            run_logger.wait(run_logger.drain_timeout)
+
+
+if __name__ == "__main__":
+    """
+    Log a run with 250 metrics and an artifact into a local SQLite store
+    
+    Run: python src/ml/pipeline_components/mlflow_logging.py
+    """
+    import os
+    import tempfile
+    from pathlib import Path
+    
+    print("Testing MLflow run logger...")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        client = MlflowClient(tracking_uri=f"sqlite:///{os.path.join(tmp, 'mlflow.db')}")
+        client.create_experiment('logger-demo', artifact_location=Path(tmp, 'artifacts').as_uri())
+        artifact = os.path.join(tmp, 'notes.txt')
+        with open(artifact, 'w') as f:
+            f.write('hello')
+        
+        run = MLflowRunLogger(experiment_name='logger-demo', client=client)
+        run.start()
+        start = time.perf_counter()
+        run.log_params({f'param_{i}': i for i in range(150)})
+        run.log_metrics({f'metric_{i}': i / 10 for i in range(250)})
+        run.set_tag('stage', 'demo')
+        run.log_artifact(artifact)
+        run.end_run()
+        print(f"  Caller returned after {(time.perf_counter() - start) * 1000:.1f} ms")
+        
+        assert run.wait(timeout=60)
+        data = client.get_run(run.run_id).data
+        print(f"  Stats: {run.get_stats()}")
+        print(f"  Logged {len(data.params)} params, {len(data.metrics)} metrics")
+        assert len(data.params) == 150 and len(data.metrics) == 250
+        assert client.get_run(run.run_id).info.status == 'FINISHED'
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
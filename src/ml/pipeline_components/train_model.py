@@ -18,6 +18,7 @@ import numpy as np
 import argparse
 import json
 import logging
+from mlflow_logging import MLflowRunLogger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -209,27 +210,26 @@ def main():
     model = training_results['model']
     metrics = training_results['metrics']
     
-    # Log to MLflow (optional - skip if experiment not found)
+    # Log to MLflow (optional - skip if the tracking server is unavailable)
+    # Params and metrics go out as batched calls on a background thread;
+    # pending calls are drained before the process exits
     try:
-        # Set or create experiment
-        experiment_name = "SmartArchive_Training"
-        experiment = mlflow.get_experiment_by_name(experiment_name)
-        if experiment is None:
-            experiment_id = mlflow.create_experiment(experiment_name)
-        else:
-            experiment_id = experiment.experiment_id
+        run_logger = MLflowRunLogger(experiment_name="SmartArchive_Training")
+        run_logger.start()
+        run_logger.log_params({
+            "n_estimators": args.n_estimators,
+            "model_type": "RandomForest + MultiOutput",
+            "train_size": X_train.shape[0],
+            "test_size": X_test.shape[0]
+        })
+        run_logger.log_metrics({
+            metric_name: metric_value
+            for metric_name, metric_value in metrics.items()
+            if metric_name != 'n_estimators'
+        })
+        run_logger.end_run()
         
-        with mlflow.start_run(experiment_id=experiment_id):
-            mlflow.log_param("n_estimators", args.n_estimators)
-            mlflow.log_param("model_type", "RandomForest + MultiOutput")
-            mlflow.log_param("train_size", X_train.shape[0])
-            mlflow.log_param("test_size", X_test.shape[0])
-            
-            for metric_name, metric_value in metrics.items():
-                if metric_name != 'n_estimators':
-                    mlflow.log_metric(metric_name, metric_value)
-        
-        logger.info("Metrics logged to MLflow")
+        logger.info("Metrics queued for MLflow")
     except Exception as e:
         logger.warning(f"Could not log to MLflow: {e}. Continuing without MLflow logging.")
     
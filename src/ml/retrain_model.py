@@ -3,10 +3,30 @@ Model Retraining Script
 
 Retrains the anomaly detection model using feedback and recent monitoring data.
 Logs metrics to MLflow and updates model registry.
+
+Training data is streamed from the database in batches: the scaler is fit
+incrementally (StandardScaler.partial_fit) and the model is trained on a
+fixed-size reservoir sample, so memory stays constant with history length.
+
+Incremental mode (retrain(incremental=True)) builds on the last completed
+retrain instead: only feedback newer than its watermark (highest feedback id
+trained on, stored in retraining_log) is streamed, new trees are fit on it
+and the same number of the oldest trees are retired. Cost then follows the
+amount of new data rather than the length of history. The scaler is kept
+from the full retrain the ensemble started from.
+
+MLflow logging does not hold up the pipeline: params, metrics and tags are
+sent as batched calls and the saved model directory is uploaded on a
+background thread (MLflowRunLogger), after the model is persisted locally.
+
+Each saved model is registered in the local model registry (model_registry.py)
+under the 'staging' alias; consumers load it from there by version or alias.
 """
 
 import os
 import sys
+import copy
+import itertools
 import json
 import mlflow
 import pandas as pd
@@ -15,13 +35,83 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-from typing import Tuple, Dict, Optional
+from typing import Callable, Tuple, Dict, Optional, Iterator
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from monitoring.feedback_db import FeedbackDB
 from monitoring.predictions_db import PredictionsDB
+from ml.model_artifacts import load_model_artifact, read_artifact_metadata, save_model_artifact
+from ml.model_registry import get_registry
+from ml.pipeline_components.mlflow_logging import MLflowRunLogger
+from monitoring.streaming import DEFAULT_BATCH_SIZE
+
+# Rows kept for model fitting/evaluation (IsolationForest subsamples 256 per tree)
+DEFAULT_SAMPLE_SIZE = 20000
+
+# Trees fit on new data (and oldest trees retired) per incremental retrain
+DEFAULT_NEW_TREES = 25
+
+# Fitted IsolationForest state kept per tree, aligned with estimators_
+_PER_TREE_ATTRIBUTES = ('estimators_', 'estimators_features_',
+                        '_average_path_length_per_tree', '_decision_path_lengths')
+
+
+def _can_rotate_trees(model: IsolationForest) -> bool:
+    """
+    Whether a fitted forest exposes the per-tree state update_model() slices
+    
+    Two of _PER_TREE_ATTRIBUTES are private to scikit-learn and may be renamed
+    by a release; without them a model can only be retrained in full.
+    """
+    return all(hasattr(model, attribute) for attribute in _PER_TREE_ATTRIBUTES)
+
+
+class ReservoirSample:
+    """Uniform fixed-size sample of a row stream (Algorithm R, vectorized per batch)"""
+    
+    def __init__(self, size: int = DEFAULT_SAMPLE_SIZE, random_state: int = 42):
+        """
+        Args:
+            size: Maximum rows kept
+            random_state: Random seed
+        """
+        self.size = size
+        self.rng = np.random.default_rng(random_state)
+        self.seen = 0
+        self.X = None
+        self.y = None
+        self._filled = 0
+    
+    def add(self, X: np.ndarray, y: np.ndarray):
+        """Offer a batch of rows to the sample"""
+        if self.X is None:
+            self.X = np.empty((self.size, X.shape[1]), dtype=X.dtype)
+            self.y = np.empty(self.size, dtype=y.dtype)
+        
+        # Fill the reservoir first
+        take = min(self.size - self._filled, len(X))
+        if take:
+            self.X[self._filled:self._filled + take] = X[:take]
+            self.y[self._filled:self._filled + take] = y[:take]
+            self._filled += take
+        
+        # Row with stream index n replaces a random slot with probability size/(n+1)
+        rest = np.arange(take, len(X))
+        if len(rest):
+            slots = self.rng.integers(0, self.seen + rest + 1)
+            keep = slots < self.size
+            self.X[slots[keep]] = X[rest[keep]]
+            self.y[slots[keep]] = y[rest[keep]]
+        
+        self.seen += len(X)
+    
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sampled (X, y)"""
+        if self.X is None:
+            return np.empty((0, 0)), np.empty(0)
+        return self.X[:self._filled], self.y[:self._filled]
 
 
 class ModelRetrainer:
@@ -31,7 +121,9 @@ class ModelRetrainer:
         self,
         model_name: str = "smart-archive-anomaly",
         experiment_name: str = "smart-archive-retraining",
-        db_path: str = "monitoring.db"
+        db_path: str = "monitoring.db",
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        registry_dir: Optional[str] = None
     ):
         """
         Initialize retrainer
@@ -40,16 +132,29 @@ class ModelRetrainer:
             model_name: Name of model in MLflow registry
             experiment_name: MLflow experiment name
             db_path: Path to monitoring database
+            progress_callback: Called with (stage, fraction done) as the pipeline advances
+            registry_dir: Local model registry (default: MODEL_REGISTRY_DIR or model_registry/)
         """
         self.model_name = model_name
         self.experiment_name = experiment_name
         self.db_path = db_path
+        self.progress_callback = progress_callback
+        self.mlflow_run = None
+        self.registry = get_registry(registry_dir)
         self.feedback_db = FeedbackDB(db_path)
         self.predictions_db = PredictionsDB(db_path)
         
         # Set up MLflow
         mlflow.set_experiment(experiment_name)
     
+    def _report(self, stage: str, fraction: float):
+        """Forward pipeline progress to progress_callback (if any)"""
+        if self.progress_callback is not None:
+            try:
+                self.progress_callback(stage, fraction)
+            except Exception as e:
+                print(f"[WARN] Progress callback failed: {e}")
+    
     def load_training_data(self, days: int = 90) -> pd.DataFrame:
         """
         Load training data from feedback and predictions
@@ -76,6 +181,160 @@ class ModelRetrainer:
         print(f"[OK] Loaded {len(feedback_df)} feedback records")
         return feedback_df
     
+    def load_previous_model(self) -> Optional[Dict]:
+        """
+        Model, scaler and watermark of the last completed retrain
+        
+        Returns:
+            Dict with model, scaler, watermark and model_path, or None when
+            there is nothing to build on (no retrain yet, no watermark because
+            it was trained on predictions only, or the artifact is gone)
+        """
+        last = self.feedback_db.get_last_retraining()
+        if not last or last.get('watermark') is None or not last.get('model_path'):
+            print("[WARN] No previous retrain with a watermark")
+            return None
+        
+        model_path = last['model_path']
+        if not Path(model_path).exists():
+            print(f"[WARN] Previous model not found: {model_path}")
+            return None
+        
+        metadata = read_artifact_metadata(model_path)
+        # Private copy: the forest is modified in place
+        model, _ = load_model_artifact(model_path, mmap_mode=None, run_warm_up=False)
+        if not isinstance(model, IsolationForest) or 'scaler_mean' not in metadata:
+            print(f"[WARN] Previous model cannot be grown: {model_path}")
+            return None
+        if not _can_rotate_trees(model):
+            print("[WARN] This scikit-learn version does not expose per-tree IsolationForest state "
+                  "- running a full retrain")
+            return None
+        
+        scaler = StandardScaler()
+        scaler.mean_ = np.asarray(metadata['scaler_mean'])
+        scaler.scale_ = np.asarray(metadata['scaler_scale'])
+        scaler.var_ = scaler.scale_ ** 2
+        scaler.n_features_in_ = len(scaler.mean_)
+        
+        print(f"[DATA] Building on {model_path} (watermark: feedback id {last['watermark']})")
+        return {
+            'model': model,
+            'scaler': scaler,
+            'watermark': int(last['watermark']),
+            'model_path': model_path
+        }
+    
+    def stream_training_data(self, days: int = 90, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Stream training data in typed batches (feedback, else predictions)
+        
+        Args:
+            days: Number of days of historical data to include
+            batch_size: Rows per batch
+        
+        Yields:
+            Dict of column name -> np.ndarray
+        """
+        print(f"[DATA] Streaming training data from last {days} days (batch size {batch_size})...")
+        
+        batches = self.feedback_db.iter_feedback(days=days, batch_size=batch_size)
+        first = next(batches, None)
+        
+        if first is None:
+            print("[WARN] No feedback data found - using predictions only")
+            batches = self.predictions_db.iter_predictions(days=days, batch_size=batch_size)
+            first = next(batches, None)
+            if first is None:
+                raise ValueError("No training data available")
+        
+        yield first
+        yield from batches
+    
+    def _track_watermark(self, batches: Iterator[Dict[str, np.ndarray]], state: Dict) -> Iterator[Dict[str, np.ndarray]]:
+        """Pass batches through, recording the highest feedback id in state['watermark']"""
+        for chunk in batches:
+            if 'feedback_status' in chunk and len(chunk['id']):
+                state['watermark'] = max(state.get('watermark') or 0, int(chunk['id'].max()))
+            yield chunk
+    
+    def chunk_features(self, chunk: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build raw (unscaled) features and anomaly labels for one batch
+        
+        Same features as prepare_features(); missing values are left as NaN
+        for the scaler to skip.
+        
+        Args:
+            chunk: Batch from stream_training_data()
+        
+        Returns:
+            Tuple of (X, y)
+        """
+        if 'predicted_value' in chunk and 'actual_value' in chunk:
+            predicted = chunk['predicted_value']
+            actual = chunk['actual_value']
+            error = np.abs(actual - predicted)
+            error_pct = (error / (actual + 0.001)) * 100
+            X = np.column_stack([predicted, actual, error, error_pct])
+        elif 'archived_gb_predicted' in chunk:
+            predicted = chunk['archived_gb_predicted']
+            X = np.column_stack([predicted, np.abs(chunk['archived_gb_actual'] - predicted)])
+        else:
+            raise ValueError(f"Unsupported training columns: {sorted(chunk)}")
+        
+        if 'feedback_status' in chunk:
+            y = (chunk['feedback_status'] == 'incorrect').astype(int)
+        else:
+            y = np.zeros(len(X), dtype=int)
+        
+        return X, y
+    
+    def prepare_features_streaming(
+        self,
+        batches: Iterator[Dict[str, np.ndarray]],
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        random_state: int = 42,
+        scaler: Optional[StandardScaler] = None
+    ) -> Tuple[np.ndarray, np.ndarray, StandardScaler, int]:
+        """
+        Fit the scaler over the full stream and keep a reservoir sample
+        
+        Args:
+            batches: Iterator from stream_training_data()
+            sample_size: Rows kept for training and evaluation
+            random_state: Random seed for the sample
+            scaler: Fitted scaler to apply unchanged (incremental retraining);
+                None fits a new one over the stream
+        
+        Returns:
+            Tuple of (X_sample_scaled, y_sample, scaler, rows_seen)
+        """
+        print(f"[PREPARE] Preparing features (streaming, sample size {sample_size})...")
+        
+        fit_scaler = scaler is None
+        if fit_scaler:
+            scaler = StandardScaler()
+        sample = ReservoirSample(sample_size, random_state)
+        
+        for chunk in batches:
+            X, y = self.chunk_features(chunk)
+            if fit_scaler:
+                scaler.partial_fit(X)  # NaNs are ignored
+            sample.add(X, y)
+        
+        X_sample, y_sample = sample.arrays()
+        if not len(X_sample):
+            raise ValueError("No training data available")
+        
+        # Missing values -> feature mean (0 after scaling), as in prepare_features
+        X_scaled = np.nan_to_num(scaler.transform(X_sample), nan=0.0)
+        
+        print(f"[OK] Streamed {sample.seen} rows, sampled {len(X_scaled)} with {X_scaled.shape[1]} features")
+        print(f"   Anomalies in sample: {y_sample.sum()} ({y_sample.mean()*100:.1f}%)")
+        
+        return X_scaled, y_sample, scaler, sample.seen
+    
     def prepare_features(self, df: pd.DataFrame) -> Tuple[np.ndarray, pd.Series, pd.DataFrame]:
         """
         Prepare features for training
@@ -163,6 +422,65 @@ class ModelRetrainer:
         print("[OK] Model training complete")
         return model
     
+    def update_model(
+        self,
+        model: IsolationForest,
+        X: np.ndarray,
+        n_new_trees: int = DEFAULT_NEW_TREES,
+        contamination: float = 0.1,
+        random_state: int = 42
+    ) -> IsolationForest:
+        """
+        Grow a fitted isolation forest with trees fit on new data only
+        
+        n_new_trees trees are fit on X (warm_start) and as many of the oldest
+        trees are retired, so the ensemble size stays constant. New trees use
+        the subsample size of the existing ones (max_samples_) to keep path
+        lengths comparable; the contamination threshold is re-derived on X.
+        
+        Args:
+            model: Fitted IsolationForest (updated in place)
+            X: New rows, scaled like the model's training data (at least max_samples_)
+            n_new_trees: Trees to add and to retire
+            contamination: Expected anomaly rate
+            random_state: Seed for the new trees (vary it between runs)
+        
+        Returns:
+            The updated model
+        
+        Raises:
+            ValueError: If the forest lacks the per-tree state to retire trees
+                (model left unchanged; retrain in full instead)
+        """
+        if not _can_rotate_trees(model):
+            missing = [a for a in _PER_TREE_ATTRIBUTES if not hasattr(model, a)]
+            raise ValueError(f"Cannot retire trees, IsolationForest has no {missing}")
+        
+        size = len(model.estimators_)
+        n_new_trees = min(n_new_trees, size)
+        print(f"[TRAIN] Growing Isolation Forest: {n_new_trees} new trees on {len(X)} rows, "
+              f"retiring the {n_new_trees} oldest...")
+        
+        model.set_params(
+            warm_start=True,
+            n_estimators=size + n_new_trees,
+            max_samples=model.max_samples_,
+            contamination=contamination,
+            random_state=random_state
+        )
+        model.fit(X)
+        
+        # New trees are appended, so the oldest come first
+        for attribute in _PER_TREE_ATTRIBUTES:
+            setattr(model, attribute, getattr(model, attribute)[n_new_trees:])
+        model.set_params(n_estimators=size, warm_start=False)
+        
+        # fit() set the threshold with the retired trees still in place
+        model.offset_ = np.percentile(model.score_samples(X), 100.0 * contamination)
+        
+        print("[OK] Model update complete")
+        return model
+    
     def evaluate_model(
         self,
         model: IsolationForest,
@@ -218,17 +536,18 @@ class ModelRetrainer:
     
     def log_to_mlflow(
         self,
-        model: IsolationForest,
         metrics: Dict,
         params: Dict,
         feedback_count: int,
         drift_score: float
     ) -> str:
         """
-        Log model and metrics to MLflow
+        Start the MLflow run and queue its params, metrics and tags
+        
+        Only creating the run waits for the tracking server; the values are
+        sent as batched calls on the run logger's background thread.
         
         Args:
-            model: Trained model
             metrics: Evaluation metrics
             params: Model parameters
             feedback_count: Number of feedback records used
@@ -239,35 +558,61 @@ class ModelRetrainer:
         """
         print("[MLFLOW] Logging to MLflow...")
         
-        with mlflow.start_run() as run:
-            # Log parameters
-            mlflow.log_params({
-                **params,
-                'feedback_count': feedback_count,
-                'drift_score': drift_score
-            })
-            
-            # Log metrics
-            mlflow.log_metrics(metrics)
+        self.mlflow_run = MLflowRunLogger(experiment_name=self.experiment_name)
+        run_id = self.mlflow_run.start()
+        self.mlflow_run.log_params({
+            **params,
+            'feedback_count': feedback_count,
+            'drift_score': drift_score
+        })
+        self.mlflow_run.log_metrics(metrics)
+        self.mlflow_run.set_tags({'stage': 'retraining', 'model_type': 'IsolationForest'})
+        self.mlflow_run.flush()
             
-            # Log model
-            mlflow.sklearn.log_model(model, "model")
+        print(f"[OK] Started run: {run_id}")
+        return run_id
             
-            # Log tags
-            mlflow.set_tag("stage", "retraining")
-            mlflow.set_tag("model_type", "IsolationForest")
+    def upload_model_to_mlflow(self, model_path: str):
+        """
+        Queue the upload of the saved model artifact and end the run
             
-            run_id = run.info.run_id
-            print(f"[OK] Logged run: {run_id}")
+        Returns immediately; use self.mlflow_run.wait() to block until done.
             
-            return run_id
+        Args:
+            model_path: Artifact directory written by save_model_artifact()
+        """
+        self.mlflow_run.log_artifacts(str(model_path), artifact_path='model')
+        self.mlflow_run.end_run()
+        print(f"[MLFLOW] Model upload queued for run {self.mlflow_run.run_id}")
+    
+    def register_model(self, model_path: str, **metadata) -> Optional[int]:
+        """
+        Register a saved model in the local registry as 'staging'
+        
+        Args:
+            model_path: Artifact directory written by save_model_artifact()
+            **metadata: Fields stored with the version (run_id, mode, metrics)
+        
+        Returns:
+            Registry version, or None if registration failed
+        """
+        try:
+            record = self.registry.register(self.model_name, model_path, metadata=metadata, aliases=['staging'])
+            return record['version']
+        except Exception as e:
+            print(f"[WARN] Model registry update failed: {e}")
+            return None
     
     def retrain(
         self,
         feedback_count: int = 0,
         drift_score: float = 0.0,
         contamination: float = 0.1,
-        days: int = 90
+        days: int = 90,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        incremental: bool = False,
+        new_trees: int = DEFAULT_NEW_TREES
     ) -> Dict:
         """
         Execute full retraining pipeline
@@ -277,6 +622,12 @@ class ModelRetrainer:
             drift_score: Current drift score
             contamination: Anomaly contamination rate
             days: Days of historical data to use
+            batch_size: Rows fetched from the database per batch
+            sample_size: Rows kept in memory for training
+            incremental: Grow the last retrained model with trees fit on
+                feedback newer than its watermark; falls back to a full
+                retrain when there is no such model or too little new data
+            new_trees: Trees replaced per incremental retrain
         
         Returns:
             Dictionary with retraining results
@@ -286,22 +637,63 @@ class ModelRetrainer:
         print("="*60)
         
         try:
-            # Step 1: Load data
-            df = self.load_training_data(days=days)
+            # Step 1: Stream data
+            self._report('loading data', 0.05)
+            previous = self.load_previous_model() if incremental else None
+            watermark = {}
+            X = None
             
-            # Step 2: Prepare features
-            X, y, df_processed = self.prepare_features(df)
+            if previous is not None:
+                # Step 2a: Only feedback past the watermark, scaled like the existing trees
+                batches = self._track_watermark(
+                    self.feedback_db.iter_feedback(after_id=previous['watermark'], batch_size=batch_size),
+                    watermark
+                )
+                first = next(batches, None)
+                rows_seen = 0
+                if first is not None:
+                    X, y, scaler, rows_seen = self.prepare_features_streaming(
+                        itertools.chain([first], batches), sample_size=sample_size, scaler=previous['scaler']
+                    )
+                
+                min_rows = previous['model'].max_samples_
+                if rows_seen < min_rows:
+                    print(f"[WARN] {rows_seen} new feedback rows (< {min_rows} per tree) - running a full retrain")
+                    previous, watermark, X = None, {}, None
+            
+            if X is None:
+                # Step 2b: Full window (incremental scaler + reservoir sample)
+                batches = self.stream_training_data(days=days, batch_size=batch_size)
+                X, y, scaler, rows_seen = self.prepare_features_streaming(
+                    self._track_watermark(batches, watermark), sample_size=sample_size
+                )
             
             # Step 3: Train model
-            model = self.train_model(X, y, contamination=contamination)
+            self._report('training', 0.4)
+            mode = 'incremental' if previous is not None else 'full'
+            baseline_model = None
+            if previous is not None:
+                baseline_model = copy.deepcopy(previous['model'])
+                model = self.update_model(
+                    previous['model'], X,
+                    n_new_trees=new_trees,
+                    contamination=contamination,
+                    random_state=watermark['watermark']
+                )
+            else:
+                model = self.train_model(X, y, contamination=contamination)
             
-            # Step 4: Evaluate
-            params = {'contamination': contamination}
-            metrics = self.evaluate_model(model, X, y)
+            # Step 4: Evaluate (incremental: against the previous model, on the new data)
+            self._report('evaluating', 0.7)
+            params = {'contamination': contamination, 'sample_size': sample_size, 'mode': mode}
+            if previous is not None:
+                params['new_trees'] = new_trees
+            metrics = self.evaluate_model(model, X, y, baseline_model=baseline_model)
+            metrics['n_rows_streamed'] = rows_seen
             
             # Step 5: Log to MLflow
+            self._report('logging to mlflow', 0.8)
             run_id = self.log_to_mlflow(
-                model=model,
                 metrics=metrics,
                 params=params,
                 feedback_count=feedback_count,
@@ -316,28 +708,44 @@ class ModelRetrainer:
                 accuracy_drop=0.0
             )
             
-            metrics_before = {"baseline": "v1.0"}
+            metrics_before = {"baseline": previous['model_path'] if previous is not None else "v1.0"}
             metrics_after = json.dumps({k: float(v) if isinstance(v, np.floating) else v 
                                        for k, v in metrics.items()})
             
-            self.feedback_db.log_retraining_complete(
-                retraining_id=retraining_id,
-                model_improvement=metrics.get('score_improvement', 0.0),
-                metrics_before=json.dumps(metrics_before),
-                metrics_after=metrics_after
-            )
-            
             # Step 7: Save model to disk
+            self._report('saving model', 0.95)
             model_dir = Path("models")
             model_dir.mkdir(exist_ok=True)
-            model_path = model_dir / f"anomaly_model_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
+            model_path = model_dir / f"anomaly_model_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
             
-            import pickle
-            with open(model_path, 'wb') as f:
-                pickle.dump(model, f)
+            # Uncompressed artifact directory, loadable with mmap_mode='r'
+            save_model_artifact(model, model_path, metadata={
+                'scaler_mean': scaler.mean_.tolist(),
+                'scaler_scale': scaler.scale_.tolist(),
+                'run_id': run_id,
+                'retraining_id': retraining_id,
+                'training_mode': mode,
+                'watermark': watermark.get('watermark'),
+                'metrics': metrics
+            })
             
             print(f"[OK] Model saved to: {model_path}")
             
+            # Persisted locally: the MLflow copy is uploaded in the background
+            self.upload_model_to_mlflow(model_path)
+            registry_version = self.register_model(model_path, run_id=run_id, mode=mode, metrics=metrics)
+            
+            # Completed last, so the watermark only advances with a saved model
+            self.feedback_db.log_retraining_complete(
+                retraining_id=retraining_id,
+                model_improvement=metrics.get('score_improvement', 0.0),
+                metrics_before=json.dumps(metrics_before),
+                metrics_after=metrics_after,
+                watermark=watermark.get('watermark'),
+                model_path=str(model_path)
+            )
+            self._report('completed', 1.0)
+            
             print("\n" + "="*60)
             print("[OK] RETRAINING PIPELINE COMPLETED")
             print("="*60)
@@ -347,10 +755,15 @@ class ModelRetrainer:
                 'run_id': run_id,
                 'model_path': str(model_path),
                 'metrics': metrics,
-                'retraining_id': retraining_id
+                'retraining_id': retraining_id,
+                'mode': mode,
+                'watermark': watermark.get('watermark'),
+                'registry_version': registry_version
             }
         
         except Exception as e:
+            if self.mlflow_run is not None:
+                self.mlflow_run.end_run('FAILED')
             print(f"\n[ERROR] RETRAINING FAILED: {e}")
             print("="*60)
             return {
@@ -372,6 +785,10 @@ def main():
     parser.add_argument('--drift-score', type=float, default=0.0, help='Drift detection score')
     parser.add_argument('--contamination', type=float, default=0.1, help='Anomaly contamination rate')
     parser.add_argument('--days', type=int, default=90, help='Days of historical data')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows fetched per database batch')
+    parser.add_argument('--sample-size', type=int, default=DEFAULT_SAMPLE_SIZE, help='Rows kept in memory for training')
+    parser.add_argument('--incremental', action='store_true', help='Grow the last model with trees fit on new feedback only')
+    parser.add_argument('--new-trees', type=int, default=DEFAULT_NEW_TREES, help='Trees replaced per incremental retrain')
     
     args = parser.parse_args()
     
@@ -380,11 +797,20 @@ def main():
         feedback_count=args.feedback_count,
         drift_score=args.drift_score,
         contamination=args.contamination,
-        days=args.days
+        days=args.days,
+        batch_size=args.batch_size,
+        sample_size=args.sample_size,
+        incremental=args.incremental,
+        new_trees=args.new_trees
     )
     
     print(f"\n📊 Result: {json.dumps(result, indent=2, default=str)}")
     
+    if retrainer.mlflow_run is not None:
+        print("[MLFLOW] Waiting for uploads to finish...")
+        retrainer.mlflow_run.wait()
+        print(f"[MLFLOW] {retrainer.mlflow_run.get_stats()}")
+    
     return 0 if result['status'] == 'success' else 1
 
 
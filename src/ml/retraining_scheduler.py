@@ -3,13 +3,33 @@ Retraining Scheduler
 
 Background job that periodically checks retraining conditions
 and automatically triggers retraining when thresholds are met.
+
+Event-driven mode (event_driven=True):
+- Feedback submissions and prediction writes are counted in process through
+  the monitoring event bus (monitoring/events.py)
+- An event only schedules a re-evaluation (debounced, so bursts coalesce)
+  when RetaininingTrigger.could_trigger() says a threshold could have been
+  crossed since the last evaluation
+- The fallback poll follows the trigger's recommended next check
+  (2/4/12 hours) instead of a fixed check_interval_hours
+
+Trigger checks run on a single worker thread that keeps its databases, drift
+detector and trigger manager open between checks.
+
+Retraining itself runs in a separate process (ml/retraining_worker.py) with
+a lock file ensuring at most one active retrain; its progress is reported
+under 'retraining' in get_status() and cancel_retraining() stops it.
 """
 
 import logging
 import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 import sys
@@ -18,8 +38,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from monitoring.feedback_db import FeedbackDB
 from monitoring.predictions_db import PredictionsDB
 from monitoring.drift_detector import DriftDetector
-from monitoring.retraining_trigger import RetainingTriggerManager
+from monitoring.events import FEEDBACK_SUBMITTED, PREDICTION_SAVED, EventBus, get_event_bus
+from monitoring.retraining_trigger import RetaininingTrigger, RetainingTriggerManager, invalidate_trigger_cache
+from monitoring.retention import RetentionManager
 from ml.retrain_model import ModelRetrainer
+from ml.retraining_worker import RetrainingWorker
 
 
 # Configure logging
@@ -37,7 +60,16 @@ class RetrainingScheduler:
         self,
         db_path: str = "monitoring.db",
         check_interval_hours: int = 4,
-        auto_retrain: bool = True
+        auto_retrain: bool = True,
+        compaction_interval_hours: int = 24,
+        retention_policies: Optional[dict] = None,
+        event_driven: bool = False,
+        event_bus: Optional[EventBus] = None,
+        event_debounce_seconds: float = 30.0,
+        isolate_retraining: bool = True,
+        retrain_cpu_seconds: Optional[int] = None,
+        retrain_memory_mb: Optional[int] = None,
+        incremental_retraining: bool = False
     ):
         """
         Initialize scheduler
@@ -46,35 +78,98 @@ class RetrainingScheduler:
             db_path: Path to monitoring database
             check_interval_hours: How often to check for retraining conditions
             auto_retrain: Whether to automatically trigger retraining when conditions met
+            compaction_interval_hours: How often to rebuild the summary rollup tables
+            retention_policies: Retention policy overrides; when given (even {}),
+                expired rows are archived and deleted before each compaction
+            event_driven: Re-evaluate on feedback/prediction events and adapt the
+                poll interval to the trigger's recommendation
+            event_bus: Bus to subscribe to (default: the process-wide bus)
+            event_debounce_seconds: Delay before an event-triggered check, so
+                bursts of events share one evaluation
+            isolate_retraining: Run retraining in a separate worker process
+                (one at a time, guarded by a lock file) instead of inline
+            retrain_cpu_seconds: CPU-time limit of the worker process
+            retrain_memory_mb: Memory limit of the worker process in MB
+            incremental_retraining: Grow the last model with trees fit on feedback
+                since its watermark instead of refitting on the full window
         """
         self.db_path = db_path
         self.check_interval_hours = check_interval_hours
         self.auto_retrain = auto_retrain
+        self.compaction_interval_hours = compaction_interval_hours
+        self.retention_policies = retention_policies
+        self.last_compaction = None
         self.scheduler = None
         self.last_check = None
         self.last_retrain = None
+        self.incremental_retraining = incremental_retraining
+    
+        self.event_driven = event_driven
+        self.event_bus = event_bus or get_event_bus()
+        self.event_debounce_seconds = event_debounce_seconds
+        self.next_check_hours = check_interval_hours
+        self.trigger = RetaininingTrigger()
+        self.last_evaluation = None
+        self.event_stats = {'events': 0, 'skipped': 0, 'event_checks': 0, 'evaluations': 0}
+        self._pending = {'feedback': 0, 'negative_feedback': 0, 'predictions': 0}
+        self._event_check_scheduled = False
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        
+        self.retraining_worker = None
+        if isolate_retraining:
+            self.retraining_worker = RetrainingWorker(
+                db_path,
+                cpu_seconds=retrain_cpu_seconds,
+                memory_mb=retrain_memory_mb
+            )
+        
+        # SQLite connections are bound to their thread: one trigger manager per worker thread
+        self._local = threading.local()
+        self._trigger_managers = []
     
-    def _check_conditions(self):
-        """Check if retraining conditions are met"""
+    def _get_trigger_manager(self) -> RetainingTriggerManager:
+        """Trigger manager of the current thread, created on first use and then reused"""
+        trigger_manager = getattr(self._local, 'trigger_manager', None)
+        if trigger_manager is None:
+            trigger_manager = RetainingTriggerManager(
+                feedback_db=FeedbackDB(self.db_path),
+                predictions_db=PredictionsDB(self.db_path),
+                drift_detector=DriftDetector()
+            )
+            self._local.trigger_manager = trigger_manager
+            with self._lock:
+                self._trigger_managers.append(trigger_manager)
+        return trigger_manager
+    
+    def _close_trigger_managers(self):
+        """Close the databases held by the trigger managers"""
+        with self._lock:
+            trigger_managers, self._trigger_managers = self._trigger_managers, []
+        for trigger_manager in trigger_managers:
+            for db in (trigger_manager.feedback_db, trigger_manager.predictions_db):
+                try:
+                    db.close()
+                except Exception:
+                    # Opened on another (finished) thread; released when collected
+                    pass
+        self._local = threading.local()
+    
+    def _check_conditions(self, use_cache: bool = True):
+        """Check if retraining conditions are met (reusing a recent dashboard evaluation if any)"""
         try:
             logger.info("🔍 Checking retraining conditions...")
             
-            # Initialize databases
-            feedback_db = FeedbackDB(self.db_path)
-            predictions_db = PredictionsDB(self.db_path)
-            drift_detector = DriftDetector()
-            
-            # Create trigger manager
-            trigger_manager = RetainingTriggerManager(
-                feedback_db=feedback_db,
-                predictions_db=predictions_db,
-                drift_detector=drift_detector
-            )
+            # Events from here on count towards the next check
+            with self._lock:
+                self._pending = dict.fromkeys(self._pending, 0)
+                self.event_stats['evaluations'] += 1
             
             # Check conditions
-            evaluation = trigger_manager.check_retraining_conditions()
+            evaluation = self._get_trigger_manager().check_retraining_conditions(use_cache=use_cache)
             
             self.last_check = datetime.now()
+            self.last_evaluation = evaluation
             
             # Log results
             should_retrain = evaluation.get('should_retrain', False)
@@ -95,48 +190,161 @@ class RetrainingScheduler:
             # Log evaluation to file
             self._log_evaluation(evaluation)
             
-            feedback_db.close()
-            predictions_db.close()
+            if self.event_driven:
+                self._adapt_check_interval(evaluation)
             
         except Exception as e:
             logger.error(f"❌ Error checking conditions: {e}", exc_info=True)
     
+    def _adapt_check_interval(self, evaluation: dict):
+        """Reschedule the fallback poll to the trigger's recommended next check"""
+        hours = evaluation.get('recommendations', {}).get('next_check_hours')
+        if not hours or hours == self.next_check_hours:
+            return
+        self.next_check_hours = hours
+        if self.scheduler is not None and self.scheduler.get_job('retrain_check') is not None:
+            self.scheduler.reschedule_job('retrain_check', trigger=IntervalTrigger(hours=hours))
+            logger.info(f"   Next poll in {hours} hours")
+    
+    def _on_feedback(self, event: dict):
+        """Event bus callback: count feedback, re-evaluate if a threshold could be crossed"""
+        negative = sum(n for status, n in event.get('statuses', {}).items() if status != 'correct')
+        self._record_events(feedback=event.get('count', 1), negative_feedback=negative)
+    
+    def _on_prediction(self, event: dict):
+        """Event bus callback: count predictions, re-evaluate if drift could tip the decision"""
+        self._record_events(predictions=event.get('count', 1))
+    
+    def _record_events(self, **counts):
+        """Add to the pending counters and decide whether an evaluation is worthwhile"""
+        with self._lock:
+            for key, value in counts.items():
+                self._pending[key] += value
+            pending = dict(self._pending)
+            self.event_stats['events'] += 1
+        
+        evaluation = self.last_evaluation
+        if evaluation is not None and not evaluation.get('error') and not self.trigger.could_trigger(
+            evaluation,
+            new_feedback=pending['feedback'],
+            new_negative_feedback=pending['negative_feedback'],
+            new_predictions=pending['predictions']
+        ):
+            with self._lock:
+                self.event_stats['skipped'] += 1
+            return
+        
+        self._schedule_event_check()
+    
+    def _schedule_event_check(self):
+        """Queue one debounced check; further events before it runs share it"""
+        with self._lock:
+            if self.scheduler is None or self._event_check_scheduled:
+                return
+            self._event_check_scheduled = True
+        
+        self.scheduler.add_job(
+            self._run_event_check,
+            trigger=DateTrigger(run_date=datetime.now() + timedelta(seconds=self.event_debounce_seconds)),
+            id='retrain_check_event',
+            name='Event-triggered retraining check',
+            executor='trigger',
+            replace_existing=True
+        )
+    
+    def _run_event_check(self):
+        """Run an event-triggered check on fresh data"""
+        with self._lock:
+            self._event_check_scheduled = False
+            self.event_stats['event_checks'] += 1
+        self._check_conditions(use_cache=False)
+    
+    def _compact_rollups(self):
+        """Apply retention (if configured), then rebuild the daily rollup tables"""
+        try:
+            if self.retention_policies is not None:
+                logger.info("Applying retention policies...")
+                with RetentionManager(self.db_path, policies=self.retention_policies) as retention:
+                    report = retention.run()
+                for table, result in report['tables'].items():
+                    logger.info(f"   {table}: {result.get('deleted', 0)} rows expired")
+            
+            logger.info("Rebuilding summary rollups...")
+            feedback_db = FeedbackDB(self.db_path)
+            predictions_db = PredictionsDB(self.db_path)
+            try:
+                feedback_db.rebuild_rollups()
+                predictions_db.rebuild_rollups()
+            finally:
+                feedback_db.close()
+                predictions_db.close()
+            self.last_compaction = datetime.now()
+            logger.info("[OK] Rollups rebuilt")
+        except Exception as e:
+            logger.error(f"Error rebuilding rollups: {e}")
+    
     def _execute_retraining(self, evaluation: dict):
-        """Execute the retraining process"""
+        """Execute the retraining process (in the worker process when isolated)"""
         try:
             logger.info("[RETRAIN] Starting automatic retraining...")
             
             # Get metrics from evaluation
             metrics = evaluation.get('metrics', {})
-            feedback_count = metrics.get('feedback_count', 0)
-            drift_score = metrics.get('drift_score', 0.0)
+            retrain_kwargs = {
+                'feedback_count': metrics.get('feedback_count', 0),
+                'drift_score': metrics.get('drift_score', 0.0),
+                'contamination': 0.1,
+                'days': 90,
+                'incremental': self.incremental_retraining
+            }
+            
+            if self.retraining_worker is not None:
+                started = self.retraining_worker.start(
+                    retrain_kwargs,
+                    on_complete=lambda result: self._on_retraining_complete(result, evaluation)
+                )
+                if started:
+                    logger.info(f"   Worker PID: {self.retraining_worker.get_status()['pid']}")
+                else:
+                    logger.info("⏸️ A retrain is already running - skipped")
+                return
             
-            # Create retrainer
+            # Create retrainer and run inline
             retrainer = ModelRetrainer(db_path=self.db_path)
+            result = retrainer.retrain(**retrain_kwargs)
+            self._on_retraining_complete(result, evaluation)
             
-            # Execute retraining
-            result = retrainer.retrain(
-                feedback_count=feedback_count,
-                drift_score=drift_score,
-                contamination=0.1,
-                days=90
-            )
+        except Exception as e:
+            logger.error(f"[ERROR] Error executing retraining: {e}", exc_info=True)
             
+    def _on_retraining_complete(self, result: dict, evaluation: dict):
+        """Log the outcome of a retrain"""
+        try:
             if result['status'] == 'success':
                 logger.info(f"[OK] Retraining completed successfully!")
                 logger.info(f"   Run ID: {result['run_id']}")
                 logger.info(f"   Model Path: {result['model_path']}")
+                logger.info(f"   Mode: {result.get('mode', 'full')} (watermark: {result.get('watermark')})")
                 
                 self.last_retrain = datetime.now()
+                invalidate_trigger_cache()
                 
                 # Log success
                 self._log_retrain_success(result, evaluation)
+            elif result['status'] == 'cancelled':
+                logger.info("[RETRAIN] Retraining cancelled")
             else:
                 logger.error(f"[ERROR] Retraining failed: {result.get('error', 'Unknown error')}")
                 self._log_retrain_failure(result, evaluation)
         
         except Exception as e:
-            logger.error(f"[ERROR] Error executing retraining: {e}", exc_info=True)
+            logger.error(f"[ERROR] Error handling retraining result: {e}", exc_info=True)
+    
+    def cancel_retraining(self) -> bool:
+        """Terminate a running isolated retrain; True if one was cancelled"""
+        if self.retraining_worker is None:
+            return False
+        return self.retraining_worker.cancel()
     
     def _log_evaluation(self, evaluation: dict):
         """Log evaluation results to file"""
@@ -212,21 +420,42 @@ class RetrainingScheduler:
             logger.warning("Scheduler already running")
             return
         
-        self.scheduler = BackgroundScheduler()
+        # Trigger checks share one worker thread (and its open databases)
+        self.scheduler = BackgroundScheduler(executors={
+            'default': ThreadPoolExecutor(),
+            'trigger': ThreadPoolExecutor(max_workers=1)
+        })
         
         # Add job to check conditions periodically
         self.scheduler.add_job(
             self._check_conditions,
-            trigger=IntervalTrigger(hours=self.check_interval_hours),
+            trigger=IntervalTrigger(hours=self.next_check_hours),
             id='retrain_check',
             name='Check retraining conditions',
+            executor='trigger',
+            replace_existing=True
+        )
+        
+        # Periodic compaction of the summary rollups
+        self.scheduler.add_job(
+            self._compact_rollups,
+            trigger=IntervalTrigger(hours=self.compaction_interval_hours),
+            id='rollup_compaction',
+            name='Rebuild summary rollups',
             replace_existing=True
         )
         
         self.scheduler.start()
         
+        if self.event_driven:
+            self._subscriptions = [
+                (FEEDBACK_SUBMITTED, self.event_bus.subscribe(FEEDBACK_SUBMITTED, self._on_feedback)),
+                (PREDICTION_SAVED, self.event_bus.subscribe(PREDICTION_SAVED, self._on_prediction))
+            ]
+        
         logger.info(f"[OK] Retraining scheduler started")
         logger.info(f"   Check interval: {self.check_interval_hours} hours")
+        logger.info(f"   Event-driven: {'Enabled' if self.event_driven else 'Disabled'}")
         logger.info(f"   Auto-retrain: {'Enabled' if self.auto_retrain else 'Disabled'}")
         
         # Run first check immediately
@@ -235,24 +464,35 @@ class RetrainingScheduler:
     
     def stop(self):
         """Stop the background scheduler"""
+        for topic, callback in self._subscriptions:
+            self.event_bus.unsubscribe(topic, callback)
+        self._subscriptions = []
+        
         if self.scheduler is not None:
             self.scheduler.shutdown()
             logger.info("[OK] Retraining scheduler stopped")
             self.scheduler = None
+            self._event_check_scheduled = False
+        self._close_trigger_managers()
     
     def trigger_check_now(self):
         """Manually trigger a check"""
         logger.info("Manually triggering retraining check...")
-        self._check_conditions()
+        self._check_conditions(use_cache=False)
     
     def get_status(self) -> dict:
         """Get scheduler status"""
         return {
             'running': self.scheduler is not None and self.scheduler.running,
             'check_interval_hours': self.check_interval_hours,
+            'next_check_hours': self.next_check_hours,
+            'event_driven': self.event_driven,
+            'event_stats': dict(self.event_stats),
             'auto_retrain': self.auto_retrain,
             'last_check': self.last_check.isoformat() if self.last_check else None,
-            'last_retrain': self.last_retrain.isoformat() if self.last_retrain else None
+            'last_compaction': self.last_compaction.isoformat() if self.last_compaction else None,
+            'last_retrain': self.last_retrain.isoformat() if self.last_retrain else None,
+            'retraining': self.retraining_worker.get_status() if self.retraining_worker else None
         }
 
 
@@ -263,7 +503,8 @@ _scheduler_instance: RetrainingScheduler = None
 def get_scheduler(
     db_path: str = "monitoring.db",
     check_interval_hours: int = 4,
-    auto_retrain: bool = True
+    auto_retrain: bool = True,
+    event_driven: bool = False
 ) -> RetrainingScheduler:
     """Get or create the global scheduler instance"""
     global _scheduler_instance
@@ -272,7 +513,8 @@ def get_scheduler(
         _scheduler_instance = RetrainingScheduler(
             db_path=db_path,
             check_interval_hours=check_interval_hours,
-            auto_retrain=auto_retrain
+            auto_retrain=auto_retrain,
+            event_driven=event_driven
         )
     
     return _scheduler_instance
@@ -301,7 +543,8 @@ if __name__ == '__main__':
     scheduler = RetrainingScheduler(
         db_path="monitoring.db",
         check_interval_hours=4,
-        auto_retrain=True
+        auto_retrain=True,
+        event_driven=True
     )
     
     try:
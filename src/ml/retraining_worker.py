@@ -0,0 +1,306 @@
+"""
+Isolated Retraining Worker
+
+Runs ModelRetrainer.retrain() in a separate process so a retrain never
+competes with the Streamlit app or the scheduler thread for the GIL and memory.
+
+- At most one active retrain per database: the parent holds an exclusive
+  lock file (<db_path>.retrain.lock) for the lifetime of the child, so
+  overlapping scheduler ticks and other processes are refused
+- Optional CPU-time / address-space limits (resource.setrlimit) and nice
+  level are applied inside the child (Unix only)
+- Progress (stage, fraction) and the final result come back over a queue
+  and are exposed by get_status()
+- cancel() terminates the child
+
+Usage:
+    worker = RetrainingWorker('monitoring.db', memory_mb=2048)
+    worker.start({'feedback_count': 120, 'drift_score': 0.4}, on_complete=print)
+    worker.get_status()   # {'state': 'running', 'stage': 'training', 'progress': 0.6, ...}
+    worker.cancel()
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class RetrainLock:
+    """Exclusive, non-blocking lock file (released by the OS if the holder dies)"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+    
+    def acquire(self) -> bool:
+        """Try to take the lock; False if another holder has it"""
+        if self._fd is not None:
+            return False
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+    
+    def release(self):
+        """Release the lock (no-op if not held)"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+    
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+
+def run_retraining(db_path: str, retrain_kwargs: Dict, report: Callable[[str, float], None]) -> Dict:
+    """Default worker target: ModelRetrainer.retrain() with progress reporting"""
+    from ml.retrain_model import ModelRetrainer
+    
+    retrainer = ModelRetrainer(db_path=db_path, progress_callback=report)
+    return retrainer.retrain(**retrain_kwargs)
+
+
+def _apply_limits(cpu_seconds: Optional[int], memory_mb: Optional[int], nice: Optional[int]):
+    """Restrict the current (child) process"""
+    if nice:
+        os.nice(nice)
+    if resource is None:
+        if cpu_seconds or memory_mb:
+            print("[WARN] Resource limits are not supported on this platform")
+        return
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL at the hard limit
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(target, db_path: str, retrain_kwargs: Dict, limits: Dict, messages):
+    """Child process entry point"""
+    def report(stage: str, fraction: float):
+        messages.put(('progress', stage, float(fraction)))
+    
+    try:
+        _apply_limits(**limits)
+        result = target(db_path, retrain_kwargs, report)
+    except BaseException as e:  # MemoryError included: report it instead of dying silently
+        result = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+    messages.put(('result', result))
+
+
+class RetrainingWorker:
+    """Dispatches retraining to a separate process, one at a time"""
+    
+    def __init__(
+        self,
+        db_path: str = "monitoring.db",
+        lock_path: Optional[str] = None,
+        cpu_seconds: Optional[int] = None,
+        memory_mb: Optional[int] = None,
+        nice: Optional[int] = None,
+        target: Callable = run_retraining
+    ):
+        """
+        Args:
+            db_path: Path to monitoring database (passed to the retrainer)
+            lock_path: Lock file (default: <db_path>.retrain.lock)
+            cpu_seconds: CPU-time limit of the child (None = unlimited)
+            memory_mb: Address-space limit of the child in MB (None = unlimited)
+            nice: Niceness increment of the child
+            target: Module-level function (db_path, retrain_kwargs, report) -> result dict
+        """
+        self.db_path = db_path
+        self.lock = RetrainLock(lock_path or f"{db_path}.retrain.lock")
+        self.limits = {'cpu_seconds': cpu_seconds, 'memory_mb': memory_mb, 'nice': nice}
+        self.target = target
+        # spawn: the child does not inherit scheduler threads or open SQLite connections
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._monitor = None
+        self._cancelled = False
+        self._status_lock = threading.Lock()
+        self._status = {'state': 'idle'}
+    
+    def start(self, retrain_kwargs: Optional[Dict] = None,
+              on_complete: Optional[Callable[[Dict], None]] = None) -> bool:
+        """
+        Start a retrain in a new process
+        
+        Args:
+            retrain_kwargs: Keyword arguments for ModelRetrainer.retrain()
+            on_complete: Called with the result dict when the process ends
+                (from a monitor thread; the result has status 'success',
+                'failed' or 'cancelled')
+        
+        Returns:
+            True if started, False if a retrain is already running
+        """
+        with self._status_lock:
+            if self._status['state'] == 'running' or not self.lock.acquire():
+                return False
+            
+            messages = self._context.Queue()
+            self._process = self._context.Process(
+                target=_worker_main,
+                args=(self.target, self.db_path, retrain_kwargs or {}, self.limits, messages),
+                name='retraining-worker',
+                daemon=True
+            )
+            self._cancelled = False
+            try:
+                self._process.start()
+            except Exception:
+                self.lock.release()
+                raise
+            
+            self._status = {
+                'state': 'running',
+                'pid': self._process.pid,
+                'stage': 'starting',
+                'progress': 0.0,
+                'started_at': datetime.now().isoformat(),
+                'finished_at': None,
+                'result': None
+            }
+            self._monitor = threading.Thread(
+                target=self._watch, args=(self._process, messages, on_complete),
+                name='retraining-monitor', daemon=True
+            )
+            self._monitor.start()
+        return True
+    
+    def _watch(self, process, messages, on_complete):
+        """Relay progress, then record the outcome and release the lock"""
+        result = None
+        while result is None:
+            try:
+                message = messages.get(timeout=0.2)
+            except queue.Empty:
+                if not process.is_alive():
+                    # One last look: the result may have been queued just before exit
+                    try:
+                        message = messages.get(timeout=0.5)
+                    except queue.Empty:
+                        break
+                else:
+                    continue
+            if message[0] == 'progress':
+                with self._status_lock:
+                    self._status['stage'] = message[1]
+                    self._status['progress'] = message[2]
+            elif message[0] == 'result':
+                result = message[1]
+        
+        process.join()
+        if self._cancelled:
+            result = {'status': 'cancelled'}
+        elif result is None:
+            result = {'status': 'failed', 'error': f"Worker exited with code {process.exitcode}"}
+        
+        state = {'success': 'succeeded', 'cancelled': 'cancelled'}.get(result.get('status'), 'failed')
+        with self._status_lock:
+            self._status.update({
+                'state': state,
+                'finished_at': datetime.now().isoformat(),
+                'exitcode': process.exitcode,
+                'result': result
+            })
+            if state == 'succeeded':
+                self._status['progress'] = 1.0
+            self.lock.release()
+        
+        if on_complete is not None:
+            try:
+                on_complete(result)
+            except Exception as e:
+                print(f"Error in retraining completion callback: {e}")
+    
+    def cancel(self, timeout: float = 10.0) -> bool:
+        """
+        Terminate the running retrain
+        
+        Returns:
+            True if a running retrain was cancelled
+        """
+        process = self._process
+        if process is None or not process.is_alive():
+            return False
+        self._cancelled = True
+        process.terminate()
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+        self.wait(timeout)
+        return True
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the current retrain to finish; True if nothing is running"""
+        monitor = self._monitor
+        if monitor is not None:
+            monitor.join(timeout)
+        return not self.is_running()
+    
+    def is_running(self) -> bool:
+        with self._status_lock:
+            return self._status['state'] == 'running'
+    
+    def get_status(self) -> Dict:
+        """State, stage, progress, timestamps and result of the last retrain"""
+        with self._status_lock:
+            return dict(self._status)
+
+
+if __name__ == "__main__":
+    """
+    Run a retrain on monitoring.db in a worker process and print progress
+    
+    Run: python src/ml/retraining_worker.py
+    """
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    
+    worker = RetrainingWorker('monitoring.db', memory_mb=4096)
+    if not worker.start({'feedback_count': 0, 'drift_score': 0.0}):
+        print("A retrain is already running")
+        sys.exit(1)
+    
+    while worker.is_running():
+        status = worker.get_status()
+        print(f"  {status['stage']:<24} {status['progress'] * 100:5.1f}%")
+        time.sleep(1)
+    
+    print(f"Result: {worker.get_status()['result']}")
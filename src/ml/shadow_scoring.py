@@ -0,0 +1,318 @@
+"""
+Shadow Scoring
+
+Runs a candidate model version next to the primary one on live traffic
+without touching the primary response:
+
+- submit() is called after the primary prediction; a sampled fraction of
+  requests (sample_rate) is handed to a small thread pool and submit()
+  returns immediately. When the pool is saturated the request is dropped
+  from shadowing rather than queued without bound
+- The candidate is taken from its own ModelManager (so it is hot-swappable
+  too) and timed the same way as the primary
+- Paired predictions are buffered and written to the shadow_predictions
+  table (PredictionsDB.save_shadow_predictions_bulk) in one transaction per
+  flush, from a single writer thread that owns the SQLite connection
+- A rolling window of divergence and latency per version is kept in memory;
+  errors against actual values come from PredictionsDB.get_shadow_comparison()
+
+Usage:
+    shadow = ShadowScorer(ModelManager(model_ref='smart-archive-forecast@staging').start(),
+                          sample_rate=0.1, db_path='monitoring.db')
+    with primary.acquire() as active:
+        start = time.perf_counter()
+        predictions = active.model.predict(X)
+        shadow.submit(X, predictions, time.perf_counter() - start, active.version)
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .model_manager import ModelManager
+except ImportError:
+    from model_manager import ModelManager
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitoring.predictions_db import PredictionsDB
+
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 64
+DEFAULT_FLUSH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_WINDOW = 1000
+
+
+def _as_pairs(predictions) -> np.ndarray:
+    """[archived_gb, savings_gb] rows from single- or multi-output predictions"""
+    predictions = np.asarray(predictions, dtype=float)
+    if predictions.ndim == 1:
+        return np.column_stack([predictions, predictions * 0.7])
+    if predictions.shape[1] == 1:
+        return np.column_stack([predictions[:, 0], predictions[:, 0] * 0.7])
+    return predictions[:, :2]
+
+
+class ShadowScorer:
+    """Scores sampled requests with a candidate model off the request path"""
+    
+    def __init__(
+        self,
+        candidate: ModelManager,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        db_path: Optional[str] = 'monitoring.db',
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        window: int = DEFAULT_WINDOW,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            candidate: ModelManager of the candidate version (already loaded)
+            sample_rate: Fraction of requests shadow-scored (0-1)
+            db_path: Monitoring database for paired predictions (None = memory only)
+            max_workers: Threads scoring the candidate
+            max_pending: Shadow requests queued or running before new ones are dropped
+            flush_size: Buffered pairs that trigger a write
+            flush_interval: Seconds after which buffered pairs are written anyway
+            window: Pairs kept for the rolling in-memory comparison
+            seed: Sampling seed (tests)
+        """
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        
+        self._random = random.Random(seed)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow-scorer')
+        # One writer thread owns the SQLite connection
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-writer')
+        self._db: Optional[PredictionsDB] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._window = deque(maxlen=window)
+        self.stats = {'requests': 0, 'sampled': 0, 'dropped': 0, 'scored': 0, 'failed': 0,
+                      'written': 0, 'write_errors': 0}
+    
+    def submit(
+        self,
+        X,
+        primary_predictions,
+        primary_latency_seconds: float,
+        primary_version: str,
+        prediction_dates: Optional[Sequence[str]] = None
+    ) -> bool:
+        """
+        Maybe shadow-score a request (never blocks)
+        
+        Args:
+            X: Model input the primary scored (not modified afterwards)
+            primary_predictions: Primary model output for X
+            primary_latency_seconds: Primary predict() time
+            primary_version: Primary model version
+            prediction_dates: Date per row, to pair with actual values later
+        
+        Returns:
+            True if the request was handed to the shadow pool
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            if self._random.random() >= self.sample_rate:
+                return False
+            self.stats['sampled'] += 1
+            if self._pending >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self._pending += 1
+        
+        self._pool.submit(self._score, X, primary_predictions, primary_latency_seconds,
+                          primary_version, prediction_dates)
+        return True
+    
+    def _score(self, X, primary_predictions, primary_latency_seconds, primary_version, prediction_dates):
+        try:
+            with self.candidate.acquire() as candidate:
+                start = time.perf_counter()
+                candidate_predictions = candidate.model.predict(X)
+                candidate_latency = time.perf_counter() - start
+            
+            primary = _as_pairs(primary_predictions)
+            shadow = _as_pairs(candidate_predictions)
+            today = datetime.now().strftime('%Y-%m-%d')
+            dates = list(prediction_dates) if prediction_dates is not None else [today] * len(primary)
+            # Latency is per request; each row carries the request's latency
+            records = [
+                {
+                    'prediction_date': dates[i],
+                    'primary_version': str(primary_version),
+                    'candidate_version': str(candidate.version),
+                    'primary_archived_gb': float(primary[i, 0]),
+                    'primary_savings_gb': float(primary[i, 1]),
+                    'candidate_archived_gb': float(shadow[i, 0]),
+                    'candidate_savings_gb': float(shadow[i, 1]),
+                    'primary_latency_ms': primary_latency_seconds * 1000,
+                    'candidate_latency_ms': candidate_latency * 1000
+                }
+                for i in range(len(primary))
+            ]
+            
+            with self._lock:
+                self.stats['scored'] += 1
+                self._window.append((
+                    float(np.mean(np.abs(shadow[:, 0] - primary[:, 0]))),
+                    primary_latency_seconds * 1000,
+                    candidate_latency * 1000
+                ))
+                if self.db_path:
+                    self._buffer.extend(records)
+                due = (len(self._buffer) >= self.flush_size
+                       or time.monotonic() - self._last_flush >= self.flush_interval)
+            if due:
+                self.flush()
+        except Exception as e:
+            with self._lock:
+                self.stats['failed'] += 1
+            print(f"[WARN] Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    # Writing
+    
+    def flush(self):
+        """Hand buffered pairs to the writer thread"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if records:
+            return self._writer.submit(self._write, records)
+        return None
+    
+    def _write(self, records: List[Dict]):
+        if self._db is None:
+            self._db = PredictionsDB(self.db_path)
+        written = self._db.save_shadow_predictions_bulk(records)
+        with self._lock:
+            if written < 0:
+                self.stats['write_errors'] += 1
+            else:
+                self.stats['written'] += written
+    
+    def close(self, timeout: Optional[float] = None):
+        """Finish pending shadow requests, write what is buffered and close the database"""
+        self._pool.shutdown(wait=True)
+        self.flush()
+        self._writer.submit(lambda: self._db.close() if self._db is not None else None)
+        self._writer.shutdown(wait=True)
+    
+    # Comparison
+    
+    def get_stats(self) -> Dict:
+        """
+        Counters and rolling comparison over the last `window` shadowed requests
+        
+        Returns:
+            Dictionary with requests, sampled, dropped, scored, failed, written,
+            pending, window, mean_divergence_gb, primary/candidate p50/p99
+            latency and latency deltas (candidate - primary, ms)
+        """
+        with self._lock:
+            stats = dict(self.stats, pending=self._pending)
+            window = np.array(self._window) if self._window else np.empty((0, 3))
+        
+        stats['window'] = len(window)
+        if len(window):
+            primary_p50, primary_p99 = np.percentile(window[:, 1], [50, 99])
+            candidate_p50, candidate_p99 = np.percentile(window[:, 2], [50, 99])
+            stats.update({
+                'mean_divergence_gb': float(window[:, 0].mean()),
+                'primary_p50_ms': float(primary_p50),
+                'primary_p99_ms': float(primary_p99),
+                'candidate_p50_ms': float(candidate_p50),
+                'candidate_p99_ms': float(candidate_p99),
+                'latency_delta_p50_ms': float(candidate_p50 - primary_p50),
+                'latency_delta_p99_ms': float(candidate_p99 - primary_p99)
+            })
+        return stats
+
+
+if __name__ == "__main__":
+    """
+    Shadow-score a candidate on simulated traffic and compare it to the primary
+    
+    Run: python src/ml/shadow_scoring.py
+    """
+    import tempfile
+    from sklearn.ensemble import RandomForestRegressor
+    
+    try:
+        from .model_artifacts import save_model_artifact
+    except ImportError:
+        from model_artifacts import save_model_artifact
+    
+    print("Testing shadow scoring...")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 9))
+    y = np.column_stack([X[:, 0] * 10 + 100, X[:, 1] * 5 + 50])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, n_estimators in (('primary', 20), ('candidate', 60)):
+            save_model_artifact(RandomForestRegressor(n_estimators=n_estimators, random_state=0).fit(X, y),
+                                Path(tmp) / name)
+        primary = ModelManager(model_dir=Path(tmp) / 'primary', poll_interval=0)
+        primary.load_initial()
+        candidate = ModelManager(model_dir=Path(tmp) / 'candidate', poll_interval=0)
+        candidate.load_initial()
+        
+        db_path = str(Path(tmp) / 'monitoring.db')
+        shadow = ShadowScorer(candidate, sample_rate=0.5, db_path=db_path, flush_size=50, seed=0)
+        
+        print("\n✓ Test 1: 400 requests, half shadowed")
+        added = []
+        for i in range(400):
+            batch = X[i:i + 4]
+            with primary.acquire() as active:
+                start = time.perf_counter()
+                predictions = active.model.predict(batch)
+                elapsed = time.perf_counter() - start
+                submit_start = time.perf_counter()
+                shadow.submit(batch, predictions, elapsed, active.version)
+                added.append(time.perf_counter() - submit_start)
+        shadow.close()
+        
+        stats = shadow.get_stats()
+        print(f"  submit() p99: {np.percentile(added, 99) * 1000:.3f} ms")
+        print(f"  Sampled {stats['sampled']}, scored {stats['scored']}, dropped {stats['dropped']}, "
+              f"written {stats['written']}")
+        print(f"  Latency p99: primary {stats['primary_p99_ms']:.2f} ms, "
+              f"candidate {stats['candidate_p99_ms']:.2f} ms (delta {stats['latency_delta_p99_ms']:+.2f} ms)")
+        assert stats['written'] == stats['scored'] * 4
+        
+        print("\n✓ Test 2: Comparison from the monitoring DB")
+        with PredictionsDB(db_path) as db:
+            comparison = db.get_shadow_comparison(days=1)
+        print(comparison[['n', 'mean_divergence_gb', 'latency_delta_ms']].to_string(index=False))
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
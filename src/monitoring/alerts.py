@@ -3,13 +3,49 @@ Alert Management Module
 
 Handles creation, persistence, and notification of alerts based on drift detection results.
 Provides alert thresholds, severity levels, and notification mechanisms.
+
+Deduplication:
+Each alert gets a fingerprint of (alert type, severity band, series). While an
+alert with the same fingerprint is open, save_alert() updates that alert
+instead of inserting a new event:
+- higher severity          -> 'escalated'  (severity raised, notified)
+- suppression window over  -> 'renotified' (reminder notification)
+- otherwise                -> 'suppressed' (occurrence counted, not notified)
+Open alerts are kept in an in-memory fingerprint index, so the check is O(1).
+A miss is checked against the database before inserting (another manager may
+have opened the alert since the index was loaded), and a unique index on the
+fingerprint of unresolved alerts makes a concurrent insert fold in as a repeat.
+
+Lifecycle:
+Alerts are 'open' -> 'acknowledged' -> 'resolved' (status column, indexed).
+Repeats of an acknowledged alert are suppressed unless they escalate, which
+reopens it; a repeat of a resolved alert creates a new alert. Active alerts
+are an indexed lookup on status = 'open', and get_open_alert_count() caches
+the count for the dashboard badge. The cache is per database file and shared
+by every manager in the process, so a manager built on each Streamlit rerun
+still hits it.
 """
 
+import hashlib
 import json
+import time
+from pathlib import Path
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, List
 from .predictions_db import PredictionsDB
+from .notifications import NotificationDispatcher
+
+
+# Open alert count per database: {db key: (count, monotonic time read)}
+_OPEN_COUNTS: Dict = {}
+
+
+def _open_count_key(db: PredictionsDB):
+    """Cache key of a database: its resolved file path (in-memory databases are per connection)"""
+    if db.db_path == ':memory:':
+        return ('memory', id(db))
+    return str(Path(db.db_path).resolve())
 
 
 def _convert_to_json_serializable(obj):
@@ -85,13 +121,32 @@ class AlertManager:
         'multi_signal': 'Immediate action required - review model performance and input data'
     }
     
+    # Severities that share a fingerprint (a warning can escalate to critical)
+    SEVERITY_BANDS = {
+        'info': 'informational',
+        'warning': 'actionable',
+        'critical': 'actionable'
+    }
+    
+    SEVERITY_RANK = {'info': 0, 'warning': 1, 'critical': 2}
+    
+    # Minimum time between notifications of the same open alert
+    DEFAULT_SUPPRESSION_WINDOWS = {
+        'info': timedelta(hours=24),
+        'warning': timedelta(hours=6),
+        'critical': timedelta(hours=1)
+    }
+    
     def __init__(
         self,
         db: PredictionsDB,
         z_score_threshold: float = 2.0,
         ks_p_value_threshold: float = 0.05,
         trend_change_threshold: float = 10.0,
-        anomaly_alert_threshold: int = 2
+        anomaly_alert_threshold: int = 2,
+        suppression_windows: Optional[Dict[str, timedelta]] = None,
+        dispatcher: Optional[NotificationDispatcher] = None,
+        open_count_ttl: float = 30.0
     ):
         """
         Initialize alert manager with drift detection thresholds
@@ -102,17 +157,26 @@ class AlertManager:
             ks_p_value_threshold: KS test p-value threshold (default: 0.05)
             trend_change_threshold: Trend change % threshold (default: 10.0)
             anomaly_alert_threshold: Anomaly count threshold for alert (default: 2)
+            suppression_windows: Per-severity overrides of DEFAULT_SUPPRESSION_WINDOWS
+            dispatcher: Asynchronous notification dispatcher (None = print synchronously)
+            open_count_ttl: Seconds get_open_alert_count() may serve a cached count
         """
         self.db = db
         self.z_score_threshold = z_score_threshold
         self.ks_p_value_threshold = ks_p_value_threshold
         self.trend_change_threshold = trend_change_threshold
         self.anomaly_alert_threshold = anomaly_alert_threshold
+        self.suppression_windows = {**self.DEFAULT_SUPPRESSION_WINDOWS, **(suppression_windows or {})}
+        self._open_alerts = None  # fingerprint -> open alert, loaded on first save
+        self.dispatcher = dispatcher
+        self.open_count_ttl = open_count_ttl
+        self._open_count_key = _open_count_key(db)
     
     def create_alert_from_drift(
         self,
         drift_results: Dict,
-        prediction_date: str
+        prediction_date: str,
+        series: str = 'default'
     ) -> Optional[Dict]:
         """
         Create alert from drift detection results
@@ -123,6 +187,7 @@ class AlertManager:
         Args:
             drift_results: Dictionary from DriftDetector.check_all_drifts()
             prediction_date: Date of the prediction (YYYY-MM-DD)
+            series: Monitored series the drift was detected on
         
         Returns:
             Alert dictionary or None if no drift:
@@ -133,6 +198,7 @@ class AlertManager:
                 'details': Dict (drift detection results),
                 'recommendation': str (action to take),
                 'prediction_date': str (YYYY-MM-DD),
+                'series': str,
                 'created_at': str (ISO timestamp),
                 'status': 'active'
             }
@@ -159,6 +225,7 @@ class AlertManager:
             'details': drift_results,
             'recommendation': recommendation,
             'prediction_date': prediction_date,
+            'series': series,
             'created_at': datetime.now().isoformat(),
             'status': 'active'
         }
@@ -296,16 +363,145 @@ class AlertManager:
         """Get recommendation for alert type"""
         return self.RECOMMENDATIONS.get(alert_type, "Review model performance")
     
+    def alert_fingerprint(self, alert: Dict) -> str:
+        """Deduplication key: alert type, severity band and series"""
+        band = self.SEVERITY_BANDS.get(alert.get('severity', 'warning'), 'actionable')
+        key = f"{alert.get('alert_type')}|{band}|{alert.get('series', 'default')}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def _now() -> datetime:
+        """Current UTC time, comparable with SQLite CURRENT_TIMESTAMP"""
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    def _get_open_alerts(self) -> Dict[str, Dict]:
+        """Fingerprint index of unresolved alerts (loaded from the database once)"""
+        if self._open_alerts is None:
+            self._open_alerts = {
+                row['fingerprint']: self._index_entry(row)
+                for row in self.db.get_open_alerts_by_fingerprint()
+            }
+        return self._open_alerts
+    
+    @staticmethod
+    def _index_entry(row: Dict) -> Dict:
+        """Fingerprint index entry from a get_open_alerts_by_fingerprint() row"""
+        return {
+            'id': row['id'],
+            'severity': row['event_severity'],
+            'status': row['status'],
+            'last_notified_at': datetime.fromisoformat(row['last_notified_at'])
+        }
+    
+    def _lookup_open_alert(self, fingerprint: str) -> Optional[Dict]:
+        """Index entry of an unresolved alert opened after the index was loaded"""
+        row = self.db.get_open_alert(fingerprint)
+        if row is None:
+            return None
+        entry = self._index_entry(row)
+        self._get_open_alerts()[fingerprint] = entry
+        return entry
+    
+    def _find_open_alert(self, event_id: int) -> Optional[str]:
+        """Fingerprint of an indexed alert by event ID"""
+        for fingerprint, entry in self._get_open_alerts().items():
+            if entry['id'] == event_id:
+                return fingerprint
+        return None
+    
     def save_alert(self, alert: Dict) -> int:
         """
-        Save alert to database as monitoring event
+        Save alert to database, folding repeats into the open alert
+        
+        Sets alert['id'] and alert['dedup_action'] ('created', 'escalated',
+        'renotified' or 'suppressed'); send_notification() skips suppressed alerts.
         
         Args:
             alert: Alert dictionary
         
         Returns:
-            Event ID if successful, -1 if error
+            Event ID (of the existing alert when deduplicated), -1 if error
         """
+        try:
+            fingerprint = self.alert_fingerprint(alert)
+            open_alerts = self._get_open_alerts()
+            existing = open_alerts.get(fingerprint)
+            if existing is None:
+                existing = self._lookup_open_alert(fingerprint)
+            
+            if existing is not None:
+                event_id = self._update_open_alert(alert, existing)
+                if event_id is not None:
+                    return event_id
+                # Resolved elsewhere (another manager on the same database): stale entry
+                del open_alerts[fingerprint]
+            
+            event_id = self._insert_alert(alert, fingerprint)
+            if event_id == 0:
+                # Another manager opened it between the lookup and the insert
+                existing = self._lookup_open_alert(fingerprint)
+                event_id = self._update_open_alert(alert, existing) if existing is not None else None
+                return -1 if event_id is None else event_id
+            if event_id > 0:
+                open_alerts[fingerprint] = {
+                    'id': event_id,
+                    'severity': alert.get('severity', 'warning'),
+                    'status': 'open',
+                    'last_notified_at': self._now()
+                }
+                self._drop_open_count()
+            alert['id'] = event_id
+            alert['dedup_action'] = 'created'
+            return event_id
+        except Exception as e:
+            print(f"Error saving alert: {e}")
+            return -1
+    
+    def _update_open_alert(self, alert: Dict, existing: Dict) -> Optional[int]:
+        """Apply the escalation / suppression rule to a repeated alert (None if no longer unresolved)"""
+        now = self._now()
+        severity = alert.get('severity', 'warning')
+        
+        if self.SEVERITY_RANK.get(severity, 1) > self.SEVERITY_RANK.get(existing['severity'], 1):
+            action = 'escalated'
+        elif existing['status'] == 'acknowledged':
+            # Someone is already on it: only an escalation notifies again
+            action = 'suppressed'
+        elif now - existing['last_notified_at'] >= self.suppression_windows.get(existing['severity'], timedelta(0)):
+            action = 'renotified'
+        else:
+            action = 'suppressed'
+        
+        notified = action != 'suppressed'
+        if action != 'escalated':
+            severity = existing['severity']
+        
+        # An escalation reopens an acknowledged alert
+        reopen = action == 'escalated' and existing['status'] != 'open'
+        updated = self.db.record_alert_occurrence(
+            existing['id'],
+            severity,
+            message=alert.get('message') if notified else None,
+            notified=notified,
+            status='open' if reopen else None
+        )
+        if not updated:
+            return None
+        
+        existing['severity'] = severity
+        if notified:
+            existing['last_notified_at'] = now
+        if reopen:
+            existing['status'] = 'open'
+            self._drop_open_count()
+        
+        alert['id'] = existing['id']
+        alert['severity'] = severity
+        alert['dedup_action'] = action
+        return existing['id']
+    
+    def _insert_alert(self, alert: Dict, fingerprint: str) -> int:
+        """Insert a new alert event"""
         try:
             # Convert drift details to JSON-serializable format
             drift_details = {
@@ -324,47 +520,72 @@ class AlertManager:
                     'recommendation': alert.get('recommendation'),
                     'prediction_date': alert.get('prediction_date'),
                     'drift_details': drift_details
-                })
+                }),
+                alert_type=alert.get('alert_type'),
+                prediction_date=alert.get('prediction_date'),
+                recommendation=alert.get('recommendation'),
+                series=alert.get('series', 'default'),
+                fingerprint=fingerprint
             )
             return event_id
         except Exception as e:
             print(f"Error saving alert: {e}")
             return -1
     
-    def get_active_alerts(self, days: int = 7) -> list:
+    def get_active_alerts(self, days: Optional[int] = None) -> list:
         """
-        Get active/unacknowledged alerts from recent days
+        Get open (unacknowledged, unresolved) alerts
         
         Args:
-            days: Number of days to look back
+            days: Only alerts created in the last N days (None = all open alerts)
         
         Returns:
             List of alert dictionaries
         """
         try:
-            events = self.db.get_monitoring_events(days=days, event_type='alert')
-            
-            alerts = []
-            for _, event in events.iterrows():
-                try:
-                    metadata = json.loads(event['metadata']) if event['metadata'] else {}
-                    alerts.append({
-                        'id': event['id'],
-                        'severity': event['event_severity'],
-                        'message': event['message'],
-                        'alert_type': metadata.get('alert_type'),
-                        'recommendation': metadata.get('recommendation'),
-                        'created_at': event['created_at'],
-                        'prediction_date': metadata.get('prediction_date')
-                    })
-                except (json.JSONDecodeError, KeyError):
-                    continue
-            
-            return alerts
+            return self._alerts_to_dicts(self.db.get_alerts(days=days, status='open'))
         except Exception as e:
             print(f"Error retrieving alerts: {e}")
             return []
     
+    def get_open_alert_count(self, max_age: Optional[float] = None) -> int:
+        """
+        Number of open alerts, cached for open_count_ttl seconds
+        
+        The cache is shared by all managers on the same database file and
+        dropped whenever one of them opens, reopens, acknowledges or
+        resolves an alert, so it only lags changes made by other processes.
+        
+        Args:
+            max_age: Override of open_count_ttl for this call (0 = always query)
+        
+        Returns:
+            Open alert count (-1 if error)
+        """
+        ttl = self.open_count_ttl if max_age is None else max_age
+        now = time.monotonic()
+        cached = _OPEN_COUNTS.get(self._open_count_key)
+        if cached is not None and now - cached[1] < ttl:
+            return cached[0]
+        try:
+            count = self.db.count_open_alerts()
+        except Exception as e:
+            print(f"Error counting open alerts: {e}")
+            return -1
+        _OPEN_COUNTS[self._open_count_key] = (count, now)
+        return count
+    
+    def _drop_open_count(self):
+        """Invalidate the cached open alert count of this database"""
+        _OPEN_COUNTS.pop(self._open_count_key, None)
+    
+    @staticmethod
+    def _alerts_to_dicts(events) -> List[Dict]:
+        """Convert PredictionsDB.get_alerts() rows to alert dictionaries"""
+        events = events.rename(columns={'event_severity': 'severity'})
+        events['acknowledged'] = events['acknowledged'].astype(bool)
+        return events.to_dict('records')
+    
     def get_alert_summary(self, days: int = 7) -> Dict:
         """
         Get summary statistics of recent alerts
@@ -375,54 +596,59 @@ class AlertManager:
         Returns:
             Dictionary with alert counts by severity and type
         """
-        alerts = self.get_active_alerts(days=days)
-        
         summary = {
-            'total_alerts': len(alerts),
+            'total_alerts': 0,
             'critical_count': 0,
             'warning_count': 0,
             'info_count': 0,
             'by_type': {}
         }
         
-        for alert in alerts:
-            severity = alert.get('severity', 'info')
-            alert_type = alert.get('alert_type', 'unknown')
+        try:
+            counts = self.db.get_alert_counts(days=days)
+        except Exception as e:
+            print(f"Error summarizing alerts: {e}")
+            return summary
+        
+        # One row per (severity, type) pair
+        for severity, alert_type, count in counts.itertuples(index=False):
+            count = int(count)
+            alert_type = alert_type or 'unknown'
+            summary['total_alerts'] += count
             
             if severity == 'critical':
-                summary['critical_count'] += 1
+                summary['critical_count'] += count
             elif severity == 'warning':
-                summary['warning_count'] += 1
+                summary['warning_count'] += count
             else:
-                summary['info_count'] += 1
+                summary['info_count'] += count
             
-            if alert_type not in summary['by_type']:
-                summary['by_type'][alert_type] = 0
-            summary['by_type'][alert_type] += 1
+            summary['by_type'][alert_type] = summary['by_type'].get(alert_type, 0) + count
         
         return summary
     
     def send_notification(self, alert: Dict) -> bool:
         """
-        Send alert notification (console and/or email)
+        Send alert notification
+        
+        With a dispatcher the alert is only queued (email/webhook delivery
+        happens on its worker threads); otherwise it is printed.
         
         Args:
             alert: Alert dictionary
         
         Returns:
-            True if notification sent successfully
+            True if notification sent or queued (False for suppressed repeats)
         """
+        if alert.get('dedup_action') == 'suppressed':
+            return False
+        
         try:
-            severity = alert.get('severity', 'warning')
-            message = alert.get('message', '')
-            recommendation = alert.get('recommendation', '')
+            if self.dispatcher is not None:
+                return self.dispatcher.submit(alert)
             
             # Console notification
             self._send_console_notification(alert)
-            
-            # Future: Email notification
-            # self._send_email_notification(alert)
-            
             return True
         except Exception as e:
             print(f"Error sending notification: {e}")
@@ -450,38 +676,45 @@ class AlertManager:
         print(f"   Action: {recommendation}")
         print(f"   Time: {alert.get('created_at', 'N/A')}\n")
     
-    def _send_email_notification(self, alert: Dict) -> bool:
+    def acknowledge_alert(self, event_id: int) -> bool:
         """
-        Send email notification (stub for future implementation)
+        Mark an open alert as acknowledged
         
-        Would require:
-        - SMTP configuration
-        - Email templates
-        - Recipient configuration
+        Further repeats of the alert are suppressed unless they escalate.
         
         Args:
-            alert: Alert dictionary
+            event_id: ID of the event/alert
         
         Returns:
-            True if email sent
+            True if acknowledgment saved (False if not open)
         """
-        # TODO: Implement email notification
-        # This would be added in a future phase
-        return False
+        if not self.db.set_alert_status(event_id, 'acknowledged'):
+            return False
+        fingerprint = self._find_open_alert(event_id)
+        if fingerprint is not None:
+            self._open_alerts[fingerprint]['status'] = 'acknowledged'
+        self._drop_open_count()
+        return True
     
-    def acknowledge_alert(self, event_id: int) -> bool:
+    def resolve_alert(self, event_id: int) -> bool:
         """
-        Mark alert as acknowledged (stub for future implementation)
+        Mark an open or acknowledged alert as resolved
+        
+        The next occurrence of the same condition creates a new alert.
         
         Args:
             event_id: ID of the event/alert
         
         Returns:
-            True if acknowledgment saved
+            True if resolution saved (False if already resolved)
         """
-        # TODO: Add acknowledgment support to database
-        # Would require adding 'acknowledged' column to monitoring_events
-        return False
+        if not self.db.set_alert_status(event_id, 'resolved'):
+            return False
+        fingerprint = self._find_open_alert(event_id)
+        if fingerprint is not None:
+            del self._open_alerts[fingerprint]
+        self._drop_open_count()
+        return True
     
     def get_alert_history(self, days: int = 30, severity: Optional[str] = None) -> List[Dict]:
         """
@@ -495,25 +728,7 @@ class AlertManager:
             List of alert dictionaries
         """
         try:
-            events = self.db.get_monitoring_events(days=days, event_type='alert', severity=severity)
-            
-            alerts = []
-            for _, event in events.iterrows():
-                try:
-                    metadata = json.loads(event['metadata']) if event['metadata'] else {}
-                    alerts.append({
-                        'id': event['id'],
-                        'severity': event['event_severity'],
-                        'message': event['message'],
-                        'alert_type': metadata.get('alert_type'),
-                        'recommendation': metadata.get('recommendation'),
-                        'created_at': event['created_at'],
-                        'prediction_date': metadata.get('prediction_date')
-                    })
-                except (json.JSONDecodeError, KeyError):
-                    continue
-            
-            return alerts
+            return self._alerts_to_dicts(self.db.get_alerts(days=days, severity=severity))
         except Exception as e:
             print(f"Error retrieving alert history: {e}")
             return []
@@ -598,6 +813,14 @@ if __name__ == "__main__":
     for a in active:
         print(f"    - [{a['severity'].upper()}] {a['message']}")
     
+    # Test 4b: Lifecycle
+    print("\n✓ Test 4b: Acknowledge and resolve")
+    open_before = manager.get_open_alert_count()
+    assert manager.acknowledge_alert(alert_id), "Open alert should be acknowledged"
+    assert manager.resolve_alert(alert_id), "Acknowledged alert should be resolved"
+    assert not manager.resolve_alert(alert_id), "Resolved alert stays resolved"
+    print(f"  Open alerts: {open_before} -> {manager.get_open_alert_count()}")
+    
     # Test 5: Get alert summary
     print("\n✓ Test 5: Alert summary statistics")
     summary = manager.get_alert_summary(days=1)
@@ -0,0 +1,298 @@
+"""
+Database Connection Pool
+
+Small thread-safe pool for the cloud FeedbackDB backends (pyodbc for Azure
+SQL, psycopg2 for PostgreSQL). Any DB-API 2.0 connection factory works, so
+tests can run against SQLite or a local PostgreSQL stand-in.
+
+Features:
+- Bounded pool (max_size) with blocking checkout and timeout
+- Health check (SELECT 1) on connections idle longer than health_check_interval
+- Broken connections are discarded instead of returned to the pool
+- run() retries once on a fresh connection after a disconnect error
+
+Usage:
+    pool = ConnectionPool(lambda: psycopg2.connect(**config), max_size=5)
+    
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+    
+    count = pool.run(lambda conn: fetch_count(conn))   # reconnects on failure
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+# SQLSTATE class 08 = connection exception (pyodbc reports it in args[0])
+DISCONNECT_SQLSTATE_PREFIX = '08'
+
+
+def is_disconnect_error(error: Exception) -> bool:
+    """
+    Whether an exception means the connection itself is unusable
+    
+    Covers psycopg2/sqlite3 OperationalError and InterfaceError, and pyodbc
+    errors carrying a class 08 SQLSTATE.
+    
+    Args:
+        error: Exception raised by a DB-API driver
+    
+    Returns:
+        True if the connection should be discarded and the call retried
+    """
+    if type(error).__name__ in ('OperationalError', 'InterfaceError'):
+        return True
+    
+    args = getattr(error, 'args', ())
+    return bool(args) and isinstance(args[0], str) and args[0].startswith(DISCONNECT_SQLSTATE_PREFIX)
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections"""
+    
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 5,
+        timeout: float = 30.0,
+        health_check_query: str = 'SELECT 1',
+        health_check_interval: float = 30.0
+    ):
+        """
+        Initialize pool (connections are opened lazily)
+        
+        Args:
+            connect: Zero-argument factory returning a new DB-API connection
+            max_size: Maximum open connections
+            timeout: Seconds to wait for a free connection before TimeoutError
+            health_check_query: Query used to validate idle connections
+            health_check_interval: Validate connections idle longer than this (seconds)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_query = health_check_query
+        self.health_check_interval = health_check_interval
+        
+        self._idle = deque()  # (connection, last_used)
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'health_check_failures': 0,
+            'reconnects': 0
+        }
+    
+    def _checkout(self):
+        """Take an idle connection or open a new one, waiting if the pool is full"""
+        deadline = time.monotonic() + self.timeout
+        
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No database connection available within {self.timeout:g}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+                    conn, last_used = None, None
+            
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                self._count('created')
+                return conn
+            
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                self._count('reused')
+                return conn
+            
+            # Stale connection: drop it and try again
+            self._count('health_check_failures')
+            self._discard(conn)
+    
+    def _count(self, key: str):
+        with self._cond:
+            self._stats[key] += 1
+    
+    def _is_healthy(self, conn) -> bool:
+        """Run the health check query on a connection"""
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+    
+    def _checkin(self, conn):
+        """Return a healthy connection to the pool"""
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    def _discard(self, conn):
+        """Close a broken connection and free its slot"""
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+    
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with-block
+        
+        On a disconnect error the connection is discarded; on any other error
+        (including a streaming generator closed early) it is rolled back and
+        returned to the pool.
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        except BaseException as e:
+            if isinstance(e, Exception) and is_disconnect_error(e):
+                self._discard(conn)
+            else:
+                try:
+                    conn.rollback()
+                    self._checkin(conn)
+                except Exception:
+                    self._discard(conn)
+            raise
+        else:
+            self._checkin(conn)
+    
+    def run(self, operation: Callable[[Any], Any], retries: int = 1):
+        """
+        Run operation(conn) on a pooled connection, reconnecting on failure
+        
+        Args:
+            operation: Callable taking a connection; should commit its own writes
+            retries: Extra attempts on a fresh connection after disconnect errors
+        
+        Returns:
+            operation's return value
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    return operation(conn)
+            except Exception as e:
+                if attempt < retries and is_disconnect_error(e):
+                    self._count('reconnects')
+                    continue
+                raise
+    
+    def get_stats(self) -> Dict:
+        """
+        Get pool counters for monitoring
+        
+        Returns:
+            Dictionary with open/idle connection counts and lifetime counters
+        """
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'open': self._size,
+                'idle': len(self._idle),
+                **self._stats
+            }
+    
+    def close(self):
+        """Close idle connections; checked-out ones close when returned"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+
+def create_cloud_pool(provider: str, cloud_config: Dict, connection_string: Optional[str] = None) -> ConnectionPool:
+    """
+    Build a pool for the FeedbackDB cloud providers
+    
+    cloud_config may set 'pool_size' (default 5), 'pool_timeout' (default 30)
+    and 'connection_factory' to replace the driver (e.g. a SQLite shim in tests).
+    
+    Args:
+        provider: 'azure' (pyodbc) or 'postgres' (psycopg2)
+        cloud_config: FeedbackDB cloud configuration
+        connection_string: ODBC connection string for provider='azure'
+    
+    Returns:
+        ConnectionPool for the provider
+    """
+    factory = cloud_config.get('connection_factory')
+    
+    if factory is None:
+        if provider == 'azure':
+            import pyodbc
+            
+            def factory():
+                conn = pyodbc.connect(connection_string)
+                conn.setencoding(encoding='utf-8')
+                return conn
+        elif provider == 'postgres':
+            import psycopg2
+            
+            def factory():
+                return psycopg2.connect(
+                    host=cloud_config['host'],
+                    port=cloud_config.get('port', 5432),
+                    user=cloud_config['user'],
+                    password=cloud_config['password'],
+                    database=cloud_config['database']
+                )
+        else:
+            raise ValueError(f"Unknown cloud provider: {provider}")
+    
+    return ConnectionPool(
+        factory,
+        max_size=int(cloud_config.get('pool_size', 5)),
+        timeout=float(cloud_config.get('pool_timeout', 30.0))
+    )
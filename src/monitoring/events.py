@@ -0,0 +1,119 @@
+"""
+In-Process Monitoring Event Bus
+
+Database writers publish what they changed so interested components can react
+immediately instead of polling: FeedbackDB publishes 'feedback_submitted' and
+PredictionsDB publishes 'prediction_saved' after each successful commit.
+RetrainingScheduler (event-driven mode) subscribes to both to decide when the
+retraining trigger is worth re-evaluating.
+
+Subscribers run synchronously on the publisher's thread, so they must be
+cheap (update counters, schedule work) and thread-safe. Exceptions raised by
+a subscriber are printed and never reach the writer.
+
+Usage:
+    bus = get_event_bus()
+    bus.subscribe(FEEDBACK_SUBMITTED, lambda event: print(event['count']))
+    bus.publish(FEEDBACK_SUBMITTED, count=1, statuses={'incorrect': 1})
+"""
+
+import threading
+from collections import Counter
+from typing import Callable, Dict, List
+
+
+FEEDBACK_SUBMITTED = 'feedback_submitted'
+PREDICTION_SAVED = 'prediction_saved'
+
+
+class EventBus:
+    """Synchronous publish/subscribe with per-topic counters"""
+    
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable]] = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+    
+    def subscribe(self, topic: str, callback: Callable[[Dict], None]) -> Callable:
+        """
+        Register a callback for a topic
+        
+        Args:
+            topic: Event name, e.g. FEEDBACK_SUBMITTED
+            callback: Called with the event dict (topic plus payload)
+        
+        Returns:
+            The callback (pass it to unsubscribe)
+        """
+        with self._lock:
+            # Copy on write: publish() iterates without holding the lock
+            self._subscribers[topic] = self._subscribers.get(topic, []) + [callback]
+        return callback
+    
+    def unsubscribe(self, topic: str, callback: Callable):
+        """Remove a callback (no-op if not subscribed)"""
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            self._subscribers[topic] = [c for c in callbacks if c is not callback]
+    
+    def publish(self, topic: str, **payload) -> int:
+        """
+        Deliver an event to every subscriber of its topic
+        
+        Args:
+            topic: Event name
+            **payload: Event fields
+        
+        Returns:
+            Number of subscribers notified
+        """
+        with self._lock:
+            self._counts[topic] += 1
+            callbacks = self._subscribers.get(topic, [])
+        
+        event = {'topic': topic, **payload}
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in {topic} subscriber: {e}")
+        return len(callbacks)
+    
+    def get_counts(self) -> Dict[str, int]:
+        """Events published per topic since creation"""
+        with self._lock:
+            return dict(self._counts)
+
+
+_default_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """Process-wide bus used by the database modules"""
+    return _default_bus
+
+
+if __name__ == "__main__":
+    """
+    Publish a few events to a counting subscriber
+    
+    Run: python src/monitoring/events.py
+    """
+    print("Testing event bus...")
+    print("=" * 60)
+    
+    bus = EventBus()
+    received = []
+    bus.subscribe(FEEDBACK_SUBMITTED, received.append)
+    
+    bus.publish(FEEDBACK_SUBMITTED, count=1, statuses={'correct': 1})
+    bus.publish(FEEDBACK_SUBMITTED, count=3, statuses={'incorrect': 3})
+    bus.publish(PREDICTION_SAVED, count=1)
+    
+    print(f"Received: {received}")
+    print(f"Counts: {bus.get_counts()}")
+    assert len(received) == 2
+    assert bus.get_counts() == {FEEDBACK_SUBMITTED: 2, PREDICTION_SAVED: 1}
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -8,7 +8,23 @@ Used for retraining trigger evaluation and model improvement.
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
+from collections import Counter
 from typing import Optional, List, Dict
+from .events import FEEDBACK_SUBMITTED, get_event_bus
+from .query_builder import window_start
+from .streaming import DEFAULT_BATCH_SIZE, FEEDBACK_DTYPES, iter_batches
+from .rollups import (
+    apply_feedback_rollup, ensure_feedback_rollup, read_feedback_accuracy, read_feedback_snapshot,
+    rebuild_feedback_rollup, summarize_feedback_accuracy
+)
+
+
+# retraining_log columns added after the first release; added to existing
+# databases by _migrate_retraining_log()
+RETRAINING_LOG_COLUMNS = [
+    ('watermark', 'INTEGER'),     # Highest feedback id the saved model was trained on
+    ('model_path', 'TEXT')
+]
 
 
 class FeedbackDB:
@@ -29,6 +45,8 @@ class FeedbackDB:
         """Create database and tables if they don't exist"""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        # Only takes effect on a new file; lets retention release pages incrementally
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
         
         # Create feedback table
         self.conn.execute('''
@@ -58,12 +76,24 @@ class FeedbackDB:
                 completed_at TIMESTAMP,
                 status TEXT DEFAULT 'pending',
                 metrics_before TEXT,
-                metrics_after TEXT
+                metrics_after TEXT,
+                {added_columns}
             )
-        ''')
+        '''.format(added_columns=',\n                '.join(f'{name} {ddl}' for name, ddl in RETRAINING_LOG_COLUMNS)))
+        self._migrate_retraining_log()
+        
+        # Daily rollup behind get_feedback_accuracy (backfilled on first run)
+        ensure_feedback_rollup(self.conn)
         
         self.conn.commit()
     
+    def _migrate_retraining_log(self):
+        """Add the RETRAINING_LOG_COLUMNS to an older retraining_log table"""
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(retraining_log)')}
+        for name, ddl in RETRAINING_LOG_COLUMNS:
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE retraining_log ADD COLUMN {name} {ddl}')
+    
     def submit_feedback(
         self,
         prediction_id: int,
@@ -101,12 +131,57 @@ class FeedbackDB:
                 feedback_status,
                 user_feedback
             ))
+            apply_feedback_rollup(self.conn, 'id = ?', (cursor.lastrowid,))
             self.conn.commit()
+            get_event_bus().publish(FEEDBACK_SUBMITTED, count=1, statuses={feedback_status: 1})
             return cursor.lastrowid
         except Exception as e:
+            self.conn.rollback()
             print(f"Error submitting feedback: {e}")
             return -1
     
+    def submit_feedback_bulk(self, records: List[Dict]) -> int:
+        """
+        Insert many feedback records in a single transaction
+        
+        Args:
+            records: Dicts with prediction_id, prediction_date, predicted_value,
+                     actual_value, feedback_status and optional user_feedback
+        
+        Returns:
+            Number of records inserted (-1 on error)
+        """
+        try:
+            last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM feedback').fetchone()[0]
+            self.conn.executemany('''
+                INSERT INTO feedback
+                (prediction_id, prediction_date, predicted_value, actual_value,
+                 feedback_status, user_feedback)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    r.get('prediction_id'),
+                    r['prediction_date'],
+                    r['predicted_value'],
+                    r['actual_value'],
+                    r['feedback_status'],
+                    r.get('user_feedback')
+                )
+                for r in records
+            ])
+            apply_feedback_rollup(self.conn, 'id > ?', (last_id,))
+            self.conn.commit()
+            get_event_bus().publish(
+                FEEDBACK_SUBMITTED,
+                count=len(records),
+                statuses=dict(Counter(r['feedback_status'] for r in records))
+            )
+            return len(records)
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Error submitting feedback in bulk: {e}")
+            return -1
+    
     def get_feedback_count(self, days: int = 7) -> int:
         """
         Get count of feedback submitted in last N days
@@ -161,27 +236,77 @@ class FeedbackDB:
             df['error'] = abs(df['actual_value'] - df['predicted_value'])
         return df
     
-    def get_feedback_accuracy(self, days: int = 30) -> Dict:
+    def iter_feedback(
+        self,
+        days: int = 90,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        as_arrow: bool = False,
+        after_id: Optional[int] = None
+    ):
         """
-        Calculate accuracy metrics from feedback
+        Stream feedback from the last N days in typed batches
+        
+        Unlike get_recent_feedback, nothing is materialized beyond one batch.
         
         Args:
-            days: Number of days to analyze
+            days: Number of days to look back
+            batch_size: Rows per batch
+            as_arrow: Yield pyarrow.RecordBatch instead of dicts of arrays
+            after_id: Stream only rows with id > after_id (a retraining
+                watermark), in id order, instead of the days window
         
-        Returns:
-            Dictionary with accuracy metrics
+        Yields:
+            Dict of column name -> np.ndarray (or pyarrow.RecordBatch)
         """
+        if after_id is not None:
+            query = '''
+                SELECT
+                    id,
+                    prediction_id,
+                    prediction_date,
+                    predicted_value,
+                    actual_value,
+                    feedback_status,
+                    user_feedback,
+                    created_at
+                FROM feedback
+                WHERE id > ?
+                ORDER BY id
+            '''
+            yield from iter_batches(self.conn, query, (after_id,), FEEDBACK_DTYPES, batch_size, as_arrow=as_arrow)
+            return
+        
         query = '''
-            SELECT 
+            SELECT
+                id,
+                prediction_id,
+                prediction_date,
+                predicted_value,
+                actual_value,
                 feedback_status,
-                COUNT(*) as count,
-                AVG(ABS(actual_value - predicted_value)) as avg_error
+                user_feedback,
+                created_at
             FROM feedback
-            WHERE DATE(created_at) >= DATE('now', '-' || ? || ' days')
-            GROUP BY feedback_status
+            WHERE created_at >= ?
+            ORDER BY created_at
         '''
+        params = (window_start(days, 'sqlite'),)
+        yield from iter_batches(self.conn, query, params, FEEDBACK_DTYPES, batch_size, as_arrow=as_arrow)
+    
+    def get_feedback_accuracy(self, days: int = 30) -> Dict:
+        """
+        Calculate accuracy metrics from feedback
         
-        df = pd.read_sql(query, self.conn, params=(days,))
+        Reads the daily rollup table instead of re-aggregating raw feedback.
+        
+        Args:
+            days: Number of days to analyze
+        
+        Returns:
+            Dictionary with accuracy metrics
+        """
+        rows = read_feedback_accuracy(self.conn, days)
+        df = pd.DataFrame(rows, columns=['feedback_status', 'count', 'avg_error'])
         
         if df.empty:
             return {
@@ -210,6 +335,31 @@ class FeedbackDB:
             'avg_error': avg_error
         }
     
+    def get_trigger_snapshot(self, count_days: int = 7, accuracy_days: int = 30) -> Dict:
+        """
+        Feedback inputs of the retraining trigger in a single query
+        
+        Equivalent to get_feedback_count(count_days) plus
+        get_feedback_accuracy(accuracy_days), read from the daily rollup.
+        
+        Args:
+            count_days: Window of the feedback count
+            accuracy_days: Window of the accuracy metrics
+        
+        Returns:
+            Dictionary with feedback_count and accuracy (get_feedback_accuracy format)
+        """
+        rows = read_feedback_snapshot(self.conn, count_days, accuracy_days)
+        return {
+            'feedback_count': int(sum(row[3] for row in rows)),
+            'accuracy': summarize_feedback_accuracy([row[:3] for row in rows])
+        }
+    
+    def rebuild_rollups(self):
+        """Recompute the feedback rollup from the raw table (compaction/repair)"""
+        rebuild_feedback_rollup(self.conn)
+        self.conn.commit()
+    
     def log_retraining_start(
         self,
         trigger_reason: str,
@@ -246,7 +396,9 @@ class FeedbackDB:
         retraining_id: int,
         model_improvement: float,
         metrics_before: str,
-        metrics_after: str
+        metrics_after: str,
+        watermark: Optional[int] = None,
+        model_path: Optional[str] = None
     ) -> bool:
         """
         Log completion of retraining
@@ -256,6 +408,8 @@ class FeedbackDB:
             model_improvement: Improvement percentage
             metrics_before: JSON string of metrics before retraining
             metrics_after: JSON string of metrics after retraining
+            watermark: Highest feedback id the new model was trained on
+            model_path: Where the new model was saved
         
         Returns:
             True if successful
@@ -267,15 +421,33 @@ class FeedbackDB:
                     completed_at = CURRENT_TIMESTAMP,
                     model_improvement = ?,
                     metrics_before = ?,
-                    metrics_after = ?
+                    metrics_after = ?,
+                    watermark = ?,
+                    model_path = ?
                 WHERE id = ?
-            ''', (model_improvement, metrics_before, metrics_after, retraining_id))
+            ''', (model_improvement, metrics_before, metrics_after, watermark, model_path, retraining_id))
             self.conn.commit()
             return True
         except Exception as e:
             print(f"Error updating retraining log: {e}")
             return False
     
+    def get_last_retraining(self) -> Optional[Dict]:
+        """
+        Most recent completed retraining (the base of an incremental retrain)
+        
+        Returns:
+            Dict with id, completed_at, watermark and model_path, or None
+        """
+        row = self.conn.execute('''
+            SELECT id, completed_at, watermark, model_path
+            FROM retraining_log
+            WHERE status = 'completed'
+            ORDER BY started_at DESC, id DESC
+            LIMIT 1
+        ''').fetchone()
+        return dict(row) if row else None
+    
     def get_retraining_history(self, limit: int = 20) -> pd.DataFrame:
         """
         Get retraining history
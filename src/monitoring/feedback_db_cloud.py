@@ -4,6 +4,10 @@ Cloud-Compatible Feedback Database Module
 Handles storage and retrieval of user feedback on predictions.
 Supports both local SQLite and cloud-based databases (Azure SQL, PostgreSQL).
 Includes Streamlit Cloud persistence using @st.cache_resource.
+
+Cloud backends go through a pooled connection layer (db_pool.py) with health
+checks and reconnect-on-failure; queries are compiled per dialect by
+query_builder.py and always parameterized.
 """
 
 import sqlite3
@@ -12,7 +16,16 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import os
 import json
+from collections import Counter
 from pathlib import Path
+from .db_pool import create_cloud_pool
+from .events import FEEDBACK_SUBMITTED, get_event_bus
+from .query_builder import ADDED_COLUMNS, column_migrations, compile_query, schema_statements, window_start
+from .streaming import DEFAULT_BATCH_SIZE, FEEDBACK_DTYPES, iter_batches
+from .rollups import (
+    apply_feedback_rollup, ensure_feedback_rollup, read_feedback_accuracy, read_feedback_snapshot,
+    rebuild_feedback_rollup, summarize_feedback_accuracy
+)
 
 
 class FeedbackDB:
@@ -31,13 +44,16 @@ class FeedbackDB:
                              'host': 'server.database.windows.net',
                              'user': 'username',
                              'password': 'password',
-                             'database': 'dbname'
+                             'database': 'dbname',
+                             'pool_size': 5,              # optional
+                             'connection_factory': None   # optional, e.g. test shim
                          }
         """
         self.db_path = db_path
         self.use_cloud = use_cloud
         self.cloud_config = cloud_config or {}
         self.conn = None
+        self.pool = None
         self.provider = cloud_config.get('provider', 'sqlite') if use_cloud else 'sqlite'
         
         # Initialize Streamlit Cloud cache if running in Streamlit
@@ -61,138 +77,59 @@ class FeedbackDB:
             print(f"Error initializing database: {e}")
             # Fall back to SQLite
             print("Falling back to SQLite...")
+            self.provider = 'sqlite'
             self._initialize_sqlite_db()
     
     def _initialize_sqlite_db(self):
         """Initialize SQLite database"""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        # Only takes effect on a new file; lets retention release pages incrementally
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
         
-        # Create feedback table
-        self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                prediction_id INTEGER,
-                prediction_date DATE,
-                predicted_value REAL,
-                actual_value REAL,
-                feedback_status TEXT NOT NULL,
-                user_feedback TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (prediction_id) REFERENCES predictions(id)
-            )
-        ''')
-        
-        # Create retraining log table
-        self.conn.execute('''
-            CREATE TABLE IF NOT EXISTS retraining_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                trigger_reason TEXT NOT NULL,
-                feedback_count INTEGER,
-                drift_score REAL,
-                accuracy_drop REAL,
-                model_improvement REAL,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                metrics_before TEXT,
-                metrics_after TEXT
-            )
-        ''')
+        # Create feedback and retraining log tables plus their indexes
+        for statement in schema_statements('sqlite'):
+            self.conn.execute(statement)
+        existing = {
+            table: {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            for table in {table for table, _, _ in ADDED_COLUMNS}
+        }
+        for statement in column_migrations('sqlite', existing):
+            self.conn.execute(statement)
+        
+        # Daily rollup behind get_feedback_accuracy (SQLite only)
+        ensure_feedback_rollup(self.conn)
         
         self.conn.commit()
     
     def _initialize_cloud_db(self):
         """Initialize cloud database (Azure SQL, PostgreSQL, etc.)"""
         try:
-            if self.provider == 'azure':
-                import pyodbc
-                connection_string = self._build_azure_connection_string()
-                self.conn = pyodbc.connect(connection_string)
-                self.conn.setencoding(encoding='utf-8')
-            elif self.provider == 'postgres':
-                import psycopg2
-                self.conn = psycopg2.connect(
-                    host=self.cloud_config['host'],
-                    user=self.cloud_config['user'],
-                    password=self.cloud_config['password'],
-                    database=self.cloud_config['database']
-                )
-            else:
+            if self.provider not in ('azure', 'postgres'):
                 raise ValueError(f"Unknown cloud provider: {self.provider}")
             
-            # Create tables
-            cursor = self.conn.cursor()
+            connection_string = None
+            if self.provider == 'azure' and 'connection_factory' not in self.cloud_config:
+                connection_string = self._build_azure_connection_string()
+            self.pool = create_cloud_pool(self.provider, self.cloud_config, connection_string)
             
-            # Use provider-specific SQL
-            if self.provider == 'azure':
-                feedback_sql = '''
-                    IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='feedback')
-                    CREATE TABLE feedback (
-                        id INT PRIMARY KEY IDENTITY(1,1),
-                        prediction_id INT,
-                        prediction_date DATE,
-                        predicted_value FLOAT,
-                        actual_value FLOAT,
-                        feedback_status VARCHAR(50) NOT NULL,
-                        user_feedback TEXT,
-                        created_at DATETIME DEFAULT GETDATE()
-                    )
-                '''
-                retraining_sql = '''
-                    IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='retraining_log')
-                    CREATE TABLE retraining_log (
-                        id INT PRIMARY KEY IDENTITY(1,1),
-                        trigger_reason VARCHAR(255) NOT NULL,
-                        feedback_count INT,
-                        drift_score FLOAT,
-                        accuracy_drop FLOAT,
-                        model_improvement FLOAT,
-                        started_at DATETIME DEFAULT GETDATE(),
-                        completed_at DATETIME,
-                        status VARCHAR(50) DEFAULT 'pending',
-                        metrics_before TEXT,
-                        metrics_after TEXT
-                    )
-                '''
-            else:  # PostgreSQL
-                feedback_sql = '''
-                    CREATE TABLE IF NOT EXISTS feedback (
-                        id SERIAL PRIMARY KEY,
-                        prediction_id INTEGER,
-                        prediction_date DATE,
-                        predicted_value FLOAT,
-                        actual_value FLOAT,
-                        feedback_status VARCHAR(50) NOT NULL,
-                        user_feedback TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                '''
-                retraining_sql = '''
-                    CREATE TABLE IF NOT EXISTS retraining_log (
-                        id SERIAL PRIMARY KEY,
-                        trigger_reason VARCHAR(255) NOT NULL,
-                        feedback_count INTEGER,
-                        drift_score FLOAT,
-                        accuracy_drop FLOAT,
-                        model_improvement FLOAT,
-                        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        completed_at TIMESTAMP,
-                        status VARCHAR(50) DEFAULT 'pending',
-                        metrics_before TEXT,
-                        metrics_after TEXT
-                    )
-                '''
+            # Use provider-specific DDL
+            for statement in schema_statements(self.provider):
+                self._execute(statement, commit=True)
             
-            cursor.execute(feedback_sql)
-            cursor.execute(retraining_sql)
-            self.conn.commit()
-            cursor.close()
+            # Older tables lack ADDED_COLUMNS; a failed ALTER (e.g. missing
+            # permissions) only disables the features that need the column
+            for statement in column_migrations(self.provider):
+                try:
+                    self._execute(statement, commit=True)
+                except Exception as e:
+                    print(f"[WARN] Schema migration failed: {e}")
         
         except Exception as e:
             print(f"Error initializing cloud database: {e}")
             raise
     
+    
     def _build_azure_connection_string(self) -> str:
         """Build Azure SQL connection string"""
         return (
@@ -204,6 +141,83 @@ class FeedbackDB:
             f"Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;"
         )
     
+    def _execute(self, query: str, params: tuple = (), fetch: Optional[str] = None, commit: bool = False):
+        """
+        Run a parameterized query on a pooled cloud connection
+        
+        Reconnects and retries once if the connection was dropped.
+        
+        Args:
+            query: SQL with driver placeholders (? for Azure, %s for PostgreSQL)
+            params: Query parameters
+            fetch: 'one', 'all' or None
+            commit: Commit after executing
+        
+        Returns:
+            Fetched row(s), or None
+        """
+        def _operation(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                if fetch == 'one':
+                    result = cursor.fetchone()
+                elif fetch == 'all':
+                    result = cursor.fetchall()
+                else:
+                    result = None
+                if commit:
+                    conn.commit()
+                return result
+            finally:
+                cursor.close()
+        
+        return self.pool.run(_operation)
+    
+    def _run(self, name: str, fetch: Optional[str] = None, commit: bool = False, **params):
+        """
+        Run a compiled query from query_builder on the active backend
+        
+        Args:
+            name: Logical query name (see query_builder.QUERIES)
+            fetch: 'one', 'all', 'id' (inserted row id) or None
+            commit: Commit after executing
+            **params: Named query parameters
+        
+        Returns:
+            Fetched row(s) as tuples, the new row id, or None
+        """
+        query = compile_query(name, self.provider)
+        args = query.bind(**params)
+        
+        if self.provider == 'sqlite':
+            cursor = self.conn.execute(query.sql, args)
+            if fetch == 'id':
+                result = cursor.lastrowid
+            elif fetch == 'one':
+                row = cursor.fetchone()
+                result = tuple(row) if row is not None else None
+            elif fetch == 'all':
+                result = [tuple(row) for row in cursor.fetchall()]
+            else:
+                result = None
+            if commit:
+                self.conn.commit()
+            return result
+        
+        result = self._execute(query.sql, args, fetch='one' if fetch == 'id' else fetch, commit=commit)
+        if fetch == 'id':
+            return result[0]
+        if fetch == 'all':
+            return [tuple(row) for row in result]
+        return result
+    
+    def _run_frame(self, name: str, **params) -> pd.DataFrame:
+        """Run a compiled SELECT and return its rows as a DataFrame"""
+        rows = self._run(name, fetch='all', **params)
+        return pd.DataFrame(rows, columns=list(compile_query(name, self.provider).columns))
+    
+    
     def submit_feedback(
         self,
         prediction_id: Optional[int],
@@ -228,63 +242,100 @@ class FeedbackDB:
             ID of inserted feedback record
         """
         try:
+            feedback_id = self._run(
+                'insert_feedback',
+                fetch='id',
+                commit=self.provider != 'sqlite',
+                prediction_id=prediction_id,
+                prediction_date=prediction_date,
+                predicted_value=predicted_value,
+                actual_value=actual_value,
+                feedback_status=feedback_status,
+                user_feedback=user_feedback
+            )
             if self.provider == 'sqlite':
-                cursor = self.conn.execute('''
-                    INSERT INTO feedback 
-                    (prediction_id, prediction_date, predicted_value, actual_value, 
-                     feedback_status, user_feedback)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    prediction_id,
-                    prediction_date,
-                    predicted_value,
-                    actual_value,
-                    feedback_status,
-                    user_feedback
-                ))
-                self.conn.commit()
-                return cursor.lastrowid
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    cursor.execute('''
-                        INSERT INTO feedback 
-                        (prediction_id, prediction_date, predicted_value, actual_value, 
-                         feedback_status, user_feedback)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        prediction_id,
-                        prediction_date,
-                        predicted_value,
-                        actual_value,
-                        feedback_status,
-                        user_feedback
-                    ))
-                else:  # PostgreSQL
-                    cursor.execute('''
-                        INSERT INTO feedback 
-                        (prediction_id, prediction_date, predicted_value, actual_value, 
-                         feedback_status, user_feedback)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        RETURNING id
-                    ''', (
-                        prediction_id,
-                        prediction_date,
-                        predicted_value,
-                        actual_value,
-                        feedback_status,
-                        user_feedback
-                    ))
-                    feedback_id = cursor.fetchone()[0]
-                
+                apply_feedback_rollup(self.conn, 'id = ?', (feedback_id,))
                 self.conn.commit()
-                cursor.close()
-                return feedback_id if self.provider == 'postgres' else 1
+            get_event_bus().publish(FEEDBACK_SUBMITTED, count=1, statuses={feedback_status: 1})
+            return feedback_id
         except Exception as e:
+            if self.provider == 'sqlite':
+                self.conn.rollback()
             print(f"Error submitting feedback: {e}")
             return -1
     
+    
+    def submit_feedback_bulk(self, records: List[Dict], page_size: int = 1000) -> int:
+        """
+        Insert many feedback records in one round trip per page
+        
+        Uses executemany (pyodbc fast_executemany on Azure SQL) and
+        psycopg2.extras.execute_values on PostgreSQL.
+        
+        Args:
+            records: Dicts with prediction_id, prediction_date, predicted_value,
+                     actual_value, feedback_status and optional user_feedback
+            page_size: Rows per statement for PostgreSQL execute_values
+        
+        Returns:
+            Number of records inserted (-1 on error)
+        """
+        if not records:
+            return 0
+        
+        query = compile_query('insert_feedback_many', self.provider)
+        rows = [
+            query.bind(**{'prediction_id': None, 'user_feedback': None, **record})
+            for record in records
+        ]
+        columns = '''(prediction_id, prediction_date, predicted_value, actual_value,
+                     feedback_status, user_feedback)'''
+        
+        try:
+            if self.provider == 'sqlite':
+                last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM feedback').fetchone()[0]
+                self.conn.executemany(query.sql, rows)
+                apply_feedback_rollup(self.conn, 'id > ?', (last_id,))
+                self.conn.commit()
+                self._publish_bulk(records)
+                return len(rows)
+            
+            def _bulk_insert(conn):
+                cursor = conn.cursor()
+                try:
+                    if self.provider == 'azure':
+                        if hasattr(cursor, 'fast_executemany'):
+                            cursor.fast_executemany = True
+                        cursor.executemany(query.sql, rows)
+                    elif _is_psycopg2_connection(conn):
+                        from psycopg2.extras import execute_values
+                        execute_values(
+                            cursor, f"INSERT INTO feedback {columns} VALUES %s", rows,
+                            page_size=page_size
+                        )
+                    else:  # DB-API stand-in for PostgreSQL
+                        cursor.executemany(query.sql, rows)
+                    conn.commit()
+                finally:
+                    cursor.close()
+            
+            # No retry: a dropped connection mid-batch may have committed
+            self.pool.run(_bulk_insert, retries=0)
+            self._publish_bulk(records)
+            return len(rows)
+        except Exception as e:
+            print(f"Error submitting feedback in bulk: {e}")
+            return -1
+    
+    @staticmethod
+    def _publish_bulk(records: List[Dict]):
+        """Announce committed bulk feedback on the event bus"""
+        get_event_bus().publish(
+            FEEDBACK_SUBMITTED,
+            count=len(records),
+            statuses=dict(Counter(r['feedback_status'] for r in records))
+        )
+    
     def get_feedback_count(self, days: int = 7) -> int:
         """
         Get count of feedback submitted in last N days
@@ -296,37 +347,8 @@ class FeedbackDB:
             Count of feedback records
         """
         try:
-            if self.provider == 'sqlite':
-                query = '''
-                    SELECT COUNT(*) as count
-                    FROM feedback
-                    WHERE DATE(created_at) >= DATE('now', '-' || ? || ' days')
-                '''
-                cursor = self.conn.execute(query, (days,))
-                result = cursor.fetchone()
-                return result['count'] if result else 0
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    query = '''
-                        SELECT COUNT(*) as count
-                        FROM feedback
-                        WHERE DATEDIFF(day, created_at, GETDATE()) <= ?
-                    '''
-                    cursor.execute(query, (days,))
-                else:  # PostgreSQL
-                    query = '''
-                        SELECT COUNT(*) as count
-                        FROM feedback
-                        WHERE created_at >= NOW() - INTERVAL '%s days'
-                    '''
-                    cursor.execute(query % days)
-                
-                result = cursor.fetchone()
-                count = result[0] if result else 0
-                cursor.close()
-                return count
+            result = self._run('feedback_count', fetch='one', since=window_start(days, self.provider))
+            return result[0] if result else 0
         except Exception as e:
             print(f"Error getting feedback count: {e}")
             return 0
@@ -343,68 +365,7 @@ class FeedbackDB:
             DataFrame with feedback records
         """
         try:
-            if self.provider == 'sqlite':
-                query = '''
-                    SELECT 
-                        id,
-                        prediction_id,
-                        prediction_date,
-                        predicted_value,
-                        actual_value,
-                        feedback_status,
-                        user_feedback,
-                        created_at
-                    FROM feedback
-                    WHERE DATE(created_at) >= DATE('now', '-' || ? || ' days')
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                '''
-                df = pd.read_sql(query, self.conn, params=(days, limit))
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    query = '''
-                        SELECT 
-                            id,
-                            prediction_id,
-                            prediction_date,
-                            predicted_value,
-                            actual_value,
-                            feedback_status,
-                            user_feedback,
-                            created_at
-                        FROM feedback
-                        WHERE DATEDIFF(day, created_at, GETDATE()) <= ?
-                        ORDER BY created_at DESC
-                        OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
-                    '''
-                    cursor.execute(query, (days, limit))
-                else:  # PostgreSQL
-                    query = '''
-                        SELECT 
-                            id,
-                            prediction_id,
-                            prediction_date,
-                            predicted_value,
-                            actual_value,
-                            feedback_status,
-                            user_feedback,
-                            created_at
-                        FROM feedback
-                        WHERE created_at >= NOW() - INTERVAL '%s days'
-                        ORDER BY created_at DESC
-                        LIMIT %s
-                    '''
-                    cursor.execute(query % (days, limit))
-                
-                rows = cursor.fetchall()
-                cursor.close()
-                
-                df = pd.DataFrame(rows, columns=[
-                    'id', 'prediction_id', 'prediction_date', 'predicted_value',
-                    'actual_value', 'feedback_status', 'user_feedback', 'created_at'
-                ])
+            df = self._run_frame('recent_feedback', since=window_start(days, self.provider), limit=limit)
             
             if not df.empty:
                 df['prediction_date'] = pd.to_datetime(df['prediction_date'])
@@ -416,6 +377,47 @@ class FeedbackDB:
             print(f"Error getting recent feedback: {e}")
             return pd.DataFrame()
     
+    def iter_feedback(
+        self,
+        days: int = 90,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        as_arrow: bool = False,
+        after_id: Optional[int] = None
+    ):
+        """
+        Stream feedback from the last N days in typed batches
+        
+        Uses a server-side named cursor on PostgreSQL and fetchmany on
+        SQLite/Azure SQL, so memory stays bounded by batch_size.
+        
+        Args:
+            days: Number of days to look back
+            batch_size: Rows per batch
+            as_arrow: Yield pyarrow.RecordBatch instead of dicts of arrays
+            after_id: Stream only rows with id > after_id (a retraining
+                watermark), in id order, instead of the days window
+        
+        Yields:
+            Dict of column name -> np.ndarray (or pyarrow.RecordBatch)
+        """
+        if after_id is not None:
+            query = compile_query('stream_feedback_after', self.provider)
+            params = query.bind(after_id=after_id)
+        else:
+            query = compile_query('stream_feedback', self.provider)
+            params = query.bind(since=window_start(days, self.provider))
+        
+        if self.provider == 'sqlite':
+            yield from iter_batches(self.conn, query.sql, params, FEEDBACK_DTYPES, batch_size,
+                                    as_arrow=as_arrow)
+            return
+        
+        # Hold one pooled connection for the whole export
+        with self.pool.connection() as conn:
+            yield from iter_batches(conn, query.sql, params, FEEDBACK_DTYPES, batch_size,
+                                    cursor_name='feedback_export', as_arrow=as_arrow)
+            conn.commit()
+    
     def get_feedback_accuracy(self, days: int = 30) -> Dict:
         """
         Calculate accuracy metrics from feedback
@@ -428,46 +430,11 @@ class FeedbackDB:
         """
         try:
             if self.provider == 'sqlite':
-                query = '''
-                    SELECT 
-                        feedback_status,
-                        COUNT(*) as count,
-                        AVG(ABS(actual_value - predicted_value)) as avg_error
-                    FROM feedback
-                    WHERE DATE(created_at) >= DATE('now', '-' || ? || ' days')
-                    GROUP BY feedback_status
-                '''
-                df = pd.read_sql(query, self.conn, params=(days,))
+                df = pd.DataFrame(read_feedback_accuracy(self.conn, days),
+                                  columns=['feedback_status', 'count', 'avg_error'])
             else:
-                cursor = self.conn.cursor()
+                df = self._run_frame('feedback_accuracy', since=window_start(days, self.provider))
                 
-                if self.provider == 'azure':
-                    query = '''
-                        SELECT 
-                            feedback_status,
-                            COUNT(*) as count,
-                            AVG(ABS(actual_value - predicted_value)) as avg_error
-                        FROM feedback
-                        WHERE DATEDIFF(day, created_at, GETDATE()) <= ?
-                        GROUP BY feedback_status
-                    '''
-                    cursor.execute(query, (days,))
-                else:  # PostgreSQL
-                    query = '''
-                        SELECT 
-                            feedback_status,
-                            COUNT(*) as count,
-                            AVG(ABS(actual_value - predicted_value)) as avg_error
-                        FROM feedback
-                        WHERE created_at >= NOW() - INTERVAL '%s days'
-                        GROUP BY feedback_status
-                    '''
-                    cursor.execute(query % days)
-                
-                rows = cursor.fetchall()
-                cursor.close()
-                
-                df = pd.DataFrame(rows, columns=['feedback_status', 'count', 'avg_error'])
             
             if df.empty:
                 return {
@@ -506,6 +473,43 @@ class FeedbackDB:
                 'avg_error': 0.0
             }
     
+    def get_trigger_snapshot(self, count_days: int = 7, accuracy_days: int = 30) -> Dict:
+        """
+        Feedback inputs of the retraining trigger in one round trip
+        
+        Replaces get_feedback_count(count_days) + get_feedback_accuracy(accuracy_days):
+        SQLite reads the daily rollup, cloud backends run one grouped query
+        with both windows as conditional aggregates.
+        
+        Args:
+            count_days: Window of the feedback count
+            accuracy_days: Window of the accuracy metrics
+        
+        Returns:
+            Dictionary with feedback_count and accuracy (get_feedback_accuracy format)
+        """
+        try:
+            if self.provider == 'sqlite':
+                rows = read_feedback_snapshot(self.conn, count_days, accuracy_days)
+            else:
+                rows = self._run(
+                    'trigger_snapshot',
+                    fetch='all',
+                    since=window_start(max(count_days, accuracy_days), self.provider),
+                    accuracy_since=window_start(accuracy_days, self.provider),
+                    count_since=window_start(count_days, self.provider)
+                )
+            return {
+                'feedback_count': int(sum(row[3] or 0 for row in rows)),
+                'accuracy': summarize_feedback_accuracy([row[:3] for row in rows])
+            }
+        except Exception as e:
+            print(f"Error reading trigger snapshot: {e}")
+            return {
+                'feedback_count': 0,
+                'accuracy': summarize_feedback_accuracy([])
+            }
+    
     def log_retraining_start(
         self,
         trigger_reason: str,
@@ -526,35 +530,15 @@ class FeedbackDB:
             ID of retraining log record
         """
         try:
-            if self.provider == 'sqlite':
-                cursor = self.conn.execute('''
-                    INSERT INTO retraining_log 
-                    (trigger_reason, feedback_count, drift_score, accuracy_drop, status)
-                    VALUES (?, ?, ?, ?, 'pending')
-                ''', (trigger_reason, feedback_count, drift_score, accuracy_drop))
-                self.conn.commit()
-                return cursor.lastrowid
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    cursor.execute('''
-                        INSERT INTO retraining_log 
-                        (trigger_reason, feedback_count, drift_score, accuracy_drop, status)
-                        VALUES (?, ?, ?, ?, 'pending')
-                    ''', (trigger_reason, feedback_count, drift_score, accuracy_drop))
-                else:  # PostgreSQL
-                    cursor.execute('''
-                        INSERT INTO retraining_log 
-                        (trigger_reason, feedback_count, drift_score, accuracy_drop, status)
-                        VALUES (%s, %s, %s, %s, 'pending')
-                        RETURNING id
-                    ''', (trigger_reason, feedback_count, drift_score, accuracy_drop))
-                    retraining_id = cursor.fetchone()[0]
-                
-                self.conn.commit()
-                cursor.close()
-                return retraining_id if self.provider == 'postgres' else 1
+            return self._run(
+                'insert_retraining',
+                fetch='id',
+                commit=True,
+                trigger_reason=trigger_reason,
+                feedback_count=feedback_count,
+                drift_score=drift_score,
+                accuracy_drop=accuracy_drop
+            )
         except Exception as e:
             print(f"Error logging retraining: {e}")
             return -1
@@ -564,7 +548,9 @@ class FeedbackDB:
         retraining_id: int,
         model_improvement: float,
         metrics_before: str,
-        metrics_after: str
+        metrics_after: str,
+        watermark: Optional[int] = None,
+        model_path: Optional[str] = None
     ) -> bool:
         """
         Log completion of retraining
@@ -574,54 +560,44 @@ class FeedbackDB:
             model_improvement: Improvement percentage
             metrics_before: JSON string of metrics before retraining
             metrics_after: JSON string of metrics after retraining
+            watermark: Highest feedback id the new model was trained on
+            model_path: Where the new model was saved
         
         Returns:
             True if successful
         """
         try:
-            if self.provider == 'sqlite':
-                self.conn.execute('''
-                    UPDATE retraining_log
-                    SET status = 'completed',
-                        completed_at = CURRENT_TIMESTAMP,
-                        model_improvement = ?,
-                        metrics_before = ?,
-                        metrics_after = ?
-                    WHERE id = ?
-                ''', (model_improvement, metrics_before, metrics_after, retraining_id))
-                self.conn.commit()
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    cursor.execute('''
-                        UPDATE retraining_log
-                        SET status = 'completed',
-                            completed_at = GETDATE(),
-                            model_improvement = ?,
-                            metrics_before = ?,
-                            metrics_after = ?
-                        WHERE id = ?
-                    ''', (model_improvement, metrics_before, metrics_after, retraining_id))
-                else:  # PostgreSQL
-                    cursor.execute('''
-                        UPDATE retraining_log
-                        SET status = 'completed',
-                            completed_at = NOW(),
-                            model_improvement = %s,
-                            metrics_before = %s,
-                            metrics_after = %s
-                        WHERE id = %s
-                    ''', (model_improvement, metrics_before, metrics_after, retraining_id))
-                
-                self.conn.commit()
-                cursor.close()
-            
+            self._run(
+                'complete_retraining',
+                commit=True,
+                model_improvement=model_improvement,
+                metrics_before=metrics_before,
+                metrics_after=metrics_after,
+                watermark=watermark,
+                model_path=model_path,
+                retraining_id=retraining_id
+            )
             return True
         except Exception as e:
             print(f"Error updating retraining log: {e}")
             return False
     
+    def get_last_retraining(self) -> Optional[Dict]:
+        """
+        Most recent completed retraining (the base of an incremental retrain)
+        
+        Returns:
+            Dict with id, completed_at, watermark and model_path, or None
+        """
+        try:
+            row = self._run('last_retraining', fetch='one', limit=1)
+            if row is None:
+                return None
+            return dict(zip(compile_query('last_retraining', self.provider).columns, row))
+        except Exception as e:
+            print(f"Error getting last retraining: {e}")
+            return None
+    
     def get_retraining_history(self, limit: int = 20) -> pd.DataFrame:
         """
         Get retraining history
@@ -633,68 +609,7 @@ class FeedbackDB:
             DataFrame with retraining history
         """
         try:
-            if self.provider == 'sqlite':
-                query = '''
-                    SELECT 
-                        id,
-                        trigger_reason,
-                        feedback_count,
-                        drift_score,
-                        accuracy_drop,
-                        model_improvement,
-                        status,
-                        started_at,
-                        completed_at
-                    FROM retraining_log
-                    ORDER BY started_at DESC
-                    LIMIT ?
-                '''
-                df = pd.read_sql(query, self.conn, params=(limit,))
-            else:
-                cursor = self.conn.cursor()
-                
-                if self.provider == 'azure':
-                    query = '''
-                        SELECT 
-                            id,
-                            trigger_reason,
-                            feedback_count,
-                            drift_score,
-                            accuracy_drop,
-                            model_improvement,
-                            status,
-                            started_at,
-                            completed_at
-                        FROM retraining_log
-                        ORDER BY started_at DESC
-                        OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
-                    '''
-                    cursor.execute(query, (limit,))
-                else:  # PostgreSQL
-                    query = '''
-                        SELECT 
-                            id,
-                            trigger_reason,
-                            feedback_count,
-                            drift_score,
-                            accuracy_drop,
-                            model_improvement,
-                            status,
-                            started_at,
-                            completed_at
-                        FROM retraining_log
-                        ORDER BY started_at DESC
-                        LIMIT %s
-                    '''
-                    cursor.execute(query % limit)
-                
-                rows = cursor.fetchall()
-                cursor.close()
-                
-                df = pd.DataFrame(rows, columns=[
-                    'id', 'trigger_reason', 'feedback_count', 'drift_score',
-                    'accuracy_drop', 'model_improvement', 'status', 'started_at', 'completed_at'
-                ])
+            df = self._run_frame('retraining_history', limit=limit)
             
             if not df.empty:
                 df['started_at'] = pd.to_datetime(df['started_at'])
@@ -705,6 +620,22 @@ class FeedbackDB:
             print(f"Error getting retraining history: {e}")
             return pd.DataFrame()
     
+    
+    def rebuild_rollups(self):
+        """Recompute the feedback rollup from the raw table (SQLite only; no-op for cloud)"""
+        if self.provider == 'sqlite':
+            rebuild_feedback_rollup(self.conn)
+            self.conn.commit()
+    
+    def get_pool_stats(self) -> Dict:
+        """
+        Get connection pool statistics (cloud providers only)
+        
+        Returns:
+            Pool counters, or empty dict for SQLite
+        """
+        return self.pool.get_stats() if self.pool else {}
+    
     def close(self):
         """Close database connection"""
         if self.conn:
@@ -712,3 +643,14 @@ class FeedbackDB:
                 self.conn.close()
             except Exception as e:
                 print(f"Error closing connection: {e}")
+        if self.pool:
+            self.pool.close()
+
+
+def _is_psycopg2_connection(conn) -> bool:
+    """True if conn is a real psycopg2 connection (execute_values available)"""
+    try:
+        import psycopg2.extensions
+    except ImportError:
+        return False
+    return isinstance(conn, psycopg2.extensions.connection)
@@ -0,0 +1,414 @@
+"""
+Alert Notification Dispatcher
+
+Delivers alerts to notification channels on background threads so slow SMTP
+servers or webhooks never block drift evaluation.
+
+- submit() only enqueues: each channel has its own bounded queue and worker
+  thread; when a queue is full the alert is dropped for that channel (and
+  counted) instead of blocking the caller
+- Workers batch queued alerts into one digest per channel (up to batch_size
+  alerts, waiting at most batch_interval seconds after the first one)
+- Failed sends are retried with exponential backoff and jitter
+- get_metrics() reports per-channel counters and dispatch latency
+  (submit -> delivered) percentiles
+
+Channels:
+    ConsoleChannel()                           print digests (default)
+    EmailChannel(host, port, sender, recipients, ...)   smtplib
+    WebhookChannel(url, headers=None)          JSON POST via requests
+
+Usage:
+    dispatcher = NotificationDispatcher([ConsoleChannel(), WebhookChannel(url)])
+    manager = AlertManager(db, dispatcher=dispatcher)
+    ...
+    dispatcher.stop()
+"""
+
+import queue
+import random
+import smtplib
+import threading
+import time
+import numpy as np
+from collections import deque
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+SEVERITY_ICONS = {
+    'critical': '🚨',
+    'warning': '⚠️',
+    'info': 'ℹ️'
+}
+
+
+def format_digest(alerts: List[Dict]) -> Tuple[str, str]:
+    """
+    Render a batch of alerts as a subject line and plain-text body
+    
+    Args:
+        alerts: Alert dictionaries
+    
+    Returns:
+        Tuple of (subject, body)
+    """
+    severities = [a.get('severity', 'warning') for a in alerts]
+    worst = 'critical' if 'critical' in severities else 'warning' if 'warning' in severities else 'info'
+    if len(alerts) == 1:
+        subject = f"[{worst.upper()}] {alerts[0].get('message', 'Alert')}"
+    else:
+        subject = f"[{worst.upper()}] {len(alerts)} monitoring alerts"
+    
+    lines = []
+    for alert in alerts:
+        severity = alert.get('severity', 'warning')
+        lines.append(f"{SEVERITY_ICONS.get(severity, '•')} [{severity.upper()}] {alert.get('message', '')}")
+        lines.append(f"   Type: {alert.get('alert_type', '')}")
+        lines.append(f"   Action: {alert.get('recommendation', '')}")
+        lines.append(f"   Time: {alert.get('created_at', 'N/A')}")
+        if alert.get('dedup_action') in ('escalated', 'renotified'):
+            lines.append(f"   Status: {alert['dedup_action']}")
+        lines.append("")
+    return subject, "\n".join(lines)
+
+
+class ConsoleChannel:
+    """Print digests to stdout"""
+    
+    name = 'console'
+    
+    def send(self, alerts: List[Dict]):
+        subject, body = format_digest(alerts)
+        print(f"\n{subject}\n{body}")
+
+
+class EmailChannel:
+    """Send digests by SMTP"""
+    
+    name = 'email'
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        recipients: List[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        timeout: float = 10.0
+    ):
+        """
+        Args:
+            host: SMTP server
+            port: SMTP port
+            sender: From address
+            recipients: To addresses
+            username: Login user (optional)
+            password: Login password (optional)
+            use_tls: Issue STARTTLS before login
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+    
+    def send(self, alerts: List[Dict]):
+        subject, body = format_digest(alerts)
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content(body)
+        
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+
+class WebhookChannel:
+    """POST digests as JSON"""
+    
+    name = 'webhook'
+    
+    def __init__(self, url: str, headers: Optional[Dict] = None, timeout: float = 10.0):
+        """
+        Args:
+            url: Webhook URL
+            headers: Extra HTTP headers
+            timeout: Request timeout in seconds
+        """
+        self.url = url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.session = requests.Session()
+    
+    def send(self, alerts: List[Dict]):
+        subject, body = format_digest(alerts)
+        payload = {
+            'subject': subject,
+            'text': body,
+            'alerts': [{
+                'id': a.get('id'),
+                'alert_type': a.get('alert_type'),
+                'severity': a.get('severity'),
+                'message': a.get('message'),
+                'recommendation': a.get('recommendation'),
+                'prediction_date': a.get('prediction_date'),
+                'created_at': str(a.get('created_at'))
+            } for a in alerts]
+        }
+        response = self.session.post(self.url, json=payload, headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class _ChannelWorker:
+    """Queue, worker thread and metrics of one channel"""
+    
+    def __init__(self, channel, dispatcher: 'NotificationDispatcher'):
+        self.channel = channel
+        self.dispatcher = dispatcher
+        self.queue = queue.Queue(maxsize=dispatcher.queue_size)
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=1000)
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0, 'batches': 0}
+        self.stopping = False
+        self.thread = threading.Thread(
+            target=self._run, name=f'notify-{channel.name}', daemon=True
+        )
+    
+    def _count(self, key: str, n: int = 1):
+        with self.lock:
+            self.stats[key] += n
+    
+    def _next_batch(self) -> Optional[List[Tuple[float, Dict]]]:
+        """Block for the first item, then collect more until the batch is full or the interval ends"""
+        if self.stopping:
+            self._drain()
+            return None
+        item = self.queue.get()
+        if item is None:
+            self.queue.task_done()
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.dispatcher.batch_interval
+        while len(batch) < self.dispatcher.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop sentinel: deliver what we have, then exit
+                self.queue.task_done()
+                self.stopping = True
+                break
+            batch.append(item)
+        return batch
+    
+    def _drain(self):
+        """Count alerts still queued when a stop cuts delivery short as dropped"""
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.queue.task_done()
+            if item is not None:
+                self._count('dropped')
+    
+    def _send_with_retry(self, alerts: List[Dict]) -> bool:
+        dispatcher = self.dispatcher
+        for attempt in range(dispatcher.max_retries + 1):
+            try:
+                self.channel.send(alerts)
+                return True
+            except Exception as e:
+                if attempt == dispatcher.max_retries:
+                    print(f"Notification via {self.channel.name} failed after {attempt + 1} attempts: {e}")
+                    return False
+                self._count('retries')
+                delay = min(dispatcher.backoff_base * (2 ** attempt), dispatcher.backoff_max)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        return False
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            alerts = [alert for _, alert in batch]
+            delivered = self._send_with_retry(alerts)
+            done = time.monotonic()
+            with self.lock:
+                self.stats['batches'] += 1
+                if delivered:
+                    self.stats['sent'] += len(batch)
+                    self.latencies.extend(done - submitted for submitted, _ in batch)
+                else:
+                    self.stats['failed'] += len(batch)
+            for _ in batch:
+                self.queue.task_done()
+    
+    def metrics(self) -> Dict:
+        with self.lock:
+            result = dict(self.stats)
+            latencies = np.array(self.latencies)
+        result['queue_depth'] = self.queue.qsize()
+        if latencies.size:
+            result['latency_p50_s'] = float(np.percentile(latencies, 50))
+            result['latency_p95_s'] = float(np.percentile(latencies, 95))
+            result['latency_max_s'] = float(latencies.max())
+        return result
+
+
+class NotificationDispatcher:
+    """Asynchronous, batched delivery of alerts to notification channels"""
+    
+    def __init__(
+        self,
+        channels: Optional[List] = None,
+        queue_size: int = 1000,
+        batch_size: int = 20,
+        batch_interval: float = 5.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        """
+        Initialize and start the channel workers
+        
+        Args:
+            channels: Channel objects with name and send(alerts) (default: console)
+            queue_size: Maximum queued alerts per channel
+            batch_size: Maximum alerts per digest
+            batch_interval: Seconds to wait for more alerts after the first
+            max_retries: Retries per digest after the first attempt
+            backoff_base: First retry delay in seconds (doubles per retry)
+            backoff_max: Upper bound of the retry delay
+        """
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._workers = [_ChannelWorker(channel, self) for channel in (channels or [ConsoleChannel()])]
+        self._stopped = False
+        for worker in self._workers:
+            worker.thread.start()
+    
+    def submit(self, alert: Dict) -> bool:
+        """
+        Queue an alert on every channel without blocking
+        
+        Args:
+            alert: Alert dictionary
+        
+        Returns:
+            True if at least one channel accepted it
+        """
+        if self._stopped:
+            return False
+        item = (time.monotonic(), dict(alert))
+        accepted = False
+        for worker in self._workers:
+            try:
+                worker.queue.put_nowait(item)
+                worker._count('queued')
+                accepted = True
+            except queue.Full:
+                worker._count('dropped')
+        return accepted
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued alert has been delivered or given up on
+        
+        Args:
+            timeout: Seconds to wait (None = no limit)
+        
+        Returns:
+            True if all queues drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            while worker.queue.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+    
+    def stop(self, timeout: float = 10.0):
+        """
+        Deliver queued alerts, then stop the workers
+        
+        Args:
+            timeout: Seconds to wait in total. A channel whose queue stays full
+                that long stops after its current digest; its remaining alerts
+                are counted as dropped
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            try:
+                worker.queue.put(None, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                worker.stopping = True
+        for worker in self._workers:
+            worker.thread.join(timeout=max(deadline - time.monotonic(), 0))
+    
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Per-channel counters, queue depth and dispatch latency percentiles"""
+        return {worker.channel.name: worker.metrics() for worker in self._workers}
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.stop()
+
+
+if __name__ == "__main__":
+    """
+    Dispatch a burst of alerts to the console channel
+    
+    Run: python src/monitoring/notifications.py
+    """
+    print("Testing notification dispatcher...")
+    print("=" * 60)
+    
+    with NotificationDispatcher(batch_size=5, batch_interval=0.2) as dispatcher:
+        for i in range(12):
+            dispatcher.submit({
+                'alert_type': 'anomaly',
+                'severity': 'critical' if i % 4 == 0 else 'warning',
+                'message': f'Anomaly detected ({i})',
+                'recommendation': 'Check data quality'
+            })
+        dispatcher.flush(timeout=5)
+        metrics = dispatcher.get_metrics()['console']
+    
+    print(f"Sent {metrics['sent']} alerts in {metrics['batches']} digests, "
+          f"p95 latency {metrics['latency_p95_s'] * 1000:.0f} ms")
+    assert metrics['sent'] == 12
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
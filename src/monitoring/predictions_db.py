@@ -11,6 +11,47 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 
+try:
+    from .events import PREDICTION_SAVED, get_event_bus
+    from .query_builder import window_start
+    from .streaming import DEFAULT_BATCH_SIZE, PREDICTION_DTYPES, iter_batches
+    from .rollups import (
+        apply_prediction_rollup, ensure_prediction_rollup, mean_and_std,
+        read_prediction_summary, rebuild_prediction_rollup, refresh_prediction_bounds
+    )
+except ImportError:
+    from events import PREDICTION_SAVED, get_event_bus
+    from query_builder import window_start
+    from streaming import DEFAULT_BATCH_SIZE, PREDICTION_DTYPES, iter_batches
+    from rollups import (
+        apply_prediction_rollup, ensure_prediction_rollup, mean_and_std,
+        read_prediction_summary, rebuild_prediction_rollup, refresh_prediction_bounds
+    )
+
+
+# Alert fields stored as columns of monitoring_events (NULL for other events);
+# added to existing databases by _migrate_alert_columns()
+ALERT_COLUMNS = [
+    ('alert_type', 'TEXT'),
+    ('prediction_date', 'DATE'),
+    ('recommendation', 'TEXT'),
+    ('acknowledged', 'INTEGER NOT NULL DEFAULT 0'),
+    ('acknowledged_at', 'TIMESTAMP'),
+    ('series', 'TEXT'),
+    ('fingerprint', 'TEXT'),
+    ('occurrence_count', 'INTEGER NOT NULL DEFAULT 1'),
+    ('last_seen_at', 'TIMESTAMP'),
+    ('last_notified_at', 'TIMESTAMP'),
+    ('status', "TEXT NOT NULL DEFAULT 'open'"),
+    ('resolved_at', 'TIMESTAMP')
+]
+
+# Alert lifecycle: open -> acknowledged -> resolved (open -> resolved also allowed)
+ALERT_STATUSES = ('open', 'acknowledged', 'resolved')
+
+# Alerts that repeats are folded into (predicate of the unique fingerprint index)
+UNRESOLVED_ALERT = "event_type = 'alert' AND status IN ('open', 'acknowledged')"
+
 
 class PredictionsDB:
     """SQLite database for storing and retrieving predictions"""
@@ -30,6 +71,8 @@ class PredictionsDB:
         """Create database and tables if they don't exist"""
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row  # Access columns by name
+        # Only takes effect on a new file; lets retention release pages incrementally
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
         
         # Create predictions table
         self.conn.execute('''
@@ -54,9 +97,11 @@ class PredictionsDB:
                 event_severity TEXT NOT NULL,
                 message TEXT NOT NULL,
                 metadata TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                {alert_columns}
             )
-        ''')
+        '''.format(alert_columns=',\n                '.join(f'{name} {ddl}' for name, ddl in ALERT_COLUMNS)))
+        self._migrate_alert_columns()
         
         # Create model metrics table
         self.conn.execute('''
@@ -73,8 +118,96 @@ class PredictionsDB:
             )
         ''')
         
+        # Paired primary/candidate predictions from shadow scoring (shadow_scoring.py)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS shadow_predictions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                prediction_date DATE,
+                primary_version TEXT NOT NULL,
+                candidate_version TEXT NOT NULL,
+                primary_archived_gb REAL NOT NULL,
+                primary_savings_gb REAL NOT NULL,
+                candidate_archived_gb REAL NOT NULL,
+                candidate_savings_gb REAL NOT NULL,
+                primary_latency_ms REAL,
+                candidate_latency_ms REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_shadow_predictions_candidate_created '
+            'ON shadow_predictions(candidate_version, created_at)'
+        )
+        
+        # Daily rollup behind get_summary_statistics (backfilled on first run)
+        ensure_prediction_rollup(self.conn)
+        
         self.conn.commit()
     
+    def _migrate_alert_columns(self):
+        """
+        Add the alert columns to an older monitoring_events table
+        
+        Existing alerts are backfilled from their JSON metadata once, in SQL
+        (json_extract), so readers never parse metadata again.
+        """
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(monitoring_events)')}
+        missing = [(name, ddl) for name, ddl in ALERT_COLUMNS if name not in existing]
+        
+        for name, ddl in missing:
+            self.conn.execute(f'ALTER TABLE monitoring_events ADD COLUMN {name} {ddl}')
+        
+        if 'alert_type' in dict(missing):
+            self.conn.execute('''
+                UPDATE monitoring_events
+                SET alert_type = json_extract(metadata, '$.alert_type'),
+                    prediction_date = json_extract(metadata, '$.prediction_date'),
+                    recommendation = json_extract(metadata, '$.recommendation')
+                WHERE event_type = 'alert' AND json_valid(metadata)
+            ''')
+        
+        if 'status' in dict(missing):
+            self.conn.execute("UPDATE monitoring_events SET status = 'acknowledged' WHERE acknowledged = 1")
+        
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_monitoring_events_type_created '
+            'ON monitoring_events(event_type, created_at)'
+        )
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_monitoring_events_alert_type '
+            'ON monitoring_events(alert_type, prediction_date)'
+        )
+        self.conn.execute('DROP INDEX IF EXISTS idx_monitoring_events_fingerprint')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_monitoring_events_fingerprint_status '
+            'ON monitoring_events(fingerprint, status)'
+        )
+        # At most one unresolved alert per fingerprint, whichever manager saves it.
+        # Older databases may hold duplicates: keep the newest, resolve the rest.
+        has_unique = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_monitoring_events_open_fingerprint'"
+        ).fetchone()
+        if not has_unique:
+            self.conn.execute(f'''
+                UPDATE monitoring_events
+                SET status = 'resolved', resolved_at = CURRENT_TIMESTAMP
+                WHERE {UNRESOLVED_ALERT} AND fingerprint IS NOT NULL
+                  AND id NOT IN (
+                      SELECT MAX(id) FROM monitoring_events
+                      WHERE {UNRESOLVED_ALERT} AND fingerprint IS NOT NULL
+                      GROUP BY fingerprint
+                  )
+            ''')
+            self.conn.execute(
+                'CREATE UNIQUE INDEX idx_monitoring_events_open_fingerprint '
+                f'ON monitoring_events(fingerprint) WHERE {UNRESOLVED_ALERT}'
+            )
+        # Partial index: open-alert lookups and counts never touch other events
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_monitoring_events_alert_status '
+            "ON monitoring_events(status, created_at) WHERE event_type = 'alert'"
+        )
+    
     def save_prediction(
         self,
         prediction_date: str,
@@ -97,6 +230,11 @@ class PredictionsDB:
             ID of inserted prediction
         """
         try:
+            # REPLACE drops any existing row for the date: take it out of the rollup first
+            replaced_days = apply_prediction_rollup(
+                self.conn, 'prediction_date = ?', (prediction_date,), sign=-1
+            )
+            
             cursor = self.conn.execute('''
                 INSERT OR REPLACE INTO predictions 
                 (prediction_date, archived_gb_predicted, savings_gb_predicted, 
@@ -109,9 +247,15 @@ class PredictionsDB:
                 archived_gb_actual,
                 savings_gb_actual
             ))
+            prediction_id = cursor.lastrowid
+            
+            refresh_prediction_bounds(self.conn, replaced_days)
+            apply_prediction_rollup(self.conn, 'id = ?', (prediction_id,))
             self.conn.commit()
-            return cursor.lastrowid
+            get_event_bus().publish(PREDICTION_SAVED, count=1, prediction_date=prediction_date)
+            return prediction_id
         except Exception as e:
+            self.conn.rollback()
             print(f"Error saving prediction: {e}")
             return -1
     
@@ -133,6 +277,7 @@ class PredictionsDB:
             True if update successful, False otherwise
         """
         try:
+            apply_prediction_rollup(self.conn, 'prediction_date = ?', (prediction_date,), sign=-1)
             self.conn.execute('''
                 UPDATE predictions
                 SET archived_gb_actual = COALESCE(?, archived_gb_actual),
@@ -140,9 +285,11 @@ class PredictionsDB:
                     updated_at = CURRENT_TIMESTAMP
                 WHERE prediction_date = ?
             ''', (archived_gb_actual, savings_gb_actual, prediction_date))
+            apply_prediction_rollup(self.conn, 'prediction_date = ?', (prediction_date,))
             self.conn.commit()
             return True
         except Exception as e:
+            self.conn.rollback()
             print(f"Error updating actual value: {e}")
             return False
     
@@ -186,6 +333,48 @@ class PredictionsDB:
             df['created_at'] = pd.to_datetime(df['created_at'])
         return df
     
+    def iter_predictions(
+        self,
+        days: int = 30,
+        include_actuals_only: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        as_arrow: bool = False
+    ):
+        """
+        Stream predictions from the last N days in typed batches
+        
+        Args:
+            days: Number of days to retrieve
+            include_actuals_only: If True, only return predictions with actual values
+            batch_size: Rows per batch
+            as_arrow: Yield pyarrow.RecordBatch instead of dicts of arrays
+        
+        Yields:
+            Dict of column name -> np.ndarray (or pyarrow.RecordBatch)
+        """
+        where_clause = ""
+        if include_actuals_only:
+            where_clause = "AND archived_gb_actual IS NOT NULL"
+        
+        query = f'''
+            SELECT
+                id,
+                prediction_date,
+                archived_gb_predicted,
+                savings_gb_predicted,
+                archived_gb_actual,
+                savings_gb_actual,
+                created_at
+            FROM predictions
+            WHERE created_at >= ?
+            {where_clause}
+            ORDER BY +prediction_date DESC
+        '''
+        # Unary + keeps the planner on the created_at range (then sorts the
+        # window) instead of walking the whole prediction_date index in order
+        params = (window_start(days, 'sqlite'),)
+        yield from iter_batches(self.conn, query, params, PREDICTION_DTYPES, batch_size, as_arrow=as_arrow)
+    
     def get_recent_predictions_for_drift(self, window_size: int = 30) -> Tuple[List[float], List[float]]:
         """
         Get recent predictions for drift detection
@@ -203,12 +392,13 @@ class PredictionsDB:
             LIMIT ?
         '''
         
-        df = pd.read_sql(query, self.conn, params=(window_size,))
+        # Plain cursor: called on every trigger check, a DataFrame is not needed
+        rows = self.conn.execute(query, (window_size,)).fetchall()
         
-        if df.empty:
+        if not rows:
             return [], []
         
-        return df['archived_gb_predicted'].tolist(), df['savings_gb_predicted'].tolist()
+        return [row[0] for row in rows], [row[1] for row in rows]
     
     def get_latest_prediction(self) -> Optional[Dict]:
         """
@@ -242,7 +432,12 @@ class PredictionsDB:
         event_type: str,
         event_severity: str,
         message: str,
-        metadata: Optional[str] = None
+        metadata: Optional[str] = None,
+        alert_type: Optional[str] = None,
+        prediction_date: Optional[str] = None,
+        recommendation: Optional[str] = None,
+        series: Optional[str] = None,
+        fingerprint: Optional[str] = None
     ) -> int:
         """
         Log a monitoring event (drift detection, alerts, etc.)
@@ -252,22 +447,149 @@ class PredictionsDB:
             event_severity: Severity level ('info', 'warning', 'error', 'critical')
             message: Event message
             metadata: Optional JSON metadata
+            alert_type: Alert type (alerts only)
+            prediction_date: Prediction the alert refers to (alerts only)
+            recommendation: Suggested action (alerts only)
+            series: Monitored series the alert belongs to (alerts only)
+            fingerprint: Deduplication key (alerts only)
         
         Returns:
-            ID of inserted event
+            ID of inserted event (0 if an unresolved alert with the same
+            fingerprint already exists, -1 on error)
         """
         try:
             cursor = self.conn.execute('''
                 INSERT INTO monitoring_events
-                (event_type, event_severity, message, metadata)
-                VALUES (?, ?, ?, ?)
-            ''', (event_type, event_severity, message, metadata))
+                (event_type, event_severity, message, metadata,
+                 alert_type, prediction_date, recommendation, series, fingerprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+            ''', (event_type, event_severity, message, metadata,
+                  alert_type, prediction_date, recommendation, series, fingerprint))
             self.conn.commit()
-            return cursor.lastrowid
+            return cursor.lastrowid if cursor.rowcount == 1 else 0
         except Exception as e:
             print(f"Error saving monitoring event: {e}")
             return -1
     
+    def get_open_alerts_by_fingerprint(self) -> List[Dict]:
+        """
+        Unresolved (open or acknowledged) alerts that carry a deduplication fingerprint
+        
+        Returns:
+            List of dicts with id, fingerprint, event_severity, status and last_notified_at
+        """
+        cursor = self.conn.execute(f'''
+            SELECT id, fingerprint, event_severity, status,
+                   COALESCE(last_notified_at, created_at) as last_notified_at
+            FROM monitoring_events
+            WHERE {UNRESOLVED_ALERT} AND fingerprint IS NOT NULL
+            ORDER BY id
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def get_open_alert(self, fingerprint: str) -> Optional[Dict]:
+        """
+        The unresolved alert with a fingerprint (unique index lookup)
+        
+        Args:
+            fingerprint: Deduplication key
+        
+        Returns:
+            Dict as in get_open_alerts_by_fingerprint(), or None
+        """
+        row = self.conn.execute(f'''
+            SELECT id, fingerprint, event_severity, status,
+                   COALESCE(last_notified_at, created_at) as last_notified_at
+            FROM monitoring_events
+            WHERE {UNRESOLVED_ALERT} AND fingerprint = ?
+        ''', (fingerprint,)).fetchone()
+        return dict(row) if row else None
+    
+    def record_alert_occurrence(
+        self,
+        event_id: int,
+        event_severity: str,
+        message: Optional[str] = None,
+        notified: bool = False,
+        status: Optional[str] = None
+    ) -> bool:
+        """
+        Fold a repeated alert into its existing open event
+        
+        Only open or acknowledged alerts are updated, so a repeat of an alert
+        resolved elsewhere is not folded into the resolved event.
+        
+        Args:
+            event_id: ID of the open alert
+            event_severity: Severity after escalation (unchanged if not escalated)
+            message: New message (None keeps the current one)
+            notified: Whether this occurrence was notified
+            status: New lifecycle status (None keeps the current one)
+        
+        Returns:
+            True if the event was updated (False if resolved or missing)
+        """
+        try:
+            cursor = self.conn.execute('''
+                UPDATE monitoring_events
+                SET occurrence_count = occurrence_count + 1,
+                    last_seen_at = CURRENT_TIMESTAMP,
+                    event_severity = ?,
+                    message = COALESCE(?, message),
+                    last_notified_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE last_notified_at END,
+                    status = COALESCE(?, status)
+                WHERE id = ? AND status IN ('open', 'acknowledged')
+            ''', (event_severity, message, int(notified), status, event_id))
+            self.conn.commit()
+            return cursor.rowcount == 1
+        except Exception as e:
+            print(f"Error updating alert occurrence: {e}")
+            return False
+    
+    def set_alert_status(self, event_id: int, status: str) -> bool:
+        """
+        Move an alert along its lifecycle
+        
+        Only forward transitions are applied: open -> acknowledged,
+        open/acknowledged -> resolved.
+        
+        Args:
+            event_id: ID of the alert
+            status: 'acknowledged' or 'resolved'
+        
+        Returns:
+            True if the alert changed state
+        """
+        if status == 'acknowledged':
+            query = '''
+                UPDATE monitoring_events
+                SET status = 'acknowledged', acknowledged = 1, acknowledged_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND event_type = 'alert' AND status = 'open'
+            '''
+        elif status == 'resolved':
+            query = '''
+                UPDATE monitoring_events
+                SET status = 'resolved', resolved_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND event_type = 'alert' AND status IN ('open', 'acknowledged')
+            '''
+        else:
+            raise ValueError(f"Invalid alert status transition: {status}")
+        
+        try:
+            cursor = self.conn.execute(query, (event_id,))
+            self.conn.commit()
+            return cursor.rowcount == 1
+        except Exception as e:
+            print(f"Error updating alert status: {e}")
+            return False
+    
+    def count_open_alerts(self) -> int:
+        """Number of open alerts (covered by the partial status index)"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM monitoring_events WHERE event_type = 'alert' AND status = 'open'"
+        ).fetchone()[0]
+    
     def get_monitoring_events(
         self,
         days: int = 7,
@@ -314,6 +636,78 @@ class PredictionsDB:
             df['created_at'] = pd.to_datetime(df['created_at'])
         return df
     
+    def get_alerts(
+        self,
+        days: Optional[int] = 7,
+        severity: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Get alert events using the structured alert columns
+        
+        Args:
+            days: Number of days to retrieve (None = no time limit)
+            severity: Filter by severity level (optional)
+            status: Filter by lifecycle status (optional)
+        
+        Returns:
+            DataFrame with one row per alert, newest first
+        """
+        where_clause = "WHERE event_type = 'alert'"
+        params = []
+        
+        if status:
+            where_clause += " AND status = ?"
+            params.append(status)
+        
+        if days is not None:
+            where_clause += " AND created_at >= ?"
+            params.append(window_start(days, 'sqlite'))
+        
+        if severity:
+            where_clause += " AND event_severity = ?"
+            params.append(severity)
+        
+        query = f'''
+            SELECT
+                id,
+                event_severity,
+                message,
+                alert_type,
+                recommendation,
+                prediction_date,
+                series,
+                occurrence_count,
+                status,
+                acknowledged,
+                created_at
+            FROM monitoring_events
+            {where_clause}
+            ORDER BY created_at DESC
+        '''
+        
+        df = pd.read_sql(query, self.conn, params=params)
+        if not df.empty:
+            df['created_at'] = pd.to_datetime(df['created_at'])
+        return df
+    
+    def get_alert_counts(self, days: int = 7) -> pd.DataFrame:
+        """
+        Count alerts of the last N days by severity and type
+        
+        Args:
+            days: Number of days to analyze
+        
+        Returns:
+            DataFrame with event_severity, alert_type and count columns
+        """
+        return pd.read_sql('''
+            SELECT event_severity, alert_type, COUNT(*) as count
+            FROM monitoring_events
+            WHERE event_type = 'alert' AND created_at >= ?
+            GROUP BY event_severity, alert_type
+        ''', self.conn, params=[window_start(days, 'sqlite')])
+    
     def save_model_metrics(
         self,
         metric_date: str,
@@ -384,15 +778,18 @@ class PredictionsDB:
         """
         Get summary statistics about predictions
         
+        Reads the daily rollup table, so the cost depends on `days` only,
+        not on the number of stored predictions.
+        
         Args:
             days: Number of days to analyze
         
         Returns:
             Dictionary with summary statistics
         """
-        df = self.get_predictions(days=days)
+        totals = read_prediction_summary(self.conn, days)
         
-        if df.empty:
+        if totals is None:
             return {
                 'total_predictions': 0,
                 'predictions_with_actuals': 0,
@@ -400,16 +797,117 @@ class PredictionsDB:
                 'avg_predicted_savings_gb': 0
             }
         
+        stats = {}
+        for suffix in ('archived_predicted', 'savings_predicted', 'archived_actual', 'savings_actual'):
+            stats[suffix] = mean_and_std(
+                totals[f'n_{suffix}'], totals[f'sum_{suffix}'], totals[f'sumsq_{suffix}']
+            )
+        
+        min_date = pd.to_datetime(totals['min_prediction_date']).date()
+        max_date = pd.to_datetime(totals['max_prediction_date']).date()
+        
         return {
-            'total_predictions': len(df),
-            'predictions_with_actuals': df['archived_gb_actual'].notna().sum(),
-            'avg_predicted_archived_gb': df['archived_gb_predicted'].mean(),
-            'avg_predicted_savings_gb': df['savings_gb_predicted'].mean(),
-            'avg_actual_archived_gb': df['archived_gb_actual'].mean() if df['archived_gb_actual'].notna().any() else None,
-            'avg_actual_savings_gb': df['savings_gb_actual'].mean() if df['savings_gb_actual'].notna().any() else None,
-            'date_range': f"{df['prediction_date'].min().date()} to {df['prediction_date'].max().date()}"
+            'total_predictions': int(totals['n']),
+            'predictions_with_actuals': int(totals['n_archived_actual']),
+            'avg_predicted_archived_gb': stats['archived_predicted'][0],
+            'avg_predicted_savings_gb': stats['savings_predicted'][0],
+            'avg_actual_archived_gb': stats['archived_actual'][0],
+            'avg_actual_savings_gb': stats['savings_actual'][0],
+            'std_predicted_archived_gb': stats['archived_predicted'][1],
+            'std_predicted_savings_gb': stats['savings_predicted'][1],
+            'date_range': f"{min_date} to {max_date}"
         }
     
+    def save_shadow_predictions_bulk(self, records: List[Dict]) -> int:
+        """
+        Insert paired shadow predictions in a single transaction
+        
+        Args:
+            records: Dicts with prediction_date, primary_version, candidate_version,
+                     primary_archived_gb, primary_savings_gb, candidate_archived_gb,
+                     candidate_savings_gb, primary_latency_ms, candidate_latency_ms
+        
+        Returns:
+            Number of records inserted (-1 on error)
+        """
+        try:
+            self.conn.executemany('''
+                INSERT INTO shadow_predictions
+                (prediction_date, primary_version, candidate_version,
+                 primary_archived_gb, primary_savings_gb,
+                 candidate_archived_gb, candidate_savings_gb,
+                 primary_latency_ms, candidate_latency_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    r.get('prediction_date'),
+                    r['primary_version'],
+                    r['candidate_version'],
+                    r['primary_archived_gb'],
+                    r['primary_savings_gb'],
+                    r['candidate_archived_gb'],
+                    r['candidate_savings_gb'],
+                    r.get('primary_latency_ms'),
+                    r.get('candidate_latency_ms')
+                )
+                for r in records
+            ])
+            self.conn.commit()
+            return len(records)
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Error saving shadow predictions: {e}")
+            return -1
+    
+    def get_shadow_comparison(self, days: int = 7, candidate_version: Optional[str] = None) -> pd.DataFrame:
+        """
+        Compare primary and candidate versions on the shadow-scored traffic
+        
+        Errors use the actual values recorded for the same prediction_date
+        (rows without actuals only count towards divergence and latency).
+        
+        Args:
+            days: Number of days to look back
+            candidate_version: Only this candidate (default: all)
+        
+        Returns:
+            DataFrame per (primary_version, candidate_version) with n,
+            n_with_actuals, primary_mae, candidate_mae, mae_delta,
+            mean_divergence_gb, primary_latency_ms, candidate_latency_ms,
+            latency_delta_ms (deltas are candidate - primary)
+        """
+        query = '''
+            SELECT
+                s.primary_version,
+                s.candidate_version,
+                COUNT(*) AS n,
+                COUNT(p.archived_gb_actual) AS n_with_actuals,
+                AVG(ABS(s.primary_archived_gb - p.archived_gb_actual)) AS primary_mae,
+                AVG(ABS(s.candidate_archived_gb - p.archived_gb_actual)) AS candidate_mae,
+                AVG(ABS(s.candidate_archived_gb - s.primary_archived_gb)) AS mean_divergence_gb,
+                AVG(s.primary_latency_ms) AS primary_latency_ms,
+                AVG(s.candidate_latency_ms) AS candidate_latency_ms,
+                MAX(s.created_at) AS last_seen
+            FROM shadow_predictions s
+            LEFT JOIN predictions p ON p.prediction_date = s.prediction_date
+            WHERE s.created_at >= ?
+        '''
+        params = [window_start(days, 'sqlite')]
+        if candidate_version is not None:
+            query += ' AND s.candidate_version = ?'
+            params.append(candidate_version)
+        query += ' GROUP BY s.primary_version, s.candidate_version ORDER BY last_seen DESC'
+        
+        df = pd.read_sql_query(query, self.conn, params=params)
+        df['mae_delta'] = df['candidate_mae'] - df['primary_mae']
+        df['latency_delta_ms'] = df['candidate_latency_ms'] - df['primary_latency_ms']
+        return df
+    
+    def rebuild_rollups(self):
+        """Recompute the summary rollup from the predictions table (compaction/repair)"""
+        rebuild_prediction_rollup(self.conn)
+        self.conn.commit()
+    
     def close(self):
         """Close database connection"""
         if self.conn:
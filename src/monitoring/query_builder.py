@@ -0,0 +1,498 @@
+"""
+Feedback Query Builder
+
+Each FeedbackDB query is written once as a dialect-neutral template and
+compiled per backend (sqlite, azure, postgres). Compiled statements are
+cached, so every call after the first only binds parameters.
+
+Template syntax:
+    :name           bound parameter (? for sqlite/azure, %s for postgres)
+    {LIMIT :name}   LIMIT ? / OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
+    {RETURNING id}  RETURNING id / OUTPUT INSERTED.id (sqlite uses lastrowid)
+
+Time windows are range predicates on the indexed created_at column
+(created_at >= :since) with the cutoff computed in Python by window_start(),
+instead of DATE(created_at) / DATEDIFF(day, created_at, ...) which wrap the
+column in a function and force a full scan.
+
+Usage:
+    query = compile_query('feedback_count', 'postgres')
+    cursor.execute(query.sql, query.bind(since=window_start(7, 'postgres')))
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+DIALECTS = ('sqlite', 'azure', 'postgres')
+
+PLACEHOLDERS = {
+    'sqlite': '?',
+    'azure': '?',
+    'postgres': '%s'
+}
+
+QUERIES = {
+    'insert_feedback': {
+        'sql': '''
+            INSERT INTO feedback
+            (prediction_id, prediction_date, predicted_value, actual_value,
+             feedback_status, user_feedback)
+            {RETURNING id}
+            VALUES (:prediction_id, :prediction_date, :predicted_value, :actual_value,
+                    :feedback_status, :user_feedback)
+        ''',
+        'columns': None
+    },
+    'insert_feedback_many': {
+        'sql': '''
+            INSERT INTO feedback
+            (prediction_id, prediction_date, predicted_value, actual_value,
+             feedback_status, user_feedback)
+            VALUES (:prediction_id, :prediction_date, :predicted_value, :actual_value,
+                    :feedback_status, :user_feedback)
+        ''',
+        'columns': None
+    },
+    'feedback_count': {
+        'sql': '''
+            SELECT COUNT(*) as count
+            FROM feedback
+            WHERE created_at >= :since
+        ''',
+        'columns': ('count',)
+    },
+    'recent_feedback': {
+        'sql': '''
+            SELECT
+                id,
+                prediction_id,
+                prediction_date,
+                predicted_value,
+                actual_value,
+                feedback_status,
+                user_feedback,
+                created_at
+            FROM feedback
+            WHERE created_at >= :since
+            ORDER BY created_at DESC
+            {LIMIT :limit}
+        ''',
+        'columns': ('id', 'prediction_id', 'prediction_date', 'predicted_value',
+                    'actual_value', 'feedback_status', 'user_feedback', 'created_at')
+    },
+    'stream_feedback': {
+        'sql': '''
+            SELECT
+                id,
+                prediction_id,
+                prediction_date,
+                predicted_value,
+                actual_value,
+                feedback_status,
+                user_feedback,
+                created_at
+            FROM feedback
+            WHERE created_at >= :since
+            ORDER BY created_at
+        ''',
+        'columns': ('id', 'prediction_id', 'prediction_date', 'predicted_value',
+                    'actual_value', 'feedback_status', 'user_feedback', 'created_at')
+    },
+    # Feedback newer than a retraining watermark (incremental retraining)
+    'stream_feedback_after': {
+        'sql': '''
+            SELECT
+                id,
+                prediction_id,
+                prediction_date,
+                predicted_value,
+                actual_value,
+                feedback_status,
+                user_feedback,
+                created_at
+            FROM feedback
+            WHERE id > :after_id
+            ORDER BY id
+        ''',
+        'columns': ('id', 'prediction_id', 'prediction_date', 'predicted_value',
+                    'actual_value', 'feedback_status', 'user_feedback', 'created_at')
+    },
+    'feedback_accuracy': {
+        'sql': '''
+            SELECT
+                feedback_status,
+                COUNT(*) as count,
+                AVG(ABS(actual_value - predicted_value)) as avg_error
+            FROM feedback
+            WHERE created_at >= :since
+            GROUP BY feedback_status
+        ''',
+        'columns': ('feedback_status', 'count', 'avg_error')
+    },
+    # Count and accuracy windows of the retraining trigger in one round trip
+    'trigger_snapshot': {
+        'sql': '''
+            SELECT
+                feedback_status,
+                SUM(CASE WHEN created_at >= :accuracy_since THEN 1 ELSE 0 END) as count,
+                AVG(CASE WHEN created_at >= :accuracy_since
+                         THEN ABS(actual_value - predicted_value) END) as avg_error,
+                SUM(CASE WHEN created_at >= :count_since THEN 1 ELSE 0 END) as recent_count
+            FROM feedback
+            WHERE created_at >= :since
+            GROUP BY feedback_status
+        ''',
+        'columns': ('feedback_status', 'count', 'avg_error', 'recent_count')
+    },
+    'insert_retraining': {
+        'sql': '''
+            INSERT INTO retraining_log
+            (trigger_reason, feedback_count, drift_score, accuracy_drop, status)
+            {RETURNING id}
+            VALUES (:trigger_reason, :feedback_count, :drift_score, :accuracy_drop, 'pending')
+        ''',
+        'columns': None
+    },
+    'complete_retraining': {
+        'sql': '''
+            UPDATE retraining_log
+            SET status = 'completed',
+                completed_at = CURRENT_TIMESTAMP,
+                model_improvement = :model_improvement,
+                metrics_before = :metrics_before,
+                metrics_after = :metrics_after,
+                watermark = :watermark,
+                model_path = :model_path
+            WHERE id = :retraining_id
+        ''',
+        'columns': None
+    },
+    'last_retraining': {
+        'sql': '''
+            SELECT
+                id,
+                completed_at,
+                watermark,
+                model_path
+            FROM retraining_log
+            WHERE status = 'completed'
+            ORDER BY started_at DESC
+            {LIMIT :limit}
+        ''',
+        'columns': ('id', 'completed_at', 'watermark', 'model_path')
+    },
+    'retraining_history': {
+        'sql': '''
+            SELECT
+                id,
+                trigger_reason,
+                feedback_count,
+                drift_score,
+                accuracy_drop,
+                model_improvement,
+                status,
+                started_at,
+                completed_at
+            FROM retraining_log
+            ORDER BY started_at DESC
+            {LIMIT :limit}
+        ''',
+        'columns': ('id', 'trigger_reason', 'feedback_count', 'drift_score',
+                    'accuracy_drop', 'model_improvement', 'status', 'started_at', 'completed_at')
+    }
+}
+
+# Indexes backing the range/ORDER BY predicates above: (name, table, column)
+INDEXES = [
+    ('idx_feedback_created_at', 'feedback', 'created_at'),
+    ('idx_retraining_log_started_at', 'retraining_log', 'started_at')
+]
+
+# Columns added after the first release (table, column, type per dialect);
+# they are part of the CREATE TABLEs below, column_migrations() adds them to
+# existing tables
+ADDED_COLUMNS = [
+    ('retraining_log', 'watermark', {'sqlite': 'INTEGER', 'azure': 'INT', 'postgres': 'INTEGER'}),
+    ('retraining_log', 'model_path', {'sqlite': 'TEXT', 'azure': 'VARCHAR(500)', 'postgres': 'TEXT'})
+]
+
+TABLES = {
+    'sqlite': [
+        '''
+            CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                prediction_id INTEGER,
+                prediction_date DATE,
+                predicted_value REAL,
+                actual_value REAL,
+                feedback_status TEXT NOT NULL,
+                user_feedback TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (prediction_id) REFERENCES predictions(id)
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS retraining_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                trigger_reason TEXT NOT NULL,
+                feedback_count INTEGER,
+                drift_score REAL,
+                accuracy_drop REAL,
+                model_improvement REAL,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                status TEXT DEFAULT 'pending',
+                metrics_before TEXT,
+                metrics_after TEXT,
+                watermark INTEGER,
+                model_path TEXT
+            )
+        '''
+    ],
+    'azure': [
+        '''
+            IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='feedback')
+            CREATE TABLE feedback (
+                id INT PRIMARY KEY IDENTITY(1,1),
+                prediction_id INT,
+                prediction_date DATE,
+                predicted_value FLOAT,
+                actual_value FLOAT,
+                feedback_status VARCHAR(50) NOT NULL,
+                user_feedback TEXT,
+                created_at DATETIME DEFAULT GETDATE()
+            )
+        ''',
+        '''
+            IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='retraining_log')
+            CREATE TABLE retraining_log (
+                id INT PRIMARY KEY IDENTITY(1,1),
+                trigger_reason VARCHAR(255) NOT NULL,
+                feedback_count INT,
+                drift_score FLOAT,
+                accuracy_drop FLOAT,
+                model_improvement FLOAT,
+                started_at DATETIME DEFAULT GETDATE(),
+                completed_at DATETIME,
+                status VARCHAR(50) DEFAULT 'pending',
+                metrics_before TEXT,
+                metrics_after TEXT,
+                watermark INT,
+                model_path VARCHAR(500)
+            )
+        '''
+    ],
+    'postgres': [
+        '''
+            CREATE TABLE IF NOT EXISTS feedback (
+                id SERIAL PRIMARY KEY,
+                prediction_id INTEGER,
+                prediction_date DATE,
+                predicted_value FLOAT,
+                actual_value FLOAT,
+                feedback_status VARCHAR(50) NOT NULL,
+                user_feedback TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS retraining_log (
+                id SERIAL PRIMARY KEY,
+                trigger_reason VARCHAR(255) NOT NULL,
+                feedback_count INTEGER,
+                drift_score FLOAT,
+                accuracy_drop FLOAT,
+                model_improvement FLOAT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                status VARCHAR(50) DEFAULT 'pending',
+                metrics_before TEXT,
+                metrics_after TEXT,
+                watermark INTEGER,
+                model_path TEXT
+            )
+        '''
+    ]
+}
+
+_PARAM_PATTERN = re.compile(r':([A-Za-z_]\w*)')
+_LIMIT_PATTERN = re.compile(r'\{LIMIT :([A-Za-z_]\w*)\}')
+
+_compiled_cache: Dict[Tuple[str, str], 'CompiledQuery'] = {}
+
+
+class CompiledQuery:
+    """A logical query rendered for one SQL dialect"""
+    
+    def __init__(self, name: str, dialect: str, sql: str, param_names: Tuple[str, ...],
+                 columns: Optional[Tuple[str, ...]], returns_id: bool):
+        self.name = name
+        self.dialect = dialect
+        self.sql = sql
+        self.param_names = param_names
+        self.columns = columns
+        self.returns_id = returns_id
+    
+    def bind(self, **values) -> tuple:
+        """
+        Order named values into the driver's positional parameter tuple
+        
+        Raises:
+            KeyError: If a parameter of the query is missing
+        """
+        missing = [name for name in self.param_names if name not in values]
+        if missing:
+            raise KeyError(f"Query '{self.name}' is missing parameters: {', '.join(missing)}")
+        return tuple(values[name] for name in self.param_names)
+    
+    def __repr__(self):
+        return f"CompiledQuery({self.name!r}, {self.dialect!r})"
+
+
+def _render(template: str, dialect: str) -> str:
+    """Expand {LIMIT} and {RETURNING id} for a dialect"""
+    if dialect == 'azure':
+        # T-SQL has no LIMIT; OFFSET/FETCH requires the ORDER BY every limited query has
+        sql = _LIMIT_PATTERN.sub(r'OFFSET 0 ROWS FETCH NEXT :\1 ROWS ONLY', template)
+        sql = sql.replace('{RETURNING id}', 'OUTPUT INSERTED.id')
+    else:
+        sql = _LIMIT_PATTERN.sub(r'LIMIT :\1', template)
+        if dialect == 'postgres' and '{RETURNING id}' in sql:
+            sql = sql.replace('{RETURNING id}', '').rstrip() + '\n            RETURNING id'
+        else:
+            sql = sql.replace('{RETURNING id}', '')
+    
+    # Drop lines emptied by the substitutions above
+    return '\n'.join(line for line in sql.split('\n') if line.strip() or not line) + '\n'
+
+
+def compile_query(name: str, dialect: str) -> CompiledQuery:
+    """
+    Compile a logical query for a dialect (cached)
+    
+    Args:
+        name: Key in QUERIES
+        dialect: 'sqlite', 'azure' or 'postgres'
+    
+    Returns:
+        CompiledQuery with sql, param_names and result columns
+    """
+    key = (name, dialect)
+    query = _compiled_cache.get(key)
+    if query is not None:
+        return query
+    
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown SQL dialect: {dialect}")
+    if name not in QUERIES:
+        raise KeyError(f"Unknown query: {name}")
+    
+    spec = QUERIES[name]
+    sql = _render(spec['sql'], dialect)
+    param_names = tuple(_PARAM_PATTERN.findall(sql))
+    sql = _PARAM_PATTERN.sub(PLACEHOLDERS[dialect], sql)
+    
+    query = CompiledQuery(
+        name,
+        dialect,
+        sql,
+        param_names,
+        spec['columns'],
+        returns_id='{RETURNING id}' in spec['sql']
+    )
+    return _compiled_cache.setdefault(key, query)
+
+
+def schema_statements(dialect: str) -> List[str]:
+    """
+    CREATE TABLE and CREATE INDEX statements for a dialect
+    
+    Args:
+        dialect: 'sqlite', 'azure' or 'postgres'
+    
+    Returns:
+        Statements to run in order (all idempotent)
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown SQL dialect: {dialect}")
+    
+    statements = list(TABLES[dialect])
+    for index_name, table, column in INDEXES:
+        if dialect == 'azure':
+            statements.append(
+                f"IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='{index_name}') "
+                f"CREATE INDEX {index_name} ON {table}({column})"
+            )
+        else:
+            statements.append(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({column})")
+    return statements
+
+
+def column_migrations(dialect: str, existing: Optional[Dict[str, set]] = None) -> List[str]:
+    """
+    ALTER TABLE statements adding ADDED_COLUMNS to tables created before them
+    
+    Args:
+        dialect: 'sqlite', 'azure' or 'postgres'
+        existing: Current column names per table; required for sqlite, which
+            has no conditional ADD COLUMN (azure/postgres statements are idempotent)
+    
+    Returns:
+        Statements to run in order
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown SQL dialect: {dialect}")
+    
+    statements = []
+    for table, column, types in ADDED_COLUMNS:
+        if dialect == 'azure':
+            statements.append(
+                f"IF COL_LENGTH('{table}', '{column}') IS NULL "
+                f"ALTER TABLE {table} ADD {column} {types[dialect]}"
+            )
+        elif dialect == 'postgres':
+            statements.append(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {types[dialect]}")
+        elif column not in (existing or {}).get(table, set()):
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {types[dialect]}")
+    return statements
+
+
+def window_start(days: int, dialect: str, now: Optional[datetime] = None):
+    """
+    Lower bound for a "last N days" window, as a bindable value
+    
+    Matches the previous whole-day semantics (DATE(created_at) >= today - N):
+    the cutoff is midnight UTC N days ago. Timestamps are stored in UTC
+    (SQLite CURRENT_TIMESTAMP, Azure SQL GETDATE()).
+    
+    Args:
+        days: Number of days to look back
+        dialect: Target dialect (SQLite compares timestamps as text)
+        now: Reference time (default: current UTC time)
+    
+    Returns:
+        'YYYY-MM-DD HH:MM:SS' string for sqlite, naive datetime otherwise
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = datetime.combine(now.date() - timedelta(days=days), datetime.min.time())
+    if dialect == 'sqlite':
+        return cutoff.strftime('%Y-%m-%d %H:%M:%S')
+    return cutoff
+
+
+if __name__ == "__main__":
+    """
+    Print every query compiled for every dialect
+    
+    Run: python src/monitoring/query_builder.py
+    """
+    for dialect in DIALECTS:
+        print("=" * 60)
+        print(f"Dialect: {dialect}")
+        print("=" * 60)
+        for name in QUERIES:
+            query = compile_query(name, dialect)
+            print(f"\n-- {name} {query.param_names}")
+            print(query.sql.strip())
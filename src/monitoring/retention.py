@@ -0,0 +1,418 @@
+"""
+Retention Engine for Monitoring Tables
+
+predictions, feedback, monitoring_events, retraining_log and
+shadow_predictions otherwise grow
+forever in one SQLite file. A policy per table decides how long raw rows are
+kept and what happens to them once they expire:
+
+    raw_days    Keep raw rows for this many days (None = keep forever)
+    archive     Export expired rows to compressed Parquet before deleting
+    downsample  Keep daily aggregates of expired rows
+
+Downsampling:
+- predictions / feedback: the daily rollup tables (rollups.py) already hold
+  per-day aggregates, so their rows for expired days are simply kept. With
+  downsample=False the expired rows are subtracted from the rollup instead.
+- monitoring_events / retraining_log / shadow_predictions: additive
+  aggregates are upserted into <table>_daily keyed by day and the policy's
+  group-by columns.
+
+Expired rows are processed in id-ordered chunks; each chunk is archived,
+downsampled and deleted in its own short transaction so concurrent writers
+are never blocked for long. Freed pages are then returned to the OS with
+PRAGMA incremental_vacuum in small steps (new databases are created with
+auto_vacuum=INCREMENTAL; existing ones need enable_incremental_vacuum() once).
+
+Archive layout (Hive-style, readable with pyarrow.dataset / pandas):
+    <archive_dir>/<table>/day=YYYY-MM-DD/part-<first_id>-<last_id>.parquet
+
+Usage:
+    manager = RetentionManager('monitoring.db', policies={'monitoring_events': {'raw_days': 30}})
+    report = manager.run()
+"""
+
+import time
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from .query_builder import window_start
+    from .rollups import apply_feedback_rollup, apply_prediction_rollup, refresh_prediction_bounds
+    from .streaming import PYARROW_AVAILABLE
+except ImportError:
+    from query_builder import window_start
+    from rollups import apply_feedback_rollup, apply_prediction_rollup, refresh_prediction_bounds
+    from streaming import PYARROW_AVAILABLE
+
+
+# Static description of each table: time column, index, and how it is downsampled
+RETENTION_TABLES = {
+    'predictions': {
+        'time_column': 'created_at',
+        'index': 'idx_predictions_created_at',
+        'rollup': 'prediction_daily_rollup'
+    },
+    'feedback': {
+        'time_column': 'created_at',
+        'index': 'idx_feedback_created_at',
+        'rollup': 'feedback_daily_rollup'
+    },
+    'monitoring_events': {
+        'time_column': 'created_at',
+        'index': 'idx_monitoring_events_created_at',
+        'downsample': {
+            'table': 'monitoring_events_daily',
+            'group_by': ['event_type', 'event_severity'],
+            'aggregates': {'n': 'COUNT(*)'}
+        }
+    },
+    'retraining_log': {
+        'time_column': 'started_at',
+        'index': 'idx_retraining_log_started_at',
+        'downsample': {
+            'table': 'retraining_log_daily',
+            'group_by': ['trigger_reason', 'status'],
+            'aggregates': {
+                'n': 'COUNT(*)',
+                'n_improvement': 'COUNT(model_improvement)',
+                'sum_improvement': 'TOTAL(model_improvement)'
+            }
+        }
+    },
+    'shadow_predictions': {
+        'time_column': 'created_at',
+        'index': 'idx_shadow_predictions_created_at',
+        'downsample': {
+            'table': 'shadow_predictions_daily',
+            'group_by': ['primary_version', 'candidate_version'],
+            'aggregates': {
+                'n': 'COUNT(*)',
+                'sum_divergence_gb': 'TOTAL(ABS(candidate_archived_gb - primary_archived_gb))',
+                'sum_primary_latency_ms': 'TOTAL(primary_latency_ms)',
+                'sum_candidate_latency_ms': 'TOTAL(candidate_latency_ms)'
+            }
+        }
+    }
+}
+
+# Default policies; RetentionManager(policies=...) overrides per table
+DEFAULT_POLICIES = {
+    'predictions': {'raw_days': 365, 'archive': True, 'downsample': True},
+    'feedback': {'raw_days': 365, 'archive': True, 'downsample': True},
+    'monitoring_events': {'raw_days': 90, 'archive': True, 'downsample': True},
+    'retraining_log': {'raw_days': 730, 'archive': True, 'downsample': True},
+    'shadow_predictions': {'raw_days': 30, 'archive': False, 'downsample': True}
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_VACUUM_STEP = 1000  # pages per incremental_vacuum call
+
+
+def merge_policies(policies: Optional[Dict] = None) -> Dict:
+    """
+    Combine user policies with DEFAULT_POLICIES
+    
+    A table mapped to None is excluded; partial dicts override single keys.
+    """
+    merged = {}
+    policies = policies or {}
+    for table, default in DEFAULT_POLICIES.items():
+        if table in policies and policies[table] is None:
+            continue
+        merged[table] = {**default, **policies.get(table, {})}
+    for table in policies:
+        if table not in RETENTION_TABLES:
+            raise ValueError(f"No retention spec for table '{table}'")
+    return merged
+
+
+class RetentionManager:
+    """Applies retention policies to a monitoring SQLite database"""
+    
+    def __init__(
+        self,
+        db_path: str = 'monitoring.db',
+        policies: Optional[Dict] = None,
+        archive_dir: str = 'archive',
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pause_seconds: float = 0.0,
+        compression: str = 'zstd'
+    ):
+        """
+        Initialize retention manager
+        
+        Args:
+            db_path: Path to the SQLite database
+            policies: Per-table overrides of DEFAULT_POLICIES
+            archive_dir: Directory for exported partitions
+            chunk_size: Rows deleted per transaction
+            pause_seconds: Sleep between chunks to let other writers in
+            compression: Parquet codec (zstd, snappy, gzip)
+        """
+        self.db_path = db_path
+        self.policies = merge_policies(policies)
+        self.archive_dir = Path(archive_dir)
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.compression = compression
+        self.conn = sqlite3.connect(db_path, timeout=30)
+    
+    def _table_exists(self, table: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+    
+    def _ensure_structures(self, table: str, spec: Dict):
+        """Time-column index and downsample table"""
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {spec['index']} ON {table}({spec['time_column']})"
+        )
+        downsample = spec.get('downsample')
+        if downsample:
+            columns = [f'{col} TEXT NOT NULL' for col in downsample['group_by']]
+            columns += [f'{name} REAL NOT NULL DEFAULT 0' for name in downsample['aggregates']]
+            self.conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {downsample['table']} (
+                    day DATE NOT NULL,
+                    {', '.join(columns)},
+                    PRIMARY KEY (day, {', '.join(downsample['group_by'])})
+                )
+            ''')
+        self.conn.commit()
+    
+    def count_expired(self, table: str, cutoff: str) -> int:
+        """Number of rows older than the cutoff"""
+        time_column = RETENTION_TABLES[table]['time_column']
+        return self.conn.execute(
+            f'SELECT COUNT(*) FROM {table} WHERE {time_column} < ?', (cutoff,)
+        ).fetchone()[0]
+    
+    def _archive(self, table: str, df: pd.DataFrame) -> List[str]:
+        """Write one file per day; names are derived from the id range so reruns overwrite"""
+        time_column = RETENTION_TABLES[table]['time_column']
+        days = pd.to_datetime(df[time_column]).dt.strftime('%Y-%m-%d')
+        files = []
+        for day, part in df.groupby(days):
+            directory = self.archive_dir / table / f'day={day}'
+            directory.mkdir(parents=True, exist_ok=True)
+            stem = f"part-{part['id'].min()}-{part['id'].max()}"
+            if PYARROW_AVAILABLE:
+                path = directory / f'{stem}.parquet'
+                part.to_parquet(path, compression=self.compression, index=False)
+            else:
+                path = directory / f'{stem}.csv.gz'
+                part.to_csv(path, compression='gzip', index=False)
+            files.append(str(path))
+        return files
+    
+    def _downsample(self, table: str, spec: Dict, where: str, params: tuple):
+        """Upsert additive daily aggregates of the chunk"""
+        downsample = spec['downsample']
+        group_by = downsample['group_by']
+        aggregates = downsample['aggregates']
+        self.conn.execute(f'''
+            INSERT INTO {downsample['table']} (day, {', '.join(group_by)}, {', '.join(aggregates)})
+            SELECT
+                DATE({spec['time_column']}),
+                {', '.join(f"COALESCE({col}, '')" for col in group_by)},
+                {', '.join(aggregates.values())}
+            FROM {table}
+            WHERE {where}
+            GROUP BY 1, {', '.join(str(i + 2) for i in range(len(group_by)))}
+            ON CONFLICT(day, {', '.join(group_by)}) DO UPDATE SET
+                {', '.join(f'{name} = {name} + excluded.{name}' for name in aggregates)}
+        ''', params)
+    
+    def _expire_chunk(self, table: str, policy: Dict, cutoff: str, after_id: int) -> Dict:
+        """Archive, downsample and delete one chunk; returns its stats"""
+        spec = RETENTION_TABLES[table]
+        time_column = spec['time_column']
+        
+        df = pd.read_sql_query(
+            f'SELECT * FROM {table} WHERE {time_column} < ? AND id > ? ORDER BY id LIMIT ?',
+            self.conn, params=(cutoff, after_id, self.chunk_size)
+        )
+        if df.empty:
+            return {'rows': 0, 'last_id': after_id, 'files': []}
+        
+        last_id = int(df['id'].max())
+        files = self._archive(table, df) if policy.get('archive') else []
+        
+        where = f'{time_column} < ? AND id > ? AND id <= ?'
+        params = (cutoff, after_id, last_id)
+        try:
+            rollup = spec.get('rollup')
+            touched_days = []
+            if rollup and not policy.get('downsample') and self._table_exists(rollup):
+                if table == 'predictions':
+                    touched_days = apply_prediction_rollup(self.conn, where, params, sign=-1)
+                else:
+                    apply_feedback_rollup(self.conn, where, params, sign=-1)
+            elif spec.get('downsample') and policy.get('downsample'):
+                self._downsample(table, spec, where, params)
+            
+            deleted = self.conn.execute(f'DELETE FROM {table} WHERE {where}', params).rowcount
+            if touched_days:
+                refresh_prediction_bounds(self.conn, touched_days)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        
+        return {'rows': deleted, 'last_id': last_id, 'files': files}
+    
+    def apply_policy(self, table: str, dry_run: bool = False) -> Dict:
+        """
+        Expire one table according to its policy
+        
+        Args:
+            table: Table name
+            dry_run: Only count expired rows
+        
+        Returns:
+            Dictionary with cutoff, expired/deleted counts and archive files
+        """
+        policy = self.policies[table]
+        result = {'table': table, 'cutoff': None, 'expired': 0, 'deleted': 0, 'files': []}
+        if policy.get('raw_days') is None or not self._table_exists(table):
+            return result
+        
+        spec = RETENTION_TABLES[table]
+        cutoff = window_start(policy['raw_days'], 'sqlite')
+        result['cutoff'] = cutoff
+        
+        if not dry_run:
+            self._ensure_structures(table, spec)
+        result['expired'] = self.count_expired(table, cutoff)
+        if dry_run or not result['expired']:
+            return result
+        
+        after_id = 0
+        while True:
+            chunk = self._expire_chunk(table, policy, cutoff, after_id)
+            if not chunk['rows'] and chunk['last_id'] == after_id:
+                break
+            result['deleted'] += chunk['rows']
+            result['files'].extend(chunk['files'])
+            after_id = chunk['last_id']
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+        
+        return result
+    
+    def enable_incremental_vacuum(self):
+        """
+        Switch an existing database to auto_vacuum=INCREMENTAL
+        
+        Requires one full VACUUM (exclusive lock for its duration); run it
+        during a maintenance window. New databases are created incremental.
+        """
+        self.conn.commit()
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        self.conn.execute('VACUUM')
+    
+    def vacuum(self, max_pages: Optional[int] = None, step_pages: int = DEFAULT_VACUUM_STEP) -> int:
+        """
+        Release free pages in small steps
+        
+        Args:
+            max_pages: Stop after this many pages (None = all free pages)
+            step_pages: Pages released per call; each call is a short transaction
+        
+        Returns:
+            Number of pages released
+        """
+        if self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            print("auto_vacuum is not INCREMENTAL; call enable_incremental_vacuum() once to reclaim space")
+            return 0
+        
+        released = 0
+        while max_pages is None or released < max_pages:
+            free = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free:
+                break
+            step = min(free, step_pages)
+            if max_pages is not None:
+                step = min(step, max_pages - released)
+            self.conn.execute(f'PRAGMA incremental_vacuum({step})').fetchall()
+            released += step
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+        return released
+    
+    def run(self, dry_run: bool = False, vacuum: bool = True) -> Dict:
+        """
+        Apply every policy, then vacuum
+        
+        Args:
+            dry_run: Only report how many rows would expire
+            vacuum: Run incremental vacuum afterwards
+        
+        Returns:
+            Dictionary with per-table results and released pages
+        """
+        report = {'tables': {}, 'vacuumed_pages': 0}
+        for table in self.policies:
+            try:
+                report['tables'][table] = self.apply_policy(table, dry_run=dry_run)
+            except Exception as e:
+                print(f"Error applying retention to {table}: {e}")
+                report['tables'][table] = {'table': table, 'error': str(e)}
+        
+        if vacuum and not dry_run:
+            report['vacuumed_pages'] = self.vacuum()
+        return report
+    
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
+
+if __name__ == "__main__":
+    """
+    Expire old rows from a throwaway database
+    
+    Run: python src/monitoring/retention.py
+    """
+    import tempfile
+    
+    try:
+        from .predictions_db import PredictionsDB
+    except ImportError:
+        from predictions_db import PredictionsDB
+    
+    print("Testing retention engine...")
+    print("=" * 60)
+    
+    temp_dir = tempfile.mkdtemp()
+    db_path = str(Path(temp_dir) / 'retention.db')
+    
+    with PredictionsDB(db_path) as db:
+        for i in range(200):
+            db.save_monitoring_event('drift', 'warning' if i % 2 else 'info', f'event {i}')
+        db.conn.execute("UPDATE monitoring_events SET created_at = datetime('now', '-' || (id % 200) || ' days')")
+        db.conn.commit()
+    
+    with RetentionManager(db_path, archive_dir=str(Path(temp_dir) / 'archive'), chunk_size=50) as manager:
+        print(f"Dry run: {manager.run(dry_run=True)['tables']['monitoring_events']['expired']} rows expire")
+        report = manager.run()
+        events = report['tables']['monitoring_events']
+        print(f"Deleted {events['deleted']} rows, {len(events['files'])} archive files")
+        daily = manager.conn.execute('SELECT SUM(n) FROM monitoring_events_daily').fetchone()[0]
+        print(f"Downsampled rows: {int(daily)}")
+        print(f"Vacuumed pages: {report['vacuumed_pages']}")
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -3,13 +3,38 @@ Retraining Trigger Module
 
 Evaluates conditions to determine if model retraining should be initiated.
 Checks: feedback count, drift detection score, and accuracy drops.
+
+RetainingTriggerManager reads its inputs up front as one snapshot per
+database: the feedback count and accuracy in one query
+(FeedbackDB.get_trigger_snapshot) and the drift sample in one query
+(PredictionsDB.get_recent_predictions_for_drift). The two databases can be
+different backends, so they are not read in a single statement. Each
+evaluation is cached for a short TTL per database pair, so dashboard renders
+and scheduler ticks in the same process share one evaluation instead of each
+re-querying.
 """
 
+import copy
+import threading
+import time
 import pandas as pd
 from typing import Dict, Tuple, Optional
 from datetime import datetime, timedelta
 
 
+DEFAULT_CACHE_TTL = 60.0  # seconds
+
+# (feedback backend, predictions db) -> (monotonic time, evaluation)
+_evaluation_cache: Dict[tuple, Tuple[float, Dict]] = {}
+_evaluation_cache_lock = threading.Lock()
+
+
+def invalidate_trigger_cache():
+    """Drop cached evaluations (e.g. after retraining or bulk feedback imports)"""
+    with _evaluation_cache_lock:
+        _evaluation_cache.clear()
+
+
 class RetaininingTrigger:
     """Evaluates conditions for triggering model retraining"""
     
@@ -160,6 +185,7 @@ class RetaininingTrigger:
             'action': 'retrain' if evaluation['should_retrain'] else 'monitor',
             'urgency': self._calculate_urgency(confidence),
             'next_check': self._estimate_next_check(metrics),
+            'next_check_hours': self._next_check_hours(metrics),
             'data_needed': self._estimate_data_needed(metrics),
             'estimated_impact': self._estimate_impact(metrics)
         }
@@ -177,12 +203,68 @@ class RetaininingTrigger:
     
     def _estimate_next_check(self, metrics: Dict) -> str:
         """Estimate when next evaluation check should occur"""
+        return f"{self._next_check_hours(metrics)} hours"
+    
+    def _next_check_hours(self, metrics: Dict) -> int:
+        """Recommended hours until the next evaluation"""
         if metrics['drift_score'] > 0.5:
-            return '2 hours'
+            return 2
         elif metrics['feedback_count'] > 20:
-            return '4 hours'
+            return 4
         else:
-            return '12 hours'
+            return 12
+    
+    def could_trigger(
+        self,
+        evaluation: Dict,
+        new_feedback: int = 0,
+        new_negative_feedback: int = 0,
+        new_predictions: int = 0
+    ) -> bool:
+        """
+        Whether events since an evaluation could have made retraining due
+        
+        Each condition is bounded by what the events can change: the feedback
+        count only grows with new feedback, accuracy only drops with new
+        non-'correct' feedback, and drift only moves with new predictions.
+        Re-evaluation is worthwhile only if at least two conditions (the
+        retrain quorum) are met or reachable.
+        
+        Args:
+            evaluation: Result of evaluate() (from RetainingTriggerManager,
+                which adds 'feedback_totals')
+            new_feedback: Feedback submitted since the evaluation
+            new_negative_feedback: Of which 'incorrect' or 'uncertain'
+            new_predictions: Predictions saved since the evaluation
+        
+        Returns:
+            True if the trigger should be re-evaluated
+        """
+        details = evaluation.get('trigger_details')
+        metrics = evaluation.get('metrics')
+        if not details or not metrics:
+            return True
+        
+        feedback_reachable = (
+            details['condition_feedback']
+            or metrics['feedback_count'] + new_feedback >= self.feedback_threshold
+        )
+        
+        accuracy_reachable = details['condition_accuracy']
+        if not accuracy_reachable and new_negative_feedback > 0:
+            totals = evaluation.get('feedback_totals')
+            baseline = metrics['baseline_accuracy']
+            if not totals or baseline <= 0:
+                accuracy_reachable = True
+            else:
+                # Worst case: every new negative entry lands in the accuracy window
+                total = totals['total_feedback'] + new_negative_feedback
+                lowest_accuracy = totals['correct_feedback'] / total
+                accuracy_reachable = 1 - lowest_accuracy / baseline >= self.accuracy_drop_threshold
+        
+        drift_reachable = details['condition_drift'] or new_predictions > 0
+        
+        return sum([feedback_reachable, accuracy_reachable, drift_reachable]) >= 2
     
     def _estimate_data_needed(self, metrics: Dict) -> Dict:
         """Estimate how much more data is needed"""
@@ -212,7 +294,8 @@ class RetaininingTrigger:
 class RetainingTriggerManager:
     """Manages retraining trigger evaluation with database integration"""
     
-    def __init__(self, feedback_db=None, predictions_db=None, drift_detector=None):
+    def __init__(self, feedback_db=None, predictions_db=None, drift_detector=None,
+                 cache_ttl: float = DEFAULT_CACHE_TTL):
         """
         Initialize trigger manager
         
@@ -220,18 +303,62 @@ class RetainingTriggerManager:
             feedback_db: FeedbackDB instance
             predictions_db: PredictionsDB instance
             drift_detector: DriftDetector instance
+            cache_ttl: Seconds an evaluation is reused (0 disables the cache)
         """
         self.feedback_db = feedback_db
         self.predictions_db = predictions_db
         self.drift_detector = drift_detector
         self.trigger = RetaininingTrigger()
+        self.cache_ttl = cache_ttl
     
-    def check_retraining_conditions(self) -> Dict:
+    def _cache_key(self) -> tuple:
+        """Identify the databases an evaluation was computed from"""
+        feedback_db = self.feedback_db
+        cloud_config = getattr(feedback_db, 'cloud_config', None) or {}
+        return (
+            getattr(feedback_db, 'provider', 'sqlite'),
+            cloud_config.get('host'),
+            cloud_config.get('database'),
+            getattr(feedback_db, 'db_path', id(feedback_db)),
+            getattr(self.predictions_db, 'db_path', id(self.predictions_db))
+        )
+    
+    def _read_feedback_snapshot(self) -> Dict:
+        """Feedback count and accuracy, in one query when the backend supports it"""
+        if hasattr(self.feedback_db, 'get_trigger_snapshot'):
+            return self.feedback_db.get_trigger_snapshot(count_days=7, accuracy_days=30)
+        return {
+            'feedback_count': self.feedback_db.get_feedback_count(days=7),
+            'accuracy': self.feedback_db.get_feedback_accuracy(days=30)
+        }
+    
+    def _read_snapshot(self) -> Dict:
+        """
+        All trigger inputs, one query per database
+        
+        Returns:
+            Feedback snapshot (feedback_count, accuracy) plus drift_sample:
+            recent archived_gb predictions, or None without a drift detector
+            or if the read failed
+        """
+        snapshot = self._read_feedback_snapshot()
+        snapshot['drift_sample'] = None
+        if self.drift_detector:
+            try:
+                snapshot['drift_sample'], _ = self.predictions_db.get_recent_predictions_for_drift()
+            except Exception as e:
+                print(f"Warning: Reading the drift sample failed: {e}")
+        return snapshot
+    
+    def check_retraining_conditions(self, use_cache: bool = True) -> Dict:
         """
         Check all retraining conditions using current data
         
+        Args:
+            use_cache: Reuse an evaluation of the same databases younger than cache_ttl
+        
         Returns:
-            Dictionary with evaluation results
+            Dictionary with evaluation results ('cached' is True when reused)
         """
         if not self.feedback_db or not self.predictions_db:
             return {
@@ -240,15 +367,34 @@ class RetainingTriggerManager:
                 'error': True
             }
         
-        # Get metrics
-        feedback_count = self.feedback_db.get_feedback_count(days=7)
-        feedback_metrics = self.feedback_db.get_feedback_accuracy(days=30)
+        key = self._cache_key()
+        if use_cache and self.cache_ttl > 0:
+            with _evaluation_cache_lock:
+                entry = _evaluation_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+                evaluation = copy.deepcopy(entry[1])
+                evaluation['cached'] = True
+                return evaluation
+        
+        evaluation = self._evaluate()
+        if self.cache_ttl > 0:
+            with _evaluation_cache_lock:
+                _evaluation_cache[key] = (time.monotonic(), copy.deepcopy(evaluation))
+        evaluation['cached'] = False
+        return evaluation
+    
+    def _evaluate(self) -> Dict:
+        """Read the snapshot, run drift detection and evaluate the trigger"""
+        # All inputs up front (one round trip per database)
+        snapshot = self._read_snapshot()
+        feedback_count = snapshot['feedback_count']
+        feedback_metrics = snapshot['accuracy']
+        archived_list = snapshot['drift_sample']
         
         # Get drift score
         drift_score = 0.0
-        if self.drift_detector:
+        if archived_list is not None:
             try:
-                archived_list, savings_list = self.predictions_db.get_recent_predictions_for_drift()
                 if len(archived_list) >= 10:  # Need at least 10 samples for drift detection
                     # Use KS test for drift detection
                     drift_result = self.drift_detector.detect_drift_ks_test(archived_list)
@@ -276,6 +422,10 @@ class RetainingTriggerManager:
         
         # Add recommendations
         evaluation['recommendations'] = self.trigger.get_recommendations(evaluation)
+        evaluation['feedback_totals'] = {
+            'total_feedback': feedback_metrics.get('total_feedback', 0),
+            'correct_feedback': feedback_metrics.get('correct_feedback', 0)
+        }
         evaluation['timestamp'] = datetime.now().isoformat()
         
         return evaluation
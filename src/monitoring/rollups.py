@@ -0,0 +1,356 @@
+"""
+Daily Rollup Tables
+
+Summary statistics are read from small per-day aggregate tables instead of
+re-scanning predictions/feedback on every dashboard render. A summary over
+N days reads at most N rollup rows, whatever the history length.
+
+Tables:
+    prediction_daily_rollup  - per DATE(created_at): row count, and per
+                               measure count / sum / sum of squares,
+                               min/max prediction_date
+    feedback_daily_rollup    - per DATE(created_at) and feedback_status:
+                               count and |actual - predicted| aggregates
+
+Maintenance:
+- Incremental: the write methods call apply_*_rollup() in the same
+  transaction as the insert/update (sign=-1 removes a row's old values)
+- Compaction: rebuild_*_rollup() recomputes every day that still has raw
+  rows; RetrainingScheduler runs it periodically, and it backfills databases
+  created before the rollups existed
+- Retention (retention.py) deletes expired raw rows but keeps their rollup
+  rows as the downsampled history, so a rebuild leaves days older than the
+  oldest raw row untouched
+
+Requires SQLite >= 3.24 (UPSERT).
+"""
+
+import math
+import sqlite3
+from typing import Dict, List, Optional
+
+
+# (rollup column suffix, predictions column)
+PREDICTION_MEASURES = [
+    ('archived_predicted', 'archived_gb_predicted'),
+    ('savings_predicted', 'savings_gb_predicted'),
+    ('archived_actual', 'archived_gb_actual'),
+    ('savings_actual', 'savings_gb_actual')
+]
+
+
+def _measure_columns() -> List[str]:
+    return [f'{stat}_{suffix}' for suffix, _ in PREDICTION_MEASURES for stat in ('n', 'sum', 'sumsq')]
+
+
+PREDICTION_ROLLUP_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS prediction_daily_rollup (
+            day DATE PRIMARY KEY,
+            n INTEGER NOT NULL DEFAULT 0,
+            {measures},
+            min_prediction_date DATE,
+            max_prediction_date DATE
+        )
+    '''.format(measures=',\n            '.join(f'{col} REAL NOT NULL DEFAULT 0' for col in _measure_columns())),
+    'CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at)'
+]
+
+FEEDBACK_ROLLUP_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS feedback_daily_rollup (
+            day DATE NOT NULL,
+            feedback_status TEXT NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            n_error INTEGER NOT NULL DEFAULT 0,
+            sum_error REAL NOT NULL DEFAULT 0,
+            sumsq_error REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, feedback_status)
+        )
+    '''
+]
+
+
+def _is_empty(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute(f'SELECT NOT EXISTS (SELECT 1 FROM {table})').fetchone()[0] == 1
+
+
+# ---------------------------------------------------------------------------
+# Predictions
+# ---------------------------------------------------------------------------
+
+def ensure_prediction_rollup(conn: sqlite3.Connection):
+    """Create the rollup table and backfill it if the raw table has rows"""
+    for statement in PREDICTION_ROLLUP_SCHEMA:
+        conn.execute(statement)
+    if _is_empty(conn, 'prediction_daily_rollup') and not _is_empty(conn, 'predictions'):
+        rebuild_prediction_rollup(conn)
+
+
+def apply_prediction_rollup(conn: sqlite3.Connection, where: str, params: tuple = (), sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) matching prediction rows from the rollup
+    
+    Does not commit; call inside the transaction that changes the rows.
+    Subtract before the rows change and add after; when subtracting, pass
+    the returned days to refresh_prediction_bounds() once the change is made.
+    
+    Args:
+        conn: SQLite connection
+        where: Predicate on predictions selecting the rows, e.g. 'id = ?'
+        params: Predicate parameters
+        sign: 1 to add, -1 to subtract
+    
+    Returns:
+        Days (DATE(created_at)) touched
+    """
+    if sign not in (1, -1):
+        raise ValueError("sign must be 1 or -1")
+    
+    columns = ['n'] + _measure_columns()
+    exprs = ['COUNT(*)']
+    for _, source in PREDICTION_MEASURES:
+        exprs += [f'COUNT({source})', f'TOTAL({source})', f'TOTAL({source} * {source})']
+    
+    days = [row[0] for row in conn.execute(
+        f'SELECT DISTINCT DATE(created_at) FROM predictions WHERE {where}', params
+    )]
+    
+    conn.execute(f'''
+        INSERT INTO prediction_daily_rollup
+        (day, {', '.join(columns)}, min_prediction_date, max_prediction_date)
+        SELECT
+            DATE(created_at),
+            {', '.join(f'{sign} * {expr}' for expr in exprs)},
+            MIN(prediction_date),
+            MAX(prediction_date)
+        FROM predictions
+        WHERE {where}
+        GROUP BY DATE(created_at)
+        ON CONFLICT(day) DO UPDATE SET
+            {', '.join(f'{col} = {col} + excluded.{col}' for col in columns)},
+            min_prediction_date = MIN(COALESCE(min_prediction_date, excluded.min_prediction_date),
+                                      excluded.min_prediction_date),
+            max_prediction_date = MAX(COALESCE(max_prediction_date, excluded.max_prediction_date),
+                                      excluded.max_prediction_date)
+    ''', params)
+    
+    return days
+
+
+def refresh_prediction_bounds(conn: sqlite3.Connection, days: List[str]):
+    """
+    Recompute min/max prediction_date for days that lost rows
+    
+    min/max cannot be decremented, so they are re-read from the raw rows of
+    those days (a bounded range scan on idx_predictions_created_at).
+    
+    Args:
+        conn: SQLite connection
+        days: Days returned by apply_prediction_rollup(sign=-1)
+    """
+    for day in days:
+        conn.execute('''
+            UPDATE prediction_daily_rollup
+            SET min_prediction_date = (
+                    SELECT MIN(prediction_date) FROM predictions
+                    WHERE created_at >= :day AND created_at < DATE(:day, '+1 day')
+                ),
+                max_prediction_date = (
+                    SELECT MAX(prediction_date) FROM predictions
+                    WHERE created_at >= :day AND created_at < DATE(:day, '+1 day')
+                )
+            WHERE day = :day
+        ''', {'day': day})
+    conn.execute('DELETE FROM prediction_daily_rollup WHERE n <= 0')
+
+
+def rebuild_prediction_rollup(conn: sqlite3.Connection):
+    """Recompute the prediction rollup for days with raw rows (compaction/repair)"""
+    conn.execute('''
+        DELETE FROM prediction_daily_rollup
+        WHERE day >= (SELECT DATE(MIN(created_at)) FROM predictions)
+    ''')
+    apply_prediction_rollup(conn, '1 = 1')
+
+
+def read_prediction_summary(conn: sqlite3.Connection, days: int) -> Optional[Dict]:
+    """
+    Aggregate the rollup rows of the last N days
+    
+    Args:
+        conn: SQLite connection
+        days: Number of days (same window as DATE(created_at) >= DATE('now', '-N days'))
+    
+    Returns:
+        Dictionary of totals (n, n_*, sum_*, sumsq_*, min/max prediction_date),
+        or None if there are no rows
+    """
+    columns = ['n'] + _measure_columns()
+    cursor = conn.execute(f'''
+        SELECT
+            {', '.join(f'TOTAL({col})' for col in columns)},
+            MIN(min_prediction_date),
+            MAX(max_prediction_date)
+        FROM prediction_daily_rollup
+        WHERE day >= DATE('now', '-' || ? || ' days')
+    ''', (days,))
+    row = cursor.fetchone()
+    
+    totals = dict(zip(columns + ['min_prediction_date', 'max_prediction_date'], row))
+    if not totals['n']:
+        return None
+    return totals
+
+
+def mean_and_std(n: float, total: float, sumsq: float):
+    """
+    Mean and sample standard deviation from count, sum and sum of squares
+    
+    Returns:
+        Tuple of (mean, std); None where undefined
+    """
+    if not n:
+        return None, None
+    mean = total / n
+    if n < 2:
+        return mean, None
+    variance = max((sumsq - n * mean * mean) / (n - 1), 0.0)
+    return mean, math.sqrt(variance)
+
+
+# ---------------------------------------------------------------------------
+# Feedback
+# ---------------------------------------------------------------------------
+
+def ensure_feedback_rollup(conn: sqlite3.Connection):
+    """Create the rollup table and backfill it if the raw table has rows"""
+    for statement in FEEDBACK_ROLLUP_SCHEMA:
+        conn.execute(statement)
+    if _is_empty(conn, 'feedback_daily_rollup') and not _is_empty(conn, 'feedback'):
+        rebuild_feedback_rollup(conn)
+
+
+def apply_feedback_rollup(conn: sqlite3.Connection, where: str, params: tuple = (), sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) matching feedback rows from the rollup
+    
+    Does not commit; call inside the transaction that changes the rows.
+    
+    Args:
+        conn: SQLite connection
+        where: Predicate on feedback selecting the rows, e.g. 'id > ?'
+        params: Predicate parameters
+        sign: 1 to add, -1 to subtract
+    """
+    if sign not in (1, -1):
+        raise ValueError("sign must be 1 or -1")
+    
+    conn.execute(f'''
+        INSERT INTO feedback_daily_rollup (day, feedback_status, n, n_error, sum_error, sumsq_error)
+        SELECT
+            DATE(created_at),
+            feedback_status,
+            {sign} * COUNT(*),
+            {sign} * COUNT(actual_value - predicted_value),
+            {sign} * TOTAL(ABS(actual_value - predicted_value)),
+            {sign} * TOTAL((actual_value - predicted_value) * (actual_value - predicted_value))
+        FROM feedback
+        WHERE {where}
+        GROUP BY DATE(created_at), feedback_status
+        ON CONFLICT(day, feedback_status) DO UPDATE SET
+            n = n + excluded.n,
+            n_error = n_error + excluded.n_error,
+            sum_error = sum_error + excluded.sum_error,
+            sumsq_error = sumsq_error + excluded.sumsq_error
+    ''', params)
+    
+    if sign == -1:
+        conn.execute('DELETE FROM feedback_daily_rollup WHERE n <= 0')
+
+
+def rebuild_feedback_rollup(conn: sqlite3.Connection):
+    """Recompute the feedback rollup for days with raw rows (compaction/repair)"""
+    conn.execute('''
+        DELETE FROM feedback_daily_rollup
+        WHERE day >= (SELECT DATE(MIN(created_at)) FROM feedback)
+    ''')
+    apply_feedback_rollup(conn, '1 = 1')
+
+
+def read_feedback_accuracy(conn: sqlite3.Connection, days: int) -> List[tuple]:
+    """
+    Per-status feedback totals of the last N days from the rollup
+    
+    Args:
+        conn: SQLite connection
+        days: Number of days (same window as DATE(created_at) >= DATE('now', '-N days'))
+    
+    Returns:
+        Rows of (feedback_status, count, avg_error)
+    """
+    cursor = conn.execute('''
+        SELECT
+            feedback_status,
+            SUM(n) as count,
+            CASE WHEN SUM(n_error) > 0 THEN SUM(sum_error) / SUM(n_error) END as avg_error
+        FROM feedback_daily_rollup
+        WHERE day >= DATE('now', '-' || ? || ' days')
+        GROUP BY feedback_status
+    ''', (days,))
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def read_feedback_snapshot(conn: sqlite3.Connection, count_days: int, accuracy_days: int) -> List[tuple]:
+    """
+    Feedback inputs of the retraining trigger in one rollup scan
+    
+    Args:
+        conn: SQLite connection
+        count_days: Window of the feedback count
+        accuracy_days: Window of the accuracy metrics
+    
+    Returns:
+        Rows of (feedback_status, count, avg_error, recent_count) where count and
+        avg_error cover accuracy_days and recent_count covers count_days
+    """
+    cursor = conn.execute('''
+        SELECT
+            feedback_status,
+            TOTAL(CASE WHEN day >= DATE('now', '-' || :accuracy_days || ' days') THEN n END) as count,
+            CASE WHEN TOTAL(CASE WHEN day >= DATE('now', '-' || :accuracy_days || ' days') THEN n_error END) > 0
+                 THEN TOTAL(CASE WHEN day >= DATE('now', '-' || :accuracy_days || ' days') THEN sum_error END)
+                      / TOTAL(CASE WHEN day >= DATE('now', '-' || :accuracy_days || ' days') THEN n_error END)
+            END as avg_error,
+            TOTAL(CASE WHEN day >= DATE('now', '-' || :count_days || ' days') THEN n END) as recent_count
+        FROM feedback_daily_rollup
+        WHERE day >= DATE('now', '-' || :days || ' days')
+        GROUP BY feedback_status
+    ''', {'count_days': count_days, 'accuracy_days': accuracy_days, 'days': max(count_days, accuracy_days)})
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def summarize_feedback_accuracy(rows: List[tuple]) -> Dict:
+    """
+    Accuracy metrics from per-status (feedback_status, count, avg_error) rows
+    
+    Same result as FeedbackDB.get_feedback_accuracy(), without pandas.
+    """
+    counts = {}
+    errors = []
+    for status, count, avg_error in rows:
+        if not count:
+            continue
+        counts[status] = counts.get(status, 0) + int(count)
+        if avg_error is not None:
+            errors.append(float(avg_error))
+    
+    total = sum(counts.values())
+    return {
+        'total_feedback': total,
+        'correct_feedback': counts.get('correct', 0),
+        'incorrect_feedback': counts.get('incorrect', 0),
+        'uncertain_feedback': counts.get('uncertain', 0),
+        'accuracy': (counts.get('correct', 0) / total * 100) if total > 0 else 0.0,
+        'avg_error': sum(errors) / len(errors) if errors else 0.0
+    }
@@ -0,0 +1,193 @@
+"""
+Streaming Query Readers
+
+Generator-based readers that pull query results in fixed-size batches
+instead of materializing the whole result in pandas. Memory use depends on
+batch_size only, not on how much history the query covers.
+
+Cursor handling per driver:
+- sqlite3 / pyodbc: cursor.fetchmany(batch_size)
+- psycopg2: named (server-side) cursor with itersize = batch_size, so rows
+  stay on the server until fetched
+
+Each batch is converted to typed columns: a dict of NumPy arrays, or a
+pyarrow.RecordBatch when as_arrow=True and pyarrow is installed.
+
+Usage:
+    dtypes = {'predicted_value': 'float64', 'created_at': 'datetime64[s]'}
+    for batch in iter_batches(conn, query, params, dtypes, batch_size=5000):
+        model.partial_fit(batch['predicted_value'].reshape(-1, 1))
+"""
+
+import sqlite3
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Column types of the exported tables (anything not listed stays object)
+FEEDBACK_DTYPES = {
+    'id': 'int64',
+    'prediction_id': 'float64',  # nullable
+    'prediction_date': 'datetime64[s]',
+    'predicted_value': 'float64',
+    'actual_value': 'float64',
+    'feedback_status': 'object',
+    'user_feedback': 'object',
+    'created_at': 'datetime64[s]'
+}
+
+PREDICTION_DTYPES = {
+    'id': 'int64',
+    'prediction_date': 'datetime64[s]',
+    'archived_gb_predicted': 'float64',
+    'savings_gb_predicted': 'float64',
+    'archived_gb_actual': 'float64',
+    'savings_gb_actual': 'float64',
+    'created_at': 'datetime64[s]'
+}
+
+
+def _is_psycopg2_connection(conn) -> bool:
+    try:
+        import psycopg2.extensions
+    except ImportError:
+        return False
+    return isinstance(conn, psycopg2.extensions.connection)
+
+
+def iter_rows(
+    conn,
+    query: str,
+    params: tuple = (),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cursor_name: Optional[str] = None
+) -> Iterator[Tuple[List[str], List[tuple]]]:
+    """
+    Execute a query and yield its rows in batches
+    
+    Args:
+        conn: sqlite3, pyodbc or psycopg2 connection
+        query: SQL with the driver's placeholders
+        params: Query parameters
+        batch_size: Rows per batch
+        cursor_name: Server-side cursor name (psycopg2 only)
+    
+    Yields:
+        Tuple of (column names, list of row tuples)
+    """
+    if cursor_name and _is_psycopg2_connection(conn):
+        cursor = conn.cursor(name=cursor_name)
+        cursor.itersize = batch_size
+    else:
+        cursor = conn.cursor()
+        if isinstance(cursor, sqlite3.Cursor):
+            # Plain tuples even when the connection uses sqlite3.Row
+            cursor.row_factory = None
+    
+    try:
+        cursor.execute(query, params)
+        columns = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if columns is None:
+                # Named cursors only describe the result after the first fetch
+                columns = [col[0] for col in cursor.description]
+            yield columns, [tuple(row) for row in rows]
+    finally:
+        cursor.close()
+
+
+def rows_to_arrays(columns: List[str], rows: List[tuple], dtypes: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """
+    Convert a batch of row tuples to one typed NumPy array per column
+    
+    NULLs become NaN in float columns and NaT in datetime columns.
+    
+    Args:
+        columns: Column names
+        rows: Row tuples
+        dtypes: NumPy dtype per column name
+    
+    Returns:
+        Dictionary of column name -> array
+    """
+    arrays = {}
+    for name, values in zip(columns, zip(*rows)):
+        dtype = dtypes.get(name, 'object')
+        if dtype.startswith('datetime64'):
+            values = [v if v is not None else 'NaT' for v in values]
+        arrays[name] = np.array(values, dtype=dtype)
+    return arrays
+
+
+def iter_batches(
+    conn,
+    query: str,
+    params: tuple = (),
+    dtypes: Optional[Dict[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cursor_name: Optional[str] = None,
+    as_arrow: bool = False
+) -> Iterator[Any]:
+    """
+    Stream a query as typed column batches
+    
+    Args:
+        conn: sqlite3, pyodbc or psycopg2 connection
+        query: SQL with the driver's placeholders
+        params: Query parameters
+        dtypes: NumPy dtype per column name
+        batch_size: Rows per batch
+        cursor_name: Server-side cursor name (psycopg2 only)
+        as_arrow: Yield pyarrow.RecordBatch instead of dicts of arrays
+    
+    Yields:
+        Dict of column name -> np.ndarray, or pyarrow.RecordBatch
+    """
+    if as_arrow and not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for as_arrow=True (pip install pyarrow)")
+    
+    for columns, rows in iter_rows(conn, query, params, batch_size, cursor_name):
+        arrays = rows_to_arrays(columns, rows, dtypes or {})
+        if as_arrow:
+            yield pa.RecordBatch.from_pydict(arrays)
+        else:
+            yield arrays
+
+
+if __name__ == "__main__":
+    """
+    Stream a synthetic table in batches
+    
+    Run: python src/monitoring/streaming.py
+    """
+    print("Testing streaming readers...")
+    print("=" * 60)
+    
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id INTEGER, value REAL, created_at TIMESTAMP)')
+    conn.executemany(
+        'INSERT INTO t VALUES (?, ?, ?)',
+        [(i, i * 0.5 if i % 7 else None, '2025-01-01 00:00:00') for i in range(12345)]
+    )
+    
+    dtypes = {'id': 'int64', 'value': 'float64', 'created_at': 'datetime64[s]'}
+    total = 0
+    for batch in iter_batches(conn, 'SELECT * FROM t', dtypes=dtypes, batch_size=5000):
+        total += len(batch['id'])
+        print(f"  batch: {len(batch['id'])} rows, value dtype {batch['value'].dtype}, "
+              f"nulls {int(np.isnan(batch['value']).sum())}")
+    assert total == 12345
+    
+    print("\n" + "=" * 60)
+    print("✅ All tests passed!")
@@ -0,0 +1,80 @@
+"""
+Apply Retention Policies to the Monitoring Database
+
+Archives expired rows to compressed Parquet, keeps daily aggregates and
+deletes the raw rows in small chunks, then releases free pages with
+incremental vacuum. See src/monitoring/retention.py for the policies.
+
+Usage:
+    python src/scripts/apply_retention.py --dry-run
+    python src/scripts/apply_retention.py --db monitoring.db --archive-dir archive
+    python src/scripts/apply_retention.py --policies retention.json
+    python src/scripts/apply_retention.py --enable-incremental-vacuum
+
+retention.json overrides DEFAULT_POLICIES per table, e.g.:
+    {"monitoring_events": {"raw_days": 30}, "retraining_log": null}
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitoring.retention import DEFAULT_CHUNK_SIZE, RetentionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply retention policies to the monitoring database")
+    parser.add_argument("--db", default="monitoring.db", help="SQLite database path (default: monitoring.db)")
+    parser.add_argument("--policies", help="JSON file with per-table policy overrides")
+    parser.add_argument("--archive-dir", default="archive", help="Directory for Parquet exports (default: archive)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows deleted per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would expire")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip incremental vacuum")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="Convert the database to auto_vacuum=INCREMENTAL (one full VACUUM, locks the file)"
+    )
+    args = parser.parse_args()
+    
+    policies = None
+    if args.policies:
+        with open(args.policies, "r") as f:
+            policies = json.load(f)
+    
+    with RetentionManager(
+        args.db,
+        policies=policies,
+        archive_dir=args.archive_dir,
+        chunk_size=args.chunk_size,
+        pause_seconds=args.pause
+    ) as manager:
+        if args.enable_incremental_vacuum:
+            print("Converting database to incremental vacuum (full VACUUM)...")
+            manager.enable_incremental_vacuum()
+        
+        report = manager.run(dry_run=args.dry_run, vacuum=not args.no_vacuum)
+    
+    print("=" * 60)
+    print(f"Retention {'(dry run) ' if args.dry_run else ''}for {args.db}")
+    print("=" * 60)
+    for table, result in report['tables'].items():
+        if 'error' in result:
+            print(f"  {table:<20} ERROR: {result['error']}")
+            continue
+        if result['cutoff'] is None:
+            print(f"  {table:<20} kept (no policy or table)")
+            continue
+        print(f"  {table:<20} before {result['cutoff']}: {result['expired']} expired, "
+              f"{result['deleted']} deleted, {len(result['files'])} files")
+    if not args.dry_run:
+        print(f"  Vacuumed pages: {report['vacuumed_pages']}")
+
+
+if __name__ == "__main__":
+    main()
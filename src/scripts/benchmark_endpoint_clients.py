@@ -0,0 +1,131 @@
+"""
+Benchmark: Sync vs Async Endpoint Client
+
+Fetches many forecasts against the local mock endpoint and compares:
+1. AzureMLEndpointClient, requests issued from a thread pool
+2. AsyncAzureMLEndpointClient, requests awaited on one event loop
+
+Both clients get the same concurrency limit, so the comparison is thread
+pool vs event loop for the same concurrent I/O rather than sequential vs
+concurrent. Latencies include time queued behind the concurrency limit.
+
+The mock endpoint simulates inference latency and the deployment's
+max_concurrent_requests_per_instance, so the numbers reflect I/O wait rather
+than model cost.
+
+Usage:
+    python src/scripts/benchmark_endpoint_clients.py
+    python src/scripts/benchmark_endpoint_clients.py --requests 100 --latency 0.05 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ml.azure_endpoint_client import AzureMLEndpointClient
+from ml.azure_endpoint_client_async import AsyncAzureMLEndpointClient, run_sync
+from scripts.mock_endpoint_server import MockEndpointServer
+
+
+def make_frames(count: int, rows: int = 30):
+    """Build `count` historical frames with the 7 raw features plus date"""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start='2025-08-14', periods=rows, freq='D')
+    return [
+        pd.DataFrame({
+            'date': dates,
+            'total_files': rng.uniform(100000, 150000, rows),
+            'avg_file_size_mb': rng.uniform(1.0, 1.5, rows),
+            'pct_pdf': rng.uniform(0.40, 0.50, rows),
+            'pct_docx': rng.uniform(0.25, 0.35, rows),
+            'pct_xlsx': rng.uniform(0.10, 0.20, rows),
+            'pct_other': rng.uniform(0.05, 0.15, rows),
+            'archive_frequency_per_day': rng.uniform(200, 400, rows),
+        })
+        for _ in range(count)
+    ]
+
+
+def run_sync_client(frames, concurrency: int):
+    """Fetch all forecasts concurrently with the blocking client on a thread pool"""
+    client = AzureMLEndpointClient(max_concurrent_requests=concurrency)
+    
+    def _timed(df, submitted):
+        client.get_predictions(df)
+        return time.perf_counter() - submitted
+    
+    # Timed from submission, like the async tasks, so queueing counts in both
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(_timed, df, time.perf_counter()) for df in frames]
+        return [future.result() for future in futures]
+
+
+def run_async_client(frames, concurrency: int):
+    """Fetch all forecasts concurrently with the asyncio client"""
+    async def _timed(client, df):
+        start = time.perf_counter()
+        await client.get_predictions(df)
+        return time.perf_counter() - start
+    
+    async def _fetch_all():
+        async with AsyncAzureMLEndpointClient(max_concurrent_requests=concurrency) as client:
+            return await asyncio.gather(*(_timed(client, df) for df in frames))
+    
+    return list(run_sync(_fetch_all()))
+
+
+def summarize(name: str, wall_s: float, latencies, requests: int):
+    """Print throughput and latency percentiles for one run"""
+    lat_ms = np.array(latencies) * 1000
+    print(f"\n{name}")
+    print(f"  Wall clock:  {wall_s:.2f}s")
+    print(f"  Throughput:  {requests / wall_s:.1f} forecasts/s")
+    print(f"  Latency p50: {np.percentile(lat_ms, 50):.1f} ms")
+    print(f"  Latency p95: {np.percentile(lat_ms, 95):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sync vs async endpoint clients')
+    parser.add_argument('--requests', type=int, default=100, help='Forecasts to fetch')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated endpoint latency (seconds)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Endpoint/client concurrency limit')
+    args = parser.parse_args()
+    
+    frames = make_frames(args.requests)
+    
+    print("=" * 60)
+    print("Endpoint Client Benchmark")
+    print("=" * 60)
+    print(f"Requests: {args.requests}, latency: {args.latency * 1000:.0f} ms, "
+          f"concurrency: {args.concurrency}")
+    
+    with MockEndpointServer(latency_s=args.latency, max_concurrency=args.concurrency) as server:
+        os.environ['MLFLOW_ENDPOINT'] = server.url
+        os.environ.setdefault('MLFLOW_API_KEY', 'local-benchmark-key')
+        
+        start = time.perf_counter()
+        sync_latencies = run_sync_client(frames, args.concurrency)
+        sync_wall = time.perf_counter() - start
+        summarize("Sync client (thread pool)", sync_wall, sync_latencies, args.requests)
+        
+        start = time.perf_counter()
+        async_latencies = run_async_client(frames, args.concurrency)
+        async_wall = time.perf_counter() - start
+        summarize("Async client (event loop)", async_wall, async_latencies, args.requests)
+    
+    print("\n" + "=" * 60)
+    print(f"Async vs thread pool: {sync_wall / async_wall:.2f}x wall clock")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
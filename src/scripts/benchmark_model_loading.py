@@ -0,0 +1,138 @@
+"""
+Benchmark: Model Cold Start and Per-Worker Memory
+
+Compares loading the forecasting model in several worker processes:
+1. Private copy   - joblib.load() (what score.init() used to do)
+2. Memory-mapped  - load_model_artifact(mmap_mode='r')
+
+Each worker reports load time, warm-up time and RSS growth. With psutil
+installed, USS (private) and PSS (proportional, shared pages split between
+workers) are reported too, which is where mmap sharing shows up.
+
+Uses test_data/model/model.pkl when present. That file is not checked in,
+so by default an equivalent model is trained from
+test_data/prepared/archive-data.csv (MultiOutputRegressor of a
+100-tree RandomForest on the 9 endpoint features, like train_model.py).
+
+Usage:
+    python src/scripts/benchmark_model_loading.py
+    python src/scripts/benchmark_model_loading.py --workers 4
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ml.model_artifacts import PSUTIL_AVAILABLE, load_model_artifact, save_model_artifact
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+
+def build_test_model(n_estimators: int = 100):
+    """Load test_data/model if it has weights, else train the equivalent model"""
+    model_dir = REPO_ROOT / 'test_data' / 'model'
+    if (model_dir / 'model.pkl').exists():
+        import mlflow.sklearn
+        print(f"Using {model_dir}")
+        return mlflow.sklearn.load_model(str(model_dir))
+    
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+    from ml.pipeline_components.train_model import build_features
+    
+    print("test_data/model has no model.pkl; training the equivalent model...")
+    df = pd.read_csv(REPO_ROOT / 'test_data' / 'prepared' / 'archive-data.csv')
+    X = build_features(df).values
+    y = df[['archived_gb', 'savings_gb']].values
+    return MultiOutputRegressor(
+        RandomForestRegressor(n_estimators=n_estimators, random_state=42)
+    ).fit(X, y)
+
+
+def _worker(artifact_dir: str, mmap_mode, queue):
+    """Load the model in a fresh process and report its cost"""
+    process_start = time.perf_counter()
+    # Import the estimator modules first so load time excludes library imports
+    import sklearn.ensemble, sklearn.multioutput  # noqa: F401
+    import_seconds = time.perf_counter() - process_start
+    
+    _, stats = load_model_artifact(artifact_dir, mmap_mode=mmap_mode)
+    stats['import_seconds'] = import_seconds
+    stats['ready_seconds'] = time.perf_counter() - process_start
+    
+    if PSUTIL_AVAILABLE:
+        import psutil
+        info = psutil.Process().memory_full_info()
+        stats['uss_mb'] = info.uss / (1024 * 1024)
+        stats['pss_mb'] = getattr(info, 'pss', 0) / (1024 * 1024)
+    
+    queue.put(stats)
+    # Stay alive until the parent has collected every worker, so shared
+    # pages are counted while all workers hold them
+    time.sleep(1.0)
+
+
+def run_workers(artifact_dir: Path, mmap_mode, workers: int):
+    """Start `workers` processes concurrently and collect their stats"""
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(str(artifact_dir), mmap_mode, queue))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get(timeout=120) for _ in procs]
+    for proc in procs:
+        proc.join()
+    return results
+
+
+def summarize(name: str, results):
+    """Print mean per-worker figures"""
+    def mean(key):
+        values = [r[key] for r in results if r.get(key) is not None]
+        return float(np.mean(values)) if values else float('nan')
+    
+    print(f"\n{name}")
+    print(f"  sklearn import:  {mean('import_seconds') * 1000:8.1f} ms")
+    print(f"  Load:            {mean('load_seconds') * 1000:8.1f} ms")
+    print(f"  Warm-up:         {mean('warm_up_seconds') * 1000:8.1f} ms")
+    print(f"  Ready (total):   {mean('ready_seconds') * 1000:8.1f} ms")
+    print(f"  RSS growth:      {mean('rss_delta_mb'):8.1f} MB/worker")
+    if PSUTIL_AVAILABLE:
+        print(f"  USS (private):   {mean('uss_mb'):8.1f} MB/worker")
+        print(f"  PSS:             {mean('pss_mb'):8.1f} MB/worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark model cold start and memory')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes per mode')
+    parser.add_argument('--n-estimators', type=int, default=100, help='Trees when training the test model')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("Model Loading Benchmark")
+    print("=" * 60)
+    
+    model = build_test_model(args.n_estimators)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = save_model_artifact(model, Path(tmp) / 'forecast_model')
+        size_mb = (artifact_dir / 'model.joblib').stat().st_size / (1024 * 1024)
+        print(f"Artifact: {size_mb:.1f} MB, {args.workers} workers per mode")
+        
+        summarize("Private copy (mmap_mode=None)", run_workers(artifact_dir, None, args.workers))
+        summarize("Memory-mapped (mmap_mode='r')", run_workers(artifact_dir, 'r', args.workers))
+    
+    print("\n" + "=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Local Mock Azure ML Endpoint
+
+Serves the same request/response format as the Azure ML online endpoint so the
+endpoint clients can be tested and benchmarked without network access.
+
+Request:  {"input_data": {"columns": [...], "index": [...], "data": [...]}}
+Response: [[archived_gb, savings_gb], ...]  (one pair per input row)
+
+Rows with a negative total_files are treated as poison and make the whole
+request fail with HTTP 500, which lets tests exercise partial failures.
+
+Usage:
+    from scripts.mock_endpoint_server import MockEndpointServer
+    
+    with MockEndpointServer(latency_s=0.05, max_concurrency=10) as server:
+        os.environ['MLFLOW_ENDPOINT'] = server.url
+        ...
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _MockEndpointHandler(BaseHTTPRequestHandler):
+    """Request handler scoring rows with a deterministic formula"""
+    
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        
+        with server.slots:
+            with server.stats_lock:
+                server.request_count += 1
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                time.sleep(server.latency_s)
+                status, response = self._score(body)
+            finally:
+                with server.stats_lock:
+                    server.in_flight -= 1
+        
+        payload = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _score(self, body: dict):
+        input_data = body.get('input_data', {})
+        columns = input_data.get('columns', [])
+        data = input_data.get('data', [])
+        
+        if 'total_files' not in columns or 'avg_file_size_mb' not in columns:
+            return 424, {'error': 'missing input columns'}
+        
+        files_idx = columns.index('total_files')
+        size_idx = columns.index('avg_file_size_mb')
+        
+        predictions = []
+        for row in data:
+            if row[files_idx] < 0:
+                return 500, {'error': 'poison row'}
+            archived_gb = row[files_idx] * row[size_idx] / 1024
+            predictions.append([archived_gb, archived_gb * 0.48])
+        return 200, predictions
+    
+    def log_message(self, format, *args):
+        """Silence per-request logging"""
+        pass
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for concurrent benchmarks"""
+    
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockEndpointServer:
+    """Threaded local HTTP server mimicking the Azure ML scoring endpoint"""
+    
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        max_concurrency: int = 10,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        """
+        Create the server (call start() or use as a context manager)
+        
+        Args:
+            latency_s: Simulated inference latency per request (default: 0.0)
+            max_concurrency: Requests served in parallel, like the deployment's
+                max_concurrent_requests_per_instance (default: 10)
+            host: Bind address (default: 127.0.0.1)
+            port: Bind port, 0 picks a free port (default: 0)
+        """
+        self.httpd = _MockHTTPServer((host, port), _MockEndpointHandler)
+        self.httpd.latency_s = latency_s
+        self.httpd.slots = threading.BoundedSemaphore(max_concurrency)
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.in_flight = 0
+        self.httpd.max_in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Scoring URL of the running server"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/score"
+    
+    @property
+    def request_count(self) -> int:
+        """Number of requests served so far"""
+        return self.httpd.request_count
+    
+    @property
+    def max_in_flight(self) -> int:
+        """Highest number of requests served concurrently"""
+        return self.httpd.max_in_flight
+    
+    def start(self) -> 'MockEndpointServer':
+        """Start serving on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the server and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Run a local mock Azure ML endpoint')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated latency (seconds)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Max concurrent requests')
+    args = parser.parse_args()
+    
+    server = MockEndpointServer(latency_s=args.latency, max_concurrency=args.concurrency, port=args.port)
+    print(f"Mock endpoint listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -1,21 +1,67 @@
 """
 Promote MLflow Model to Azure ML Model Registry
-Registers a model from local MLflow to Azure ML Studio
+Registers a model from local MLflow (or the local model registry) to Azure ML Studio
+
+Artifacts are identified by content digest: promoting an artifact that was
+already uploaded to the same Azure model name is skipped without connecting
+to Azure (--force uploads anyway).
 """
 import json
 import os
+import sys
 import argparse
 import logging
 import subprocess
+from pathlib import Path
 from azure.ai.ml import MLClient
 from azure.ai.ml.entities import Model
 from azure.identity import AzureCliCredential, DefaultAzureCredential
 import mlflow
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ml.model_registry import artifact_digest, get_registry, parse_model_ref
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def find_mlflow_model_path(model_name: str, model_version: str) -> str:
+    """Locate the artifacts of a registered MLflow model version under ./mlruns"""
+    print(f"\n🔍 Retrieving MLflow model...")
+    try:
+        mlflow.set_tracking_uri("file:./mlruns")
+        client = mlflow.tracking.MlflowClient()
+        
+        # Get model version details
+        model_version_info = client.get_model_version(model_name, model_version)
+        run_id = model_version_info.run_id
+        model_uri = model_version_info.source
+        
+        print(f"✅ MLflow Model Found:")
+        print(f"   Name: {model_name}")
+        print(f"   Version: {model_version}")
+        print(f"   Run ID: {run_id}")
+        print(f"   URI: {model_uri}")
+    except Exception as e:
+        logger.error(f"❌ Failed to find MLflow model: {e}")
+        print(f"\nAvailable models: {[m.name for m in client.search_registered_models()]}")
+        raise
+    
+    # MLflow stores registered models in: mlruns/{experiment_id}/models/{model_hash}/artifacts
+    mlruns_root = "mlruns"
+    for exp_dir in os.listdir(mlruns_root):
+        models_dir = os.path.join(mlruns_root, exp_dir, "models")
+        if os.path.isdir(models_dir):
+            for model_dir in os.listdir(models_dir):
+                model_candidate = os.path.join(models_dir, model_dir, "artifacts")
+                if os.path.isdir(model_candidate) and os.path.exists(os.path.join(model_candidate, "MLmodel")):
+                    print(f"✅ Found model at: {os.path.abspath(model_candidate)}")
+                    return model_candidate
+    
+    raise FileNotFoundError("Could not find MLflow model artifacts directory with MLmodel file")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Promote MLflow model to Azure ML Studio"
@@ -23,7 +69,6 @@ def main():
     parser.add_argument(
         "--model_name",
         type=str,
-        required=True,
         help="Name of model in MLflow to promote"
     )
     parser.add_argument(
@@ -32,18 +77,59 @@ def main():
         default="1",
         help="Version of model in MLflow (default: 1)"
     )
+    parser.add_argument(
+        "--registry_ref",
+        type=str,
+        help="Promote from the local model registry instead: name@alias or name@version"
+    )
+    parser.add_argument(
+        "--registry_dir",
+        type=str,
+        default=None,
+        help="Local model registry directory (default: MODEL_REGISTRY_DIR or model_registry)"
+    )
     parser.add_argument(
         "--azure_model_name",
         type=str,
         required=True,
         help="Name for model in Azure ML (can be same as model_name)"
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Upload even if this exact artifact was promoted before"
+    )
     args = parser.parse_args()
+    if not args.model_name and not args.registry_ref:
+        parser.error("one of --model_name or --registry_ref is required")
     
     print("=" * 80)
     print("MLflow → Azure ML Model Promotion")
     print("=" * 80)
     
+    # --- Locate model artifacts ---
+    registry = get_registry(args.registry_dir)
+    if args.registry_ref:
+        name, ref = parse_model_ref(args.registry_ref)
+        record = registry.get_version(name, ref)
+        model_path = record['path']
+        model_type = "custom_model"
+        source = f"local registry: {name} v{record['version']} ({ref})"
+        print(f"\n✅ Registry Model Found: {name} v{record['version']} at {os.path.abspath(model_path)}")
+    else:
+        model_path = find_mlflow_model_path(args.model_name, args.model_version)
+        model_type = "mlflow_model"
+        source = f"MLflow: {args.model_name}"
+    
+    # --- Skip unchanged artifacts ---
+    digest, files = artifact_digest(model_path)
+    promoted_version = registry.get_promotion(args.azure_model_name, digest)
+    print(f"\n🔑 Artifact digest: {digest[:12]} ({len(files)} files)")
+    if promoted_version is not None and not args.force:
+        print(f"\n⏭️  Unchanged: already registered as {args.azure_model_name} v{promoted_version}")
+        print("   Nothing uploaded (use --force to upload again)")
+        return
+    
     # --- Load Azure configuration ---
     config_path = "azure_config.json"
     if not os.path.exists(config_path):
@@ -64,7 +150,7 @@ def main():
     print(f"  Resource Group: {resource_group}")
     print(f"  Workspace: {workspace_name}")
     print(f"\n🔄 Model Details:")
-    print(f"  MLflow Model: {args.model_name} (v{args.model_version})")
+    print(f"  Source: {source}")
     print(f"  Azure ML Name: {args.azure_model_name}")
     
     # --- Connect to Azure ML ---
@@ -100,84 +186,19 @@ def main():
         print("   4. Try again")
         raise
     
-    # --- Get MLflow model ---
-    print(f"\n🔍 Retrieving MLflow model...")
-    try:
-        mlflow.set_tracking_uri("file:./mlruns")
-        client = mlflow.tracking.MlflowClient()
-        
-        # Get model version details
-        model_version = client.get_model_version(args.model_name, args.model_version)
-        run_id = model_version.run_id
-        model_uri = model_version.source
-        
-        print(f"✅ MLflow Model Found:")
-        print(f"   Name: {args.model_name}")
-        print(f"   Version: {args.model_version}")
-        print(f"   Run ID: {run_id}")
-        print(f"   URI: {model_uri}")
-        
-        # Convert MLflow URI to actual file path
-        # MLflow URI is like: models:/m-xxxxx
-        # We need to find the actual model directory in mlruns
-        if model_uri.startswith("models:/"):
-            # Extract the model hash from the URI
-            model_hash = model_uri.replace("models:/", "")
-            # Look in mlruns for the model directory
-            mlruns_path = os.path.join("mlruns", run_id, "artifacts")
-            if os.path.exists(mlruns_path):
-                model_path = os.path.join(mlruns_path, "model")
-                if os.path.exists(model_path):
-                    print(f"   Local Path: {os.path.abspath(model_path)}")
-                else:
-                    # Try to find model directory
-                    for root, dirs, files in os.walk(mlruns_path):
-                        if "model.pkl" in files or "MLmodel" in files:
-                            model_path = root
-                            print(f"   Local Path: {os.path.abspath(model_path)}")
-                            break
-        else:
-            model_path = model_uri
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to find MLflow model: {e}")
-        print(f"\nAvailable models: {[m.name for m in client.search_registered_models()]}")
-        raise
-    
     # --- Register model in Azure ML ---
     print(f"\n📤 Registering model in Azure ML Studio...")
     try:
-        # Build the correct path to the model artifacts
-        # MLflow stores registered models in: mlruns/{experiment_id}/models/{model_hash}/artifacts
-        mlruns_root = "mlruns"
-        
-        # Find the model directory
-        model_path = None
-        for exp_dir in os.listdir(mlruns_root):
-            models_dir = os.path.join(mlruns_root, exp_dir, "models")
-            if os.path.isdir(models_dir):
-                for model_dir in os.listdir(models_dir):
-                    model_candidate = os.path.join(models_dir, model_dir, "artifacts")
-                    if os.path.isdir(model_candidate) and os.path.exists(os.path.join(model_candidate, "MLmodel")):
-                        # Found it!
-                        model_path = model_candidate
-                        print(f"✅ Found model at: {os.path.abspath(model_path)}")
-                        break
-                if model_path:
-                    break
-        
-        if not model_path:
-            raise FileNotFoundError("Could not find MLflow model artifacts directory with MLmodel file")
-        
-        # Register model in Azure ML
         model = Model(
             path=model_path,
             name=args.azure_model_name,
-            description=f"Promoted from MLflow: {args.model_name}",
-            type="mlflow_model"
+            description=f"Promoted from {source}",
+            type=model_type,
+            tags={"content_digest": digest}
         )
         
         registered_model = ml_client.models.create_or_update(model)
+        registry.record_promotion(args.azure_model_name, digest, registered_model.version)
         
         print(f"✅ Model registered in Azure ML:")
         print(f"   Name: {registered_model.name}")
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 import sys
 from pathlib import Path
 import json
+from typing import Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -156,7 +157,8 @@ def create_monitoring_dashboard():
     
     st.subheader("🔍 Monitoring Dashboard")
     
-    # Initialize monitoring components
+    # Initialize monitoring components (built on every rerun; the open-alert
+    # badge count is cached per database file, not per AlertManager)
     db = PredictionsDB('monitoring.db')
     detector = DriftDetector()
     manager = AlertManager(db)
@@ -199,11 +201,14 @@ def display_active_alerts(manager: AlertManager):
     summary = manager.get_alert_summary(days=7)
     
     # Summary metrics
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         st.metric("Total Alerts", summary['total_alerts'])
     
+    with col5:
+        st.metric("🔔 Open", max(manager.get_open_alert_count(), 0))
+    
     with col2:
         st.metric("🚨 Critical", summary['critical_count'], 
                  delta_color="inverse" if summary['critical_count'] > 0 else "off")
@@ -217,8 +222,9 @@ def display_active_alerts(manager: AlertManager):
     
     st.divider()
     
-    # Active alerts table
-    alerts = manager.get_active_alerts(days=7)
+    # Active (open) alerts table
+    alerts = manager.get_active_alerts()
+    actionable = bool(alerts)
     
     # Use mock data as fallback if no alerts in database
     if not alerts:
@@ -268,13 +274,13 @@ def display_active_alerts(manager: AlertManager):
         # Display alerts
         if filtered_alerts:
             for alert in filtered_alerts:
-                display_alert_card(alert)
+                display_alert_card(alert, manager if actionable else None)
         else:
             st.info("No alerts matching filters")
 
 
-def display_alert_card(alert: dict):
-    """Display individual alert card with formatting"""
+def display_alert_card(alert: dict, manager: Optional[AlertManager] = None):
+    """Display individual alert card with formatting (and lifecycle actions when a manager is given)"""
     
     # Color based on severity
     severity_colors = {
@@ -310,6 +316,14 @@ def display_alert_card(alert: dict):
         with col3:
             st.markdown(f"<span style='color: {color}; font-weight: bold;'>{alert['severity'].upper()}</span>", 
                        unsafe_allow_html=True)
+            
+            if manager is not None and alert.get('id'):
+                if st.button("Acknowledge", key=f"ack_{alert['id']}"):
+                    manager.acknowledge_alert(int(alert['id']))
+                    st.rerun()
+                if st.button("Resolve", key=f"resolve_{alert['id']}"):
+                    manager.resolve_alert(int(alert['id']))
+                    st.rerun()
 
 
 def display_prediction_history(db: PredictionsDB):
@@ -253,7 +253,7 @@ def create_historical_vs_predicted_chart(df_historical, df_predicted):
         marker=dict(size=6)
     ))
     
-    # Add confidence interval if available (for mock data compatibility)
+    # Add interval band if available (forest prediction intervals, or mock data)
     if 'confidence_upper' in df_predicted.columns and 'confidence_lower' in df_predicted.columns:
         fig.add_trace(go.Scatter(
             x=df_predicted['date'].tolist() + df_predicted['date'].tolist()[::-1],
@@ -262,7 +262,7 @@ def create_historical_vs_predicted_chart(df_historical, df_predicted):
             fill='toself',
             fillcolor='rgba(255, 127, 14, 0.2)',
             line=dict(color='rgba(255,255,255,0)'),
-            name='95% Confidence Interval',
+            name='Prediction Interval',
             hoverinfo='skip'
         ))
     
@@ -1344,8 +1344,17 @@ def main():
         if AZURE_ML_AVAILABLE:
             st.info("🔄 Fetching predictions from Azure ML endpoint...")
             client = AzureMLEndpointClient()
-            df_predicted, metrics = client.get_predictions(df_historical, forecast_days=90)
-            st.success("✅ Real predictions loaded from Azure ML!")
+            # One endpoint call for both the forecast and model metrics
+            df_predicted, metrics = client.get_forecast_and_metrics(df_historical, forecast_days=90)
+            if metrics.get('source') == 'local_fallback':
+                breaker = client.get_breaker_status()
+                st.warning(
+                    f"⚠️ Azure ML endpoint circuit is {breaker['state']} "
+                    f"({breaker['consecutive_failures']} consecutive failures). "
+                    f"Predictions served by the local fallback model."
+                )
+            else:
+                st.success("✅ Real predictions loaded from Azure ML!")
         else:
             st.warning("⚠️ Azure ML endpoint not available, using mock predictions")
             df_predicted = get_mock_prediction()
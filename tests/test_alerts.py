@@ -0,0 +1,386 @@
+"""
+Alert Storage Tests
+
+Test Coverage:
+1. Alert fields stored in structured, indexed monitoring_events columns
+2. Migration backfills alerts written before the columns existed
+3. Summary counts come from one GROUP BY query
+4. Fingerprint deduplication (also across managers), suppression windows and escalation
+5. Lifecycle states, the partial open-alert index and the cached open count
+"""
+
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.alerts import AlertManager
+from monitoring.predictions_db import PredictionsDB
+
+
+ANOMALY_DRIFT = {
+    'overall_drift_detected': True,
+    'anomalies': {'has_anomalies': True, 'anomaly_count': 3, 'max_z_score': 2.5},
+    'distribution_drift': {'has_drift': False, 'p_value': 0.87},
+    'trend_drift': {'has_trend_drift': False}
+}
+
+MULTI_DRIFT = {
+    'overall_drift_detected': True,
+    'anomalies': {'has_anomalies': True, 'anomaly_count': 4, 'max_z_score': 3.1},
+    'distribution_drift': {'has_drift': True, 'p_value': 0.01, 'mean_change_pct': 20.5},
+    'trend_drift': {'has_trend_drift': True, 'trend_direction': 'up', 'trend_change_pct': 15.2}
+}
+
+
+class TestAlertStorage(unittest.TestCase):
+    """AlertManager on the structured alert columns"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'alerts.db')
+        self.db = PredictionsDB(self.db_path)
+        self.manager = AlertManager(self.db)
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def test_alert_fields_are_columns(self):
+        """save_alert fills alert_type, prediction_date and recommendation"""
+        alert = self.manager.create_alert_from_drift(ANOMALY_DRIFT, '2025-11-14')
+        alert_id = self.manager.save_alert(alert)
+        
+        row = self.db.conn.execute(
+            'SELECT alert_type, prediction_date, recommendation, acknowledged FROM monitoring_events WHERE id = ?',
+            (alert_id,)
+        ).fetchone()
+        self.assertEqual(tuple(row), ('anomaly', '2025-11-14', alert['recommendation'], 0))
+        
+        active = self.manager.get_active_alerts(days=1)
+        self.assertEqual(active[0]['alert_type'], 'anomaly')
+        self.assertEqual(active[0]['prediction_date'], '2025-11-14')
+        self.assertFalse(active[0]['acknowledged'])
+    
+    def test_summary_groups_in_sql(self):
+        """Counts by severity and type"""
+        for series, drift in enumerate((ANOMALY_DRIFT, ANOMALY_DRIFT, MULTI_DRIFT)):
+            self.manager.save_alert(self.manager.create_alert_from_drift(drift, '2025-11-14', series=str(series)))
+        self.db.save_monitoring_event('drift_detected', 'info', 'not an alert')
+        
+        summary = self.manager.get_alert_summary(days=1)
+        self.assertEqual(summary['total_alerts'], 3)
+        self.assertEqual(summary['critical_count'], 1)
+        self.assertEqual(summary['warning_count'], 2)
+        self.assertEqual(summary['by_type'], {'anomaly': 2, 'multi_signal': 1})
+        self.assertEqual(len(self.manager.get_alert_history(days=1, severity='critical')), 1)
+    
+    def test_alert_queries_use_index(self):
+        """The alert window is a range lookup on (event_type, created_at)"""
+        plan = self.db.conn.execute('''
+            EXPLAIN QUERY PLAN
+            SELECT event_severity, alert_type, COUNT(*) FROM monitoring_events
+            WHERE event_type = 'alert' AND created_at >= ?
+            GROUP BY event_severity, alert_type
+        ''', ('2025-01-01 00:00:00',)).fetchall()
+        self.assertIn('idx_monitoring_events_type_created', ' '.join(row[-1] for row in plan))
+    
+    def test_migration_backfills_old_rows(self):
+        """Alerts stored only as JSON metadata get their columns on open"""
+        self.db.close()
+        legacy_path = os.path.join(self.temp_dir, 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('''
+            CREATE TABLE monitoring_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                event_severity TEXT NOT NULL,
+                message TEXT NOT NULL,
+                metadata TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute(
+            'INSERT INTO monitoring_events (event_type, event_severity, message, metadata) VALUES (?, ?, ?, ?)',
+            ('alert', 'critical', 'legacy', json.dumps({
+                'alert_type': 'trend_drift', 'prediction_date': '2025-01-02', 'recommendation': 'watch'
+            }))
+        )
+        conn.execute(
+            'INSERT INTO monitoring_events (event_type, event_severity, message, metadata) VALUES (?, ?, ?, ?)',
+            ('alert', 'warning', 'broken metadata', '{not json')
+        )
+        conn.commit()
+        conn.close()
+        
+        self.db = PredictionsDB(legacy_path)
+        alerts = AlertManager(self.db).get_active_alerts(days=1)
+        
+        self.assertEqual(len(alerts), 2)
+        legacy = [a for a in alerts if a['message'] == 'legacy'][0]
+        self.assertEqual(legacy['alert_type'], 'trend_drift')
+        self.assertEqual(legacy['prediction_date'], '2025-01-02')
+        self.assertEqual(legacy['recommendation'], 'watch')
+
+
+class TestAlertDeduplication(unittest.TestCase):
+    """Repeated alerts update the open alert instead of inserting"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = PredictionsDB(os.path.join(self.temp_dir, 'dedup.db'))
+        self.manager = AlertManager(self.db)
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def _save(self, drift, manager=None, series='default'):
+        manager = manager or self.manager
+        alert = manager.create_alert_from_drift(drift, '2025-11-14', series=series)
+        manager.save_alert(alert)
+        return alert
+    
+    def _alert_rows(self):
+        return self.db.conn.execute(
+            "SELECT id, event_severity, occurrence_count FROM monitoring_events WHERE event_type = 'alert'"
+        ).fetchall()
+    
+    def test_repeats_are_suppressed(self):
+        """Same fingerprint within the window: one row, counted, not notified"""
+        first = self._save(ANOMALY_DRIFT)
+        second = self._save(ANOMALY_DRIFT)
+        
+        self.assertEqual(first['dedup_action'], 'created')
+        self.assertEqual(second['dedup_action'], 'suppressed')
+        self.assertEqual(second['id'], first['id'])
+        self.assertFalse(self.manager.send_notification(second))
+        self.assertEqual([tuple(row)[2] for row in self._alert_rows()], [2])
+    
+    def test_higher_severity_escalates(self):
+        """A critical repeat of an open warning raises its severity"""
+        self._save(ANOMALY_DRIFT)
+        critical = dict(ANOMALY_DRIFT, anomalies={'has_anomalies': True, 'anomaly_count': 3, 'max_z_score': 3.6})
+        escalated = self._save(critical)
+        
+        self.assertEqual(escalated['dedup_action'], 'escalated')
+        self.assertEqual([tuple(row)[1:] for row in self._alert_rows()], [('critical', 2)])
+        
+        # A later warning does not downgrade it
+        self.assertEqual(self._save(ANOMALY_DRIFT)['severity'], 'critical')
+    
+    def test_renotify_after_window(self):
+        """Once the suppression window has passed the open alert is re-notified"""
+        self._save(ANOMALY_DRIFT)
+        later = AlertManager._now() + timedelta(hours=7)
+        with mock.patch.object(AlertManager, '_now', return_value=later):
+            self.assertEqual(self._save(ANOMALY_DRIFT)['dedup_action'], 'renotified')
+            self.assertEqual(self._save(ANOMALY_DRIFT)['dedup_action'], 'suppressed')
+    
+    def test_series_and_type_are_separate(self):
+        """Different series or alert types get their own alerts"""
+        self._save(ANOMALY_DRIFT, series='archived_gb')
+        self._save(ANOMALY_DRIFT, series='savings_gb')
+        self._save(MULTI_DRIFT, series='archived_gb')
+        self.assertEqual(len(self._alert_rows()), 3)
+    
+    def test_index_is_rebuilt_from_database(self):
+        """A new AlertManager deduplicates against alerts saved earlier"""
+        first = self._save(ANOMALY_DRIFT)
+        repeat = self._save(ANOMALY_DRIFT, manager=AlertManager(self.db))
+        self.assertEqual(repeat['id'], first['id'])
+        self.assertEqual(repeat['dedup_action'], 'suppressed')
+
+    def test_alert_opened_by_another_manager(self):
+        """An index miss checks the database, so two managers share one open alert"""
+        other = AlertManager(self.db)
+        self._save(MULTI_DRIFT)  # loads this manager's index
+        self._save(MULTI_DRIFT, manager=other)
+        
+        first = self._save(ANOMALY_DRIFT, manager=other)
+        repeat = self._save(ANOMALY_DRIFT)
+        self.assertEqual(repeat['id'], first['id'])
+        self.assertEqual(repeat['dedup_action'], 'suppressed')
+        self.assertEqual(len(self._alert_rows()), 2)
+        
+        # Opened between the lookup and the insert: the unique index folds it in
+        second = self._save(ANOMALY_DRIFT, series='b', manager=other)
+        lookups = []
+        
+        def stale_lookup(fingerprint):
+            lookups.append(fingerprint)
+            return None if len(lookups) == 1 else PredictionsDB.get_open_alert(self.db, fingerprint)
+        
+        with mock.patch.object(self.db, 'get_open_alert', side_effect=stale_lookup):
+            raced = self._save(ANOMALY_DRIFT, series='b')
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(raced['id'], second['id'])
+        self.assertEqual(raced['dedup_action'], 'suppressed')
+        self.assertEqual(len(self._alert_rows()), 3)
+    
+    def test_one_unresolved_alert_per_fingerprint(self):
+        """The unique index refuses a second unresolved alert until the first is resolved"""
+        first = self.db.save_monitoring_event('alert', 'warning', 'first', fingerprint='fp')
+        self.assertEqual(self.db.save_monitoring_event('alert', 'warning', 'again', fingerprint='fp'), 0)
+        
+        self.db.set_alert_status(first, 'resolved')
+        self.assertGreater(self.db.save_monitoring_event('alert', 'warning', 'new', fingerprint='fp'), first)
+    
+    def test_migration_resolves_duplicate_open_alerts(self):
+        """Databases from before the unique index keep only the newest unresolved duplicate"""
+        self.db.conn.execute('DROP INDEX idx_monitoring_events_open_fingerprint')
+        ids = [self.db.save_monitoring_event('alert', 'warning', str(i), fingerprint='fp') for i in range(3)]
+        path = self.db.db_path
+        self.db.close()
+        
+        self.db = PredictionsDB(path)
+        self.assertEqual([row['id'] for row in self.db.get_open_alerts_by_fingerprint()], [ids[-1]])
+
+
+class TestAlertLifecycle(unittest.TestCase):
+    """open -> acknowledged -> resolved"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = PredictionsDB(os.path.join(self.temp_dir, 'lifecycle.db'))
+        self.manager = AlertManager(self.db)
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def _save(self, drift, series='default'):
+        alert = self.manager.create_alert_from_drift(drift, '2025-11-14', series=series)
+        self.manager.save_alert(alert)
+        return alert
+    
+    def _status(self, event_id):
+        return tuple(self.db.conn.execute(
+            'SELECT status, acknowledged, acknowledged_at IS NOT NULL, resolved_at IS NOT NULL '
+            'FROM monitoring_events WHERE id = ?', (event_id,)
+        ).fetchone())
+    
+    def test_transitions(self):
+        """Acknowledge then resolve; invalid transitions are refused"""
+        alert_id = self._save(ANOMALY_DRIFT)['id']
+        self.assertEqual(self._status(alert_id), ('open', 0, 0, 0))
+        
+        self.assertTrue(self.manager.acknowledge_alert(alert_id))
+        self.assertFalse(self.manager.acknowledge_alert(alert_id))
+        self.assertEqual(self._status(alert_id), ('acknowledged', 1, 1, 0))
+        self.assertEqual(self.manager.get_active_alerts(), [])
+        
+        self.assertTrue(self.manager.resolve_alert(alert_id))
+        self.assertFalse(self.manager.resolve_alert(alert_id))
+        self.assertFalse(self.manager.acknowledge_alert(alert_id))
+        self.assertEqual(self._status(alert_id), ('resolved', 1, 1, 1))
+        self.assertEqual(len(self.manager.get_alert_history(days=1)), 1)
+        
+        with self.assertRaises(ValueError):
+            self.db.set_alert_status(alert_id, 'open')
+    
+    def test_acknowledged_repeats_and_escalation(self):
+        """Acknowledged alerts stay quiet until they escalate, which reopens them"""
+        alert_id = self._save(ANOMALY_DRIFT)['id']
+        self.manager.acknowledge_alert(alert_id)
+        
+        later = AlertManager._now() + timedelta(hours=7)
+        with mock.patch.object(AlertManager, '_now', return_value=later):
+            self.assertEqual(self._save(ANOMALY_DRIFT)['dedup_action'], 'suppressed')
+        
+        critical = dict(ANOMALY_DRIFT, anomalies={'has_anomalies': True, 'anomaly_count': 3, 'max_z_score': 3.6})
+        escalated = self._save(critical)
+        self.assertEqual(escalated['dedup_action'], 'escalated')
+        self.assertEqual(escalated['id'], alert_id)
+        self.assertEqual(self._status(alert_id)[0], 'open')
+    
+    def test_resolved_alert_is_not_reused(self):
+        """A repeat after resolution opens a new alert, also for a fresh manager"""
+        first = self._save(ANOMALY_DRIFT)['id']
+        self.manager.resolve_alert(first)
+        
+        second = self._save(ANOMALY_DRIFT)
+        self.assertEqual(second['dedup_action'], 'created')
+        self.assertNotEqual(second['id'], first)
+        
+        repeat = AlertManager(self.db).create_alert_from_drift(ANOMALY_DRIFT, '2025-11-14')
+        AlertManager(self.db).save_alert(repeat)
+        self.assertEqual(repeat['id'], second['id'])
+    
+    def test_alert_resolved_by_another_manager(self):
+        """A repeat of an alert resolved through another manager opens a new alert"""
+        first = self._save(ANOMALY_DRIFT)['id']
+        self.assertTrue(AlertManager(self.db).resolve_alert(first))
+        
+        repeat = self._save(ANOMALY_DRIFT)
+        self.assertEqual(repeat['dedup_action'], 'created')
+        self.assertNotEqual(repeat['id'], first)
+        self.assertEqual(self._status(first)[0], 'resolved')
+        self.assertEqual(self.db.count_open_alerts(), 1)
+        self.assertEqual(self._save(ANOMALY_DRIFT)['id'], repeat['id'])
+    
+    def test_open_alert_queries_use_partial_index(self):
+        """Open-alert lookups and counts are served by the partial status index"""
+        for query in (
+            "SELECT COUNT(*) FROM monitoring_events WHERE event_type = 'alert' AND status = 'open'",
+            "SELECT * FROM monitoring_events WHERE event_type = 'alert' AND status = 'open' ORDER BY created_at DESC"
+        ):
+            plan = ' '.join(row[-1] for row in self.db.conn.execute('EXPLAIN QUERY PLAN ' + query))
+            self.assertIn('idx_monitoring_events_alert_status', plan)
+    
+    def test_open_count_is_cached(self):
+        """The badge count is cached per database and refreshed by any manager's changes"""
+        first = self._save(ANOMALY_DRIFT, series='a')['id']
+        second = self._save(ANOMALY_DRIFT, series='b')['id']
+        self.assertEqual(self.manager.get_open_alert_count(), 2)
+        
+        with mock.patch.object(self.db, 'count_open_alerts', wraps=self.db.count_open_alerts) as counter:
+            self.assertEqual(self.manager.get_open_alert_count(), 2)
+            counter.assert_not_called()
+            
+            self.manager.acknowledge_alert(first)
+            self.assertEqual(self.manager.get_open_alert_count(), 1)
+            self.assertEqual(counter.call_count, 1)
+            
+            # A new manager on the same file (a dashboard rerun) reuses the count
+            rerun = AlertManager(PredictionsDB(self.db.db_path))
+            self.addCleanup(rerun.db.close)
+            self.assertEqual(rerun.get_open_alert_count(), 1)
+            self.assertEqual(counter.call_count, 1)
+            
+            # Its changes refresh the shared count too
+            rerun.save_alert(rerun.create_alert_from_drift(ANOMALY_DRIFT, '2025-11-14', series='c'))
+            self.assertEqual(self.manager.get_open_alert_count(), 2)
+            self.assertEqual(counter.call_count, 2)
+            
+            # Changes made outside any manager show up once the TTL has passed
+            self.db.set_alert_status(second, 'resolved')
+            self.assertEqual(self.manager.get_open_alert_count(), 2)
+            self.assertEqual(self.manager.get_open_alert_count(max_age=0), 1)
+    
+    def test_migration_maps_acknowledged_rows(self):
+        """Databases from before the status column keep their acknowledgements"""
+        alert_id = self._save(ANOMALY_DRIFT)['id']
+        self.db.conn.execute('UPDATE monitoring_events SET acknowledged = 1 WHERE id = ?', (alert_id,))
+        self.db.conn.execute('DROP INDEX idx_monitoring_events_fingerprint_status')
+        self.db.conn.execute('DROP INDEX idx_monitoring_events_open_fingerprint')
+        self.db.conn.execute('DROP INDEX idx_monitoring_events_alert_status')
+        self.db.conn.execute('ALTER TABLE monitoring_events DROP COLUMN status')
+        self.db.conn.execute('ALTER TABLE monitoring_events DROP COLUMN resolved_at')
+        self.db.conn.commit()
+        path = self.db.db_path
+        self.db.close()
+        
+        self.db = PredictionsDB(path)
+        self.assertEqual(self._status(alert_id)[0], 'acknowledged')
+
+
+if __name__ == '__main__':
+    unittest.main()
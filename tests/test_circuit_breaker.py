@@ -0,0 +1,180 @@
+"""
+Circuit Breaker Tests
+
+Covers the breaker state machine and the endpoint client's degraded mode
+against the local mock endpoint server.
+
+Test Coverage:
+1. closed -> open -> half_open -> closed/open transitions
+2. Short-circuited requests served by the local fallback model
+3. Fast failure when no fallback model is available
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+from pathlib import Path
+from unittest import mock
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.azure_endpoint_client import AzureMLEndpointClient, EndpointServerError
+from ml.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from scripts.mock_endpoint_server import MockEndpointServer
+from tests.test_endpoint_client import _make_history
+
+
+class TestCircuitBreakerStates(unittest.TestCase):
+    """Breaker state machine with a fake clock"""
+    
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=10,
+                                      clock=lambda: self.now)
+    
+    def _fail(self, times: int):
+        for _ in range(times):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_failure()
+    
+    def test_opens_after_consecutive_failures(self):
+        """Trips on the threshold-th consecutive failure only"""
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self._fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.get_status()['short_circuited_requests'], 1)
+    
+    def test_success_resets_failure_count(self):
+        """A success between failures keeps the circuit closed"""
+        self._fail(2)
+        self.breaker.record_success()
+        self._fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+    
+    def test_half_open_admits_single_probe(self):
+        """After reset_timeout exactly one probe is let through"""
+        self._fail(3)
+        self.now = 9.9
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now = 10.0
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+    
+    def test_probe_outcome(self):
+        """Successful probe closes; failed probe re-opens for another interval"""
+        self._fail(3)
+        self.now = 10.0
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertAlmostEqual(self.breaker.get_status()['next_probe_in_seconds'], 10.0)
+        
+        self.now = 20.0
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.get_status()['times_opened'], 2)
+
+    def test_released_probe_admits_next(self):
+        """An abandoned probe frees the slot without changing state"""
+        self._fail(3)
+        self.now = 10.0
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.release_probe()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+
+class TestClientDegradedMode(unittest.TestCase):
+    """Endpoint client behaviour while the circuit is open"""
+    
+    def setUp(self):
+        self.server = MockEndpointServer(latency_s=0.2).start()
+        self.model_dir = tempfile.mkdtemp()
+        self.env = mock.patch.dict(os.environ, {
+            'MLFLOW_ENDPOINT': self.server.url,
+            'MLFLOW_API_KEY': 'test-key',
+            'MLFLOW_BREAKER_THRESHOLD': '2',
+            'MLFLOW_BREAKER_RESET_SECONDS': '60',
+            'LOCAL_MODEL_DIR': self.model_dir
+        })
+        self.env.start()
+    
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+    
+    def _save_local_model(self):
+        """Fit a small 2-output model on the 9 endpoint features"""
+        client = AzureMLEndpointClient()
+        payload = client.prepare_request_payload(_make_history(40))
+        X = np.array(payload['input_data']['data'])
+        y = np.column_stack([X[:, 0] / 1000, X[:, 0] / 2000])
+        joblib.dump(LinearRegression().fit(X, y), Path(self.model_dir) / 'model.joblib')
+    
+    def _trip(self, client):
+        """Send poison frames until the breaker opens"""
+        poison = _make_history(5)
+        poison['total_files'] = -1
+        for _ in range(client.breaker.failure_threshold):
+            with self.assertRaises(EndpointServerError):
+                client.call_endpoint(poison)
+        self.assertEqual(client.breaker.state, OPEN)
+    
+    def test_open_circuit_uses_local_model(self):
+        """Requests skip the endpoint and come back from the local model"""
+        self._save_local_model()
+        client = AzureMLEndpointClient()
+        self._trip(client)
+        served = self.server.request_count
+        
+        start = time.perf_counter()
+        forecast_df, metrics = client.get_predictions(_make_history(30))
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(metrics['source'], 'local_fallback')
+        self.assertEqual(len(forecast_df), 30)
+        self.assertFalse(forecast_df['archived_gb'].isna().any())
+        self.assertEqual(self.server.request_count, served)
+        self.assertLess(elapsed, 0.2)
+        self.assertTrue(client.get_breaker_status()['fallback_model']['available'])
+    
+    def test_open_circuit_without_model_fails_fast(self):
+        """With no local model the client raises CircuitOpenError immediately"""
+        client = AzureMLEndpointClient()
+        self._trip(client)
+        
+        start = time.perf_counter()
+        with self.assertRaises(CircuitOpenError):
+            client.call_endpoint(_make_history(10))
+        self.assertLess(time.perf_counter() - start, 0.2)
+    
+    def test_open_circuit_chunk_not_retried(self):
+        """A short-circuited chunk fails once instead of chunk_retries + 1 times"""
+        client = AzureMLEndpointClient(chunk_retries=3)
+        self._trip(client)
+        
+        result, error = client._call_chunk(_make_history(10))
+        self.assertIsNone(result)
+        self.assertIsInstance(error, CircuitOpenError)
+        self.assertEqual(client.get_breaker_status()['short_circuited_requests'], 1)
+    
+    def test_breaker_shared_across_clients(self):
+        """A new client for the same endpoint sees the open circuit"""
+        self._trip(AzureMLEndpointClient())
+        self.assertEqual(AzureMLEndpointClient().breaker.state, OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+"""
+Connection Pool and Cloud FeedbackDB Tests
+
+psycopg2/pyodbc are not needed: the postgres code path runs against a small
+SQLite shim that rewrites the PostgreSQL dialect used by feedback_db_cloud.
+
+Test Coverage:
+1. Pool reuse, size limit and checkout timeout
+2. Health check and reconnect after a dropped connection
+3. Cloud FeedbackDB (postgres dialect) parameterized queries and bulk insert
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.db_pool import ConnectionPool, is_disconnect_error
+from monitoring.feedback_db_cloud import FeedbackDB
+
+
+def _to_sqlite_params(params) -> tuple:
+    """Bind datetimes the way they are stored (SQLite has no timestamp type)"""
+    return tuple(p.strftime('%Y-%m-%d %H:%M:%S') if isinstance(p, datetime) else p for p in params)
+
+
+def _to_sqlite(query: str) -> str:
+    """Rewrite the PostgreSQL SQL used by FeedbackDB into SQLite"""
+    if 'ADD COLUMN IF NOT EXISTS' in query:
+        # Column migrations: the fresh test tables already have every column
+        return 'SELECT 1'
+    query = query.replace('SERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+    return query.replace('%s', '?')
+
+
+class _ShimCursor:
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+    
+    def execute(self, query, params=()):
+        self._conn.check()
+        self._conn.statements.append(query)
+        self._cursor.execute(_to_sqlite(query), _to_sqlite_params(params))
+    
+    def executemany(self, query, rows):
+        self._conn.check()
+        self._conn.statements.append(query)
+        self._cursor.executemany(_to_sqlite(query), rows)
+    
+    def fetchone(self):
+        return self._cursor.fetchone()
+    
+    def fetchall(self):
+        return self._cursor.fetchall()
+    
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+    
+    @property
+    def description(self):
+        return self._cursor.description
+    
+    def close(self):
+        self._cursor.close()
+
+
+class _ShimConnection:
+    """DB-API connection speaking the PostgreSQL dialect over SQLite"""
+    
+    def __init__(self, db_path: str, statements: list):
+        self.raw = sqlite3.connect(db_path, check_same_thread=False)
+        self.statements = statements
+        self.broken = False
+        self.closed = False
+    
+    def check(self):
+        if self.broken:
+            raise sqlite3.OperationalError("server closed the connection unexpectedly")
+    
+    def cursor(self):
+        return _ShimCursor(self)
+    
+    def commit(self):
+        self.raw.commit()
+    
+    def rollback(self):
+        self.raw.rollback()
+    
+    def close(self):
+        self.closed = True
+        self.raw.close()
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Pool checkout, limits and recovery"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'pool.db')
+        self.statements = []
+        self.opened = []
+    
+    def _connect(self):
+        conn = _ShimConnection(self.db_path, self.statements)
+        self.opened.append(conn)
+        return conn
+    
+    def test_connections_are_reused(self):
+        """Sequential borrows share one connection"""
+        pool = ConnectionPool(self._connect, max_size=3)
+        for _ in range(5):
+            pool.run(lambda conn: conn.cursor().execute('SELECT 1'))
+        
+        stats = pool.get_stats()
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['reused'], 4)
+        self.assertEqual(stats['idle'], 1)
+    
+    def test_checkout_times_out_when_exhausted(self):
+        """A full pool raises TimeoutError instead of opening more connections"""
+        pool = ConnectionPool(self._connect, max_size=1, timeout=0.05)
+        with pool.connection():
+            with self.assertRaises(TimeoutError):
+                with pool.connection():
+                    pass
+        self.assertEqual(len(self.opened), 1)
+    
+    def test_waiting_thread_gets_returned_connection(self):
+        """A blocked checkout proceeds once a connection is returned"""
+        pool = ConnectionPool(self._connect, max_size=1, timeout=5)
+        released = threading.Event()
+        results = []
+        
+        def borrower():
+            released.wait()
+            with pool.connection() as conn:
+                results.append(conn)
+        
+        with pool.connection() as first:
+            thread = threading.Thread(target=borrower)
+            thread.start()
+            released.set()
+        thread.join(timeout=5)
+        
+        self.assertEqual(results, [first])
+    
+    def test_stale_connection_fails_health_check(self):
+        """Idle connections are validated and replaced when broken"""
+        pool = ConnectionPool(self._connect, max_size=2, health_check_interval=0)
+        pool.run(lambda conn: None)
+        self.opened[0].broken = True
+        
+        pool.run(lambda conn: conn.cursor().execute('SELECT 1'))
+        
+        stats = pool.get_stats()
+        self.assertEqual(stats['health_check_failures'], 1)
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(stats['open'], 1)
+    
+    def test_run_reconnects_after_disconnect(self):
+        """A disconnect mid-operation is retried on a fresh connection"""
+        pool = ConnectionPool(self._connect, max_size=2, health_check_interval=3600)
+        pool.run(lambda conn: None)
+        self.opened[0].broken = True
+        
+        def operation(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT 42')
+            return cursor.fetchone()[0]
+        
+        self.assertEqual(pool.run(operation), 42)
+        stats = pool.get_stats()
+        self.assertEqual(stats['reconnects'], 1)
+        self.assertEqual(stats['discarded'], 1)
+    
+    def test_other_errors_keep_connection(self):
+        """SQL errors roll back but the connection stays pooled"""
+        pool = ConnectionPool(self._connect, max_size=2)
+        
+        def operation(conn):
+            raise sqlite3.IntegrityError("UNIQUE constraint failed")
+        
+        with self.assertRaises(sqlite3.IntegrityError):
+            pool.run(operation)
+        self.assertEqual(pool.get_stats()['idle'], 1)
+        self.assertFalse(is_disconnect_error(ValueError('invalid literal')))
+        self.assertTrue(is_disconnect_error(Exception('08S01', 'Communication link failure')))
+
+
+class TestCloudFeedbackDB(unittest.TestCase):
+    """Cloud FeedbackDB (postgres dialect) through the pool"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'cloud.db')
+        self.statements = []
+        self.db = FeedbackDB(use_cloud=True, cloud_config={
+            'provider': 'postgres',
+            'pool_size': 2,
+            'connection_factory': lambda: _ShimConnection(self.db_path, self.statements)
+        })
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def _record(self, i: int, status: str = 'correct') -> dict:
+        return {
+            'prediction_id': i,
+            'prediction_date': (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d'),
+            'predicted_value': 10.0 + i,
+            'actual_value': 10.5 + i,
+            'feedback_status': status
+        }
+    
+    def test_submit_returns_real_ids(self):
+        """RETURNING id gives each insert its own id"""
+        first = self.db.submit_feedback(**self._record(1))
+        second = self.db.submit_feedback(**self._record(2))
+        self.assertGreater(first, 0)
+        self.assertEqual(second, first + 1)
+    
+    def test_queries_are_parameterized(self):
+        """days/limit are bound parameters, never formatted into the SQL"""
+        self.db.submit_feedback_bulk([self._record(i) for i in range(5)])
+        self.assertEqual(self.db.get_feedback_count(days=7), 5)
+        self.assertEqual(len(self.db.get_recent_feedback(days=30, limit=3)), 3)
+        self.db.get_retraining_history(limit=4)
+        
+        for statement in self.statements:
+            self.assertNotRegex(statement, r'\b7\b')
+            self.assertNotRegex(statement, r'LIMIT \d')
+    
+    def test_bulk_insert_and_accuracy(self):
+        """Bulk insert lands every row in one pooled call"""
+        records = [self._record(i, 'correct' if i % 4 else 'incorrect') for i in range(20)]
+        
+        self.assertEqual(self.db.submit_feedback_bulk(records), 20)
+        self.assertEqual(self.db.submit_feedback_bulk([]), 0)
+        
+        accuracy = self.db.get_feedback_accuracy(days=30)
+        self.assertEqual(accuracy['total_feedback'], 20)
+        self.assertEqual(accuracy['incorrect_feedback'], 5)
+        self.assertEqual(self.db.get_pool_stats()['created'], 1)
+    
+    def test_retraining_log_round_trip(self):
+        """Retraining start/complete use the returned id"""
+        retraining_id = self.db.log_retraining_start('drift', 10, 0.4, 0.0)
+        self.assertGreater(retraining_id, 0)
+        self.assertTrue(self.db.log_retraining_complete(retraining_id, 0.1, '{}', '{}'))
+        
+        history = self.db.get_retraining_history(limit=5)
+        self.assertEqual(history.iloc[0]['status'], 'completed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,291 @@
+"""
+Azure ML Endpoint Client Tests
+
+Exercises AzureMLEndpointClient against the local mock endpoint server
+(src/scripts/mock_endpoint_server.py), so no Azure access is required.
+
+Test Coverage:
+1. Chunked concurrent requests and in-order reassembly
+2. Partial chunk failures
+3. Asyncio client (concurrency bound, sync runner, timeouts)
+4. Single round trip for forecast + metrics (request memo)
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.azure_endpoint_client import AzureMLEndpointClient, frame_fingerprint, request_context
+from ml.azure_endpoint_client_async import (
+    AsyncAzureMLEndpointClient, get_predictions_batch, run_sync
+)
+from scripts.mock_endpoint_server import MockEndpointServer
+
+
+def _make_history(rows: int) -> pd.DataFrame:
+    """Build a historical frame with the 7 raw features plus date"""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'date': pd.date_range('2025-01-01', periods=rows, freq='D'),
+        'total_files': np.arange(rows, dtype=float) + 1000,
+        'avg_file_size_mb': rng.uniform(1.0, 1.5, rows),
+        'pct_pdf': rng.uniform(0.40, 0.50, rows),
+        'pct_docx': rng.uniform(0.25, 0.35, rows),
+        'pct_xlsx': rng.uniform(0.10, 0.20, rows),
+        'pct_other': rng.uniform(0.05, 0.15, rows),
+        'archive_frequency_per_day': rng.uniform(200, 400, rows),
+    })
+
+
+class EndpointClientTestBase(unittest.TestCase):
+    """Starts a mock endpoint and points the client environment at it"""
+    
+    latency_s = 0.0
+    max_concurrency = 10
+    
+    def setUp(self):
+        self.server = MockEndpointServer(
+            latency_s=self.latency_s,
+            max_concurrency=self.max_concurrency
+        ).start()
+        self.env = mock.patch.dict(os.environ, {
+            'MLFLOW_ENDPOINT': self.server.url,
+            'MLFLOW_API_KEY': 'test-key'
+        })
+        self.env.start()
+    
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+
+
+class TestChunkedRequests(EndpointClientTestBase):
+    """Chunked concurrent endpoint calls"""
+    
+    latency_s = 0.05
+    
+    def test_chunks_reassembled_in_order(self):
+        """Predictions line up with input rows across chunks"""
+        df = _make_history(95)
+        client = AzureMLEndpointClient(chunk_size=10, max_concurrent_requests=5)
+        
+        forecast_df, metrics = client.get_predictions(df)
+        
+        expected = df['total_files'] * df['avg_file_size_mb'] / 1024
+        np.testing.assert_allclose(forecast_df['archived_gb'].values, expected.values)
+        self.assertEqual(metrics['chunk_count'], 10)
+        self.assertEqual(metrics['failed_chunks'], 0)
+        self.assertEqual(self.server.request_count, 10)
+    
+    def test_in_flight_requests_bounded(self):
+        """No more than max_concurrent_requests chunks are in flight"""
+        client = AzureMLEndpointClient(chunk_size=5, max_concurrent_requests=3)
+        client.call_endpoint(_make_history(60))
+        
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+    
+    def test_concurrency_reduces_wall_clock(self):
+        """Wall-clock time drops with the concurrency limit"""
+        df = _make_history(80)
+        
+        start = time.perf_counter()
+        AzureMLEndpointClient(chunk_size=10, max_concurrent_requests=1).call_endpoint(df)
+        serial = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        AzureMLEndpointClient(chunk_size=10, max_concurrent_requests=8).call_endpoint(df)
+        concurrent = time.perf_counter() - start
+        
+        self.assertLess(concurrent, serial / 2)
+    
+    def test_small_frame_single_request(self):
+        """Frames within chunk_size are sent as one request"""
+        client = AzureMLEndpointClient(chunk_size=50)
+        result = client.call_endpoint(_make_history(20))
+        
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(result), 20)
+        self.assertEqual(self.server.request_count, 1)
+
+
+class TestPartialFailures(EndpointClientTestBase):
+    """Graceful degradation when some chunks fail"""
+    
+    def test_failed_chunk_rows_are_nan(self):
+        """A failing chunk yields NaN rows while other chunks succeed"""
+        df = _make_history(30)
+        df.loc[12, 'total_files'] = -1  # poison row in chunk 1
+        client = AzureMLEndpointClient(chunk_size=10, max_concurrent_requests=3)
+        
+        forecast_df, metrics = client.get_predictions(df)
+        
+        self.assertEqual(len(forecast_df), 30)
+        self.assertTrue(forecast_df['archived_gb'].iloc[10:20].isna().all())
+        self.assertFalse(forecast_df['archived_gb'].iloc[:10].isna().any())
+        self.assertFalse(forecast_df['archived_gb'].iloc[20:].isna().any())
+        self.assertEqual(metrics['failed_chunks'], 1)
+        self.assertEqual(metrics['failed_rows'], 10)
+    
+    def test_all_chunks_failing_raises(self):
+        """If every chunk fails the error propagates for the mock fallback"""
+        df = _make_history(20)
+        df['total_files'] = -1
+        client = AzureMLEndpointClient(chunk_size=10)
+        
+        with self.assertRaises(RuntimeError):
+            client.call_endpoint(df)
+
+class TestAsyncClient(EndpointClientTestBase):
+    """Asyncio endpoint client"""
+    
+    latency_s = 0.05
+    
+    def test_batch_matches_sync_client(self):
+        """Concurrent forecasts equal the blocking client's, in input order"""
+        frames = [_make_history(20 + i) for i in range(6)]
+        
+        results = get_predictions_batch(frames, max_concurrent_requests=4)
+        
+        sync_client = AzureMLEndpointClient()
+        for df, (forecast_df, metrics) in zip(frames, results):
+            expected_df, expected_metrics = sync_client.get_predictions(df)
+            pd.testing.assert_frame_equal(forecast_df, expected_df)
+            self.assertAlmostEqual(metrics['avg_archived_gb'], expected_metrics['avg_archived_gb'])
+    
+    def test_semaphore_bounds_requests_across_calls(self):
+        """The client-wide limit holds across independent get_predictions calls"""
+        frames = [_make_history(10) for _ in range(12)]
+        
+        get_predictions_batch(frames, max_concurrent_requests=3)
+        
+        self.assertEqual(self.server.request_count, 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+    
+    def test_chunked_partial_failure(self):
+        """Chunk failures degrade to NaN rows like the sync client"""
+        df = _make_history(30)
+        df.loc[25, 'total_files'] = -1
+        
+        async def _fetch():
+            async with AsyncAzureMLEndpointClient(chunk_size=10) as client:
+                return await client.get_predictions(df)
+        
+        forecast_df, metrics = run_sync(_fetch())
+        
+        self.assertTrue(forecast_df['archived_gb'].iloc[20:].isna().all())
+        self.assertFalse(forecast_df['archived_gb'].iloc[:20].isna().any())
+        self.assertEqual(metrics['failed_chunks'], 1)
+    
+    def test_run_sync_inside_running_loop(self):
+        """run_sync works when called from code already inside an event loop"""
+        async def _outer():
+            return run_sync(asyncio.sleep(0, result='done'))
+        
+        self.assertEqual(asyncio.run(_outer()), 'done')
+    
+    def test_request_timeout_raises_timeout_error(self):
+        """aiohttp timeouts surface as TimeoutError, like the sync client"""
+        async def _fetch():
+            async with AsyncAzureMLEndpointClient(timeout=0.01, chunk_retries=0) as client:
+                return await client.call_endpoint(_make_history(5))
+        
+        with self.assertRaises(TimeoutError):
+            run_sync(_fetch())
+
+    def test_cancelled_requests_keep_breaker_closed(self):
+        """Caller cancellations are not endpoint failures"""
+        async def _cancel_in_flight():
+            async with AsyncAzureMLEndpointClient(chunk_retries=0) as client:
+                count = client.breaker.failure_threshold + 2
+                tasks = [asyncio.create_task(client.call_endpoint(_make_history(5))) for _ in range(count)]
+                await asyncio.sleep(0.02)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                return client.breaker.get_status()
+        
+        status = run_sync(_cancel_in_flight())
+        self.assertEqual(status['state'], 'closed')
+        self.assertEqual(status['total_failures'], 0)
+
+    def test_sibling_of_sync_client(self):
+        """Shares configuration with the sync client, not its blocking methods or session"""
+        client = AsyncAzureMLEndpointClient(interval_coverage=0)
+        
+        self.assertNotIsInstance(client, AzureMLEndpointClient)
+        self.assertFalse(hasattr(client, '_session'))
+        self.assertEqual(client.interval_coverage, 0.0)
+
+
+class TestRequestMemo(EndpointClientTestBase):
+    """One endpoint call per input frame within a request"""
+    
+    def test_forecast_and_metrics_single_call(self):
+        """get_forecast_and_metrics costs one inference"""
+        client = AzureMLEndpointClient()
+        forecast_df, metrics = client.get_forecast_and_metrics(_make_history(30))
+        
+        self.assertEqual(len(forecast_df), 30)
+        self.assertIn('avg_archived_gb', metrics)
+        self.assertEqual(self.server.request_count, 1)
+    
+    def test_memo_scoped_to_request_context(self):
+        """Repeat calls hit the memo inside a context and the endpoint outside"""
+        client = AzureMLEndpointClient()
+        df = _make_history(30)
+        
+        with request_context():
+            client.get_predictions(df)
+            client.get_model_metrics(df)
+            client.get_predictions(df.copy())  # same content, new object
+        self.assertEqual(self.server.request_count, 1)
+        
+        client.get_predictions(df)
+        client.get_model_metrics(df)
+        self.assertEqual(self.server.request_count, 3)
+    
+    def test_changed_frame_misses_memo(self):
+        """Any cell change produces a new fingerprint and a new call"""
+        client = AzureMLEndpointClient()
+        df = _make_history(30)
+        changed = df.copy()
+        changed.loc[3, 'pct_pdf'] += 0.01
+        
+        self.assertNotEqual(frame_fingerprint(df), frame_fingerprint(changed))
+        with request_context():
+            client.get_predictions(df)
+            client.get_predictions(changed)
+        self.assertEqual(self.server.request_count, 2)
+    
+    def test_async_concurrent_callers_share_request(self):
+        """Concurrent awaits of the same frame share one in-flight request"""
+        df = _make_history(30)
+        
+        async def _fetch():
+            async with AsyncAzureMLEndpointClient() as client:
+                with request_context():
+                    return await asyncio.gather(
+                        client.get_predictions(df),
+                        client.get_model_metrics(df),
+                        client.get_forecast_and_metrics(df)
+                    )
+        
+        run_sync(_fetch())
+        self.assertEqual(self.server.request_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Incremental Retraining Tests
+
+Test Coverage:
+1. update_model() fits new trees on new data and retires the oldest
+2. The retraining watermark and model path round-trip through retraining_log
+3. Only feedback past the watermark is streamed
+4. Older retraining_log tables gain the new columns
+5. Full-retrain fallback when scikit-learn lacks the per-tree attributes
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import mlflow
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.model_artifacts import save_model_artifact
+from ml.retrain_model import ModelRetrainer
+from monitoring.feedback_db import FeedbackDB
+
+
+def _feedback(n: int, offset: float = 0.0) -> list:
+    rng = np.random.default_rng(int(offset) + n)
+    return [
+        {'prediction_date': '2025-01-01', 'predicted_value': float(v),
+         'actual_value': float(v + rng.normal()), 'feedback_status': 'correct'}
+        for v in rng.normal(100 + offset, 10, n)
+    ]
+
+
+class TestIncrementalRetraining(unittest.TestCase):
+    """ModelRetrainer incremental mode on a temporary database"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        # Keep MLflow's tracking store out of the working directory
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(cls.temp_dir, 'mlflow.db')}")
+    
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(dir=self.temp_dir), 'monitoring.db')
+        self.retrainer = ModelRetrainer(db_path=self.db_path)
+    
+    def tearDown(self):
+        self.retrainer.feedback_db.close()
+        self.retrainer.predictions_db.close()
+    
+    def test_update_model_replaces_oldest_trees(self):
+        """The ensemble keeps its size; the first n trees are retired, new ones appended"""
+        rng = np.random.default_rng(0)
+        model = IsolationForest(n_estimators=20, random_state=0).fit(rng.normal(size=(1000, 4)))
+        kept = model.estimators_[5:]
+        
+        X_new = rng.normal(3.0, 1.0, size=(400, 4))
+        self.retrainer.update_model(model, X_new, n_new_trees=5, contamination=0.1, random_state=7)
+        
+        self.assertEqual(len(model.estimators_), 20)
+        self.assertEqual(len(model._decision_path_lengths), 20)
+        self.assertEqual(model.estimators_[:15], kept)
+        self.assertFalse(model.warm_start)
+        # Threshold re-derived on the new data with the final ensemble
+        self.assertAlmostEqual((model.predict(X_new) == -1).mean(), 0.1, delta=0.02)
+    
+    def test_watermark_round_trip(self):
+        """load_previous_model() builds on the last completed retrain"""
+        db = self.retrainer.feedback_db
+        db.submit_feedback_bulk(_feedback(300))
+        X = np.random.default_rng(1).normal(size=(300, 4))
+        model_path = os.path.join(os.path.dirname(self.db_path), 'model')
+        save_model_artifact(IsolationForest(n_estimators=10).fit(X), model_path, metadata={
+            'scaler_mean': [0.0] * 4, 'scaler_scale': [1.0] * 4
+        })
+        
+        self.assertIsNone(self.retrainer.load_previous_model())
+        retraining_id = db.log_retraining_start('test', 300, 0.0, 0.0)
+        db.log_retraining_complete(retraining_id, 0.0, '{}', '{}', watermark=300, model_path=model_path)
+        
+        previous = self.retrainer.load_previous_model()
+        self.assertEqual(previous['watermark'], 300)
+        self.assertEqual(len(previous['model'].estimators_), 10)
+        self.assertEqual(previous['scaler'].transform(np.ones((1, 4))).tolist(), [[1.0] * 4])
+    
+        # A scikit-learn release without the private per-tree attributes: full retrain
+        renamed = ('estimators_', 'estimators_features_', '_decision_path_lengths_renamed')
+        with mock.patch('ml.retrain_model._PER_TREE_ATTRIBUTES', renamed):
+            self.assertIsNone(self.retrainer.load_previous_model())
+            model = previous['model']
+            with self.assertRaises(ValueError):
+                self.retrainer.update_model(model, X, n_new_trees=2)
+            self.assertEqual(len(model.estimators_), 10)
+            self.assertFalse(model.warm_start)
+    
+    def test_only_new_feedback_is_streamed(self):
+        """iter_feedback(after_id=...) skips everything up to the watermark"""
+        db = self.retrainer.feedback_db
+        db.submit_feedback_bulk(_feedback(50))
+        db.submit_feedback_bulk(_feedback(20, offset=50))
+        
+        ids = np.concatenate([chunk['id'] for chunk in db.iter_feedback(after_id=50, batch_size=8)])
+        self.assertEqual(ids.tolist(), list(range(51, 71)))
+        
+        state = {}
+        list(self.retrainer._track_watermark(db.iter_feedback(after_id=50), state))
+        self.assertEqual(state['watermark'], 70)
+
+
+class TestRetrainingLogMigration(unittest.TestCase):
+    """retraining_log tables created before the watermark columns"""
+    
+    def test_old_table_gains_columns(self):
+        """watermark/model_path are added in place; existing rows read as NULL"""
+        db_path = os.path.join(tempfile.mkdtemp(), 'monitoring.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE retraining_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                trigger_reason TEXT NOT NULL,
+                feedback_count INTEGER,
+                drift_score REAL,
+                accuracy_drop REAL,
+                model_improvement REAL,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP,
+                status TEXT DEFAULT 'pending',
+                metrics_before TEXT,
+                metrics_after TEXT
+            )
+        ''')
+        conn.execute("INSERT INTO retraining_log (trigger_reason, status) VALUES ('old', 'completed')")
+        conn.commit()
+        conn.close()
+        
+        db = FeedbackDB(db_path)
+        try:
+            self.assertEqual(db.get_last_retraining()['watermark'], None)
+            retraining_id = db.log_retraining_start('new', 1, 0.0, 0.0)
+            db.log_retraining_complete(retraining_id, 0.0, '{}', '{}', watermark=9, model_path='models/m')
+            self.assertEqual(db.get_last_retraining()['watermark'], 9)
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
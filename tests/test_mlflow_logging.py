@@ -0,0 +1,188 @@
+"""
+MLflow Run Logger Tests
+
+Test Coverage:
+1. Params/metrics/tags are sent as log_batch calls within the API limits
+2. Logging calls return without waiting for the tracking server
+3. Failed calls are retried with backoff, then given up on
+4. Artifacts are uploaded and the run is terminated in order
+5. An existing run (MLFLOW_RUN_ID, as in an Azure ML job) is reused
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.pipeline_components.mlflow_logging import (
+    MAX_ENTITIES_PER_BATCH, MAX_PARAMS_TAGS_PER_BATCH, MLflowRunLogger, chunk_batch
+)
+
+
+class _FlakyClient:
+    """MlflowClient wrapper: failing or slow log_batch / log_artifacts calls"""
+    
+    def __init__(self, client, fail_batches: int = 0, fail_artifacts: int = 0, delay: float = 0.0):
+        self._client = client
+        self.fail = {'log_batch': fail_batches, 'log_artifacts': fail_artifacts}
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+    
+    def _wrap(self, name):
+        method = getattr(self._client, name)
+        
+        def call(*args, **kwargs):
+            with self.lock:
+                self.calls.append(name)
+                failing = self.fail[name] > 0
+                self.fail[name] -= 1
+            time.sleep(self.delay)
+            if failing:
+                raise ConnectionError("tracking server unavailable")
+            return method(*args, **kwargs)
+        return call
+    
+    def __getattr__(self, name):
+        if name in ('log_batch', 'log_artifacts'):
+            return self._wrap(name)
+        return getattr(self._client, name)
+
+
+class TestChunkBatch(unittest.TestCase):
+    """Request limits of log_batch"""
+    
+    def test_limits(self):
+        """No payload exceeds 100 params/tags or 1000 entities"""
+        metrics = [Metric(f'm{i}', 1.0, 0, 0) for i in range(2500)]
+        params = [Param(f'p{i}', '1') for i in range(250)]
+        tags = [RunTag(f't{i}', '1') for i in range(30)]
+        
+        batches = chunk_batch(metrics, params, tags)
+        
+        self.assertEqual(sum(len(b['metrics']) for b in batches), 2500)
+        self.assertEqual(sum(len(b['params']) for b in batches), 250)
+        self.assertEqual(sum(len(b['tags']) for b in batches), 30)
+        for batch in batches:
+            self.assertLessEqual(len(batch['params']), MAX_PARAMS_TAGS_PER_BATCH)
+            self.assertLessEqual(sum(len(v) for v in batch.values()), MAX_ENTITIES_PER_BATCH)
+
+
+class TestMLflowRunLogger(unittest.TestCase):
+    """MLflowRunLogger against a local SQLite tracking store"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.client = MlflowClient(tracking_uri=f"sqlite:///{os.path.join(cls.temp_dir, 'mlflow.db')}")
+        # Artifacts default to ./mlruns; keep them in the temp directory
+        cls.client.create_experiment('logger-tests', artifact_location=Path(cls.temp_dir, 'artifacts').as_uri())
+    
+    def _logger(self, client=None, **kwargs):
+        return MLflowRunLogger(experiment_name='logger-tests', client=client or self.client,
+                               backoff_base=0.01, **kwargs)
+    
+    def test_batched_logging(self):
+        """150 params and 250 metrics arrive in two log_batch calls"""
+        client = _FlakyClient(self.client)
+        run = self._logger(client)
+        run.start()
+        run.log_params({f'param_{i}': i for i in range(150)})
+        run.log_metrics({f'metric_{i}': i for i in range(250)})
+        run.set_tag('stage', 'test')
+        run.end_run()
+        self.assertTrue(run.wait(timeout=30))
+        
+        data = self.client.get_run(run.run_id).data
+        self.assertEqual(len(data.params), 150)
+        self.assertEqual(len(data.metrics), 250)
+        self.assertEqual(data.tags['stage'], 'test')
+        self.assertEqual(client.calls.count('log_batch'), 2)
+        self.assertEqual(self.client.get_run(run.run_id).info.status, 'FINISHED')
+    
+    def test_calls_do_not_wait_for_the_server(self):
+        """A slow tracking server does not slow down the caller"""
+        client = _FlakyClient(self.client, delay=0.5)
+        run = self._logger(client)
+        run.start()
+        
+        start = time.monotonic()
+        run.log_metrics({'rmse': 1.0})
+        run.flush()
+        run.log_metrics({'mae': 2.0})
+        run.end_run()
+        self.assertLess(time.monotonic() - start, 0.2)
+        
+        self.assertGreater(run.get_stats()['pending'], 0)
+        self.assertTrue(run.wait(timeout=30))
+        self.assertEqual(set(self.client.get_run(run.run_id).data.metrics), {'rmse', 'mae'})
+    
+    def test_retries_then_gives_up(self):
+        """Two failed batches are retried; an upload that never succeeds is counted as failed"""
+        client = _FlakyClient(self.client, fail_batches=2, fail_artifacts=100)
+        run = self._logger(client, max_retries=2)
+        run.start()
+        run.log_metrics({'r2': 0.9})
+        run.log_artifacts(self.temp_dir, 'model')
+        run.end_run()
+        self.assertTrue(run.wait(timeout=30))
+        
+        stats = run.get_stats()
+        self.assertEqual(stats['batches'], 1)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['retries'], 4)
+        self.assertIn('r2', self.client.get_run(run.run_id).data.metrics)
+        # The run is still terminated after the failed upload
+        self.assertEqual(self.client.get_run(run.run_id).info.status, 'FINISHED')
+    
+    def test_artifact_upload(self):
+        """log_artifacts uploads a directory under the given path"""
+        local_dir = tempfile.mkdtemp()
+        for name in ('model.joblib', 'artifact.json'):
+            with open(os.path.join(local_dir, name), 'w') as f:
+                f.write(name)
+        
+        with self._logger() as run:
+            run.log_artifacts(local_dir, 'model')
+        self.assertTrue(run.wait(timeout=30))
+        
+        paths = sorted(a.path for a in self.client.list_artifacts(run.run_id, 'model'))
+        self.assertEqual(paths, ['model/artifact.json', 'model/model.joblib'])
+    
+    def test_job_run_is_reused(self):
+        """With MLFLOW_RUN_ID set, metrics go to that run and it is left running"""
+        experiment_id = self.client.get_experiment_by_name('logger-tests').experiment_id
+        job_run_id = self.client.create_run(experiment_id).info.run_id
+        runs_before = len(self.client.search_runs([experiment_id]))
+        
+        with mock.patch.dict(os.environ, {'MLFLOW_RUN_ID': job_run_id}):
+            run = self._logger()
+            self.assertEqual(run.start(tags={'stage': 'train'}), job_run_id)
+        run.log_metrics({'rmse': 1.5})
+        run.end_run()
+        self.assertTrue(run.wait(timeout=30))
+        
+        job_run = self.client.get_run(job_run_id)
+        self.assertEqual(job_run.data.metrics, {'rmse': 1.5})
+        self.assertEqual(job_run.data.tags['stage'], 'train')
+        self.assertEqual(job_run.info.status, 'RUNNING')
+        self.assertEqual(len(self.client.search_runs([experiment_id])), runs_before)
+        run.log_metrics({'late': 1.0})
+        with self.assertRaises(RuntimeError):
+            run.flush()
+
+
+if __name__ == '__main__':
+    unittest.main()
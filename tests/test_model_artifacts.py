@@ -0,0 +1,87 @@
+"""
+Model Artifact Tests
+
+Test Coverage:
+1. Uncompressed save + mmap_mode='r' load round trip
+2. Load statistics (load time, RSS, warm-up)
+3. Legacy single-file models
+"""
+
+import unittest
+import sys
+import tempfile
+import joblib
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import IsolationForest
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.model_artifacts import (
+    load_model_artifact, read_artifact_metadata, save_model_artifact, warm_up
+)
+
+
+class TestModelArtifacts(unittest.TestCase):
+    """Save/load of mmap-friendly model artifacts"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(500, 9))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_arrays_are_memory_mapped(self):
+        """Large arrays come back as read-only memmaps sharing the file"""
+        model = LinearRegression().fit(self.X, self.X[:, :2])
+        save_model_artifact(model, self.dir / 'linear')
+        
+        loaded, stats = load_model_artifact(self.dir / 'linear')
+        
+        self.assertIsInstance(loaded.coef_, np.memmap)
+        self.assertFalse(loaded.coef_.flags.writeable)
+        np.testing.assert_allclose(loaded.predict(self.X[:10]), model.predict(self.X[:10]))
+        self.assertEqual(stats['mmap_mode'], 'r')
+    
+    def test_tree_model_round_trip_and_stats(self):
+        """Tree ensembles load correctly and report load/warm-up cost"""
+        model = IsolationForest(n_estimators=20, random_state=0).fit(self.X)
+        save_model_artifact(model, self.dir / 'forest', metadata={'run_id': 'abc'})
+        
+        loaded, stats = load_model_artifact(self.dir / 'forest')
+        
+        np.testing.assert_allclose(loaded.score_samples(self.X[:10]), model.score_samples(self.X[:10]))
+        self.assertGreater(stats['load_seconds'], 0)
+        self.assertIsNotNone(stats['warm_up_seconds'])
+        self.assertIn('rss_delta_mb', stats)
+        
+        metadata = read_artifact_metadata(self.dir / 'forest')
+        self.assertEqual(metadata['model_type'], 'IsolationForest')
+        self.assertEqual(metadata['n_features_in'], 9)
+        self.assertEqual(metadata['run_id'], 'abc')
+    
+    def test_legacy_compressed_file(self):
+        """Compressed single files still load (without mmap sharing)"""
+        model = LinearRegression().fit(self.X, self.X[:, 0])
+        joblib.dump(model, self.dir / 'model.pkl', compress=3)
+        
+        loaded, stats = load_model_artifact(self.dir / 'model.pkl', run_warm_up=False)
+        
+        np.testing.assert_allclose(loaded.predict(self.X[:5]), model.predict(self.X[:5]))
+        self.assertIsNone(stats['warm_up_seconds'])
+    
+    def test_warm_up_requires_width(self):
+        """warm_up needs n_features when the model does not record it"""
+        with self.assertRaises(ValueError):
+            warm_up(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Model Manager Tests
+
+Test Coverage:
+1. A changed model directory is swapped in once the file has settled
+2. In-flight requests finish on the version they started with
+3. A version that fails to load is rejected; the old one keeps serving
+4. Registry alias changes, swap latency and scoring latency statistics
+5. score.py picks up a new model without init() being called again
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.model_artifacts import save_model_artifact
+from ml.model_manager import ModelManager
+from ml.model_registry import get_registry
+
+FEATURES = ['total_files', 'avg_file_size_mb', 'pct_pdf', 'pct_docx', 'pct_xlsx',
+            'pct_other', 'archive_frequency_per_day', 'month_sin', 'month_cos']
+
+
+def _model(scale: float) -> LinearRegression:
+    """Forecast-shaped model: 9 named features -> [archived_gb, savings_gb] = scale"""
+    X = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 9)), columns=FEATURES)
+    return LinearRegression().fit(X, np.full((50, 2), scale))
+
+
+class TestModelManager(unittest.TestCase):
+    """Background loading and atomic swaps"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.X = pd.DataFrame(np.zeros((3, 9)), columns=FEATURES)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def _save(self, scale: float, name: str = 'model'):
+        save_model_artifact(_model(scale), self.dir / name)
+        # Distinct mtimes even on coarse-grained filesystems
+        stamp = 1_700_000_000 + int(scale) * 10
+        os.utime(self.dir / name / 'model.joblib', (stamp, stamp))
+    
+    def test_directory_swap_after_settle(self):
+        """The new file is loaded on the second check that sees it unchanged"""
+        self._save(1.0)
+        manager = ModelManager(model_dir=self.dir / 'model', poll_interval=0)
+        first = manager.load_initial()
+        self.assertFalse(manager.check_now())
+        
+        self._save(2.0)
+        self.assertFalse(manager.check_now())
+        self.assertTrue(manager.check_now())
+        
+        self.assertIsNot(manager.current, first)
+        self.assertAlmostEqual(manager.current.model.predict(self.X)[0, 0], 2.0)
+        swap = manager.get_stats()['last_swap']
+        self.assertEqual(swap['from_version'], first.version)
+        self.assertGreaterEqual(swap['swap_seconds'], swap['load_seconds'])
+    
+    def test_in_flight_requests_keep_their_version(self):
+        """A request pinned before a swap completes on the old model"""
+        self._save(1.0)
+        manager = ModelManager(model_dir=self.dir / 'model', poll_interval=0)
+        manager.load_initial()
+        
+        with manager.acquire() as old:
+            self._save(2.0)
+            manager.check_now()
+            self.assertTrue(manager.check_now())
+            with manager.acquire() as new:
+                self.assertEqual(manager.get_stats()['in_flight'], {old.version: 1, new.version: 1})
+                self.assertAlmostEqual(new.model.predict(self.X)[0, 0], 2.0)
+            self.assertAlmostEqual(old.model.predict(self.X)[0, 0], 1.0)
+        
+        self.assertEqual(manager.get_stats()['in_flight'], {})
+    
+    def test_broken_version_is_rejected(self):
+        """A file that does not load is never published and not retried"""
+        self._save(1.0)
+        manager = ModelManager(model_dir=self.dir / 'model', poll_interval=0)
+        good = manager.load_initial()
+        
+        (self.dir / 'model' / 'model.joblib').write_bytes(b'not a pickle')
+        manager.check_now()
+        self.assertFalse(manager.check_now())
+        self.assertIs(manager.current, good)
+        self.assertIsNotNone(manager.get_stats()['last_error'])
+        
+        with mock.patch.object(manager, '_load') as load:
+            self.assertFalse(manager.check_now())
+            load.assert_not_called()
+    
+    def test_registry_alias_and_stats(self):
+        """Moving an alias swaps versions; latency is reported per window"""
+        with mock.patch.dict('os.environ', {'MODEL_REGISTRY_DIR': str(self.dir / 'registry')}):
+            registry = get_registry()
+            self._save(1.0, 'v1')
+            self._save(2.0, 'v2')
+            registry.register('forecast', self.dir / 'v1', aliases=['production'])
+            registry.register('forecast', self.dir / 'v2')
+            
+            manager = ModelManager(model_ref='forecast@production', poll_interval=0)
+            manager.load_initial()
+            for _ in range(5):
+                with manager.acquire() as active:
+                    active.model.predict(self.X)
+            
+            registry.set_alias('forecast', 'production', 2)
+            self.assertTrue(manager.check_now())
+        
+        stats = manager.get_stats()
+        self.assertEqual((stats['version'], stats['swaps'], stats['requests']), ('2', 2, 5))
+        self.assertIsNotNone(stats['p99_ms'])
+        self.assertEqual(stats['requests_during_swap'], 0)
+        self.assertIsNone(stats['p99_during_swap_ms'])
+        self.assertIsNotNone(manager.current.rss_delta_mb)
+
+
+class TestScoringScriptHotSwap(unittest.TestCase):
+    """score.py serves a new model without a restart"""
+    
+    def test_run_uses_new_version(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        model_dir = Path(tmp.name)
+        save_model_artifact(_model(1.0), model_dir)
+        
+        with mock.patch.dict('os.environ', {'AZUREML_MODEL_DIR': str(model_dir), 'MODEL_WATCH_INTERVAL': '0'}):
+            from ml.archived import score
+            score.init()
+        
+        request = json.dumps({'total_files': 100, 'avg_file_size_mb': 1.0, 'pct_pdf': 0.5,
+                              'pct_docx': 0.2, 'pct_xlsx': 0.1, 'archive_frequency_per_day': 10})
+        first = json.loads(score.run(request))
+        self.assertAlmostEqual(first['predictions'][0]['archived_gb_next_period'], 1.0)
+        # RSS growth of the load is published like in the non-watching path
+        self.assertEqual(score.load_stats['rss_delta_mb'], score.model_manager.current.rss_delta_mb)
+        self.assertIsNotNone(score.load_stats['rss_delta_mb'])
+        
+        save_model_artifact(_model(5.0), model_dir)
+        os.utime(model_dir / 'model.joblib', (1_800_000_000, 1_800_000_000))
+        score.model_manager.check_now()
+        self.assertTrue(score.model_manager.check_now())
+        
+        second = json.loads(score.run(request))
+        self.assertAlmostEqual(second['predictions'][0]['archived_gb_next_period'], 5.0)
+        self.assertNotEqual(second['model_version'], first['model_version'])
+        self.assertIs(score.model, score.model_manager.current.model)
+
+
+if __name__ == '__main__':
+    unittest.main()
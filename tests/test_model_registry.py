@@ -0,0 +1,146 @@
+"""
+Model Registry Tests
+
+Test Coverage:
+1. Content-addressed storage: identical files and artifacts are stored once
+2. Version aliases (production/staging) and resolution
+3. Loaded-model cache keyed by version (LRU)
+4. Promotion bookkeeping by content digest
+5. Local fallback model loaded through a registry reference
+"""
+
+import unittest
+from unittest import mock
+import sys
+import tempfile
+import numpy as np
+from pathlib import Path
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.local_model import LocalFallbackModel
+from ml.model_artifacts import save_model_artifact
+from ml.model_registry import ModelRegistry, artifact_digest, get_registry, parse_model_ref
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Registry operations on a temporary directory"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.registry = ModelRegistry(self.dir / 'registry', max_loaded=2)
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(200, 9))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def _artifact(self, name: str, seed: int = 0, **metadata) -> Path:
+        y = self.X[:, :2] * (seed + 1)
+        return save_model_artifact(LinearRegression().fit(self.X, y), self.dir / name, metadata=metadata)
+    
+    def _objects(self) -> int:
+        return sum(1 for p in (self.registry.root / 'objects').rglob('*') if p.is_file())
+    
+    def test_content_is_stored_once(self):
+        """Same artifact -> same version; a shared model file is one object"""
+        first = self.registry.register('forecast', self._artifact('a'))
+        again = self.registry.register('forecast', self.dir / 'a')
+        self.assertEqual((first['version'], again['version']), (1, 1))
+        self.assertTrue(first['new'])
+        self.assertFalse(again['new'])
+        
+        # Same model, different artifact.json -> new version, model.joblib shared
+        (self.dir / 'b').mkdir()
+        (self.dir / 'b' / 'model.joblib').write_bytes((self.dir / 'a' / 'model.joblib').read_bytes())
+        (self.dir / 'b' / 'artifact.json').write_text('{"note": "copy"}')
+        second = self.registry.register('forecast', self.dir / 'b')
+        
+        self.assertEqual(second['version'], 2)
+        self.assertEqual(second['files']['model.joblib'], first['files']['model.joblib'])
+        self.assertEqual(self._objects(), 3)
+        self.assertEqual(artifact_digest(second['path'])[0], second['digest'])
+    
+    def test_resaved_model_is_same_version(self):
+        """Saving the same model twice (new created_at) does not add a version"""
+        model = LinearRegression().fit(self.X, self.X[:, :2])
+        first = self.registry.register('forecast', save_model_artifact(model, self.dir / 'a', metadata={'run': 1}))
+        with mock.patch('ml.model_artifacts.datetime') as clock:
+            clock.now.return_value.isoformat.return_value = '2030-01-01T00:00:00'
+            again = self.registry.register('forecast', save_model_artifact(model, self.dir / 'b', metadata={'run': 1}))
+        
+        self.assertNotEqual((self.dir / 'a' / 'artifact.json').read_bytes(), (self.dir / 'b' / 'artifact.json').read_bytes())
+        self.assertEqual((again['version'], again['digest']), (1, first['digest']))
+        self.assertFalse(again['new'])
+        
+        other = self.registry.register('forecast', save_model_artifact(model, self.dir / 'c', metadata={'run': 2}))
+        self.assertEqual(other['version'], 2)
+    
+    def test_aliases(self):
+        """Aliases resolve to versions and move without copying"""
+        self.registry.register('forecast', self._artifact('a'), aliases=['production'])
+        self.registry.register('forecast', self._artifact('b', seed=1), aliases=['staging'])
+        objects = self._objects()
+        
+        self.assertEqual(self.registry.resolve('forecast', 'production'), 1)
+        self.assertEqual(self.registry.resolve('forecast', 'latest'), 2)
+        self.registry.set_alias('forecast', 'production', 'staging')
+        self.assertEqual(self.registry.get_aliases('forecast'), {'production': 2, 'staging': 2})
+        self.assertEqual(self._objects(), objects)
+        
+        with self.assertRaises(KeyError):
+            self.registry.resolve('forecast', 'canary')
+        with self.assertRaises(KeyError):
+            self.registry.set_alias('forecast', 'canary', 9)
+        with self.assertRaises(ValueError):
+            self.registry.set_alias('forecast', '3', 1)
+    
+    def test_load_cache(self):
+        """Loaded models are reused per version and evicted least recently used"""
+        self.registry.register('forecast', self._artifact('a'), aliases=['production'])
+        self.registry.register('forecast', self._artifact('b', seed=1), aliases=['staging'])
+        self.registry.register('forecast', self._artifact('c', seed=2))
+        
+        production = self.registry.load('forecast', 'production')
+        self.assertIs(self.registry.load('forecast', 1), production)
+        np.testing.assert_allclose(production.predict(self.X[:3]), self.X[:3, :2], atol=1e-8)
+        
+        self.registry.load('forecast', 'staging')
+        self.registry.load('forecast', 3)
+        stats = self.registry.get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 3, 1))
+        self.assertEqual(stats['loaded'], ['forecast:2', 'forecast:3'])
+    
+    def test_promotions(self):
+        """A promoted digest is remembered per target"""
+        record = self.registry.register('forecast', self._artifact('a'))
+        self.assertIsNone(self.registry.get_promotion('azure-forecast', record['digest']))
+        
+        self.registry.record_promotion('azure-forecast', record['digest'], 7)
+        self.assertEqual(self.registry.get_promotion('azure-forecast', record['digest']), '7')
+        self.assertIsNone(self.registry.get_promotion('other-model', record['digest']))
+    
+    def test_local_model_from_registry(self):
+        """LOCAL_MODEL_REF-style references load through the shared registry cache"""
+        registry = get_registry(str(self.dir / 'shared'))
+        registry.register('forecast', self._artifact('a'), aliases=['production'])
+        self.assertEqual(parse_model_ref('forecast'), ('forecast', 'production'))
+        
+        model = LocalFallbackModel(model_ref='forecast@production')
+        with mock.patch.dict('os.environ', {'MODEL_REGISTRY_DIR': str(self.dir / 'shared')}):
+            self.assertTrue(model.available)
+        
+        payload = {'input_data': {'columns': [f'f{i}' for i in range(9)], 'data': self.X[:2].tolist()}}
+        rows = model.predict_payload(payload)
+        np.testing.assert_allclose(rows, self.X[:2, :2], atol=1e-8)
+        self.assertEqual(model.get_status()['model_dir'], str(registry.get_path('forecast', 1)))
+        self.assertEqual(registry.get_cache_stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+"""
+Notification Dispatcher Tests
+
+Test Coverage:
+1. submit() and stop() never block on slow channels; full queues drop and count
+2. Alerts are batched into digests
+3. Failed deliveries are retried with backoff (local HTTP sink)
+4. Email digests reach a local SMTP server (aiosmtpd, when installed)
+5. AlertManager queues through the dispatcher
+"""
+
+import unittest
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.alerts import AlertManager
+from monitoring.notifications import EmailChannel, NotificationDispatcher, WebhookChannel, format_digest
+from monitoring.predictions_db import PredictionsDB
+
+try:
+    from aiosmtpd.controller import Controller
+    AIOSMTPD_AVAILABLE = True
+except ImportError:
+    AIOSMTPD_AVAILABLE = False
+
+
+def _alert(i: int, severity: str = 'warning') -> dict:
+    return {'alert_type': 'anomaly', 'severity': severity, 'message': f'alert {i}', 'recommendation': 'check'}
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    """Collects JSON posts; answers 500 to the first fail_first requests"""
+    
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with server.lock:
+            server.attempts += 1
+            failing = server.attempts <= server.fail_first
+            if not failing:
+                server.payloads.append(body)
+        self.send_response(500 if failing else 204)
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPSink:
+    """Local webhook receiver"""
+    
+    def __init__(self, fail_first: int = 0):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), _SinkHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.attempts = 0
+        self.httpd.fail_first = fail_first
+        self.httpd.payloads = []
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/hook'
+    
+    def __enter__(self):
+        self.thread.start()
+        return self.httpd
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _SlowChannel:
+    """Blocks on every send until released"""
+    
+    name = 'slow'
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+    
+    def send(self, alerts):
+        self.release.wait(timeout=10)
+        self.batches.append(alerts)
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """Queueing, batching and retries"""
+    
+    def test_submit_does_not_block_and_drops_when_full(self):
+        """A stuck channel fills its bounded queue; the caller never waits"""
+        channel = _SlowChannel()
+        dispatcher = NotificationDispatcher([channel], queue_size=5, batch_size=1, batch_interval=0)
+        try:
+            start = time.monotonic()
+            accepted = [dispatcher.submit(_alert(i)) for i in range(20)]
+            self.assertLess(time.monotonic() - start, 0.5)
+            
+            metrics = dispatcher.get_metrics()['slow']
+            self.assertGreater(metrics['dropped'], 0)
+            self.assertEqual(metrics['queued'] + metrics['dropped'], 20)
+            self.assertEqual(sum(accepted), metrics['queued'])
+        finally:
+            channel.release.set()
+            dispatcher.stop()
+        
+        self.assertEqual(sum(len(b) for b in channel.batches), metrics['queued'])
+    
+    def test_stop_with_full_queue_honours_timeout(self):
+        """stop() does not wait for queue space past its timeout"""
+        channel = _SlowChannel()
+        dispatcher = NotificationDispatcher([channel], queue_size=2, batch_size=1, batch_interval=0)
+        dispatcher.submit(_alert(0))
+        time.sleep(0.1)  # first alert in send(), then fill the queue behind it
+        self.assertTrue(dispatcher.submit(_alert(1)) and dispatcher.submit(_alert(2)))
+        
+        start = time.monotonic()
+        dispatcher.stop(timeout=0.3)
+        self.assertLess(time.monotonic() - start, 1.0)
+        
+        worker_thread = dispatcher._workers[0].thread
+        channel.release.set()
+        worker_thread.join(timeout=5)
+        self.assertFalse(worker_thread.is_alive())
+        metrics = dispatcher.get_metrics()['slow']
+        self.assertEqual((metrics['sent'], metrics['dropped'], metrics['queue_depth']), (1, 2, 0))
+    
+    def test_alerts_are_batched_into_digests(self):
+        """Alerts submitted together arrive as one digest"""
+        channel = _SlowChannel()
+        channel.release.set()
+        with NotificationDispatcher([channel], batch_size=10, batch_interval=0.3) as dispatcher:
+            for i in range(7):
+                dispatcher.submit(_alert(i))
+            self.assertTrue(dispatcher.flush(timeout=5))
+            metrics = dispatcher.get_metrics()['slow']
+        
+        self.assertEqual([len(b) for b in channel.batches], [7])
+        self.assertEqual(metrics['sent'], 7)
+        self.assertIn('latency_p95_s', metrics)
+    
+    def test_webhook_retries_with_backoff(self):
+        """Two 500s, then the digest is delivered to the local sink"""
+        sink = _HTTPSink(fail_first=2)
+        with sink as httpd:
+            with NotificationDispatcher(
+                [WebhookChannel(sink.url)], batch_interval=0.05, backoff_base=0.01
+            ) as dispatcher:
+                dispatcher.submit(_alert(1, 'critical'))
+                dispatcher.submit(_alert(2))
+                self.assertTrue(dispatcher.flush(timeout=5))
+                metrics = dispatcher.get_metrics()['webhook']
+        
+        self.assertEqual(metrics['retries'], 2)
+        self.assertEqual(metrics['sent'], 2)
+        self.assertEqual(len(httpd.payloads), 1)
+        self.assertTrue(httpd.payloads[0]['subject'].startswith('[CRITICAL] 2 monitoring alerts'))
+    
+    def test_gives_up_after_max_retries(self):
+        """Undeliverable digests are counted as failed"""
+        sink = _HTTPSink(fail_first=100)
+        with sink:
+            with NotificationDispatcher(
+                [WebhookChannel(sink.url)], batch_interval=0, max_retries=2, backoff_base=0.01
+            ) as dispatcher:
+                dispatcher.submit(_alert(1))
+                dispatcher.flush(timeout=5)
+                metrics = dispatcher.get_metrics()['webhook']
+        
+        self.assertEqual(metrics['failed'], 1)
+        self.assertEqual(metrics['retries'], 2)
+    
+    @unittest.skipUnless(AIOSMTPD_AVAILABLE, "aiosmtpd not installed")
+    def test_email_digest_via_local_smtp(self):
+        """EmailChannel delivers one message per digest"""
+        received = []
+        
+        class _Collect:
+            async def handle_DATA(self, server, session, envelope):
+                received.append(envelope)
+                return '250 OK'
+        
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        
+        controller = Controller(_Collect(), hostname='127.0.0.1', port=port)
+        controller.start()
+        try:
+            channel = EmailChannel('127.0.0.1', port, 'alerts@example.com', ['ops@example.com'])
+            with NotificationDispatcher([channel], batch_interval=0.1) as dispatcher:
+                for i in range(3):
+                    dispatcher.submit(_alert(i))
+                dispatcher.flush(timeout=5)
+        finally:
+            controller.stop()
+        
+        self.assertEqual(len(received), 1)
+        self.assertIn(b'3 monitoring alerts', received[0].content)
+    
+    def test_digest_format(self):
+        """Subject carries the worst severity"""
+        subject, body = format_digest([_alert(1), _alert(2, 'info')])
+        self.assertEqual(subject, '[WARNING] 2 monitoring alerts')
+        self.assertIn('alert 2', body)
+
+
+class TestAlertManagerDispatch(unittest.TestCase):
+    """AlertManager.send_notification with a dispatcher"""
+    
+    def test_notifications_are_queued(self):
+        """Created alerts are queued, suppressed repeats are not"""
+        channel = _SlowChannel()
+        channel.release.set()
+        db = PredictionsDB(os.path.join(tempfile.mkdtemp(), 'alerts.db'))
+        drift = {
+            'overall_drift_detected': True,
+            'anomalies': {'has_anomalies': True, 'anomaly_count': 3, 'max_z_score': 2.5},
+            'distribution_drift': {'has_drift': False},
+            'trend_drift': {'has_trend_drift': False}
+        }
+        try:
+            with NotificationDispatcher([channel], batch_interval=0.05) as dispatcher:
+                manager = AlertManager(db, dispatcher=dispatcher)
+                for _ in range(3):
+                    alert = manager.create_alert_from_drift(drift, '2025-11-14')
+                    manager.save_alert(alert)
+                    manager.send_notification(alert)
+                dispatcher.flush(timeout=5)
+        finally:
+            db.close()
+        
+        self.assertEqual(sum(len(b) for b in channel.batches), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
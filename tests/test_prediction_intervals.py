@@ -0,0 +1,173 @@
+"""
+Prediction Interval Tests
+
+Test Coverage:
+1. Bands from per-tree predictions (Pipeline, MultiOutputRegressor, native multi-output)
+2. Unsupported models and invalid coverage
+3. Local fallback model and score.py return band edges
+4. Endpoint client keeps bands through chunk merging into the forecast frame
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.azure_endpoint_client import AzureMLEndpointClient
+from ml.local_model import LocalFallbackModel
+from ml.model_artifacts import save_model_artifact
+from ml.prediction_intervals import predict_with_intervals, supports_intervals, tree_predictions
+
+FEATURES = ['total_files', 'avg_file_size_mb', 'pct_pdf', 'pct_docx', 'pct_xlsx',
+            'pct_other', 'archive_frequency_per_day', 'month_sin', 'month_cos']
+
+
+def _training_data(rows: int = 300):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(rows, 9)), columns=FEATURES)
+    y = np.column_stack([X['total_files'] * 10 + 100, X['avg_file_size_mb'] * 5 + 50])
+    return X, y + rng.normal(scale=2, size=y.shape)
+
+
+def _forecast_model(n_estimators: int = 30) -> Pipeline:
+    """Pipeline(scaler, MultiOutputRegressor(RandomForest)) as in pipeline_components/train_model.py"""
+    X, y = _training_data()
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('model', MultiOutputRegressor(RandomForestRegressor(n_estimators=n_estimators, random_state=0)))
+    ]).fit(X, y)
+
+
+class TestForestIntervals(unittest.TestCase):
+    """Band computation on fitted forests"""
+    
+    def setUp(self):
+        self.X, self.y = _training_data()
+    
+    def test_pipeline_multi_output(self):
+        """One (n_trees, n_rows, 2) array; its mean is model.predict()"""
+        model = _forecast_model()
+        self.assertEqual(tree_predictions(model, self.X[:7]).shape, (30, 7, 2))
+        
+        bands = predict_with_intervals(model, self.X[:50], coverage=0.8)
+        np.testing.assert_allclose(bands['prediction'], model.predict(self.X[:50]), rtol=1e-10)
+        self.assertTrue(np.all(bands['lower'] <= bands['upper']))
+        self.assertEqual(bands['coverage'], 0.8)
+        
+        # Wider coverage, wider band; out-of-range inputs, wider band
+        wide = predict_with_intervals(model, self.X[:50], coverage=0.98)
+        self.assertTrue(np.all(wide['upper'] - wide['lower'] >= bands['upper'] - bands['lower']))
+        far = predict_with_intervals(model, self.X[:50] * 5, coverage=0.8)
+        self.assertGreater(np.mean(far['upper'] - far['lower']), np.mean(bands['upper'] - bands['lower']))
+    
+    def test_native_multi_output_forests(self):
+        for forest in (RandomForestRegressor(n_estimators=20, random_state=0),
+                       ExtraTreesRegressor(n_estimators=20, random_state=0)):
+            forest.fit(self.X, self.y)
+            bands = predict_with_intervals(forest, self.X[:10])
+            np.testing.assert_allclose(bands['prediction'], forest.predict(self.X[:10]), rtol=1e-10)
+            self.assertEqual(bands['upper'].shape, (10, 2))
+    
+    def test_unsupported_models(self):
+        linear = LinearRegression().fit(self.X, self.y)
+        self.assertFalse(supports_intervals(linear))
+        self.assertFalse(supports_intervals(RandomForestRegressor()))
+        self.assertTrue(supports_intervals(_forecast_model(5)))
+        with self.assertRaises(TypeError):
+            predict_with_intervals(linear, self.X)
+        with self.assertRaises(ValueError):
+            predict_with_intervals(_forecast_model(5), self.X, coverage=1.5)
+
+
+class TestIntervalsDownstream(unittest.TestCase):
+    """Band edges in scoring responses and the forecast frame"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.model_dir = Path(self.tmp.name)
+        save_model_artifact(_forecast_model(), self.model_dir)
+    
+    def test_local_model_payload(self):
+        X, _ = _training_data(5)
+        payload = {'input_data': {'columns': FEATURES, 'data': X.values.tolist()}}
+        model = LocalFallbackModel(model_dir=str(self.model_dir))
+        
+        self.assertIsInstance(model.predict_payload(payload)[0], list)
+        rows = model.predict_payload(payload, coverage=0.9)
+        self.assertEqual(len(rows), 5)
+        self.assertLessEqual(rows[0]['archived_gb_lower'], rows[0]['archived_gb_upper'])
+        self.assertLessEqual(rows[0]['savings_gb_lower'], rows[0]['savings_gb_upper'])
+    
+    def test_score_response_has_bands(self):
+        from ml.archived import score
+        with mock.patch.dict('os.environ', {'AZUREML_MODEL_DIR': str(self.model_dir), 'MODEL_WATCH_INTERVAL': '0'}):
+            score.init()
+        
+        request = json.dumps({'total_files': 100, 'avg_file_size_mb': 1.0, 'pct_pdf': 0.5,
+                              'pct_docx': 0.2, 'pct_xlsx': 0.1, 'archive_frequency_per_day': 10})
+        response = json.loads(score.run(request))
+        prediction = response['predictions'][0]
+        self.assertEqual(response['interval_coverage'], score.INTERVAL_COVERAGE)
+        self.assertLess(prediction['archived_gb_lower'], prediction['archived_gb_upper'])
+        self.assertLess(prediction['savings_gb_lower'], prediction['savings_gb_upper'])
+        
+        with mock.patch.object(score, 'INTERVAL_COVERAGE', 0.0):
+            self.assertNotIn('archived_gb_lower', json.loads(score.run(request))['predictions'][0])
+    
+    def test_forecast_frame_band_columns(self):
+        """Chunk merging keeps bands aligned; failed rows get NaN bands"""
+        with mock.patch.dict('os.environ', {'MLFLOW_ENDPOINT': 'http://127.0.0.1:9/score',
+                                            'MLFLOW_API_KEY': 'test-key'}):
+            client = AzureMLEndpointClient()
+        
+        history = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=3, freq='D')})
+        banded = {'predictions': [
+            {'archived_gb': 10.0, 'savings_gb': 5.0, 'archived_gb_lower': 8.0, 'archived_gb_upper': 13.0,
+             'savings_gb_lower': 4.0, 'savings_gb_upper': 6.0},
+            {'archived_gb': 11.0, 'savings_gb': 5.5, 'archived_gb_lower': 9.0, 'archived_gb_upper': 12.0,
+             'savings_gb_lower': 5.0, 'savings_gb_upper': 6.5}
+        ]}
+        merged = client.merge_chunk_outcomes(
+            [history.iloc[:2], history.iloc[2:]],
+            [(banded, None), (None, TimeoutError('chunk timed out'))]
+        )
+        forecast_df, _ = client.build_forecast(history, merged)
+        
+        self.assertEqual(forecast_df['confidence_upper'].tolist()[:2], [3.0, 1.0])
+        self.assertEqual(forecast_df['confidence_lower'].tolist()[:2], [2.0, 2.0])
+        self.assertTrue(np.isnan(forecast_df['savings_gb_upper'].iloc[2]))
+        
+        # Point-only responses keep the old frame
+        plain_df, _ = client.build_forecast(history, [[10.0, 5.0]] * 3)
+        self.assertNotIn('confidence_upper', plain_df.columns)
+
+    def test_explicit_zero_coverage_disables_bands(self):
+        """interval_coverage=0 is not replaced by the environment default"""
+        with mock.patch.dict('os.environ', {'MLFLOW_ENDPOINT': 'http://127.0.0.1:9/score',
+                                            'MLFLOW_API_KEY': 'test-key',
+                                            'PREDICTION_INTERVAL_COVERAGE': '0.8'}):
+            self.assertEqual(AzureMLEndpointClient().interval_coverage, 0.8)
+            self.assertEqual(AzureMLEndpointClient(interval_coverage=0).interval_coverage, 0.0)
+            with self.assertRaises(ValueError):
+                AzureMLEndpointClient(chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Feedback Query Builder Tests
+
+Test Coverage:
+1. Per-dialect rendering (placeholders, LIMIT/FETCH, RETURNING/OUTPUT)
+2. Compiled statement cache and parameter binding
+3. Every query's SQLite plan uses an index (no full table scans)
+4. Time-window cutoffs keep the previous whole-day semantics
+"""
+
+import unittest
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.feedback_db_cloud import FeedbackDB
+from monitoring.query_builder import (
+    DIALECTS, QUERIES, compile_query, schema_statements, window_start
+)
+
+
+# Representative values for every parameter name used in QUERIES
+SAMPLE_PARAMS = {
+    'since': '2025-01-01 00:00:00',
+    'accuracy_since': '2025-01-01 00:00:00',
+    'count_since': '2025-01-20 00:00:00',
+    'limit': 10,
+    'prediction_id': 1,
+    'prediction_date': '2025-01-01',
+    'predicted_value': 1.0,
+    'actual_value': 1.5,
+    'feedback_status': 'correct',
+    'user_feedback': None,
+    'trigger_reason': 'drift',
+    'feedback_count': 5,
+    'drift_score': 0.2,
+    'accuracy_drop': 0.0,
+    'model_improvement': 0.1,
+    'metrics_before': '{}',
+    'metrics_after': '{}',
+    'retraining_id': 1,
+    'watermark': 42,
+    'model_path': 'models/anomaly_model',
+    'after_id': 42
+}
+
+
+class TestQueryCompilation(unittest.TestCase):
+    """Dialect rendering and caching"""
+    
+    def test_every_query_compiles_for_every_dialect(self):
+        """No template markers or named parameters survive compilation"""
+        for dialect in DIALECTS:
+            for name in QUERIES:
+                sql = compile_query(name, dialect).sql
+                self.assertNotIn('{', sql, f"{name}/{dialect}")
+                self.assertNotRegex(sql, r':[a-z_]+', f"{name}/{dialect}")
+                self.assertNotIn('DATEDIFF', sql)
+                self.assertNotIn('DATE(created_at)', sql)
+    
+    def test_dialect_specific_clauses(self):
+        """LIMIT, placeholders and returned ids follow each dialect"""
+        postgres = compile_query('recent_feedback', 'postgres').sql
+        azure = compile_query('recent_feedback', 'azure').sql
+        self.assertIn('LIMIT %s', postgres)
+        self.assertIn('OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY', azure)
+        
+        self.assertIn('RETURNING id', compile_query('insert_feedback', 'postgres').sql)
+        self.assertIn('OUTPUT INSERTED.id', compile_query('insert_feedback', 'azure').sql)
+        self.assertNotIn('RETURNING', compile_query('insert_feedback', 'sqlite').sql)
+        self.assertTrue(compile_query('insert_feedback', 'sqlite').returns_id)
+    
+    def test_compiled_queries_are_cached(self):
+        """The same object is returned for repeated compiles"""
+        self.assertIs(compile_query('feedback_count', 'azure'), compile_query('feedback_count', 'azure'))
+    
+    def test_bind_orders_parameters(self):
+        """Named values are bound in placeholder order"""
+        query = compile_query('recent_feedback', 'sqlite')
+        self.assertEqual(query.bind(limit=5, since='x'), ('x', 5))
+        with self.assertRaises(KeyError):
+            query.bind(limit=5)
+    
+    def test_window_start_is_midnight_n_days_ago(self):
+        """Cutoff matches DATE(created_at) >= DATE('now', '-N days')"""
+        now = datetime(2025, 3, 10, 15, 30)
+        self.assertEqual(window_start(7, 'sqlite', now), '2025-03-03 00:00:00')
+        self.assertEqual(window_start(0, 'postgres', now), datetime(2025, 3, 10))
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Each compiled query is index-backed on a local SQLite copy"""
+    
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        for statement in schema_statements('sqlite'):
+            self.conn.execute(statement)
+        
+        start = datetime(2025, 1, 1)
+        self.conn.executemany(
+            'INSERT INTO feedback (prediction_id, prediction_date, predicted_value, actual_value, '
+            'feedback_status, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            [(i, '2025-01-01', 1.0, 1.0, 'correct', (start + timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S'))
+             for i in range(500)]
+        )
+        self.conn.execute('ANALYZE')
+    
+    def tearDown(self):
+        self.conn.close()
+    
+    def test_queries_use_indexes(self):
+        """EXPLAIN QUERY PLAN shows index/rowid lookups, never a bare table scan"""
+        for name in QUERIES:
+            query = compile_query(name, 'sqlite')
+            if query.sql.lstrip().upper().startswith('INSERT'):
+                continue
+            
+            plan = self.conn.execute(
+                'EXPLAIN QUERY PLAN ' + query.sql, query.bind(**SAMPLE_PARAMS)
+            ).fetchall()
+            details = [row[-1] for row in plan]
+            
+            table_steps = [d for d in details if d.startswith(('SCAN', 'SEARCH'))]
+            self.assertTrue(table_steps, f"{name}: {details}")
+            for detail in table_steps:
+                self.assertRegex(detail, r'USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY',
+                                 f"{name} is not index-backed: {details}")
+
+
+class TestFeedbackDBWindows(unittest.TestCase):
+    """FeedbackDB (SQLite) through the compiled queries"""
+    
+    def setUp(self):
+        self.db = FeedbackDB(':memory:')
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def test_window_counts(self):
+        """Rows inside and outside the window are split on created_at"""
+        self.db.submit_feedback(1, '2025-01-01', 10.0, 11.0, 'correct')
+        self.db.conn.execute(
+            "INSERT INTO feedback (prediction_date, predicted_value, actual_value, feedback_status, created_at) "
+            "VALUES ('2025-01-01', 1.0, 2.0, 'incorrect', datetime('now', '-40 days'))"
+        )
+        # Raw insert bypasses the incremental rollup behind get_feedback_accuracy
+        self.db.rebuild_rollups()
+        
+        self.assertEqual(self.db.get_feedback_count(days=7), 1)
+        self.assertEqual(self.db.get_feedback_count(days=60), 2)
+        self.assertEqual(len(self.db.get_recent_feedback(days=30)), 1)
+        self.assertEqual(self.db.get_feedback_accuracy(days=60)['incorrect_feedback'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Recursive Forecast Tests
+
+Test Coverage:
+1. One batched predict call per step; batched rollout matches per-tenant rollouts
+2. Seasonal and lag features are updated between steps
+3. State update hook, interval bands and input validation
+4. Endpoint clients (sync and async) roll the endpoint forward (one request per step)
+"""
+
+import unittest
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.azure_endpoint_client import AzureMLEndpointClient
+from ml.azure_endpoint_client_async import AsyncAzureMLEndpointClient, run_sync
+from ml.recursive_forecast import FEATURE_COLUMNS, RecursiveForecaster
+from scripts.mock_endpoint_server import MockEndpointServer
+
+
+def _history(tenants: int = 4, rows_per_tenant: int = 3) -> pd.DataFrame:
+    """A few daily rows per tenant with the 7 raw features"""
+    rng = np.random.default_rng(0)
+    n = tenants * rows_per_tenant
+    df = pd.DataFrame({c: rng.uniform(0.1, 0.3, n) for c in FEATURE_COLUMNS[:7]})
+    df['total_files'] = rng.integers(1000, 5000, n).astype(float)
+    df['avg_file_size_mb'] = rng.uniform(1.0, 2.0, n)
+    df['tenant_id'] = np.repeat([f'tenant_{i}' for i in range(tenants)], rows_per_tenant)
+    df['date'] = np.tile(pd.date_range('2025-01-29', periods=rows_per_tenant, freq='D'), tenants)
+    return df
+
+
+class _CountingModel:
+    """archived_gb = total_files / 1000 + month_sin; counts predict() calls and rows"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def predict(self, X):
+        X = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        self.calls.append(len(X))
+        archived = X['total_files'].to_numpy() / 1000 + X['month_sin'].to_numpy()
+        return np.column_stack([archived, archived * 0.48])
+
+
+class TestRecursiveForecaster(unittest.TestCase):
+    """Rollout mechanics"""
+    
+    def test_one_batched_call_per_step(self):
+        history = _history(tenants=5)
+        model = _CountingModel()
+        forecast_df = RecursiveForecaster(model).forecast(history, horizon=10)
+        
+        self.assertEqual(model.calls, [5] * 10)
+        self.assertEqual(len(forecast_df), 50)
+        self.assertEqual(forecast_df['step'].tolist()[:10], list(range(1, 11)))
+        
+        # Starts the day after each tenant's last row; same as a single-tenant rollout
+        tenant = forecast_df[forecast_df['tenant_id'] == 'tenant_2']
+        self.assertEqual(tenant['date'].iloc[0], pd.Timestamp('2025-02-01'))
+        single = RecursiveForecaster(_CountingModel()).forecast(
+            history[history['tenant_id'] == 'tenant_2'], horizon=10
+        )
+        np.testing.assert_allclose(single['archived_gb'], tenant['archived_gb'])
+    
+    def test_seasonal_and_lag_features_roll(self):
+        """month_sin follows the step date; lags start from each tenant's last targets, then roll"""
+        seen = []
+        
+        def predict_fn(frame):
+            seen.append(frame[['month_sin', 'archived_gb_lag_1', 'archived_gb_lag_2']].to_numpy())
+            nxt = frame['archived_gb_lag_1'].to_numpy() + 1
+            return np.column_stack([nxt, nxt / 2])
+        
+        columns = FEATURE_COLUMNS + ['archived_gb_lag_1', 'archived_gb_lag_2']
+        # archived_gb 0, 1, 2 for tenant_0, 3, 4, 5 for tenant_1, 6 for the single-row tenant_2
+        history = _history(tenants=3)
+        history = history[(history['tenant_id'] != 'tenant_2') | (history['date'] == history['date'].max())]
+        history = history.assign(archived_gb=np.arange(len(history), dtype=float))
+        forecast_df = RecursiveForecaster(predict_fn=predict_fn, feature_columns=columns, freq='MS').forecast(
+            history, horizon=4
+        )
+        
+        # Newest first; a tenant with fewer rows than lags repeats its oldest value
+        np.testing.assert_array_equal(seen[0][:, 1:], [[2.0, 1.0], [5.0, 4.0], [6.0, 6.0]])
+        self.assertEqual(forecast_df['archived_gb'].tolist()[:4], [3.0, 4.0, 5.0, 6.0])
+        self.assertEqual([s[0, 1:].tolist() for s in seen], [[2.0, 1.0], [3.0, 2.0], [4.0, 3.0], [5.0, 4.0]])
+        months = pd.DatetimeIndex(forecast_df['date'][:4]).month.to_numpy()
+        np.testing.assert_allclose([s[0, 0] for s in seen], np.sin(2 * np.pi * months / 12))
+        self.assertEqual(list(months), [2, 3, 4, 5])
+    
+    def test_update_hook_and_bands(self):
+        def grow(state, predictions, dates):
+            state['total_files'] *= 1.1
+        
+        forecast_df = RecursiveForecaster(_CountingModel(), update_state=grow).forecast(
+            _history(tenants=1), horizon=3, tenant_column=None
+        )
+        self.assertNotIn('tenant_id', forecast_df.columns)
+        self.assertTrue(np.all(np.diff(forecast_df['archived_gb']) > 0))
+        
+        X = pd.DataFrame(np.random.default_rng(0).normal(size=(200, 9)), columns=FEATURE_COLUMNS)
+        forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, X.iloc[:, :2].to_numpy())
+        banded = RecursiveForecaster(forest, coverage=0.8).forecast(_history(), horizon=5)
+        self.assertTrue(np.all(banded['archived_gb_lower'] <= banded['archived_gb_upper']))
+    
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            RecursiveForecaster()
+        with self.assertRaises(ValueError):
+            RecursiveForecaster(_CountingModel()).forecast(_history(), horizon=0)
+        with self.assertRaises(ValueError):
+            RecursiveForecaster(_CountingModel()).forecast(_history().drop(columns=['pct_pdf']), horizon=2)
+        with self.assertRaises(ValueError):
+            RecursiveForecaster(_CountingModel(), feature_columns=FEATURE_COLUMNS + ['savings_gb_lag_2'])
+
+
+class TestEndpointRecursiveForecast(unittest.TestCase):
+    """get_recursive_forecast of both endpoint clients against the mock endpoint"""
+    
+    def setUp(self):
+        self.server = MockEndpointServer().start()
+        self.env = mock.patch.dict(os.environ, {
+            'MLFLOW_ENDPOINT': self.server.url,
+            'MLFLOW_API_KEY': 'test-key'
+        })
+        self.env.start()
+    
+    def tearDown(self):
+        self.env.stop()
+        self.server.stop()
+    
+    def test_one_request_per_step(self):
+        history = _history(tenants=30)
+        client = AzureMLEndpointClient(chunk_size=1000)
+        forecast_df, metrics = client.get_recursive_forecast(history, forecast_days=12)
+        
+        self.assertEqual(self.server.request_count, 12)
+        self.assertEqual((metrics['tenants'], metrics['horizon'], metrics['endpoint_calls']), (30, 12, 12))
+        self.assertEqual(len(forecast_df), 360)
+        
+        # Mock endpoint: archived_gb = total_files * avg_file_size_mb / 1024 (features carried forward)
+        last = history.groupby('tenant_id').tail(1).set_index('tenant_id')
+        expected = last['total_files'] * last['avg_file_size_mb'] / 1024
+        actual = forecast_df.groupby('tenant_id')['archived_gb'].last()
+        np.testing.assert_allclose(actual.sort_index(), expected.sort_index())
+
+    def test_async_client_awaits_one_request_per_step(self):
+        history = _history(tenants=30)
+        
+        async def _forecast():
+            async with AsyncAzureMLEndpointClient(chunk_size=1000) as client:
+                return await client.get_recursive_forecast(history, forecast_days=12)
+        
+        forecast_df, metrics = run_sync(_forecast())
+        self.assertEqual(self.server.request_count, 12)
+        self.assertEqual((metrics['tenants'], metrics['horizon'], metrics['endpoint_calls']), (30, 12, 12))
+        
+        expected_df, _ = AzureMLEndpointClient(chunk_size=1000).get_recursive_forecast(history, forecast_days=12)
+        pd.testing.assert_frame_equal(forecast_df, expected_df)
+
+
+if __name__ == '__main__':
+    unittest.main()
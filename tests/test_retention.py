@@ -0,0 +1,137 @@
+"""
+Retention Engine Tests
+
+Test Coverage:
+1. Expired rows are archived, downsampled and deleted in chunks
+2. Daily rollups keep the history of expired predictions/feedback
+3. Policies: dry run, downsample=False, disabled tables
+4. Incremental vacuum releases pages on new databases
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.feedback_db import FeedbackDB
+from monitoring.predictions_db import PredictionsDB
+from monitoring.retention import RetentionManager, merge_policies
+from monitoring.streaming import PYARROW_AVAILABLE
+
+
+class TestRetentionManager(unittest.TestCase):
+    """RetentionManager on a populated monitoring database"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'monitoring.db')
+        self.archive_dir = os.path.join(self.temp_dir, 'archive')
+        
+        # 100 predictions and events, one per day going back 99 days
+        with PredictionsDB(self.db_path) as db:
+            for i in range(100):
+                db.save_prediction(f'2025-{i // 28 + 1:02d}-{i % 28 + 1:02d}', 250.0 + i, 130.0)
+                db.save_monitoring_event('drift', 'warning' if i % 2 else 'info', f'event {i}')
+            for table in ('predictions', 'monitoring_events'):
+                db.conn.execute(f"UPDATE {table} SET created_at = datetime('now', '-' || (id - 1) || ' days')")
+            db.conn.commit()
+            db.rebuild_rollups()
+    
+    def _manager(self, **policies):
+        return RetentionManager(self.db_path, policies=policies, archive_dir=self.archive_dir, chunk_size=7)
+    
+    def test_expired_rows_are_archived_and_deleted(self):
+        """Rows older than raw_days leave the table and land in the archive"""
+        with self._manager(predictions={'raw_days': 30}) as manager:
+            result = manager.run()['tables']['predictions']
+        
+        self.assertEqual(result['expired'], 69)
+        self.assertEqual(result['deleted'], 69)
+        with PredictionsDB(self.db_path) as db:
+            self.assertEqual(db.conn.execute('SELECT COUNT(*) FROM predictions').fetchone()[0], 31)
+        
+        if PYARROW_AVAILABLE:
+            archived = pd.concat(pd.read_parquet(path) for path in result['files'])
+        else:
+            archived = pd.concat(pd.read_csv(path) for path in result['files'])
+        self.assertEqual(len(archived), 69)
+        self.assertEqual(archived['id'].nunique(), 69)
+    
+    def test_rollups_keep_expired_history(self):
+        """Summary statistics still cover expired days, also after a rebuild"""
+        with self._manager(predictions={'raw_days': 30}) as manager:
+            manager.run()
+        
+        with PredictionsDB(self.db_path) as db:
+            self.assertEqual(db.get_summary_statistics(days=200)['total_predictions'], 100)
+            db.rebuild_rollups()
+            self.assertEqual(db.get_summary_statistics(days=200)['total_predictions'], 100)
+            self.assertEqual(db.get_summary_statistics(days=10)['total_predictions'], 11)
+    
+    def test_without_downsampling_rollup_is_reduced(self):
+        """downsample=False drops expired rows from the rollup too"""
+        with self._manager(predictions={'raw_days': 30, 'downsample': False, 'archive': False}) as manager:
+            result = manager.run()['tables']['predictions']
+        
+        self.assertEqual(result['files'], [])
+        with PredictionsDB(self.db_path) as db:
+            stats = db.get_summary_statistics(days=200)
+            raw = pd.read_sql_query('SELECT * FROM predictions', db.conn)
+        self.assertEqual(stats['total_predictions'], 31)
+        self.assertAlmostEqual(stats['avg_predicted_archived_gb'], raw['archived_gb_predicted'].mean())
+    
+    def test_events_are_downsampled(self):
+        """Expired monitoring events are counted per day, type and severity"""
+        with self._manager(monitoring_events={'raw_days': 50}) as manager:
+            result = manager.run()['tables']['monitoring_events']
+            daily = pd.read_sql_query('SELECT * FROM monitoring_events_daily', manager.conn)
+        
+        self.assertEqual(result['deleted'], 49)
+        self.assertEqual(daily['n'].sum(), 49)
+        self.assertEqual(set(daily['event_severity']), {'info', 'warning'})
+    
+    def test_dry_run_and_disabled_tables(self):
+        """Dry runs only count; tables mapped to None are left alone"""
+        with self._manager(predictions={'raw_days': 30}, monitoring_events=None) as manager:
+            report = manager.run(dry_run=True)
+        
+        self.assertNotIn('monitoring_events', report['tables'])
+        self.assertEqual(report['tables']['predictions']['expired'], 69)
+        self.assertEqual(report['tables']['predictions']['deleted'], 0)
+        with self.assertRaises(ValueError):
+            merge_policies({'unknown_table': {'raw_days': 1}})
+    
+    def test_incremental_vacuum_releases_pages(self):
+        """New databases are incremental, so deleted pages are returned"""
+        db = FeedbackDB(self.db_path)
+        try:
+            db.submit_feedback_bulk([{
+                'prediction_date': '2025-01-01',
+                'predicted_value': 1.0,
+                'actual_value': 1.0,
+                'feedback_status': 'correct',
+                'user_feedback': 'x' * 500
+            } for _ in range(2000)])
+            db.conn.execute("UPDATE feedback SET created_at = datetime('now', '-400 days')")
+            db.conn.commit()
+        finally:
+            db.close()
+        
+        with self._manager(feedback={'raw_days': 365, 'archive': False}) as manager:
+            report = manager.run()
+            free = manager.conn.execute('PRAGMA freelist_count').fetchone()[0]
+        
+        self.assertEqual(report['tables']['feedback']['deleted'], 2000)
+        self.assertGreater(report['vacuumed_pages'], 0)
+        self.assertEqual(free, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Event-Driven Retraining Scheduler Tests
+
+Test Coverage:
+1. Database writes publish feedback/prediction events on the bus
+2. Events re-evaluate only when a threshold could have been crossed
+3. Bursts of events share one debounced evaluation
+4. The poll interval follows the trigger's recommended next check
+5. Trigger components are reused between checks
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.retraining_scheduler import RetrainingScheduler
+from monitoring.events import FEEDBACK_SUBMITTED, PREDICTION_SAVED, EventBus, get_event_bus
+from monitoring.feedback_db import FeedbackDB
+from monitoring.predictions_db import PredictionsDB
+from monitoring.retraining_trigger import invalidate_trigger_cache
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class TestEventBus(unittest.TestCase):
+    """Writers publish, subscribers are isolated from each other"""
+    
+    def test_database_writes_publish_events(self):
+        """FeedbackDB and PredictionsDB announce committed rows"""
+        received = []
+        bus = get_event_bus()
+        bus.subscribe(FEEDBACK_SUBMITTED, received.append)
+        bus.subscribe(PREDICTION_SAVED, received.append)
+        feedback_db = FeedbackDB(':memory:')
+        predictions_db = PredictionsDB(':memory:')
+        try:
+            feedback_db.submit_feedback(1, '2025-01-01', 1.0, 2.0, 'incorrect')
+            feedback_db.submit_feedback_bulk([
+                {'prediction_date': '2025-01-01', 'predicted_value': 1.0, 'actual_value': 1.0,
+                 'feedback_status': status}
+                for status in ('correct', 'correct', 'uncertain')
+            ])
+            predictions_db.save_prediction('2025-01-01', 250.0, 130.0)
+        finally:
+            bus.unsubscribe(FEEDBACK_SUBMITTED, received.append)
+            bus.unsubscribe(PREDICTION_SAVED, received.append)
+            feedback_db.close()
+            predictions_db.close()
+        
+        self.assertEqual([e['topic'] for e in received], [FEEDBACK_SUBMITTED, FEEDBACK_SUBMITTED, PREDICTION_SAVED])
+        self.assertEqual(received[0]['statuses'], {'incorrect': 1})
+        self.assertEqual(received[1]['count'], 3)
+        self.assertEqual(received[1]['statuses'], {'correct': 2, 'uncertain': 1})
+    
+    def test_failing_subscriber_is_contained(self):
+        """One broken callback neither stops the others nor the publisher"""
+        bus = EventBus()
+        received = []
+        
+        def broken(event):
+            raise RuntimeError("boom")
+        
+        bus.subscribe(PREDICTION_SAVED, broken)
+        bus.subscribe(PREDICTION_SAVED, received.append)
+        self.assertEqual(bus.publish(PREDICTION_SAVED, count=1), 2)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(bus.get_counts(), {PREDICTION_SAVED: 1})
+
+
+class TestEventDrivenScheduler(unittest.TestCase):
+    """RetrainingScheduler(event_driven=True) on a private bus"""
+    
+    def setUp(self):
+        invalidate_trigger_cache()
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)  # evaluations are logged to ./logs
+        self.db_path = os.path.join(self.temp_dir, 'monitoring.db')
+        self.bus = EventBus()
+        self.scheduler = RetrainingScheduler(
+            db_path=self.db_path,
+            auto_retrain=False,
+            event_driven=True,
+            event_bus=self.bus,
+            event_debounce_seconds=0.05
+        )
+        self.scheduler.start()
+    
+    def tearDown(self):
+        self.scheduler.stop()
+        os.chdir(self.cwd)
+        invalidate_trigger_cache()
+    
+    def _stats(self):
+        return self.scheduler.get_status()['event_stats']
+    
+    def test_unreachable_events_are_skipped(self):
+        """Empty database: one feedback entry cannot reach a second condition"""
+        self.assertEqual(self._stats()['evaluations'], 1)
+        self.bus.publish(FEEDBACK_SUBMITTED, count=1, statuses={'correct': 1})
+        
+        time.sleep(0.2)
+        stats = self._stats()
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(stats['evaluations'], 1)
+    
+    def test_reachable_events_are_debounced_into_one_check(self):
+        """New predictions could tip drift: a burst triggers a single re-evaluation"""
+        for _ in range(5):
+            self.bus.publish(PREDICTION_SAVED, count=1)
+        
+        self.assertTrue(_wait_for(lambda: self._stats()['event_checks'] == 1))
+        time.sleep(0.2)
+        stats = self._stats()
+        self.assertEqual(stats['event_checks'], 1)
+        self.assertEqual(stats['evaluations'], 2)
+        self.assertEqual(stats['events'], 5)
+    
+    def test_poll_interval_follows_recommendation(self):
+        """Low feedback and no drift: the next poll is 12 hours out"""
+        self.assertEqual(self.scheduler.next_check_hours, 12)
+        job = self.scheduler.scheduler.get_job('retrain_check')
+        self.assertEqual(job.trigger.interval, timedelta(hours=12))
+    
+    def test_components_are_reused(self):
+        """Checks on the worker thread share one trigger manager"""
+        for _ in range(2):
+            self.bus.publish(PREDICTION_SAVED, count=1)
+            done = self._stats()['event_checks'] + 1
+            self.assertTrue(_wait_for(lambda: self._stats()['event_checks'] == done))
+        
+        # One for the initial check (caller thread), one for the worker thread
+        self.assertEqual(len(self.scheduler._trigger_managers), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Retraining Trigger Snapshot Tests
+
+Test Coverage:
+1. get_trigger_snapshot matches get_feedback_count + get_feedback_accuracy
+2. The cloud snapshot query returns both windows in one statement
+3. Evaluations read one snapshot per database, cached and shared between managers
+4. could_trigger() only asks for re-evaluation when a threshold is reachable
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring import feedback_db, feedback_db_cloud
+from monitoring.drift_detector import DriftDetector
+from monitoring.predictions_db import PredictionsDB
+from monitoring.query_builder import compile_query, schema_statements, window_start
+from monitoring.retraining_trigger import RetaininingTrigger, RetainingTriggerManager, invalidate_trigger_cache
+
+
+def _seed_feedback(db):
+    """Feedback inside both windows, inside only the accuracy window, and outside both"""
+    for i, status in enumerate(['correct'] * 6 + ['incorrect'] * 3 + ['uncertain']):
+        db.submit_feedback(i, '2025-01-01', 10.0, 10.0 + i, status)
+    for days_ago, status in ((12, 'incorrect'), (20, 'correct'), (45, 'incorrect')):
+        db.conn.execute(
+            "INSERT INTO feedback (prediction_date, predicted_value, actual_value, feedback_status, created_at) "
+            "VALUES ('2025-01-01', 5.0, 9.0, ?, datetime('now', ?))",
+            (status, f'-{days_ago} days')
+        )
+    # Raw inserts bypass the incremental rollup
+    db.rebuild_rollups()
+
+
+class TestTriggerSnapshot(unittest.TestCase):
+    """One query instead of separate count/accuracy round trips"""
+    
+    def test_snapshot_matches_separate_queries(self):
+        """Both SQLite FeedbackDB implementations agree with their own methods"""
+        for module in (feedback_db, feedback_db_cloud):
+            with self.subTest(module=module.__name__):
+                db = module.FeedbackDB(':memory:')
+                try:
+                    _seed_feedback(db)
+                    snapshot = db.get_trigger_snapshot(count_days=7, accuracy_days=30)
+                    
+                    self.assertEqual(snapshot['feedback_count'], db.get_feedback_count(days=7))
+                    expected = db.get_feedback_accuracy(days=30)
+                    self.assertEqual(set(snapshot['accuracy']), set(expected))
+                    for key, value in expected.items():
+                        self.assertAlmostEqual(snapshot['accuracy'][key], value, msg=key)
+                finally:
+                    db.close()
+    
+    def test_cloud_query_covers_both_windows(self):
+        """The compiled trigger_snapshot statement, run on a SQLite copy of the schema"""
+        db = feedback_db_cloud.FeedbackDB(':memory:')
+        try:
+            _seed_feedback(db)
+            query = compile_query('trigger_snapshot', 'sqlite')
+            rows = db.conn.execute(query.sql, query.bind(
+                since=window_start(30, 'sqlite'),
+                accuracy_since=window_start(30, 'sqlite'),
+                count_since=window_start(7, 'sqlite')
+            )).fetchall()
+            totals = {row[0]: (row[1], row[3]) for row in rows}
+            
+            self.assertEqual(totals['correct'], (7, 6))
+            self.assertEqual(totals['incorrect'], (4, 3))
+            self.assertEqual(totals['uncertain'], (1, 1))
+        finally:
+            db.close()
+
+
+class TestTriggerCache(unittest.TestCase):
+    """Evaluations are shared for cache_ttl seconds"""
+    
+    def setUp(self):
+        invalidate_trigger_cache()
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'monitoring.db')
+        self.feedback_db = feedback_db.FeedbackDB(self.db_path)
+        self.predictions_db = PredictionsDB(self.db_path)
+        _seed_feedback(self.feedback_db)
+    
+    def tearDown(self):
+        invalidate_trigger_cache()
+        self.feedback_db.close()
+        self.predictions_db.close()
+    
+    def _manager(self, **kwargs):
+        return RetainingTriggerManager(self.feedback_db, self.predictions_db, DriftDetector(), **kwargs)
+    
+    def test_managers_share_one_evaluation(self):
+        """A second manager on the same databases reuses the first evaluation"""
+        first = self._manager().check_retraining_conditions()
+        with mock.patch.object(self.feedback_db, 'get_trigger_snapshot',
+                               wraps=self.feedback_db.get_trigger_snapshot) as snapshot:
+            second = self._manager().check_retraining_conditions()
+            snapshot.assert_not_called()
+            
+            fresh = self._manager().check_retraining_conditions(use_cache=False)
+            self.assertEqual(snapshot.call_count, 1)
+        
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertFalse(fresh['cached'])
+        self.assertEqual(second['metrics'], first['metrics'])
+        self.assertEqual(first['metrics']['feedback_count'], 10)
+    
+    def test_inputs_read_once_per_database(self):
+        """An evaluation reads the feedback snapshot and the drift sample once each, up front"""
+        for day in range(12):
+            self.predictions_db.save_prediction(f'2025-01-{day + 1:02d}', 100.0 + day, 48.0)
+        manager = self._manager()
+        
+        with mock.patch.object(self.feedback_db, 'get_trigger_snapshot',
+                               wraps=self.feedback_db.get_trigger_snapshot) as feedback, \
+             mock.patch.object(self.predictions_db, 'get_recent_predictions_for_drift',
+                               wraps=self.predictions_db.get_recent_predictions_for_drift) as drift:
+            snapshot = manager._read_snapshot()
+            manager.check_retraining_conditions(use_cache=False)
+        
+        self.assertEqual((feedback.call_count, drift.call_count), (2, 2))
+        self.assertEqual(len(snapshot['drift_sample']), 12)
+        self.assertEqual(snapshot['feedback_count'], 10)
+        
+        without_detector = RetainingTriggerManager(self.feedback_db, self.predictions_db)
+        self.assertIsNone(without_detector._read_snapshot()['drift_sample'])
+    
+    def test_ttl_and_invalidation(self):
+        """Expired or invalidated entries are re-evaluated; cache_ttl=0 disables caching"""
+        manager = self._manager(cache_ttl=30)
+        manager.check_retraining_conditions()
+        
+        with mock.patch('monitoring.retraining_trigger.time.monotonic', return_value=10 ** 9):
+            self.assertFalse(manager.check_retraining_conditions()['cached'])
+        
+        invalidate_trigger_cache()
+        self.assertFalse(manager.check_retraining_conditions()['cached'])
+        
+        uncached = self._manager(cache_ttl=0)
+        uncached.check_retraining_conditions()
+        self.assertFalse(uncached.check_retraining_conditions()['cached'])
+    
+    def test_cached_result_is_a_copy(self):
+        """Callers cannot corrupt the cached evaluation"""
+        self._manager().check_retraining_conditions()['metrics']['feedback_count'] = -1
+        self.assertEqual(self._manager().check_retraining_conditions()['metrics']['feedback_count'], 10)
+
+
+class TestCouldTrigger(unittest.TestCase):
+    """Bounds on what new events can change"""
+    
+    def setUp(self):
+        self.trigger = RetaininingTrigger(feedback_threshold=50, accuracy_drop_threshold=0.05)
+    
+    def _evaluation(self, feedback_count, correct, total, drift_score=0.0):
+        evaluation = self.trigger.evaluate(
+            feedback_count=feedback_count,
+            drift_score=drift_score,
+            recent_accuracy=correct / total,
+            baseline_accuracy=0.88
+        )
+        evaluation['feedback_totals'] = {'total_feedback': total, 'correct_feedback': correct}
+        return evaluation
+    
+    def test_far_from_thresholds(self):
+        """A few events cannot reach the two-condition quorum"""
+        evaluation = self._evaluation(feedback_count=10, correct=95, total=100)
+        self.assertFalse(self.trigger.could_trigger(evaluation, new_feedback=5))
+        self.assertFalse(self.trigger.could_trigger(evaluation, new_predictions=3))
+        # Accuracy needs ~14 negative entries to fall 5% below the 0.88 baseline
+        self.assertFalse(self.trigger.could_trigger(evaluation, new_feedback=3, new_negative_feedback=3,
+                                                    new_predictions=1))
+    
+    def test_reachable_thresholds(self):
+        """Crossing the count plus possible drift, or a sharp accuracy fall, re-evaluates"""
+        evaluation = self._evaluation(feedback_count=48, correct=95, total=100)
+        self.assertFalse(self.trigger.could_trigger(evaluation, new_feedback=2))
+        self.assertTrue(self.trigger.could_trigger(evaluation, new_feedback=2, new_predictions=1))
+        self.assertTrue(self.trigger.could_trigger(evaluation, new_feedback=20, new_negative_feedback=20))
+    
+    def test_met_conditions_count(self):
+        """With one condition met, any event that can reach a second re-evaluates"""
+        evaluation = self._evaluation(feedback_count=60, correct=95, total=100)
+        self.assertTrue(evaluation['trigger_details']['condition_feedback'])
+        self.assertFalse(self.trigger.could_trigger(evaluation, new_feedback=1))
+        self.assertTrue(self.trigger.could_trigger(evaluation, new_predictions=1))
+    
+    def test_next_check_hours(self):
+        """The recommended interval is exposed as a number"""
+        recommendations = self.trigger.get_recommendations(self._evaluation(10, 95, 100, drift_score=0.6))
+        self.assertEqual(recommendations['next_check_hours'], 2)
+        self.assertEqual(recommendations['next_check'], '2 hours')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Retraining Worker Tests
+
+Test Coverage:
+1. Retraining runs in a separate process and reports progress
+2. The lock file allows one active retrain (also across workers)
+3. Cancellation terminates the process and releases the lock
+4. Memory limits turn runaway allocations into a failed result
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.retraining_worker import RetrainingWorker, RetrainLock, resource
+
+
+# Worker targets must be module-level so the spawned child can import them
+
+def _quick_target(db_path, retrain_kwargs, report):
+    report('training', 0.5)
+    return {'status': 'success', 'pid': os.getpid(), 'kwargs': retrain_kwargs}
+
+
+def _slow_target(db_path, retrain_kwargs, report):
+    report('training', 0.1)
+    time.sleep(60)
+    return {'status': 'success'}
+
+
+def _allocating_target(db_path, retrain_kwargs, report):
+    block = bytearray(512 * 1024 * 1024)
+    return {'status': 'success', 'size': len(block)}
+
+
+def _wait_for(condition, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+class TestRetrainingWorker(unittest.TestCase):
+    """Process isolation, locking, cancellation and limits"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'monitoring.db')
+    
+    def _worker(self, target, **kwargs):
+        return RetrainingWorker(self.db_path, target=target, **kwargs)
+    
+    def test_runs_in_child_process(self):
+        """The result comes back from another PID via on_complete"""
+        results = []
+        worker = self._worker(_quick_target)
+        self.assertTrue(worker.start({'days': 30}, on_complete=results.append))
+        self.assertTrue(worker.wait(timeout=60))
+        
+        status = worker.get_status()
+        self.assertEqual(status['state'], 'succeeded')
+        self.assertEqual(status['progress'], 1.0)
+        self.assertEqual(results[0]['kwargs'], {'days': 30})
+        self.assertNotEqual(results[0]['pid'], os.getpid())
+        self.assertFalse(worker.lock.held)
+    
+    def test_single_active_retrain(self):
+        """A second start, from this or another worker, is refused while one runs"""
+        worker = self._worker(_slow_target)
+        other = self._worker(_quick_target)
+        try:
+            self.assertTrue(worker.start())
+            self.assertFalse(worker.start())
+            self.assertFalse(other.start())
+            self.assertTrue(_wait_for(lambda: worker.get_status()['stage'] == 'training'))
+        finally:
+            worker.cancel()
+        
+        self.assertTrue(other.start())
+        self.assertTrue(other.wait(timeout=60))
+    
+    def test_cancel(self):
+        """cancel() ends the process, reports 'cancelled' and frees the lock"""
+        results = []
+        worker = self._worker(_slow_target)
+        worker.start(on_complete=results.append)
+        self.assertTrue(worker.cancel())
+        
+        self.assertEqual(worker.get_status()['state'], 'cancelled')
+        self.assertEqual(results, [{'status': 'cancelled'}])
+        self.assertFalse(worker.cancel())
+        
+        lock = RetrainLock(worker.lock.path)
+        self.assertTrue(lock.acquire())
+        lock.release()
+    
+    @unittest.skipIf(resource is None, "resource limits need a Unix platform")
+    def test_memory_limit(self):
+        """An allocation beyond memory_mb fails the retrain instead of the host"""
+        worker = self._worker(_allocating_target, memory_mb=256)
+        worker.start()
+        self.assertTrue(worker.wait(timeout=60))
+        
+        status = worker.get_status()
+        self.assertEqual(status['state'], 'failed')
+        self.assertIn('MemoryError', status['result']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
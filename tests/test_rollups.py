@@ -0,0 +1,170 @@
+"""
+Daily Rollup Tests
+
+Test Coverage:
+1. Incrementally maintained prediction rollup equals a full rebuild
+2. Replaced predictions and late actuals keep the summary exact
+3. Existing databases are backfilled on open
+4. Feedback accuracy from the rollup matches the raw table
+"""
+
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.feedback_db import FeedbackDB
+from monitoring.predictions_db import PredictionsDB
+from monitoring.rollups import mean_and_std
+
+
+class TestPredictionRollup(unittest.TestCase):
+    """PredictionsDB.get_summary_statistics from prediction_daily_rollup"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'rollup.db')
+        self.db = PredictionsDB(self.db_path)
+        
+        rng = np.random.default_rng(1)
+        for i in range(40):
+            self.db.save_prediction(f'2025-02-{i % 28 + 1:02d}' if i < 28 else f'2025-03-{i - 27:02d}',
+                                    float(rng.normal(250, 20)), float(rng.normal(130, 10)))
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def _rollup_rows(self):
+        return self.db.conn.execute('SELECT * FROM prediction_daily_rollup ORDER BY day').fetchall()
+    
+    def _raw_predictions(self):
+        return pd.read_sql_query('SELECT * FROM predictions', self.db.conn)
+    
+    def test_incremental_matches_rebuild(self):
+        """Writes leave the rollup identical to a from-scratch rebuild"""
+        self.db.save_prediction('2025-02-03', 300.0, 150.0)
+        self.db.update_actual_value('2025-02-04', 260.0, 135.0)
+        incremental = [tuple(row) for row in self._rollup_rows()]
+        
+        self.db.rebuild_rollups()
+        rebuilt = [tuple(row) for row in self._rollup_rows()]
+        
+        self.assertEqual(len(incremental), len(rebuilt))
+        for inc, reb in zip(incremental, rebuilt):
+            np.testing.assert_allclose(
+                [v for v in inc if not isinstance(v, str)],
+                [v for v in reb if not isinstance(v, str)]
+            )
+            self.assertEqual([v for v in inc if isinstance(v, str)], [v for v in reb if isinstance(v, str)])
+    
+    def test_summary_matches_raw_table(self):
+        """Replaced rows and late actuals are reflected exactly"""
+        self.db.save_prediction('2025-02-01', 999.0, 500.0)
+        self.db.update_actual_value('2025-02-02', 240.0, 120.0)
+        self.db.update_actual_value('2025-02-03', 250.0)
+        
+        stats = self.db.get_summary_statistics(days=30)
+        raw = self._raw_predictions()
+        
+        self.assertEqual(stats['total_predictions'], 40)
+        self.assertEqual(stats['predictions_with_actuals'], 2)
+        self.assertAlmostEqual(stats['avg_predicted_archived_gb'], raw['archived_gb_predicted'].mean())
+        self.assertAlmostEqual(stats['std_predicted_archived_gb'], raw['archived_gb_predicted'].std())
+        self.assertAlmostEqual(stats['avg_actual_savings_gb'], 120.0)
+        self.assertEqual(stats['date_range'], '2025-02-01 to 2025-03-12')
+    
+    def test_bounds_shrink_when_last_row_moves(self):
+        """min/max prediction_date are recomputed after a replace"""
+        self.db.conn.execute('DELETE FROM predictions WHERE prediction_date > ?', ('2025-02-01',))
+        self.db.conn.commit()
+        self.db.rebuild_rollups()
+        self.db.save_prediction('2025-02-01', 1.0, 1.0)
+        
+        stats = self.db.get_summary_statistics(days=30)
+        self.assertEqual(stats['total_predictions'], 1)
+        self.assertEqual(stats['date_range'], '2025-02-01 to 2025-02-01')
+        self.assertEqual(len(self._rollup_rows()), 1)
+    
+    def test_existing_database_is_backfilled(self):
+        """Opening a database without rollup rows rebuilds them"""
+        self.db.conn.execute('DROP TABLE prediction_daily_rollup')
+        self.db.conn.commit()
+        self.db.close()
+        
+        self.db = PredictionsDB(self.db_path)
+        self.assertEqual(self.db.get_summary_statistics(days=30)['total_predictions'], 40)
+    
+    def test_summary_reads_rollup_only(self):
+        """The summary is served without touching the predictions table"""
+        conn = sqlite3.connect(self.db_path)
+        conn.set_authorizer(
+            lambda action, table, *_: sqlite3.SQLITE_DENY if table == 'predictions' else sqlite3.SQLITE_OK
+        )
+        self.db.conn, original = conn, self.db.conn
+        try:
+            self.assertEqual(self.db.get_summary_statistics(days=30)['total_predictions'], 40)
+        finally:
+            self.db.conn = original
+            conn.close()
+    
+    def test_mean_and_std(self):
+        """Sample statistics from count, sum and sum of squares"""
+        values = np.array([2.0, 4.0, 4.0, 5.0])
+        mean, std = mean_and_std(len(values), values.sum(), (values ** 2).sum())
+        self.assertAlmostEqual(mean, values.mean())
+        self.assertAlmostEqual(std, values.std(ddof=1))
+        self.assertEqual(mean_and_std(1, 3.0, 9.0), (3.0, None))
+
+
+class TestFeedbackRollup(unittest.TestCase):
+    """FeedbackDB.get_feedback_accuracy from feedback_daily_rollup"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = FeedbackDB(os.path.join(self.temp_dir, 'feedback.db'))
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def test_accuracy_matches_raw_query(self):
+        """Single and bulk inserts both update the rollup"""
+        self.db.submit_feedback(1, '2025-01-01', 100.0, 110.0, 'correct')
+        self.db.submit_feedback(2, '2025-01-02', 100.0, 70.0, 'incorrect')
+        self.db.submit_feedback_bulk([{
+            'prediction_id': i,
+            'prediction_date': '2025-01-03',
+            'predicted_value': 100.0,
+            'actual_value': 100.0 + i,
+            'feedback_status': ('correct', 'incorrect', 'uncertain')[i % 3]
+        } for i in range(30)])
+        
+        raw = pd.read_sql_query('''
+            SELECT feedback_status, AVG(ABS(actual_value - predicted_value)) as avg_error
+            FROM feedback GROUP BY feedback_status
+        ''', self.db.conn)
+        accuracy = self.db.get_feedback_accuracy(days=7)
+        
+        self.assertEqual(accuracy['total_feedback'], 32)
+        self.assertEqual(accuracy['correct_feedback'], 11)
+        self.assertEqual(accuracy['incorrect_feedback'], 11)
+        self.assertAlmostEqual(accuracy['avg_error'], raw['avg_error'].mean())
+    
+    def test_rebuild_is_idempotent(self):
+        """Compaction leaves the totals unchanged"""
+        self.db.submit_feedback(1, '2025-01-01', 100.0, 110.0, 'correct')
+        before = self.db.get_feedback_accuracy(days=7)
+        self.db.rebuild_rollups()
+        self.assertEqual(self.db.get_feedback_accuracy(days=7), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Shadow Scoring Tests
+
+Test Coverage:
+1. Sampled requests are scored by the candidate and written in bulk
+2. submit() never waits for the candidate; a saturated pool drops requests
+3. Candidate failures are counted without affecting the caller
+4. Error/latency deltas against actual values from the monitoring DB
+5. score.py shadow-scores when SHADOW_MODEL_DIR is set
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.model_artifacts import save_model_artifact
+from ml.shadow_scoring import ShadowScorer
+from monitoring.predictions_db import PredictionsDB
+
+FEATURES = ['total_files', 'avg_file_size_mb', 'pct_pdf', 'pct_docx', 'pct_xlsx',
+            'pct_other', 'archive_frequency_per_day', 'month_sin', 'month_cos']
+
+
+def _model(scale: float) -> LinearRegression:
+    """Forecast-shaped model: 9 named features -> [archived_gb, savings_gb] = scale"""
+    X = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 9)), columns=FEATURES)
+    return LinearRegression().fit(X, np.full((50, 2), scale))
+
+
+class _Candidate:
+    """Stands in for a ModelManager: constant [value, value / 2] predictions"""
+    
+    def __init__(self, value: float = 2.0, delay: float = 0.0, fail: bool = False):
+        self.value = value
+        self.delay = delay
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+    
+    def predict(self, X):
+        self.release.wait(10)
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError("candidate rejected the input")
+        return np.tile([self.value, self.value / 2], (len(X), 1))
+    
+    @contextmanager
+    def acquire(self):
+        yield SimpleNamespace(model=self, version='candidate-1')
+
+
+class TestShadowScorer(unittest.TestCase):
+    """Sampling, background scoring and bulk writes"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'monitoring.db')
+        self.X = np.zeros((3, 9))
+        self.primary = np.tile([1.0, 0.5], (3, 1))
+    
+    def test_sampled_pairs_are_written_in_bulk(self):
+        """About sample_rate of requests is shadowed; pairs land in few transactions"""
+        shadow = ShadowScorer(_Candidate(), sample_rate=0.25, db_path=self.db_path, flush_size=30, seed=1)
+        with mock.patch.object(PredictionsDB, 'save_shadow_predictions_bulk',
+                               autospec=True, side_effect=PredictionsDB.save_shadow_predictions_bulk) as bulk:
+            for _ in range(400):
+                shadow.submit(self.X, self.primary, 0.001, 'primary-1', ['2025-01-01'] * 3)
+            shadow.close()
+        
+        stats = shadow.get_stats()
+        self.assertAlmostEqual(stats['sampled'] / stats['requests'], 0.25, delta=0.06)
+        self.assertEqual(stats['scored'] + stats['dropped'], stats['sampled'])
+        self.assertEqual(stats['written'], stats['scored'] * 3)
+        self.assertLess(bulk.call_count, stats['scored'] / 5)
+        self.assertAlmostEqual(stats['mean_divergence_gb'], 1.0)
+        
+        with PredictionsDB(self.db_path) as db:
+            count = db.conn.execute('SELECT COUNT(*) FROM shadow_predictions').fetchone()[0]
+        self.assertEqual(count, stats['written'])
+    
+    def test_submit_does_not_wait(self):
+        """A slow candidate never delays submit(); excess requests are dropped"""
+        candidate = _Candidate()
+        candidate.release.clear()
+        shadow = ShadowScorer(candidate, sample_rate=1.0, db_path=None, max_workers=1, max_pending=3)
+        
+        start = time.perf_counter()
+        accepted = [shadow.submit(self.X, self.primary, 0.001, 'primary-1') for _ in range(10)]
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(accepted, [True] * 3 + [False] * 7)
+        self.assertEqual(shadow.get_stats()['dropped'], 7)
+        
+        candidate.release.set()
+        shadow.close()
+        self.assertEqual(shadow.get_stats()['scored'], 3)
+    
+    def test_candidate_failure_is_contained(self):
+        shadow = ShadowScorer(_Candidate(fail=True), sample_rate=1.0, db_path=self.db_path)
+        self.assertTrue(shadow.submit(self.X, self.primary, 0.001, 'primary-1'))
+        shadow.close()
+        stats = shadow.get_stats()
+        self.assertEqual((stats['failed'], stats['scored'], stats['pending']), (1, 0, 0))
+    
+    def test_comparison_against_actuals(self):
+        """MAE per version and candidate - primary deltas from paired rows"""
+        with PredictionsDB(self.db_path) as db:
+            db.save_prediction('2025-01-01', 1.0, 0.5, archived_gb_actual=1.5, savings_gb_actual=0.7)
+        
+        shadow = ShadowScorer(_Candidate(value=2.0, delay=0.01), sample_rate=1.0, db_path=self.db_path)
+        shadow.submit(self.X[:2], self.primary[:2], 0.001, 'primary-1', ['2025-01-01', '2025-01-02'])
+        shadow.close()
+        
+        with PredictionsDB(self.db_path) as db:
+            comparison = db.get_shadow_comparison(days=3650).iloc[0]
+            self.assertTrue(db.get_shadow_comparison(days=3650, candidate_version='other').empty)
+        self.assertEqual((comparison['n'], comparison['n_with_actuals']), (2, 1))
+        self.assertAlmostEqual(comparison['primary_mae'], 0.5)
+        self.assertAlmostEqual(comparison['candidate_mae'], 0.5)
+        self.assertAlmostEqual(comparison['mae_delta'], 0.0)
+        self.assertAlmostEqual(comparison['mean_divergence_gb'], 1.0)
+        self.assertGreater(comparison['latency_delta_ms'], 5)
+
+
+class TestScoringScriptShadow(unittest.TestCase):
+    """score.py with a shadow candidate configured"""
+    
+    def test_run_with_shadow_candidate(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        primary_dir, candidate_dir = Path(tmp.name, 'primary'), Path(tmp.name, 'candidate')
+        save_model_artifact(_model(1.0), primary_dir)
+        save_model_artifact(_model(3.0), candidate_dir)
+        db_path = os.path.join(tmp.name, 'monitoring.db')
+        
+        from ml.archived import score
+        with mock.patch.dict('os.environ', {
+            'AZUREML_MODEL_DIR': str(primary_dir), 'MODEL_WATCH_INTERVAL': '0',
+            'SHADOW_MODEL_DIR': str(candidate_dir), 'SHADOW_SAMPLE_RATE': '1.0', 'SHADOW_DB_PATH': db_path
+        }):
+            score.init()
+        self.addCleanup(setattr, score, 'shadow_scorer', None)
+        
+        request = json.dumps({'instances': [
+            {'month': '2025-03-01', 'total_files': 100, 'avg_file_size_mb': 1.0, 'pct_pdf': 0.5,
+             'pct_docx': 0.2, 'pct_xlsx': 0.1, 'archive_frequency_per_day': 10}
+        ] * 2})
+        response = json.loads(score.run(request))
+        self.assertAlmostEqual(response['predictions'][0]['archived_gb_next_period'], 1.0)
+        
+        score.shadow_scorer.close()
+        with PredictionsDB(db_path) as db:
+            rows = db.conn.execute(
+                'SELECT prediction_date, primary_archived_gb, candidate_archived_gb FROM shadow_predictions'
+            ).fetchall()
+        self.assertEqual([tuple(r) for r in rows], [('2025-03-01', 1.0, 3.0)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Streaming Reader Tests
+
+Test Coverage:
+1. Batched, typed reads from FeedbackDB and PredictionsDB
+2. Arrow output
+3. Cloud FeedbackDB streaming through the pool
+4. ModelRetrainer streaming features (partial_fit scaler + reservoir sample)
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+from pathlib import Path
+from unittest import mock
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from monitoring.feedback_db import FeedbackDB
+from monitoring.feedback_db_cloud import FeedbackDB as CloudFeedbackDB
+from monitoring.predictions_db import PredictionsDB
+from monitoring.streaming import PYARROW_AVAILABLE
+from ml.retrain_model import ModelRetrainer, ReservoirSample
+from tests.test_db_pool import _ShimConnection
+
+
+def _feedback_records(n: int):
+    rng = np.random.default_rng(0)
+    return [{
+        'prediction_id': i,
+        'prediction_date': '2025-01-01',
+        'predicted_value': float(rng.normal(100, 10)),
+        'actual_value': float(rng.normal(100, 10)),
+        'feedback_status': 'incorrect' if i % 5 == 0 else 'correct'
+    } for i in range(n)]
+
+
+class TestStreamingReaders(unittest.TestCase):
+    """Generator readers on the SQLite databases"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'stream.db')
+        self.feedback_db = FeedbackDB(self.db_path)
+        self.feedback_db.submit_feedback_bulk(_feedback_records(2500))
+    
+    def tearDown(self):
+        self.feedback_db.close()
+    
+    def test_feedback_batches_are_typed(self):
+        """Rows arrive in batch_size chunks as typed arrays"""
+        batches = list(self.feedback_db.iter_feedback(days=7, batch_size=1000))
+        
+        self.assertEqual([len(b['id']) for b in batches], [1000, 1000, 500])
+        self.assertEqual(batches[0]['predicted_value'].dtype, np.float64)
+        self.assertEqual(batches[0]['created_at'].dtype, np.dtype('datetime64[s]'))
+        self.assertEqual(batches[0]['feedback_status'][0], 'incorrect')
+    
+    def test_prediction_batches_keep_nulls(self):
+        """Missing actuals become NaN"""
+        with PredictionsDB(self.db_path) as db:
+            db.save_prediction('2025-01-01', 250.0, 130.0)
+            db.save_prediction('2025-01-02', 251.0, 131.0)
+            db.update_actual_value('2025-01-01', 249.0, 129.0)
+            
+            batches = list(db.iter_predictions(days=7, batch_size=1))
+            values = np.concatenate([b['archived_gb_actual'] for b in batches])
+        
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(int(np.isnan(values).sum()), 1)
+    
+    def test_day_windows_use_created_at_index(self):
+        """The days window is a range on created_at (sargable), served by its index"""
+        with PredictionsDB(self.db_path) as db:
+            db.save_prediction('2025-01-01', 250.0, 130.0)
+            db.conn.execute(
+                "UPDATE predictions SET created_at = datetime('now', '-10 days') WHERE prediction_date = '2025-01-01'"
+            )
+            db.save_prediction('2025-01-02', 251.0, 131.0)
+            self.assertEqual(sum(len(b['id']) for b in db.iter_predictions(days=7)), 1)
+            
+            with mock.patch('monitoring.predictions_db.iter_batches') as reader:
+                list(db.iter_predictions(days=7))
+            query, params = reader.call_args[0][1:3]
+            plan = ' '.join(row[-1] for row in db.conn.execute('EXPLAIN QUERY PLAN ' + query, params))
+            self.assertIn('idx_predictions_created_at', plan)
+    
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_arrow_batches(self):
+        """as_arrow=True yields RecordBatches"""
+        batch = next(self.feedback_db.iter_feedback(days=7, batch_size=100, as_arrow=True))
+        self.assertEqual(batch.num_rows, 100)
+        self.assertEqual(str(batch.schema.field('actual_value').type), 'double')
+    
+    def test_cloud_backend_streams_through_pool(self):
+        """The pooled connection is returned after a partial read"""
+        db = CloudFeedbackDB(use_cloud=True, cloud_config={
+            'provider': 'postgres',
+            'pool_size': 1,
+            'connection_factory': lambda: _ShimConnection(os.path.join(self.temp_dir, 'cloud.db'), [])
+        })
+        db.submit_feedback_bulk(_feedback_records(30))
+        
+        batches = db.iter_feedback(days=7, batch_size=10)
+        self.assertEqual(len(next(batches)['id']), 10)
+        batches.close()
+        
+        self.assertEqual(db.get_pool_stats()['idle'], 1)
+        self.assertEqual(sum(len(b['id']) for b in db.iter_feedback(days=7, batch_size=7)), 30)
+        db.close()
+
+
+class TestStreamingRetrainer(unittest.TestCase):
+    """ModelRetrainer consumes batches with bounded memory"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with mock.patch('ml.retrain_model.mlflow'):
+            self.retrainer = ModelRetrainer(db_path=os.path.join(self.temp_dir, 'retrain.db'))
+        self.retrainer.feedback_db.submit_feedback_bulk(_feedback_records(3000))
+    
+    def tearDown(self):
+        self.retrainer.feedback_db.close()
+        self.retrainer.predictions_db.close()
+    
+    def test_scaler_matches_full_fit_and_sample_is_bounded(self):
+        """partial_fit over batches equals a full fit; only sample_size rows are kept"""
+        batches = self.retrainer.stream_training_data(days=7, batch_size=400)
+        X, y, scaler, rows_seen = self.retrainer.prepare_features_streaming(batches, sample_size=500)
+        
+        full = self.retrainer.feedback_db.get_recent_feedback(days=7, limit=10000)
+        full_X, _, _ = self.retrainer.prepare_features(full)
+        
+        self.assertEqual(rows_seen, 3000)
+        self.assertEqual(X.shape, (500, 4))
+        np.testing.assert_allclose(scaler.mean_[:2], full[['predicted_value', 'actual_value']].mean().values)
+        self.assertAlmostEqual(y.mean(), 0.2, delta=0.06)
+    
+    def test_reservoir_is_uniform(self):
+        """Every stream position is equally likely to be kept"""
+        hits = np.zeros(1000)
+        for seed in range(200):
+            sample = ReservoirSample(size=100, random_state=seed)
+            for start in range(0, 1000, 250):
+                rows = np.arange(start, start + 250)
+                sample.add(rows.reshape(-1, 1).astype(float), rows)
+            hits[sample.arrays()[1]] += 1
+        
+        # Expected 20 hits per position; first and last quarter should agree
+        self.assertAlmostEqual(hits[:250].mean(), hits[750:].mean(), delta=3)
+    
+    def test_falls_back_to_predictions(self):
+        """With no feedback the predictions table is streamed instead"""
+        self.retrainer.feedback_db.conn.execute('DELETE FROM feedback')
+        self.retrainer.feedback_db.conn.commit()
+        self.retrainer.predictions_db.save_prediction('2025-01-01', 250.0, 130.0)
+        
+        chunk = next(self.retrainer.stream_training_data(days=7))
+        X, y = self.retrainer.chunk_features(chunk)
+        self.assertEqual(X.shape, (1, 2))
+        self.assertEqual(y.sum(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tenant Model Router Tests
+
+Test Coverage:
+1. Rows are dispatched to their tenant's (or cluster's) model, in input order
+2. Tenants without a model use the fallback; none given raises
+3. Bounded LRU pool: hits, misses, evictions and hit rate
+4. Cached routes, refresh, and per-tenant latency statistics
+5. score.py routes tenant rows when TENANT_MODEL_PREFIX is set
+"""
+
+import unittest
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+# Add src directory to path for imports
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from ml.model_artifacts import save_model_artifact
+from ml.model_registry import get_registry
+from ml.tenant_router import TenantModelRouter
+
+FEATURES = ['total_files', 'avg_file_size_mb', 'pct_pdf', 'pct_docx', 'pct_xlsx',
+            'pct_other', 'archive_frequency_per_day', 'month_sin', 'month_cos']
+
+
+def _model(scale: float) -> LinearRegression:
+    """Forecast-shaped model: 9 named features -> [archived_gb, savings_gb] = scale"""
+    X = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 9)), columns=FEATURES)
+    return LinearRegression().fit(X, np.full((50, 2), scale))
+
+
+class TestTenantModelRouter(unittest.TestCase):
+    """Routing, pool and statistics on a temporary registry"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.registry_dir = str(self.dir / 'registry')
+        self.X = pd.DataFrame(np.zeros((6, 9)), columns=FEATURES)
+        for name, scale in (('tenant_a', 1.0), ('tenant_b', 2.0), ('cluster_1', 3.0)):
+            self._register(f'forecast-{name}', _model(scale))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def _register(self, name: str, model):
+        save_model_artifact(model, self.dir / name)
+        get_registry(self.registry_dir).register(name, self.dir / name, aliases=['production'])
+    
+    def _router(self, **kwargs) -> TenantModelRouter:
+        return TenantModelRouter(registry_dir=self.registry_dir, base_name='forecast',
+                                 tenant_models={'tenant_c': 'forecast-cluster_1'}, **kwargs)
+    
+    def test_rows_go_to_their_model(self):
+        """One predict call per model; output follows the input row order"""
+        router = self._router()
+        tenants = ['tenant_b', 'tenant_a', 'tenant_new', 'tenant_c', 'tenant_b', 'tenant_a']
+        predictions = router.predict(self.X, tenants, fallback=_model(9.0))
+        
+        np.testing.assert_allclose(predictions[:, 0], [2.0, 1.0, 9.0, 3.0, 2.0, 1.0])
+        stats = router.get_stats()
+        self.assertEqual((stats['model_calls'], stats['fallback_rows']), (4, 1))
+        self.assertEqual(stats['tenants']['tenant_c']['model'], 'forecast-cluster_1:1')
+        self.assertEqual(stats['tenants']['tenant_new']['model'], 'fallback')
+        
+        with self.assertRaises(KeyError):
+            router.predict(self.X, tenants)
+    
+    def test_forest_models(self):
+        """Forests take the per-tree path and match their own predict()"""
+        rng = np.random.default_rng(1)
+        X_train = pd.DataFrame(rng.normal(size=(100, 9)), columns=FEATURES)
+        forest = RandomForestRegressor(n_estimators=5, random_state=0).fit(X_train, X_train.iloc[:, :2])
+        self._register('forecast-tenant_f', forest)
+        
+        predictions = self._router().predict(X_train.iloc[:4], ['tenant_f'] * 4)
+        np.testing.assert_allclose(predictions, forest.predict(X_train.iloc[:4]))
+    
+    def test_pool_is_bounded_lru(self):
+        router = self._router(pool_size=2)
+        for tenants in (['tenant_a'], ['tenant_b'], ['tenant_a'], ['tenant_c'], ['tenant_b']):
+            router.predict(self.X.iloc[:1], tenants)
+        
+        pool = router.get_stats()['pool']
+        self.assertEqual((pool['hits'], pool['misses'], pool['evictions']), (1, 4, 2))
+        self.assertAlmostEqual(pool['hit_rate'], 0.2)
+        self.assertEqual((pool['loaded'], pool['pool_size']), (2, 2))
+    
+    def test_routes_are_cached_until_refreshed(self):
+        router = self._router()
+        router.predict(self.X.iloc[:1], ['tenant_d'], fallback=_model(9.0))
+        self._register('forecast-tenant_d', _model(4.0))
+        
+        self.assertIsNone(router.route('tenant_d'))
+        router.refresh_routes()
+        predictions = router.predict(self.X.iloc[:2], ['tenant_d'] * 2, fallback=_model(9.0))
+        np.testing.assert_allclose(predictions[:, 0], [4.0, 4.0])
+        
+        tenant = router.get_stats()['tenants']['tenant_d']
+        self.assertEqual((tenant['requests'], tenant['rows']), (2, 3))
+        self.assertGreaterEqual(tenant['p99_ms'], tenant['p50_ms'])
+
+
+class TestScoringScriptTenantRouting(unittest.TestCase):
+    """score.py with per-tenant models"""
+    
+    def test_run_routes_tenant_rows(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        save_model_artifact(_model(1.0), root / 'global')
+        save_model_artifact(_model(5.0), root / 'tenant_a')
+        get_registry(str(root / 'registry')).register('forecast-tenant_a', root / 'tenant_a',
+                                                      aliases=['production'])
+        
+        from ml.archived import score
+        with mock.patch.dict('os.environ', {
+            'AZUREML_MODEL_DIR': str(root / 'global'), 'MODEL_WATCH_INTERVAL': '0',
+            'MODEL_REGISTRY_DIR': str(root / 'registry'), 'TENANT_MODEL_PREFIX': 'forecast'
+        }):
+            score.init()
+        self.addCleanup(setattr, score, 'tenant_router', None)
+        
+        row = {'total_files': 100, 'avg_file_size_mb': 1.0, 'pct_pdf': 0.5,
+               'pct_docx': 0.2, 'pct_xlsx': 0.1, 'archive_frequency_per_day': 10}
+        request = json.dumps({'instances': [dict(row, tenant_id='tenant_a'), dict(row, tenant_id='tenant_z')]})
+        response = json.loads(score.run(request))
+        
+        archived = [p['archived_gb_next_period'] for p in response['predictions']]
+        np.testing.assert_allclose(archived, [5.0, 1.0])
+        self.assertEqual(score.tenant_router.get_stats()['fallback_rows'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()